@@ -29,6 +29,13 @@ class LinkedInConfig:
     MESSAGES_DIR = DATA_DIR / "messages"
     INDEX_FILE = DATA_DIR / "index.json"
     
+    # Sérialisation JSON: "auto" (orjson, puis msgspec, puis json), "orjson", "msgspec" ou "json".
+    # Sortie compacte par défaut; l'indentation est optionnelle.
+    JSON_BACKEND = os.getenv("LINKEDIN_JSON_BACKEND", "auto")
+    VALID_JSON_BACKENDS = ["auto", "orjson", "msgspec", "json"]
+    JSON_PRETTY_STORAGE = os.getenv("LINKEDIN_JSON_PRETTY_STORAGE", "false").lower() == "true"
+    JSON_PRETTY_RESPONSES = os.getenv("LINKEDIN_JSON_PRETTY_RESPONSES", "false").lower() == "true"
+    
     # Limites par défaut
     DEFAULT_PROFILE_LIMIT = 25
     DEFAULT_POST_LIMIT = 50
@@ -63,6 +70,11 @@ class LinkedInConfig:
                 "LINKEDIN_CLIENT_ID et LINKEDIN_CLIENT_SECRET sont requis. "
                 "Configurez-les dans votre fichier .env"
             )
+        if cls.JSON_BACKEND not in cls.VALID_JSON_BACKENDS:
+            raise ValueError(
+                f"Backend JSON invalide: {cls.JSON_BACKEND}. "
+                f"Options valides: {cls.VALID_JSON_BACKENDS}"
+            )
         if not cls.ACCESS_TOKEN:
             print("⚠️  LINKEDIN_ACCESS_TOKEN non configuré. Vous devrez vous authentifier.")
         return True
@@ -13,6 +13,7 @@ from mcp.types import Resource, Tool, TextContent
 from config import LinkedInConfig
 from utils.auth import LinkedInAuth
 from utils.api_client import LinkedInAPIClient
+from utils.serializer import response_serializer
 from storage.index_manager import IndexManager
 from storage.file_manager import FileManager
 
@@ -45,7 +46,7 @@ class LinkedInMCPServer:
         
         self.api_client = LinkedInAPIClient(self.auth)
         
-        self.index_manager = IndexManager(LinkedInConfig.INDEX_FILE)
+        self.index_manager = IndexManager(LinkedInConfig.INDEX_FILE, json_backend=LinkedInConfig.JSON_BACKEND)
         self.file_manager = FileManager(LinkedInConfig, self.index_manager)
         
         self.tools = {
@@ -111,14 +112,13 @@ class LinkedInMCPServer:
                 
             except Exception as e:
                 print(f" Erreur outil '{name}': {e}")
-                import json
                 return [TextContent(
                     type="text",
-                    text=json.dumps({
+                    text=response_serializer.dumps({
                         "status": "error",
                         "tool": name,
                         "error": str(e)
-                    }, indent=2)
+                    })
                 )]
     
     async def run(self):
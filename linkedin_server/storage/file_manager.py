@@ -3,11 +3,11 @@ Gestion des fichiers de données LinkedIn
 Fichier: mcp_servers/linkedin_server/storage/file_manager.py
 """
 
-import json
 from datetime import datetime
 from typing import Dict, List
 from pathlib import Path
 from .index_manager import IndexManager
+from utils.serializer import JSONSerializer
 
 
 class FileManager:
@@ -16,16 +16,18 @@ class FileManager:
     def __init__(self, config, index_manager: IndexManager):
         self.config = config
         self.index = index_manager
+        # Sortie compacte sauf si JSON_PRETTY_STORAGE
+        self.serializer = JSONSerializer(config.JSON_BACKEND, pretty=config.JSON_PRETTY_STORAGE)
     
     def _write_json(self, file_path: Path, data: Dict):
         """Écrit des données JSON dans un fichier"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(file_path, 'wb') as f:
+            f.write(self.serializer.dumps_bytes(data))
     
     def _read_json(self, file_path: Path) -> Dict:
         """Lit des données JSON depuis un fichier"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            return self.serializer.loads(f.read())
     
     def save_profile(self, profile_data: Dict) -> str:
         """Sauvegarde un profil LinkedIn"""
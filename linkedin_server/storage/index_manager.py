@@ -7,13 +7,16 @@ import json
 from datetime import datetime
 from typing import Dict, List
 from pathlib import Path
+from utils.serializer import JSONSerializer
 
 
 class IndexManager:
     """Gestionnaire de l'index centralisé"""
     
-    def __init__(self, index_file: Path):
+    def __init__(self, index_file: Path, json_backend: str = "auto"):
         self.index_file = index_file
+        # L'index est réécrit à chaque ajout: toujours en sortie compacte
+        self.serializer = JSONSerializer(json_backend)
         self.index = self._load_or_create()
     
     def _load_or_create(self) -> Dict:
@@ -26,8 +29,8 @@ class IndexManager:
     def _load(self) -> Dict:
         """Charge l'index depuis le fichier"""
         try:
-            with open(self.index_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(self.index_file, 'rb') as f:
+                return self.serializer.loads(f.read())
         except (FileNotFoundError, json.JSONDecodeError):
             return self._create_new()
     
@@ -53,8 +56,8 @@ class IndexManager:
         
         index["last_updated"] = datetime.now().isoformat()
         
-        with open(self.index_file, 'w', encoding='utf-8') as f:
-            json.dump(index, f, indent=2, ensure_ascii=False)
+        with open(self.index_file, 'wb') as f:
+            f.write(self.serializer.dumps_bytes(index))
     
     def add_profile(self, profile_id: str, file_path: str):
         """Ajoute un profil à l'index"""
@@ -3,9 +3,9 @@ Outil MCP: Posts d'une entreprise
 Fichier: mcp_servers/linkedin_server/tools/get_company_posts.py
 """
 
-import json
 from typing import Any, Dict, List
 from mcp.types import Tool, TextContent
+from utils.serializer import response_serializer
 from utils.validators import LinkedInValidator, ValidationError
 
 
@@ -67,25 +67,25 @@ class GetCompanyPostsTool:
             
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
+                text=response_serializer.dumps(result)
             )]
             
         except ValidationError as e:
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "validation_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
         except Exception as e:
             print(f" Erreur: {e}")
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "execution_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
\ No newline at end of file
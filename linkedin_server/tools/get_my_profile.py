@@ -3,9 +3,9 @@ Outil MCP: Récupération du profil utilisateur
 Fichier: mcp_servers/linkedin_server/tools/get_my_profile.py
 """
 
-import json
 from typing import Any, Dict, List
 from mcp.types import Tool, TextContent
+from utils.serializer import response_serializer
 
 
 class GetMyProfileTool:
@@ -48,16 +48,16 @@ class GetMyProfileTool:
             
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
+                text=response_serializer.dumps(result)
             )]
             
         except Exception as e:
             print(f" Erreur: {e}")
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "execution_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
\ No newline at end of file
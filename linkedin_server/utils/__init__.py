@@ -6,10 +6,13 @@ Fichier: mcp_servers/linkedin_server/utils/__init__.py
 from .api_client import LinkedInAPIClient
 from .validators import LinkedInValidator, ValidationError
 from .auth import LinkedInAuth
+from .serializer import JSONSerializer, response_serializer
 
 __all__ = [
     "LinkedInAPIClient",
     "LinkedInValidator",
     "ValidationError",
-    "LinkedInAuth"
+    "LinkedInAuth",
+    "JSONSerializer",
+    "response_serializer"
 ]
@@ -0,0 +1,117 @@
+"""
+Sérialisation JSON rapide (orjson / msgspec) avec repli sur la bibliothèque standard
+Fichier: mcp_servers/linkedin_server/utils/serializer.py
+
+Le stockage et les réponses des outils passent par JSONSerializer au lieu
+d'appeler json.dumps directement. Le backend "auto" choisit orjson, puis
+msgspec, puis json selon ce qui est installé. La sortie est compacte par
+défaut; l'indentation (2 espaces) est optionnelle.
+"""
+
+import json
+from typing import Any, List, Union
+
+from config import LinkedInConfig
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+JSON_BACKENDS = ["auto", "orjson", "msgspec", "json"]
+
+
+def available_backends() -> List[str]:
+    """Liste les backends installés, du plus rapide au plus lent"""
+    backends = []
+    if orjson is not None:
+        backends.append("orjson")
+    if msgspec is not None:
+        backends.append("msgspec")
+    backends.append("json")
+    return backends
+
+
+class JSONSerializer:
+    """Sérialiseur JSON à backend interchangeable"""
+    
+    def __init__(self, backend: str = "auto", pretty: bool = False):
+        """
+        Args:
+            backend: "auto", "orjson", "msgspec" ou "json"
+            pretty: Indenter la sortie (2 espaces) au lieu de la sortie compacte
+        """
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"Backend JSON invalide: {backend}. Options valides: {JSON_BACKENDS}")
+        if backend == "auto":
+            backend = available_backends()[0]
+        elif backend not in available_backends():
+            raise ValueError(f"Le backend JSON '{backend}' nécessite le paquet '{backend}'")
+        
+        self.backend = backend
+        self.pretty = pretty
+        
+        if backend == "orjson":
+            self._orjson_option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        elif backend == "msgspec":
+            self._msgspec_encoder = msgspec.json.Encoder()
+            self._msgspec_decoder = msgspec.json.Decoder()
+    
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """Sérialise un objet en JSON (UTF-8)"""
+        if self.backend == "orjson":
+            try:
+                return orjson.dumps(obj, option=self._orjson_option)
+            except TypeError:
+                # Type non supporté par orjson (ex: entier > 64 bits): repli sur json
+                pass
+        elif self.backend == "msgspec":
+            try:
+                data = self._msgspec_encoder.encode(obj)
+                return msgspec.json.format(data, indent=2) if self.pretty else data
+            except (TypeError, OverflowError, msgspec.EncodeError):
+                pass
+        return self._stdlib_dumps(obj).encode('utf-8')
+    
+    def dumps(self, obj: Any) -> str:
+        """Sérialise un objet en chaîne JSON"""
+        if self.backend == "json":
+            return self._stdlib_dumps(obj)
+        return self.dumps_bytes(obj).decode('utf-8')
+    
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """
+        Désérialise une chaîne ou des octets JSON
+        
+        Raises:
+            json.JSONDecodeError: Document invalide (quel que soit le backend)
+        """
+        if self.backend == "orjson":
+            # orjson.JSONDecodeError hérite de json.JSONDecodeError
+            return orjson.loads(data)
+        if self.backend == "msgspec":
+            try:
+                return self._msgspec_decoder.decode(data)
+            except msgspec.DecodeError as e:
+                text = data.decode('utf-8', errors='replace') if isinstance(data, bytes) else data
+                raise json.JSONDecodeError(str(e), text, 0) from e
+        return json.loads(data)
+    
+    def _stdlib_dumps(self, obj: Any) -> str:
+        """Sérialisation avec la bibliothèque standard (non-ASCII conservé)"""
+        if self.pretty:
+            return json.dumps(obj, indent=2, ensure_ascii=False)
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+# Sérialiseur des réponses des outils MCP
+response_serializer = JSONSerializer(
+    LinkedInConfig.JSON_BACKEND,
+    pretty=LinkedInConfig.JSON_PRETTY_RESPONSES
+)
\ No newline at end of file
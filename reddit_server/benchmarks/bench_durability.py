@@ -0,0 +1,100 @@
+"""
+Benchmark: débit d'écriture selon la politique fsync
+Fichier: mcp_servers/reddit_server/benchmarks/bench_durability.py
+
+Écrit des commentaires par lots via FileManager.save_comments avec
+chaque politique de durabilité (always, interval, records, none) et
+affiche le débit obtenu ainsi que le nombre de fsync effectués.
+
+Usage (depuis reddit_server/):
+    python benchmarks/bench_durability.py [--records 2000] [--batch 20] [--layout files]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import RedditConfig
+from storage.backends import create_index_manager
+from storage.durability import GroupCommitter
+from storage.file_manager import FileManager
+
+
+def make_config(data_dir: Path, layout: str):
+    """Configuration isolée dans un dossier temporaire"""
+    config = type("BenchConfig", (RedditConfig,), {
+        "DATA_DIR": data_dir,
+        "POSTS_DIR": data_dir / "posts",
+        "COMMENTS_DIR": data_dir / "comments",
+        "USERS_DIR": data_dir / "users",
+        "SUBREDDITS_DIR": data_dir / "subreddits",
+        "SEARCHES_DIR": data_dir / "searches",
+        "SEGMENTS_DIR": data_dir / "segments",
+        "ARCHIVES_DIR": data_dir / "archives",
+        "THREADS_DIR": data_dir / "threads",
+        "INDEX_FILE": data_dir / "index.json",
+        "INDEX_DB_FILE": data_dir / "index.db",
+        "BLOOM_FILE": data_dir / "known_ids.bloom",
+        "TEXT_INDEX_FILE": data_dir / "text_index.db",
+        "VECTOR_INDEX_FILE": data_dir / "vector_index.db",
+        "ROLLUPS_FILE": data_dir / "rollups.db",
+        "CURSORS_FILE": data_dir / "cursors.json",
+        "STORAGE_LAYOUT": layout
+    })
+    config.create_directories()
+    return config
+
+
+def make_comment(i: int) -> dict:
+    return {
+        "id": f"c{i}",
+        "post_id": "p0",
+        "author": f"user{i % 50}",
+        "body": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4,
+        "score": i % 100,
+        "created_utc": datetime.now().isoformat(),
+        "parent_id": "t3_p0",
+        "retrieved_at": datetime.now().isoformat()
+    }
+
+
+def bench_policy(policy: str, records: int, batch: int, layout: str) -> tuple:
+    """Retourne (enregistrements/s, nombre de fsync)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        config = make_config(Path(tmp), layout)
+        committer = GroupCommitter(policy, config.FSYNC_INTERVAL_MS, config.FSYNC_EVERY_RECORDS)
+        index = create_index_manager(config, committer)
+        storage = FileManager(config, index, committer)
+        
+        comments = [make_comment(i) for i in range(records)]
+        start = time.perf_counter()
+        for i in range(0, records, batch):
+            storage.save_comments(comments[i:i + batch])
+        committer.commit()
+        elapsed = time.perf_counter() - start
+        
+        index.close()
+        return records / elapsed, committer.fsyncs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=20)
+    parser.add_argument("--layout", choices=RedditConfig.VALID_STORAGE_LAYOUTS, default="files")
+    args = parser.parse_args()
+    
+    print(f"{'politique':>10} | {'enregistrements/s':>18} | {'fsync':>7}")
+    print("-" * 42)
+    for policy in GroupCommitter.POLICIES:
+        rate, fsyncs = bench_policy(policy, args.records, args.batch, args.layout)
+        print(f"{policy:>10} | {rate:>18.0f} | {fsyncs:>7}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Benchmark: coût d'insertion dans l'index en fonction de sa taille
+Fichier: mcp_servers/reddit_server/benchmarks/bench_index_journal.py
+
+Compare l'index journalisé (snapshot + journal) à l'ancienne stratégie
+qui réécrivait tout index.json à chaque insertion.
+
+Usage (depuis reddit_server/):
+    python benchmarks/bench_index_journal.py [--sizes 10000 100000 1000000] [--inserts 5000]
+                                             [--compact-min-records 100] [--compact-ratio 0.002]
+
+Les seuils de compaction par défaut du benchmark sont bas pour que les
+compactions (réécriture du snapshot) aient lieu pendant la mesure: le temps
+par insertion inclut leur coût amorti.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from storage.index_manager import IndexManager
+
+
+def build_snapshot(index_file: Path, size: int):
+    """Écrit un snapshot contenant `size` posts"""
+    now = datetime.now().isoformat()
+    index = {
+        "posts": {
+            f"p{i}": {"file": f"posts/p{i}.json", "subreddit": "python", "stored_at": now}
+            for i in range(size)
+        },
+        "comments": {},
+        "users": {},
+        "subreddits": {},
+        "searches": [],
+        "created_at": now,
+        "last_updated": now,
+        "journal_seq": 0
+    }
+    with open(index_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+
+
+def bench_journal(index_file: Path, inserts: int, compact_min_records: int,
+                  compact_ratio: float) -> Tuple[float, int]:
+    """Temps moyen (µs) d'une insertion dans l'index journalisé et nombre de compactions"""
+    manager = IndexManager(index_file, compact_min_records, compact_ratio)
+    start = time.perf_counter()
+    for i in range(inserts):
+        manager.add_comment(f"c{i}", f"comments/c{i}.json", "p0")
+    elapsed = time.perf_counter() - start
+    # Compactions de la boucle mesurée (sans celle de close())
+    compactions = manager.compactions
+    manager.close()
+    return elapsed / inserts * 1e6, compactions
+
+
+def bench_full_rewrite(index_file: Path, inserts: int) -> float:
+    """Temps moyen (µs) d'une insertion avec réécriture complète (ancien comportement)"""
+    with open(index_file, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    start = time.perf_counter()
+    for i in range(inserts):
+        index["comments"][f"c{i}"] = {
+            "file": f"comments/c{i}.json",
+            "post_id": "p0",
+            "stored_at": datetime.now().isoformat()
+        }
+        with open(index_file, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+    elapsed = time.perf_counter() - start
+    return elapsed / inserts * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--inserts", type=int, default=5000)
+    parser.add_argument("--rewrite-inserts", type=int, default=20,
+                        help="Insertions mesurées pour l'ancien comportement (lent)")
+    parser.add_argument("--compact-min-records", type=int, default=100,
+                        help="Entrées minimales du journal avant compaction")
+    parser.add_argument("--compact-ratio", type=float, default=0.002,
+                        help="Compaction quand le journal dépasse ce ratio de la taille de l'index")
+    args = parser.parse_args()
+    
+    print(f"{'taille':>10} | {'journal µs/insert':>18} | {'compactions':>11} | {'réécriture µs/insert':>21}")
+    print("-" * 70)
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            index_file = Path(tmp) / "index.json"
+            
+            build_snapshot(index_file, size)
+            journal_us, compactions = bench_journal(
+                index_file, args.inserts, args.compact_min_records, args.compact_ratio
+            )
+            
+            build_snapshot(index_file, size)
+            rewrite_us = bench_full_rewrite(index_file, args.rewrite_inserts)
+        
+        print(f"{size:>10} | {journal_us:>18.1f} | {compactions:>11} | {rewrite_us:>21.1f}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Benchmark: sérialisation JSON selon le backend
+Fichier: mcp_servers/reddit_server/benchmarks/bench_serializers.py
+
+Compare les backends installés (orjson, msgspec, json) sur des charges
+réalistes: une réponse d'outil de 100 posts, un lot de 500 commentaires
+et un post isolé. Mesure dumps/loads en sortie compacte et indentée et
+affiche la taille produite.
+
+Usage (depuis reddit_server/):
+    python benchmarks/bench_serializers.py [--posts 100] [--comments 500] [--repeat 50]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.serializer import JSONSerializer, available_backends
+
+
+def make_post(i: int) -> dict:
+    return {
+        "id": f"p{i:06d}",
+        "title": f"Retour d'expérience n°{i}: déploiement d'un modèle fédéré 🚀",
+        "author": f"user{i % 200}",
+        "subreddit": "MachineLearning",
+        "score": (i * 37) % 5000,
+        "upvote_ratio": 0.87,
+        "num_comments": (i * 13) % 400,
+        "created_utc": 1700000000.0 + i * 60,
+        "url": f"https://www.reddit.com/r/MachineLearning/comments/p{i:06d}/",
+        "selftext": "Nous avons entraîné le modèle sur 12 clients pendant 30 rounds. " * 6,
+        "is_self": True,
+        "over_18": False,
+        "spoiler": False,
+        "stickied": False,
+        "link_flair_text": "Discussion",
+        "retrieved_at": datetime.now().isoformat()
+    }
+
+
+def make_comment(i: int) -> dict:
+    return {
+        "id": f"c{i:06d}",
+        "post_id": f"p{i % 100:06d}",
+        "author": f"user{i % 300}",
+        "body": "Intéressant, avez-vous comparé avec FedProx sur des données non-IID ? " * 2,
+        "score": i % 250,
+        "created_utc": 1700000000.0 + i * 17,
+        "parent_id": f"t1_c{max(i - 1, 0):06d}",
+        "is_submitter": i % 9 == 0,
+        "depth": i % 5,
+        "retrieved_at": datetime.now().isoformat()
+    }
+
+
+def timed_us(func, repeat: int) -> float:
+    """Durée moyenne d'un appel en microsecondes"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--comments", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    
+    payloads = {
+        f"réponse {args.posts} posts": {
+            "status": "success",
+            "subreddit": "MachineLearning",
+            "posts_collected": args.posts,
+            "posts": [make_post(i) for i in range(args.posts)]
+        },
+        f"lot {args.comments} comm.": [make_comment(i) for i in range(args.comments)],
+        "post isolé": make_post(0)
+    }
+    
+    print(f"Backends installés: {', '.join(available_backends())}")
+    print(f"{'charge':>20} | {'backend':>8} | {'mode':>8} | {'dumps µs':>10} | {'loads µs':>10} | {'octets':>9}")
+    print("-" * 80)
+    for name, payload in payloads.items():
+        for backend in available_backends():
+            for pretty in (False, True):
+                serializer = JSONSerializer(backend, pretty=pretty)
+                data = serializer.dumps_bytes(payload)
+                dumps_us = timed_us(lambda: serializer.dumps(payload), args.repeat)
+                loads_us = timed_us(lambda: serializer.loads(data), args.repeat)
+                mode = "indenté" if pretty else "compact"
+                print(f"{name:>20} | {backend:>8} | {mode:>8} | {dumps_us:>10.1f} | "
+                      f"{loads_us:>10.1f} | {len(data):>9}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Benchmark: temps d'ouverture de l'index au démarrage
+Fichier: mcp_servers/reddit_server/benchmarks/bench_startup.py
+
+Mesure, pour chaque taille d'index, le temps d'ouverture des backends
+"json" (chargement complet) et "sqlite" (ouverture en temps constant),
+ainsi que le temps de la première recherche par ID.
+
+Usage (depuis reddit_server/):
+    python benchmarks/bench_startup.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from storage.index_manager import IndexManager
+from storage.sqlite_index_manager import SQLiteIndexManager
+from bench_index_journal import build_snapshot
+
+
+def timed(fn):
+    """Exécute fn et retourne (résultat, durée en ms)"""
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    
+    print(f"{'taille':>10} | {'json open ms':>12} | {'sqlite open ms':>14} | {'sqlite 1er get ms':>17}")
+    print("-" * 64)
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            index_file = Path(tmp) / "index.json"
+            db_file = Path(tmp) / "index.db"
+            build_snapshot(index_file, size)
+            
+            json_manager, json_ms = timed(lambda: IndexManager(index_file))
+            migration = SQLiteIndexManager(db_file)
+            migration.import_json_index(json_manager.index)
+            migration.close()
+            json_manager.close()
+            
+            sqlite_manager, sqlite_ms = timed(lambda: SQLiteIndexManager(db_file))
+            _, get_ms = timed(lambda: sqlite_manager.get_post(f"p{size // 2}"))
+            sqlite_manager.close()
+        
+        print(f"{size:>10} | {json_ms:>12.1f} | {sqlite_ms:>14.1f} | {get_ms:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
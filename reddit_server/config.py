@@ -18,6 +18,43 @@ class RedditConfig:
     CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
     USER_AGENT = os.getenv("REDDIT_USER_AGENT", "MCP Reddit Server v1.0")
     
+    # Client d'API: "asyncpraw" (requêtes HTTP non bloquantes) ou "praw"
+    # (client synchrone exécuté dans un thread)
+    API_BACKEND = os.getenv("REDDIT_API_BACKEND", "asyncpraw")
+    VALID_API_BACKENDS = ["asyncpraw", "praw"]
+    
+    # Concurrence maximale par outil, tous backends ("outil=N,outil=N"; outils absents: illimités).
+    # Backend "praw": taille du pool de threads des appels bloquants, et de la voie rapide
+    # des appels courts (infos d'un subreddit, un post ou un commentaire par ID)
+    API_TOOL_CONCURRENCY = os.getenv(
+        "REDDIT_API_TOOL_CONCURRENCY", "collect_user_data=2,collect_post_comments=4"
+    )
+    API_POOL_SIZE = int(os.getenv("REDDIT_API_POOL_SIZE", "8"))
+    API_FAST_POOL_SIZE = int(os.getenv("REDDIT_API_FAST_POOL_SIZE", "2"))
+    
+    # Limitation de débit partagée par tous les appels à l'API (seau à jetons recalé sur les
+    # en-têtes X-Ratelimit-*): quota par fenêtre avant le premier en-tête, rafale maximale, et
+    # requêtes du quota restant réservées aux appels "interactive" (les appels "bulk" attendent)
+    RATE_LIMIT_ENABLED = os.getenv("REDDIT_RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_REQUESTS = int(os.getenv("REDDIT_RATE_LIMIT_REQUESTS", "1000"))
+    RATE_LIMIT_WINDOW_SECONDS = int(os.getenv("REDDIT_RATE_LIMIT_WINDOW_SECONDS", "600"))
+    RATE_LIMIT_BURST = int(os.getenv("REDDIT_RATE_LIMIT_BURST", "10"))
+    RATE_LIMIT_BULK_RESERVE = int(os.getenv("REDDIT_RATE_LIMIT_BULK_RESERVE", "50"))
+    
+    # Cache des réponses de l'API (LRU borné): TTL en secondes par méthode, et par tri pour
+    # les listings ("méthode:tri=secondes"; absentes ou 0 = pas de cache), sauvegarde
+    # optionnelle entre deux redémarrages. max_staleness des outils réduit l'âge accepté.
+    API_CACHE_ENABLED = os.getenv("REDDIT_API_CACHE_ENABLED", "true").lower() == "true"
+    API_CACHE_TTLS = os.getenv(
+        "REDDIT_API_CACHE_TTLS",
+        "get_subreddit_info=3600,search_posts=300,get_user_data=600,get_post_with_comments=120,"
+        "get_subreddit_posts:hot=60,get_subreddit_posts:rising=60,get_subreddit_posts:new=30,"
+        "get_subreddit_posts:top=600"
+    )
+    API_CACHE_MAX_ENTRIES = int(os.getenv("REDDIT_API_CACHE_MAX_ENTRIES", "1000"))
+    API_CACHE_MAX_BYTES = int(os.getenv("REDDIT_API_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    API_CACHE_PERSIST = os.getenv("REDDIT_API_CACHE_PERSIST", "false").lower() == "true"
+    
     # Chemins de stockage
     DATA_DIR = Path(os.getenv("REDDIT_DATA_DIR", "./data/reddit_data"))
     POSTS_DIR = DATA_DIR / "posts"
@@ -25,18 +62,124 @@ class RedditConfig:
     USERS_DIR = DATA_DIR / "users"
     SUBREDDITS_DIR = DATA_DIR / "subreddits"
     SEARCHES_DIR = DATA_DIR / "searches"
+    SEGMENTS_DIR = DATA_DIR / "segments"
+    ARCHIVES_DIR = DATA_DIR / "archives"
+    THREADS_DIR = DATA_DIR / "threads"
     INDEX_FILE = DATA_DIR / "index.json"
+    INDEX_DB_FILE = DATA_DIR / "index.db"
+    BLOOM_FILE = DATA_DIR / "known_ids.bloom"
+    TEXT_INDEX_FILE = DATA_DIR / "text_index.db"
+    VECTOR_INDEX_FILE = DATA_DIR / "vector_index.db"
+    ROLLUPS_FILE = DATA_DIR / "rollups.db"
+    API_CACHE_FILE = DATA_DIR / "api_cache.jsonl"
+    CURSORS_FILE = DATA_DIR / "cursors.json"
+    
+    # Backend d'index: "sqlite" (sur disque, ouverture en temps constant)
+    # ou "json" (snapshot + journal chargés en mémoire au démarrage)
+    INDEX_BACKEND = os.getenv("REDDIT_INDEX_BACKEND", "sqlite")
+    VALID_INDEX_BACKENDS = ["json", "sqlite"]
+    
+    # Index JSON: compaction du journal dans le snapshot
+    INDEX_COMPACT_MIN_RECORDS = int(os.getenv("REDDIT_INDEX_COMPACT_MIN_RECORDS", "1000"))
+    INDEX_COMPACT_RATIO = float(os.getenv("REDDIT_INDEX_COMPACT_RATIO", "0.5"))
+    
+    # Layout des posts/commentaires: "files" (un fichier par ID), "partitioned"
+    # (un fichier par ID dans {subreddit}/{yyyy-mm-dd}/) ou "segments" (JSONL)
+    STORAGE_LAYOUT = os.getenv("REDDIT_STORAGE_LAYOUT", "files")
+    VALID_STORAGE_LAYOUTS = ["files", "partitioned", "segments"]
+    SEGMENT_MAX_BYTES = int(os.getenv("REDDIT_SEGMENT_MAX_BYTES", str(16 * 1024 * 1024)))
+    SEGMENT_COMPRESSION = os.getenv("REDDIT_SEGMENT_COMPRESSION", "none")  # none, gzip, zstd
+    VALID_COMPRESSIONS = ["none", "gzip", "zstd"]
+    
+    # Rétention (tâche de fond, désactivée par défaut): âge maximal en jours par
+    # type (0 = conservé indéfiniment), nombre de collections gardées par subreddit
+    # (0 = toutes), et archivage en segments compressés des données plus anciennes
+    # que ARCHIVE_AFTER_DAYS (0 = jamais), toujours lisibles
+    RETENTION_ENABLED = os.getenv("REDDIT_RETENTION_ENABLED", "false").lower() == "true"
+    RETENTION_INTERVAL_SECONDS = int(os.getenv("REDDIT_RETENTION_INTERVAL_SECONDS", "3600"))
+    RETENTION_BATCH_SIZE = int(os.getenv("REDDIT_RETENTION_BATCH_SIZE", "500"))
+    RETENTION_MAX_AGE_DAYS = {
+        "posts": int(os.getenv("REDDIT_RETENTION_POSTS_DAYS", "0")),
+        "comments": int(os.getenv("REDDIT_RETENTION_COMMENTS_DAYS", "0")),
+        "users": int(os.getenv("REDDIT_RETENTION_USERS_DAYS", "0")),
+        "searches": int(os.getenv("REDDIT_RETENTION_SEARCHES_DAYS", "0")),
+        "collections": int(os.getenv("REDDIT_RETENTION_COLLECTIONS_DAYS", "0"))
+    }
+    RETENTION_KEEP_COLLECTIONS = int(os.getenv("REDDIT_RETENTION_KEEP_COLLECTIONS", "0"))
+    ARCHIVE_AFTER_DAYS = int(os.getenv("REDDIT_ARCHIVE_AFTER_DAYS", "0"))
+    ARCHIVE_COMPRESSION = os.getenv("REDDIT_ARCHIVE_COMPRESSION", "gzip")  # none, gzip, zstd
+    
+    # Budget disque des données brutes (posts, comments, users, segments, archives; 0 = illimité).
+    # Au-delà, les fichiers les moins récemment ("lru") ou les moins souvent ("lfu") lus
+    # sont supprimés jusqu'à DISK_LOW_WATERMARK du budget; leurs entrées d'index sont
+    # conservées et ils sont récupérés à nouveau à la demande.
+    DISK_BUDGET_BYTES = int(os.getenv("REDDIT_DISK_BUDGET_BYTES", "0"))
+    DISK_LOW_WATERMARK = float(os.getenv("REDDIT_DISK_LOW_WATERMARK", "0.9"))
+    DISK_CHECK_INTERVAL_SECONDS = int(os.getenv("REDDIT_DISK_CHECK_INTERVAL_SECONDS", "60"))
+    EVICTION_POLICY = os.getenv("REDDIT_EVICTION_POLICY", "lru")
+    VALID_EVICTION_POLICIES = ["lru", "lfu"]
+    EVICTION_BATCH_SIZE = int(os.getenv("REDDIT_EVICTION_BATCH_SIZE", "500"))
+    
+    # Index plein texte local (BM25) des posts et commentaires stockés, mis à jour
+    # à chaque sauvegarde et interrogé par search_local_corpus sans appel à l'API
+    TEXT_INDEX_ENABLED = os.getenv("REDDIT_TEXT_INDEX_ENABLED", "true").lower() == "true"
+    TEXT_INDEX_BM25_K1 = float(os.getenv("REDDIT_TEXT_INDEX_BM25_K1", "1.2"))
+    TEXT_INDEX_BM25_B = float(os.getenv("REDDIT_TEXT_INDEX_BM25_B", "0.75"))
+    
+    # Index vectoriel des posts (hachage + projection aléatoire, sur CPU) et recherche
+    # approchée des plus proches voisins (IVF) pour find_similar_posts. Nécessite numpy
+    # (désactivé avec un avertissement au démarrage si numpy est absent).
+    VECTOR_INDEX_ENABLED = os.getenv("REDDIT_VECTOR_INDEX_ENABLED", "true").lower() == "true"
+    VECTOR_DIM = int(os.getenv("REDDIT_VECTOR_DIM", "256"))
+    VECTOR_NPROBE = int(os.getenv("REDDIT_VECTOR_NPROBE", "16"))
+    VECTOR_TRAIN_MIN_POSTS = int(os.getenv("REDDIT_VECTOR_TRAIN_MIN_POSTS", "2048"))
+    
+    # Agrégats tenus à jour à l'écriture (compteurs par subreddit et par jour,
+    # quantiles DDSketch du score et de num_comments), lus par reddit://stats
+    ROLLUPS_ENABLED = os.getenv("REDDIT_ROLLUPS_ENABLED", "true").lower() == "true"
+    ROLLUPS_RELATIVE_ACCURACY = float(os.getenv("REDDIT_ROLLUPS_RELATIVE_ACCURACY", "0.01"))
+    
+    # Cache LRU des lectures (get_post, get_comment, get_user_data)
+    CACHE_MAX_ENTRIES = int(os.getenv("REDDIT_CACHE_MAX_ENTRIES", "10000"))
+    CACHE_MAX_BYTES = int(os.getenv("REDDIT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    
+    # Filtre de Bloom des IDs déjà collectés (déduplication sans accès à l'index)
+    BLOOM_INITIAL_CAPACITY = int(os.getenv("REDDIT_BLOOM_INITIAL_CAPACITY", "100000"))
+    BLOOM_ERROR_RATE = float(os.getenv("REDDIT_BLOOM_ERROR_RATE", "0.001"))
+    
+    # Écriture asynchrone (file bornée + thread d'écriture par lots)
+    WRITE_QUEUE_MAX = int(os.getenv("REDDIT_WRITE_QUEUE_MAX", "1000"))
+    WRITE_BATCH_SIZE = int(os.getenv("REDDIT_WRITE_BATCH_SIZE", "64"))
+    
+    # Durabilité: fsync "always" (chaque écriture), "interval" (toutes les N ms),
+    # "records" (tous les N enregistrements) ou "none"
+    FSYNC_POLICY = os.getenv("REDDIT_FSYNC_POLICY", "interval")
+    VALID_FSYNC_POLICIES = ["always", "interval", "records", "none"]
+    FSYNC_INTERVAL_MS = int(os.getenv("REDDIT_FSYNC_INTERVAL_MS", "200"))
+    FSYNC_EVERY_RECORDS = int(os.getenv("REDDIT_FSYNC_EVERY_RECORDS", "100"))
+    
+    # Sérialisation JSON: "auto" (orjson, puis msgspec, puis json), "orjson", "msgspec" ou "json".
+    # Sortie compacte par défaut; l'indentation est optionnelle.
+    JSON_BACKEND = os.getenv("REDDIT_JSON_BACKEND", "auto")
+    VALID_JSON_BACKENDS = ["auto", "orjson", "msgspec", "json"]
+    JSON_PRETTY_STORAGE = os.getenv("REDDIT_JSON_PRETTY_STORAGE", "false").lower() == "true"
+    JSON_PRETTY_RESPONSES = os.getenv("REDDIT_JSON_PRETTY_RESPONSES", "false").lower() == "true"
     
     # Limites par défaut
     DEFAULT_POST_LIMIT = 25
     DEFAULT_COMMENT_LIMIT = 100
     DEFAULT_USER_LIMIT = 100
     DEFAULT_SEARCH_LIMIT = 10
+    # Collecte incrémentale: nombre maximal de nouveaux posts (profondeur des listings Reddit)
+    MAX_INCREMENTAL_LIMIT = 1000
     
     # Options de recherche
     VALID_SORT_OPTIONS = ["relevance", "hot", "top", "new", "comments"]
     VALID_SUBREDDIT_SORT = ["hot", "new", "top", "rising"]
     VALID_TIME_FILTERS = ["hour", "day", "week", "month", "year", "all"]
+    VALID_TEXT_MATCH_MODES = ["all", "any"]
+    VALID_BRANCH_ORDERS = ["score", "size"]
+    VALID_PRIORITIES = ["interactive", "bulk"]
     
     @classmethod
     def validate(cls):
@@ -46,11 +189,52 @@ class RedditConfig:
                 "REDDIT_CLIENT_ID et REDDIT_CLIENT_SECRET sont requis. "
                 "Configurez-les dans votre fichier .env"
             )
+        if cls.API_BACKEND not in cls.VALID_API_BACKENDS:
+            raise ValueError(
+                f"Backend d'API invalide: {cls.API_BACKEND}. "
+                f"Options valides: {cls.VALID_API_BACKENDS}"
+            )
+        if cls.INDEX_BACKEND not in cls.VALID_INDEX_BACKENDS:
+            raise ValueError(
+                f"Backend d'index invalide: {cls.INDEX_BACKEND}. "
+                f"Options valides: {cls.VALID_INDEX_BACKENDS}"
+            )
+        if cls.STORAGE_LAYOUT not in cls.VALID_STORAGE_LAYOUTS:
+            raise ValueError(
+                f"Layout de stockage invalide: {cls.STORAGE_LAYOUT}. "
+                f"Options valides: {cls.VALID_STORAGE_LAYOUTS}"
+            )
+        if cls.SEGMENT_COMPRESSION not in cls.VALID_COMPRESSIONS:
+            raise ValueError(
+                f"Compression des segments invalide: {cls.SEGMENT_COMPRESSION}. "
+                f"Options valides: {cls.VALID_COMPRESSIONS}"
+            )
+        if cls.ARCHIVE_COMPRESSION not in cls.VALID_COMPRESSIONS:
+            raise ValueError(
+                f"Compression des archives invalide: {cls.ARCHIVE_COMPRESSION}. "
+                f"Options valides: {cls.VALID_COMPRESSIONS}"
+            )
+        if cls.EVICTION_POLICY not in cls.VALID_EVICTION_POLICIES:
+            raise ValueError(
+                f"Politique d'éviction invalide: {cls.EVICTION_POLICY}. "
+                f"Options valides: {cls.VALID_EVICTION_POLICIES}"
+            )
+        if cls.FSYNC_POLICY not in cls.VALID_FSYNC_POLICIES:
+            raise ValueError(
+                f"Politique fsync invalide: {cls.FSYNC_POLICY}. "
+                f"Options valides: {cls.VALID_FSYNC_POLICIES}"
+            )
+        if cls.JSON_BACKEND not in cls.VALID_JSON_BACKENDS:
+            raise ValueError(
+                f"Backend JSON invalide: {cls.JSON_BACKEND}. "
+                f"Options valides: {cls.VALID_JSON_BACKENDS}"
+            )
         return True
     
     @classmethod
     def create_directories(cls):
         """Crée tous les dossiers nécessaires"""
         for dir_path in [cls.POSTS_DIR, cls.COMMENTS_DIR, cls.USERS_DIR, 
-                        cls.SUBREDDITS_DIR, cls.SEARCHES_DIR]:
+                        cls.SUBREDDITS_DIR, cls.SEARCHES_DIR, cls.SEGMENTS_DIR,
+                        cls.ARCHIVES_DIR, cls.THREADS_DIR]:
             dir_path.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Migration des posts et commentaires stockés vers un autre layout
+Fichier: mcp_servers/reddit_server/migrate_layout.py
+
+Déplace les enregistrements existants (fichiers à plat, partitions ou
+segments) vers le layout demandé, par lots: chaque lot est écrit et
+synchronisé, puis l'index est mis à jour et les anciens fichiers
+supprimés. Une migration interrompue peut être relancée: les
+enregistrements déjà à leur place (ou illisibles) sont ignorés. Le
+serveur doit être arrêté pendant la migration; pensez ensuite à mettre
+à jour REDDIT_STORAGE_LAYOUT.
+
+Usage (depuis reddit_server/):
+    python migrate_layout.py [--to partitioned] [--kinds posts comments] [--batch 1000]
+"""
+
+import argparse
+import time
+from typing import Iterator, List
+
+from config import RedditConfig
+from storage.backends import create_index_manager
+from storage.durability import GroupCommitter
+from storage.file_manager import FileManager
+
+
+def _batches(ids: List[str], size: int) -> Iterator[List[str]]:
+    """Regroupe les IDs par lots (un commit et une mise à jour d'index par lot)"""
+    batch = []
+    for item_id in ids:
+        batch.append(item_id)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def migrate(file_manager: FileManager, kind: str, layout: str, batch_size: int) -> dict:
+    """
+    Migre tous les enregistrements d'un type
+    
+    Returns:
+        {"moved", "skipped"}
+    """
+    # Les IDs sont lus avant les déplacements: l'index est modifié pendant la migration
+    ids = list(file_manager.index.iter_ids(kind))
+    totals = {"moved": 0, "skipped": 0}
+    for batch in _batches(ids, batch_size):
+        result = file_manager.relocate(kind, batch, layout)
+        totals["moved"] += result["moved"]
+        totals["skipped"] += result["skipped"]
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--to", dest="layout", choices=RedditConfig.VALID_STORAGE_LAYOUTS,
+                        default="partitioned")
+    parser.add_argument("--kinds", nargs="+", choices=["posts", "comments"], default=["posts", "comments"])
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+    
+    print(f" Migration vers le layout {args.layout} dans {RedditConfig.DATA_DIR}")
+    
+    committer = GroupCommitter.from_config(RedditConfig)
+    index_manager = create_index_manager(RedditConfig, committer)
+    file_manager = FileManager(RedditConfig, index_manager, committer)
+    try:
+        # Les posts d'abord: les commentaires sont partitionnés selon le subreddit de leur post
+        for kind in sorted(args.kinds, key=["posts", "comments"].index):
+            started = time.perf_counter()
+            totals = migrate(file_manager, kind, args.layout, args.batch)
+            elapsed = time.perf_counter() - started
+            rate = totals["moved"] / elapsed if elapsed else 0
+            print(f"   {kind}: {totals['moved']} déplacés, {totals['skipped']} ignorés "
+                  f"({elapsed:.2f} s, {rate:.0f} enregistrements/s)")
+    finally:
+        file_manager.close()
+        index_manager.close()
+    
+    if args.layout != RedditConfig.STORAGE_LAYOUT:
+        print(f"   Pensez à définir REDDIT_STORAGE_LAYOUT={args.layout}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
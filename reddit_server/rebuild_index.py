@@ -0,0 +1,324 @@
+"""
+Reconstruction de l'index à partir des fichiers stockés
+Fichier: mcp_servers/reddit_server/rebuild_index.py
+
+À utiliser quand l'index (index.json / index.db) est perdu ou corrompu:
+les dossiers posts/, comments/, users/, searches/, les segments et les
+archives sont parcourus, les fichiers sont analysés en parallèle par un
+pool de processus, puis le nouvel index est écrit de façon atomique pour
+le backend configuré. Le serveur doit être arrêté pendant la reconstruction.
+
+Usage (depuis reddit_server/):
+    python rebuild_index.py [--workers 8] [--chunk-size 2000] [--backend sqlite]
+"""
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from config import RedditConfig
+from storage.content_hash import content_hash
+from storage.durability import GroupCommitter, atomic_write_text
+from storage.segment_store import SEGMENT_SUFFIXES, SegmentStore, zstandard
+from storage.sqlite_index_manager import SQLiteIndexManager
+from utils.serializer import JSONSerializer
+
+# Nom des fichiers utilisateur: {username}_complete.json
+USER_FILE_SUFFIX = "_complete.json"
+
+serializer = JSONSerializer(RedditConfig.JSON_BACKEND)
+
+
+def _walk_json(directory: Path) -> Iterator[str]:
+    """Liste récursivement les fichiers .json d'un dossier (os.scandir, sans stat)"""
+    if not directory.exists():
+        return
+    stack = [str(directory)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".json") and not entry.name.startswith("."):
+                    yield entry.path
+
+
+def _chunks(paths: Iterator[str], size: int) -> Iterator[List[str]]:
+    """Regroupe les chemins par lots (une tâche du pool par lot)"""
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _index_entry(kind: str, record: Dict, file_path: str) -> Tuple[str, Dict]:
+    """Entrée d'index d'un post ou d'un commentaire"""
+    entry = {"file": file_path, "author": record.get("author"), "content_hash": content_hash(record)}
+    if kind == "posts":
+        entry["subreddit"] = record.get("subreddit")
+    else:
+        entry["post_id"] = record.get("post_id")
+    return record["id"], entry
+
+
+def _record_time(record: Dict, mtime: float) -> Tuple[float, str]:
+    """
+    Date de collecte d'un enregistrement (retrieved_at), en secondes et en ISO,
+    pour le départager de ses autres copies et dater son entrée d'index.
+    À défaut (enregistrement sans date lisible), la date de modification du fichier.
+    """
+    retrieved_at = record.get("retrieved_at")
+    if isinstance(retrieved_at, str):
+        try:
+            return datetime.fromisoformat(retrieved_at).timestamp(), retrieved_at
+        except ValueError:
+            pass
+    return mtime, datetime.fromtimestamp(mtime).isoformat()
+
+
+def parse_files(task: Tuple[str, List[str]]) -> Tuple[str, List[Tuple], int]:
+    """
+    Analyse un lot de fichiers (exécuté dans un processus du pool)
+    
+    Args:
+        task: (type, chemins) avec type "posts", "comments", "users" ou "searches"
+    
+    Returns:
+        (type, [(clé, entrée, version)], nombre de fichiers illisibles).
+        La version (date de collecte, mtime, 0) départage plusieurs copies d'un
+        même enregistrement: une copie ancienne réécrite plus tard (archivage,
+        migration) ne l'emporte pas sur une collecte plus récente.
+    """
+    kind, paths = task
+    results = []
+    errors = 0
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            
+            if kind == "users":
+                # Le nom d'utilisateur est dans le nom du fichier: pas de lecture
+                name = os.path.basename(path)
+                if not name.endswith(USER_FILE_SUFFIX):
+                    continue
+                stored_at = datetime.fromtimestamp(stat.st_mtime).isoformat()
+                version = (stat.st_mtime, stat.st_mtime_ns, 0)
+                results.append((name[:-len(USER_FILE_SUFFIX)], {"file": path, "stored_at": stored_at}, version))
+                continue
+            
+            with open(path, 'rb') as f:
+                record = serializer.loads(f.read())
+            retrieved, stored_at = _record_time(record, stat.st_mtime)
+            version = (retrieved, stat.st_mtime_ns, 0)
+            
+            if kind == "searches":
+                results.append((record["search_id"], {
+                    "search_id": record["search_id"],
+                    "query": record.get("query"),
+                    "file": path,
+                    "count": record.get("count"),
+                    "timestamp": record.get("retrieved_at") or stored_at
+                }, version))
+            else:
+                key, entry = _index_entry(kind, record, path)
+                entry["stored_at"] = stored_at
+                results.append((key, entry, version))
+        except (OSError, ValueError, KeyError, TypeError):
+            errors += 1
+    return kind, results, errors
+
+
+def parse_segment(task: Tuple[str, str, str]) -> Tuple[str, List[Tuple], int]:
+    """
+    Analyse un segment complet (exécuté dans un processus du pool)
+    
+    Args:
+        task: (type, chemin du segment, compression)
+    
+    Returns:
+        (type, [(clé, entrée, version)], nombre d'enregistrements illisibles).
+        La version (date de collecte, mtime du segment, offset) fait gagner la
+        collecte la plus récente, puis la dernière occurrence.
+    """
+    kind, segment, compression = task
+    store = SegmentStore(Path(segment).parent.parent, compression=compression,
+                         json_backend=serializer.backend)
+    results = []
+    errors = 0
+    try:
+        stat = os.stat(segment)
+        for offset, length, record in store.scan_locations(Path(segment)):
+            try:
+                key, entry = _index_entry(kind, record, segment)
+            except (KeyError, TypeError, AttributeError):
+                errors += 1
+                continue
+            retrieved, stored_at = _record_time(record, stat.st_mtime)
+            entry.update({"offset": offset, "length": length, "stored_at": stored_at})
+            results.append((key, entry, (retrieved, stat.st_mtime_ns, offset)))
+    except (OSError, ValueError):
+        errors += 1
+    return kind, results, errors
+
+
+def collect_tasks(config, chunk_size: int) -> Tuple[List[Tuple], List[Tuple]]:
+    """Liste les lots de fichiers et les segments (et archives) à analyser"""
+    file_tasks = []
+    for kind, directory in (("posts", config.POSTS_DIR), ("comments", config.COMMENTS_DIR),
+                            ("users", config.USERS_DIR), ("searches", config.SEARCHES_DIR)):
+        file_tasks.extend((kind, chunk) for chunk in _chunks(_walk_json(directory), chunk_size))
+    
+    segment_tasks = []
+    for compression in SEGMENT_SUFFIXES:
+        if compression == "zstd" and zstandard is None:
+            continue
+        for root in (config.ARCHIVES_DIR, config.SEGMENTS_DIR):
+            store = SegmentStore(root, compression=compression)
+            for kind in ("posts", "comments"):
+                segment_tasks.extend((kind, str(segment), compression) for segment in store.segments(kind))
+    return file_tasks, segment_tasks
+
+
+def build_index(config, workers: int, chunk_size: int) -> Tuple[Dict, Dict]:
+    """
+    Analyse tous les fichiers en parallèle et fusionne les entrées
+    
+    Returns:
+        (index au format IndexManager.index, statistiques)
+    """
+    file_tasks, segment_tasks = collect_tasks(config, chunk_size)
+    files = sum(len(paths) for _, paths in file_tasks)
+    
+    merged = {"posts": {}, "comments": {}, "users": {}, "searches": {}}
+    versions = {kind: {} for kind in merged}
+    errors = 0
+    records = 0
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = itertools.chain(pool.map(parse_files, file_tasks),
+                                  pool.map(parse_segment, segment_tasks))
+        for kind, entries, task_errors in results:
+            errors += task_errors
+            records += len(entries)
+            kind_entries = merged[kind]
+            kind_versions = versions[kind]
+            for key, entry, version in entries:
+                # Plusieurs copies (fichier + segment, réécritures): la plus récente gagne
+                if key not in kind_versions or version > kind_versions[key]:
+                    kind_entries[key] = entry
+                    kind_versions[key] = version
+    
+    now = datetime.now().isoformat()
+    index = {
+        "posts": merged["posts"],
+        "comments": merged["comments"],
+        "users": merged["users"],
+        "subreddits": {},
+        "searches": sorted(merged["searches"].values(), key=lambda search: search["timestamp"]),
+        "created_at": now,
+        "last_updated": now,
+        "journal_seq": 0
+    }
+    stats = {
+        "files": files,
+        "segments": len(segment_tasks),
+        "records": records,
+        "errors": errors
+    }
+    return index, stats
+
+
+def _last_journal_seq(journal_file: Path) -> int:
+    """Dernier numéro de séquence du journal de l'index JSON (0 si absent)"""
+    if not journal_file.exists():
+        return 0
+    seq = 0
+    with open(journal_file, 'rb') as f:
+        for line in f:
+            try:
+                seq = serializer.loads(line)["seq"]
+            except (ValueError, KeyError, TypeError):
+                break
+    return seq
+
+
+def write_json_index(config, index: Dict):
+    """
+    Écrit le snapshot index.json (temporaire + fsync + rename) puis supprime le journal.
+    Le snapshot reprend le dernier numéro de séquence du journal: si la
+    suppression n'a pas lieu, les anciennes entrées ne sont pas rejouées.
+    """
+    journal_file = config.INDEX_FILE.with_suffix(".journal")
+    index["journal_seq"] = _last_journal_seq(journal_file)
+    atomic_write_text(config.INDEX_FILE, serializer.dumps(index), GroupCommitter("always"))
+    if journal_file.exists():
+        journal_file.unlink()
+
+
+def write_sqlite_index(config, index: Dict):
+    """Construit une nouvelle base à côté de l'ancienne puis la remplace par un rename"""
+    db_file = config.INDEX_DB_FILE
+    tmp_file = db_file.with_name(f".{db_file.name}.rebuild")
+    for path in (tmp_file, Path(f"{tmp_file}-wal"), Path(f"{tmp_file}-shm")):
+        if path.exists():
+            path.unlink()
+    
+    manager = SQLiteIndexManager(tmp_file, synchronous="FULL")
+    # Marque aussi la base pour qu'un ancien index.json ne soit pas réimporté
+    manager.import_json_index(index)
+    manager.close()
+    
+    # Le WAL de l'ancienne base ne doit pas être appliqué à la nouvelle
+    for path in (Path(f"{db_file}-wal"), Path(f"{db_file}-shm"),
+                 Path(f"{tmp_file}-wal"), Path(f"{tmp_file}-shm")):
+        if path.exists():
+            path.unlink()
+    os.replace(tmp_file, db_file)
+    GroupCommitter("always").record([db_file])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--backend", choices=RedditConfig.VALID_INDEX_BACKENDS,
+                        default=RedditConfig.INDEX_BACKEND)
+    args = parser.parse_args()
+    
+    print(f" Reconstruction de l'index ({args.backend}) depuis {RedditConfig.DATA_DIR} "
+          f"avec {args.workers} processus")
+    
+    started = time.perf_counter()
+    index, stats = build_index(RedditConfig, args.workers, args.chunk_size)
+    parsed = time.perf_counter()
+    
+    if args.backend == "json":
+        write_json_index(RedditConfig, index)
+    else:
+        write_sqlite_index(RedditConfig, index)
+    
+    # Le filtre des IDs connus sera reconstruit depuis le nouvel index au prochain démarrage
+    if RedditConfig.BLOOM_FILE.exists():
+        RedditConfig.BLOOM_FILE.unlink()
+    
+    elapsed = time.perf_counter() - started
+    parse_seconds = parsed - started
+    print(f"   Posts: {len(index['posts'])}, Commentaires: {len(index['comments'])}, "
+          f"Utilisateurs: {len(index['users'])}, Recherches: {len(index['searches'])}")
+    print(f"   Fichiers: {stats['files']}, Segments: {stats['segments']}, "
+          f"Enregistrements: {stats['records']}, Illisibles: {stats['errors']}")
+    print(f"   Analyse: {parse_seconds:.2f} s ({stats['files'] / parse_seconds if parse_seconds else 0:.0f} fichiers/s), "
+          f"Total: {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Reconstruction des index de recherche locale des posts et commentaires stockés
+Fichier: mcp_servers/reddit_server/rebuild_search_index.py
+
+L'index plein texte (text_index.db), l'index vectoriel des posts
+(vector_index.db) et les agrégats de reddit://stats (rollups.db) sont
+tenus à jour par le serveur à chaque sauvegarde.
+Ce script les alimente avec les données collectées avant leur activation,
+ou les reconstruit entièrement (--clear): tous les layouts (fichiers,
+partitions, segments, archives) sont relus séquentiellement et indexés
+par lots. Le serveur doit être arrêté pendant la reconstruction.
+
+Usage (depuis reddit_server/):
+    python rebuild_search_index.py [--kinds posts comments] [--batch 1000] [--clear]
+"""
+
+import argparse
+import time
+from typing import Dict, Iterator, List
+
+from config import RedditConfig
+from storage.backends import create_index_manager
+from storage.durability import GroupCommitter
+from storage.file_manager import FileManager
+
+
+def _batches(records: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    """Regroupe les enregistrements par lots (une transaction par lot)"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def rebuild(file_manager: FileManager, kind: str, batch_size: int) -> int:
+    """
+    Indexe tous les enregistrements stockés d'un type
+    
+    Returns:
+        Nombre d'enregistrements indexés
+    """
+    records = file_manager.iter_posts() if kind == "posts" else file_manager.iter_comments()
+    indexed = 0
+    for batch in _batches(records, batch_size):
+        file_manager.update_search_indexes(kind, batch)
+        indexed += len(batch)
+    return indexed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kinds", nargs="+", choices=["posts", "comments"], default=["posts", "comments"])
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--clear", action="store_true", help="Vider les index avant de les reconstruire")
+    args = parser.parse_args()
+    
+    if not (RedditConfig.TEXT_INDEX_ENABLED or RedditConfig.VECTOR_INDEX_ENABLED or RedditConfig.ROLLUPS_ENABLED):
+        print(" Index de recherche et agrégats désactivés "
+              "(REDDIT_TEXT_INDEX_ENABLED, REDDIT_VECTOR_INDEX_ENABLED, REDDIT_ROLLUPS_ENABLED)")
+        return
+    
+    print(f" Reconstruction des index de recherche depuis {RedditConfig.DATA_DIR}")
+    
+    committer = GroupCommitter.from_config(RedditConfig)
+    index_manager = create_index_manager(RedditConfig, committer)
+    file_manager = FileManager(RedditConfig, index_manager, committer)
+    try:
+        if args.clear:
+            for search_index in (file_manager.text_index, file_manager.vector_index, file_manager.rollups):
+                if search_index is not None:
+                    search_index.clear()
+        # Les posts d'abord: les commentaires prennent le subreddit de leur post
+        for kind in sorted(args.kinds, key=["posts", "comments"].index):
+            started = time.perf_counter()
+            indexed = rebuild(file_manager, kind, args.batch)
+            elapsed = time.perf_counter() - started
+            rate = indexed / elapsed if elapsed else 0
+            print(f"   {kind}: {indexed} indexés ({elapsed:.2f} s, {rate:.0f} enregistrements/s)")
+        if file_manager.text_index is not None:
+            stats = file_manager.text_index.get_stats()
+            print(f"   Index plein texte: {stats['documents']} documents, {stats['terms']} termes")
+        vector_index = file_manager.vector_index
+        if vector_index is not None:
+            # Entraînement final sur l'ensemble des vecteurs
+            if len(vector_index) >= vector_index.train_min:
+                vector_index.train()
+            stats = vector_index.get_stats()
+            print(f"   Index vectoriel: {stats['vectors']} posts, {stats['lists']} listes")
+        if file_manager.rollups is not None:
+            stats = file_manager.rollups.get_stats()
+            print(f"   Agrégats: {stats['posts']} posts, {stats['comments']} commentaires "
+                  f"({stats['daily_rows']} jours x subreddits)")
+    finally:
+        file_manager.close()
+        index_manager.close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -4,16 +4,29 @@ Fichier: mcp_servers/reddit_server/server.py
 """
 
 import asyncio
+import time
+from functools import partial
 from typing import Any, List
+from urllib.parse import parse_qsl, urlsplit
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Resource, Tool, TextContent
 
 from config import RedditConfig
-from utils.api_client import RedditAPIClient
-from storage.index_manager import IndexManager
+from utils.api_pool import ApiCallPool
+from utils.async_api_client import create_api_client
+from utils.rate_limiter import RateLimitScheduler
+from utils.response_cache import ResponseCache
+from utils.serializer import response_serializer
+from utils.validators import RedditValidator, ValidationError
+from storage.backends import create_index_manager
 from storage.file_manager import FileManager
+from storage.background_writer import BackgroundWriter
+from storage.durability import GroupCommitter
+from storage.retention import RetentionManager
+from storage.disk_budget import DiskBudget
+from storage.refetcher import Refetcher
 
 # Import des outils
 from tools.search_posts import SearchPostsTool
@@ -21,35 +34,65 @@ from tools.collect_subreddit import CollectSubredditTool
 from tools.collect_comments import CollectCommentsTool
 from tools.user_data import UserDataTool
 from tools.subreddit_info import SubredditInfoTool
+from tools.search_local_corpus import SearchLocalCorpusTool
+from tools.find_similar_posts import FindSimilarPostsTool
+from tools.comment_thread import CommentThreadTool
 
 
 class RedditMCPServer:
     """Serveur MCP pour Reddit"""
     
     def __init__(self):
+        started = time.perf_counter()
+        
         # Valider et créer les dossiers
         RedditConfig.validate()
         RedditConfig.create_directories()
         
         # Initialiser les composants
         self.config = RedditConfig
-        self.api_client = RedditAPIClient(
-            RedditConfig.CLIENT_ID,
-            RedditConfig.CLIENT_SECRET,
-            RedditConfig.USER_AGENT
+        # Client d'API non bloquant (backend asyncpraw, ou PRAW dans un pool de threads borné)
+        # limites de concurrence par outil, ordonnanceur de débit partagé et cache des réponses
+        self.api_pool = ApiCallPool.from_config(RedditConfig)
+        self.rate_limiter = RateLimitScheduler.from_config(RedditConfig)
+        self.response_cache = ResponseCache.from_config(RedditConfig)
+        self.api_client = create_api_client(
+            RedditConfig, self.api_pool, self.rate_limiter, self.response_cache
         )
         
-        self.index_manager = IndexManager(RedditConfig.INDEX_FILE)
-        self.file_manager = FileManager(RedditConfig, self.index_manager)
+        self.committer = GroupCommitter.from_config(RedditConfig)
+        
+        index_started = time.perf_counter()
+        self.index_manager = create_index_manager(RedditConfig, self.committer)
+        self.index_open_ms = (time.perf_counter() - index_started) * 1000
+        self.file_manager = FileManager(RedditConfig, self.index_manager, self.committer)
+        self.writer = BackgroundWriter(
+            self.file_manager,
+            max_queue=RedditConfig.WRITE_QUEUE_MAX,
+            batch_size=RedditConfig.WRITE_BATCH_SIZE
+        )
+        self.writer.start()
+        # Les posts et commentaires évincés par le budget disque sont récupérés en tâche
+        # de fond (client d'API ordonnancé, restockage par la file d'écriture): leur
+        # lecture n'attend jamais le réseau
+        self.refetcher = Refetcher(self.api_client, self.writer)
+        self.file_manager.set_refetcher(self.refetcher.request)
+        self.retention = RetentionManager(RedditConfig, self.file_manager)
+        self.disk_budget = DiskBudget(RedditConfig, self.file_manager)
         
         # Initialiser les outils
         self.tools = {
-            "search_reddit_posts": SearchPostsTool(self.api_client, self.file_manager),
-            "collect_subreddit_posts": CollectSubredditTool(self.api_client, self.file_manager),
-            "collect_post_comments": CollectCommentsTool(self.api_client, self.file_manager),
-            "collect_user_data": UserDataTool(self.api_client, self.file_manager),
-            "collect_subreddit_info": SubredditInfoTool(self.api_client, self.file_manager)
+            "search_reddit_posts": SearchPostsTool(self.api_client, self.file_manager, self.writer),
+            "collect_subreddit_posts": CollectSubredditTool(self.api_client, self.file_manager, self.writer),
+            "collect_post_comments": CollectCommentsTool(self.api_client, self.file_manager, self.writer),
+            "collect_user_data": UserDataTool(self.api_client, self.file_manager, self.writer),
+            "collect_subreddit_info": SubredditInfoTool(self.api_client, self.file_manager),
+            "get_comment_thread": CommentThreadTool(self.file_manager, self.writer)
         }
+        if self.file_manager.text_index is not None:
+            self.tools["search_local_corpus"] = SearchLocalCorpusTool(self.file_manager)
+        if self.file_manager.vector_index is not None:
+            self.tools["find_similar_posts"] = FindSimilarPostsTool(self.file_manager)
         
         # Créer le serveur MCP
         self.server = Server("reddit-mcp-server")
@@ -58,6 +101,14 @@ class RedditMCPServer:
         print(" Serveur MCP Reddit initialisé")
         print(f"   Data directory: {self.config.DATA_DIR}")
         print(f"   Outils disponibles: {len(self.tools)}")
+        search_indexes = [self.file_manager.text_index, self.file_manager.vector_index, self.file_manager.rollups]
+        if any(search_index is not None and not len(search_index) for search_index in search_indexes):
+            if next(iter(self.index_manager.iter_ids("posts")), None) is not None:
+                print("   Index de recherche vides: lancez python rebuild_search_index.py pour y ajouter les données existantes")
+        
+        self.startup_ms = (time.perf_counter() - started) * 1000
+        print(f"   Démarrage: {self.startup_ms:.1f} ms "
+              f"(index {self.config.INDEX_BACKEND}: {self.index_open_ms:.1f} ms)")
     
     def _setup_handlers(self):
         """Configure les handlers MCP"""
@@ -76,15 +127,47 @@ class RedditMCPServer:
                     uri="reddit://stats",
                     name="Reddit Stats",
                     mimeType="application/json",
-                    description="Statistiques du serveur"
+                    description="Statistiques du serveur et agrégats des données stockées "
+                               "(paramètres: subreddit, since, until, quantiles, top)"
                 )
             ]
         
         @self.server.read_resource()
         async def read_resource(uri: str) -> str:
             """Lit une ressource"""
-            if uri == "reddit://stats":
+            parts = urlsplit(str(uri))
+            if f"{parts.scheme}://{parts.netloc}{parts.path.rstrip('/')}" == "reddit://stats":
+                # Agrégats filtrés par les paramètres de l'URI (reddit://stats?subreddit=python&since=2024-01-01)
+                try:
+                    params = RedditValidator.validate_stats_params(dict(parse_qsl(parts.query)))
+                except ValidationError as e:
+                    return f"Paramètres invalides: {e}"
                 stats = self.index_manager.get_stats()
+                stats["cache"] = self.file_manager.cache.get_stats()
+                stats["known_ids"] = self.file_manager.known_ids.get_stats()
+                stats["writer"] = self.writer.get_stats()
+                stats["durability"] = self.committer.get_stats()
+                stats["api"] = self.api_pool.get_stats()
+                if self.rate_limiter is not None:
+                    stats["rate_limit"] = self.rate_limiter.get_stats()
+                if self.response_cache is not None:
+                    stats["api_cache"] = self.response_cache.get_stats()
+                stats["retention"] = self.retention.get_stats()
+                stats["disk"] = self.disk_budget.get_stats()
+                stats["refetch"] = self.refetcher.get_stats()
+                if self.file_manager.text_index is not None:
+                    stats["text_index"] = self.file_manager.text_index.get_stats()
+                if self.file_manager.vector_index is not None:
+                    stats["vector_index"] = self.file_manager.vector_index.get_stats()
+                if self.file_manager.rollups is not None:
+                    # Agrégats SQLite hors de la boucle asyncio
+                    stats["rollups"] = await asyncio.get_running_loop().run_in_executor(
+                        None, partial(self.file_manager.rollups.query, **params)
+                    )
+                stats["startup"] = {
+                    "startup_ms": round(self.startup_ms, 1),
+                    "index_open_ms": round(self.index_open_ms, 1)
+                }
                 return f"Statistiques Reddit:\n{stats}"
             return "Ressource non trouvée"
         
@@ -101,28 +184,53 @@ class RedditMCPServer:
                     raise ValueError(f"Outil inconnu: {name}")
                 
                 tool = self.tools[name]
-                return await tool.execute(arguments)
+                return await self.api_pool.run_tool(name, tool.execute, arguments)
                 
             except Exception as e:
                 print(f" Erreur outil '{name}': {e}")
-                import json
                 return [TextContent(
                     type="text",
-                    text=json.dumps({
+                    text=response_serializer.dumps({
                         "status": "error",
                         "tool": name,
                         "error": str(e)
-                    }, indent=2)
+                    })
                 )]
     
     async def run(self):
         """Lance le serveur"""
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                self.server.create_initialization_options()
-            )
+        # Rétention et budget disque en tâches de fond: leurs étapes passent par la file d'écriture
+        background_tasks = []
+        self.refetcher.start()
+        if self.config.RETENTION_ENABLED:
+            background_tasks.append(asyncio.create_task(self.retention.run_forever(self.writer)))
+        if self.config.DISK_BUDGET_BYTES > 0:
+            background_tasks.append(asyncio.create_task(self.disk_budget.run_forever(self.writer)))
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    self.server.create_initialization_options()
+                )
+        finally:
+            for task in background_tasks:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+            await self.refetcher.close()
+            # Vider la file d'écriture, écrire le filtre des IDs connus,
+            # puis intégrer le journal (ou le WAL)
+            await self.writer.flush()
+            self.writer.close()
+            await self.api_client.close()
+            if self.response_cache is not None:
+                self.response_cache.save()
+            self.api_pool.close()
+            self.file_manager.close()
+            self.index_manager.close()
 
 
 async def main():
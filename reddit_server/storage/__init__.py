@@ -4,9 +4,27 @@ Fichier: mcp_servers/reddit_server/storage/__init__.py
 """
 
 from .index_manager import IndexManager
+from .sqlite_index_manager import SQLiteIndexManager
+from .segment_store import SegmentStore
+from .record_cache import RecordCache
+from .text_index import TextIndex
+from .vector_index import VectorIndex
+from .threads import ThreadStore
+from .rollups import RollupStats
+from .cursors import CursorStore
 from .file_manager import FileManager
+from .backends import create_index_manager
 
 __all__ = [
     "IndexManager",
-    "FileManager"
+    "SQLiteIndexManager",
+    "SegmentStore",
+    "RecordCache",
+    "TextIndex",
+    "VectorIndex",
+    "ThreadStore",
+    "RollupStats",
+    "CursorStore",
+    "FileManager",
+    "create_index_manager"
 ]
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+Statistiques d'accès aux enregistrements stockés
+Fichier: mcp_servers/reddit_server/storage/access_stats.py
+
+Les lectures (get_post, get_comment) sont comptées en mémoire puis
+reportées par lots dans l'index (dernière lecture, nombre de lectures):
+une lecture ne provoque aucune écriture. Ces statistiques alimentent la
+politique d'éviction LRU/LFU du budget disque.
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+# Champs d'index des statistiques d'accès (conservés quand un enregistrement est réécrit)
+ACCESS_FIELDS = ("last_access", "access_count")
+
+
+def eviction_key(policy: str, entry: Dict) -> Tuple:
+    """Clé de tri d'un candidat à l'éviction ("lru": dernière lecture, "lfu": nombre de lectures)"""
+    if policy == "lfu":
+        return entry["access_count"], entry["last_access"]
+    return (entry["last_access"],)
+
+
+class AccessTracker:
+    """Compteurs de lecture en attente de report dans l'index"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], List] = {}
+        self.total = 0
+    
+    def touch(self, kind: str, item_id: str):
+        """Enregistre une lecture"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self.total += 1
+            pending = self._pending.get((kind, item_id))
+            if pending is None:
+                self._pending[(kind, item_id)] = [now, 1]
+            else:
+                pending[0] = now
+                pending[1] += 1
+    
+    def drain(self) -> Dict[str, Dict[str, Tuple[str, int]]]:
+        """
+        Retire les lectures en attente
+        
+        Returns:
+            {type: {id: (dernière lecture, nombre de lectures depuis le dernier report)}}
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        accesses = {}
+        for (kind, item_id), (last_access, count) in pending.items():
+            accesses.setdefault(kind, {})[item_id] = (last_access, count)
+        return accesses
+    
+    def __len__(self) -> int:
+        return len(self._pending)
\ No newline at end of file
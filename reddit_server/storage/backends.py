@@ -0,0 +1,56 @@
+"""
+Sélection du backend d'index
+Fichier: mcp_servers/reddit_server/storage/backends.py
+"""
+
+from storage.index_manager import IndexManager
+from storage.sqlite_index_manager import SQLiteIndexManager
+from storage.durability import GroupCommitter
+
+
+def create_index_manager(config, committer: GroupCommitter = None):
+    """
+    Crée le gestionnaire d'index configuré par INDEX_BACKEND
+    
+    Args:
+        config: Classe de configuration (RedditConfig)
+        committer: Politique fsync partagée avec le FileManager
+    
+    Returns:
+        IndexManager (backend "json") ou SQLiteIndexManager (backend "sqlite").
+        Le backend SQLite s'ouvre en temps constant; au premier lancement,
+        un index.json existant y est importé.
+    """
+    backend = config.INDEX_BACKEND
+    if backend == "json":
+        return IndexManager(
+            config.INDEX_FILE,
+            compact_min_records=config.INDEX_COMPACT_MIN_RECORDS,
+            compact_ratio=config.INDEX_COMPACT_RATIO,
+            committer=committer,
+            json_backend=config.JSON_BACKEND
+        )
+    if backend == "sqlite":
+        # WAL + NORMAL ne synchronise qu'aux checkpoints; FULL synchronise chaque transaction
+        synchronous = "FULL" if committer is not None and committer.sync_each_write else "NORMAL"
+        manager = SQLiteIndexManager(config.INDEX_DB_FILE, synchronous=synchronous)
+        if manager.get_meta("json_imported_at") is None and config.INDEX_FILE.exists():
+            _import_json_index(config, manager)
+        return manager
+    raise ValueError(
+        f"Backend d'index invalide: {backend}. Options valides: {config.VALID_INDEX_BACKENDS}"
+    )
+
+
+def _import_json_index(config, manager: SQLiteIndexManager):
+    """Migration unique d'un index JSON existant vers SQLite"""
+    legacy = IndexManager(
+        config.INDEX_FILE,
+        compact_min_records=config.INDEX_COMPACT_MIN_RECORDS,
+        compact_ratio=config.INDEX_COMPACT_RATIO,
+        json_backend=config.JSON_BACKEND
+    )
+    manager.import_json_index(legacy.index)
+    legacy.close()
+    print(f"   Index JSON importé dans SQLite: {len(legacy.index['posts'])} posts, "
+          f"{len(legacy.index['comments'])} commentaires")
\ No newline at end of file
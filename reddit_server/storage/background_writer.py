@@ -0,0 +1,243 @@
+"""
+Écriture asynchrone du stockage via un thread dédié
+Fichier: mcp_servers/reddit_server/storage/background_writer.py
+
+Les outils MCP déposent leurs écritures dans une file bornée au lieu
+d'écrire sur le disque depuis la boucle asyncio. Un thread unique vide la
+file par lots: les appels consécutifs à save_posts / save_comments d'un
+même lot sont fusionnés en une seule écriture (une mise à jour d'index).
+Les tâches de maintenance (rétention) passent par la même file: elles
+ne s'exécutent jamais en même temps qu'une écriture.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from storage.content_hash import count_statuses
+
+# Méthodes du FileManager dont les appels consécutifs peuvent être fusionnés
+MERGEABLE_METHODS = ("save_posts", "save_comments")
+
+# Marqueur interne: résolu quand tout ce qui le précède est écrit
+FLUSH = "_flush"
+
+
+class BackgroundWriter:
+    """Pipeline d'écriture: file bornée + thread d'écriture par lots"""
+    
+    def __init__(self, file_manager, max_queue: int = 1000, batch_size: int = 64):
+        """
+        Args:
+            file_manager: FileManager qui effectue les écritures
+            max_queue: Taille maximale de la file (au-delà, les outils attendent)
+            batch_size: Nombre maximal d'éléments traités par lot
+        """
+        self.storage = file_manager
+        self.batch_size = batch_size
+        self.idle_commit_interval = max(file_manager.committer.interval, 0.05)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = threading.Thread(target=self._run, name="reddit-storage-writer", daemon=True)
+        
+        self.items_written = 0
+        self.batches_written = 0
+        self.errors = 0
+        self.backpressure_waits = 0
+        self.last_batch_ms = 0.0
+        self.max_batch_ms = 0.0
+        self._total_batch_ms = 0.0
+        self._total_latency_ms = 0.0
+    
+    def start(self):
+        """Démarre le thread d'écriture"""
+        self.thread.start()
+    
+    async def submit(self, method: str, *args) -> Any:
+        """
+        Dépose une écriture dans la file et attend son résultat sans bloquer la boucle
+        
+        Args:
+            method: Nom de la méthode du FileManager (ex: "save_posts") ou fonction
+            *args: Arguments de la méthode
+        
+        Returns:
+            Résultat de la méthode du FileManager
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        item = (method, args, future, loop, time.perf_counter())
+        
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # File pleine: attendre une place dans un thread pour ne pas bloquer la boucle
+            self.backpressure_waits += 1
+            await loop.run_in_executor(None, self.queue.put, item)
+        
+        return await future
+    
+    async def call(self, func: Callable, *args) -> Any:
+        """Exécute une fonction dans le thread d'écriture, dans l'ordre de la file"""
+        return await self.submit(func, *args)
+    
+    async def save_posts(self, posts: List[Dict]) -> Dict:
+        """Dépose un lot de posts"""
+        return await self.submit("save_posts", posts)
+    
+    async def save_comments(self, comments: List[Dict]) -> Dict:
+        """Dépose un lot de commentaires"""
+        return await self.submit("save_comments", comments)
+    
+    async def save_post_comments(self, post: Dict, comments: List[Dict]) -> Dict:
+        """Dépose un post et ses commentaires (résultat avec le résumé du fil)"""
+        return await self.submit("save_post_comments", post, comments)
+    
+    async def save_user_data(self, username: str, user_data: Dict) -> str:
+        """Dépose les données d'un utilisateur"""
+        return await self.submit("save_user_data", username, user_data)
+    
+    async def save_cursor(self, subreddit: str, sort: str, posts: List[Dict],
+                          complete: bool = True) -> Optional[Dict]:
+        """Dépose l'avancée (ou le point de reprise) du curseur de collecte incrémentale d'un subreddit"""
+        return await self.submit("save_cursor", subreddit, sort, posts, complete)
+    
+    async def save_subreddit_collection(self, subreddit: str, posts: List[Dict]) -> str:
+        """Dépose une collection de subreddit"""
+        return await self.submit("save_subreddit_collection", subreddit, posts)
+    
+    async def save_search_results(self, query: str, results: List[Dict]) -> str:
+        """Dépose des résultats de recherche"""
+        return await self.submit("save_search_results", query, results)
+    
+    async def flush(self):
+        """Attend que toutes les écritures déjà déposées soient sur le disque"""
+        if self.thread.is_alive():
+            await self.submit(FLUSH)
+    
+    def close(self):
+        """Arrête le thread après avoir vidé la file"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+    
+    def _run(self):
+        """Boucle du thread d'écriture"""
+        while True:
+            try:
+                item = self.queue.get(timeout=self.idle_commit_interval)
+            except queue.Empty:
+                # File inactive: effectuer le fsync groupé en attente (politique "interval")
+                self.storage.committer.commit_if_due()
+                continue
+            if item is None:
+                self.storage.committer.commit()
+                return
+            
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write_batch(batch)
+                    self.storage.committer.commit()
+                    return
+                batch.append(item)
+            
+            self._write_batch(batch)
+    
+    def _write_batch(self, batch: List[tuple]):
+        """Écrit un lot en fusionnant les appels consécutifs fusionnables"""
+        started = time.perf_counter()
+        
+        groups = []
+        for item in batch:
+            method = item[0]
+            if groups and method in MERGEABLE_METHODS and groups[-1][0][0] == method:
+                groups[-1].append(item)
+            else:
+                groups.append([item])
+        
+        for group in groups:
+            self._write_group(group)
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.batches_written += 1
+        self.last_batch_ms = elapsed_ms
+        self.max_batch_ms = max(self.max_batch_ms, elapsed_ms)
+        self._total_batch_ms += elapsed_ms
+    
+    def _write_group(self, group: List[tuple]):
+        """Exécute un groupe d'appels (fusionné si possible) et résout les futures"""
+        method = group[0][0]
+        try:
+            if method == FLUSH:
+                results = [None]
+            elif method in MERGEABLE_METHODS:
+                records = [record for item in group for record in item[1][0]]
+                merged = getattr(self.storage, method)(records)
+                results = self._split_result(merged, [len(item[1][0]) for item in group])
+            else:
+                func = method if callable(method) else getattr(self.storage, method)
+                results = [func(*group[0][1])]
+        except Exception as e:
+            self.errors += 1
+            for _, _, future, loop, _ in group:
+                loop.call_soon_threadsafe(_set_exception, future, e)
+            return
+        
+        done = time.perf_counter()
+        for (name, _, future, loop, enqueued), result in zip(group, results):
+            if name != FLUSH:
+                self.items_written += 1
+                self._total_latency_ms += (done - enqueued) * 1000
+            loop.call_soon_threadsafe(_set_result, future, result)
+    
+    @staticmethod
+    def _split_result(result: Dict, sizes: List[int]) -> List[Dict]:
+        """Découpe le résultat d'un appel fusionné en un résultat par appel d'origine"""
+        results = []
+        start = 0
+        for size in sizes:
+            part = {
+                key: value[start:start + size]
+                for key, value in result.items()
+                if isinstance(value, list)
+            }
+            part["count"] = size
+            if "statuses" in part:
+                part.update(count_statuses(part["statuses"]))
+            results.append(part)
+            start += size
+        return results
+    
+    def get_stats(self) -> Dict:
+        """Retourne les métriques de la file d'écriture"""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue": self.queue.maxsize,
+            "items_written": self.items_written,
+            "batches_written": self.batches_written,
+            "errors": self.errors,
+            "backpressure_waits": self.backpressure_waits,
+            "last_batch_ms": round(self.last_batch_ms, 2),
+            "max_batch_ms": round(self.max_batch_ms, 2),
+            "avg_batch_ms": round(self._total_batch_ms / self.batches_written, 2)
+                            if self.batches_written else 0.0,
+            "avg_write_latency_ms": round(self._total_latency_ms / self.items_written, 2)
+                                    if self.items_written else 0.0
+        }
+
+
+def _set_result(future: asyncio.Future, result: Any):
+    """Résout une future depuis la boucle (sauf si l'appelant l'a annulée)"""
+    if not future.cancelled():
+        future.set_result(result)
+
+
+def _set_exception(future: asyncio.Future, exception: Exception):
+    """Propage une erreur d'écriture à l'appelant"""
+    if not future.cancelled():
+        future.set_exception(exception)
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Filtre de Bloom extensible des IDs déjà collectés
+Fichier: mcp_servers/reddit_server/storage/bloom_filter.py
+
+Répond en mémoire constante (quelques octets par ID) à la question
+"cet ID a-t-il déjà été vu ?": une réponse négative est certaine, une
+réponse positive peut être un faux positif (taux borné par error_rate).
+Le filtre extensible ajoute un filtre deux fois plus grand, au taux
+d'erreur plus strict, quand le précédent est plein: le taux global reste
+borné sans connaître le nombre d'IDs à l'avance.
+"""
+
+import hashlib
+import math
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+from storage.locking import synchronized
+from storage.durability import atomic_write_bytes
+
+# En-tête du fichier: magic, version, nombre de filtres
+FILE_MAGIC = b"RBLM"
+FILE_VERSION = 1
+HEADER = struct.Struct("<4sHI")
+# Par filtre: capacité, taux d'erreur, nombre de bits, nombre de hashes, nombre d'éléments
+FILTER_HEADER = struct.Struct("<QdQIQ")
+
+
+def key_hashes(key: str) -> Tuple[int, int]:
+    """Deux hashes 64 bits indépendants d'une clé (calculés une fois pour tous les filtres)"""
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class BloomFilter:
+    """Filtre de Bloom de capacité fixe (double hachage sur BLAKE2b)"""
+    
+    def __init__(self, capacity: int, error_rate: float, bits: bytearray = None, count: int = 0):
+        """
+        Args:
+            capacity: Nombre d'éléments prévus
+            error_rate: Taux de faux positifs visé à pleine capacité
+            bits: Tableau de bits existant (chargement depuis le disque)
+            count: Nombre d'éléments déjà ajoutés
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+    
+    def contains_hashes(self, hashes: Tuple[int, int]) -> bool:
+        """Test d'appartenance à partir des hashes d'une clé (voir key_hashes)"""
+        # Positions h1 + i * h2 (mod m), parcourues par additions successives
+        num_bits = self.num_bits
+        pos = hashes[0] % num_bits
+        step = hashes[1] % num_bits
+        bits = self.bits
+        for _ in range(self.num_hashes):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+            pos += step
+            if pos >= num_bits:
+                pos -= num_bits
+        return True
+    
+    def add_hashes(self, hashes: Tuple[int, int]) -> bool:
+        """Ajoute une clé à partir de ses hashes; retourne False si elle était (probablement) présente"""
+        num_bits = self.num_bits
+        pos = hashes[0] % num_bits
+        step = hashes[1] % num_bits
+        bits = self.bits
+        added = False
+        for _ in range(self.num_hashes):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                added = True
+            pos += step
+            if pos >= num_bits:
+                pos -= num_bits
+        if added:
+            self.count += 1
+        return added
+    
+    def __contains__(self, key: str) -> bool:
+        return self.contains_hashes(key_hashes(key))
+    
+    def add(self, key: str) -> bool:
+        """Ajoute une clé; retourne False si elle était (probablement) déjà présente"""
+        return self.add_hashes(key_hashes(key))
+    
+    @property
+    def is_full(self) -> bool:
+        """True quand la capacité prévue est atteinte (le taux d'erreur visé aussi)"""
+        return self.count >= self.capacity
+
+
+class ScalableBloomFilter:
+    """Suite de filtres de Bloom qui grandit avec le nombre d'éléments"""
+    
+    def __init__(self, initial_capacity: int = 100000, error_rate: float = 0.001,
+                 growth: int = 2, tightening: float = 0.5):
+        """
+        Args:
+            initial_capacity: Capacité du premier filtre
+            error_rate: Taux de faux positifs global visé
+            growth: Facteur de capacité entre deux filtres successifs
+            tightening: Facteur appliqué au taux d'erreur de chaque nouveau filtre
+        """
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self._lock = threading.RLock()
+        self.filters: List[BloomFilter] = []
+    
+    def __contains__(self, key: str) -> bool:
+        hashes = key_hashes(key)
+        return any(bloom.contains_hashes(hashes) for bloom in reversed(self.filters))
+    
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+    
+    @synchronized
+    def add(self, key: str) -> bool:
+        """Ajoute une clé; retourne False si elle était (probablement) déjà présente"""
+        hashes = key_hashes(key)
+        if any(bloom.contains_hashes(hashes) for bloom in self.filters):
+            return False
+        if not self.filters or self.filters[-1].is_full:
+            # Taux d'erreur du filtre n: error_rate * (1 - tightening) * tightening^n
+            # (la somme des taux reste inférieure à error_rate)
+            n = len(self.filters)
+            self.filters.append(BloomFilter(
+                self.initial_capacity * self.growth ** n,
+                self.error_rate * (1 - self.tightening) * self.tightening ** n
+            ))
+        return self.filters[-1].add_hashes(hashes)
+    
+    def update(self, keys: Iterable[str]) -> int:
+        """Ajoute plusieurs clés; retourne le nombre de clés nouvelles"""
+        return sum(1 for key in keys if self.add(key))
+    
+    @synchronized
+    def save(self, file_path: Path, committer=None):
+        """Écrit le filtre sur le disque (fichier temporaire + rename)"""
+        parts = [HEADER.pack(FILE_MAGIC, FILE_VERSION, len(self.filters))]
+        for bloom in self.filters:
+            parts.append(FILTER_HEADER.pack(
+                bloom.capacity, bloom.error_rate, bloom.num_bits, bloom.num_hashes, bloom.count
+            ))
+            parts.append(bytes(bloom.bits))
+        atomic_write_bytes(file_path, b"".join(parts), committer)
+    
+    @classmethod
+    def load(cls, file_path: Path, initial_capacity: int = 100000,
+             error_rate: float = 0.001) -> "ScalableBloomFilter":
+        """
+        Relit un filtre écrit par save()
+        
+        Raises:
+            ValueError: Fichier invalide ou tronqué
+        """
+        data = Path(file_path).read_bytes()
+        if len(data) < HEADER.size:
+            raise ValueError(f"Filtre de Bloom tronqué: {file_path}")
+        magic, version, num_filters = HEADER.unpack_from(data, 0)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"Filtre de Bloom invalide: {file_path}")
+        
+        scalable = cls(initial_capacity, error_rate)
+        offset = HEADER.size
+        for _ in range(num_filters):
+            if offset + FILTER_HEADER.size > len(data):
+                raise ValueError(f"Filtre de Bloom tronqué: {file_path}")
+            capacity, rate, num_bits, num_hashes, count = FILTER_HEADER.unpack_from(data, offset)
+            offset += FILTER_HEADER.size
+            size = (num_bits + 7) // 8
+            if offset + size > len(data):
+                raise ValueError(f"Filtre de Bloom tronqué: {file_path}")
+            bloom = BloomFilter(capacity, rate, bytearray(data[offset:offset + size]), count)
+            if bloom.num_bits != num_bits or bloom.num_hashes != num_hashes:
+                raise ValueError(f"Filtre de Bloom invalide: {file_path}")
+            scalable.filters.append(bloom)
+            offset += size
+        if scalable.filters:
+            scalable.initial_capacity = scalable.filters[0].capacity
+        return scalable
+    
+    def get_stats(self) -> Dict:
+        """Retourne la taille du filtre et son taux de faux positifs estimé"""
+        # Taux estimé: probabilité qu'au moins un filtre réponde à tort
+        miss = 1.0
+        for bloom in self.filters:
+            fill = 1 - math.exp(-bloom.num_hashes * bloom.count / bloom.num_bits)
+            miss *= 1 - fill ** bloom.num_hashes
+        return {
+            "entries": len(self),
+            "filters": len(self.filters),
+            "bytes": sum(len(bloom.bits) for bloom in self.filters),
+            "estimated_false_positive_rate": round(1 - miss, 6)
+        }
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+Détection des changements de contenu des enregistrements Reddit
+Fichier: mcp_servers/reddit_server/storage/content_hash.py
+
+Le hash d'un enregistrement porte sur ses champs significatifs: les champs
+volatils (date de récupération) en sont exclus, si bien qu'une collecte
+périodique qui renvoie le même post ne provoque aucune écriture. Le hash
+est calculé sur une sérialisation canonique (clés triées, bibliothèque
+standard) pour rester stable quel que soit le backend JSON configuré.
+"""
+
+import hashlib
+import json
+from typing import Dict, Iterable
+
+# Champs ignorés par le hash: ils changent à chaque collecte sans changer le contenu
+VOLATILE_FIELDS = ("retrieved_at",)
+
+# Statuts d'un enregistrement lors d'une sauvegarde
+NEW = "new"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+
+
+def content_hash(record: Dict) -> str:
+    """Hash stable (BLAKE2b, 128 bits) des champs significatifs d'un enregistrement"""
+    meaningful = {key: value for key, value in record.items() if key not in VOLATILE_FIELDS}
+    canonical = json.dumps(meaningful, sort_keys=True, ensure_ascii=False,
+                           separators=(',', ':'), default=str)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def count_statuses(statuses: Iterable[str]) -> Dict[str, int]:
+    """Compte les statuts d'un lot: {"new", "updated", "unchanged"}"""
+    counts = {NEW: 0, UPDATED: 0, UNCHANGED: 0}
+    for status in statuses:
+        counts[status] += 1
+    return counts
\ No newline at end of file
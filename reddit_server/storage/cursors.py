@@ -0,0 +1,126 @@
+"""
+Curseurs de collecte incrémentale des subreddits
+Fichier: mcp_servers/reddit_server/storage/cursors.py
+
+Pour chaque subreddit et tri, le plus récent post déjà collecté (fullname
+"t3_<id>" et created_utc en secondes epoch, comme l'API: les dates ISO en
+heure locale sont ambiguës au passage à l'heure d'hiver): une collecte incrémentale parcourt le listing du
+plus récent au plus ancien et s'arrête à ce post, sans repayer les pages
+déjà vues. Un seul petit fichier JSON (cursors.json), réécrit atomiquement.
+
+Le curseur n'avance que si la collecte est complète (curseur ou fin du
+listing atteint). Une collecte interrompue par sa limite laisse le curseur
+en place et enregistre un point de reprise: "after" (plus ancien post
+collecté) et "newest" (plus récent post collecté). La collecte suivante
+reprend à "after" jusqu'au curseur, puis le curseur passe à "newest": les
+posts publiés entre-temps sont collectés par la collecte d'après.
+"""
+
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from storage.durability import GroupCommitter, atomic_write_text
+from utils.serializer import JSONSerializer
+
+
+class CursorStore:
+    """Plus récent post collecté par subreddit et tri"""
+    
+    def __init__(self, file_path: Path, json_backend: str = "auto", committer: GroupCommitter = None):
+        """
+        Args:
+            file_path: Fichier des curseurs
+            json_backend: Backend de sérialisation (voir JSONSerializer)
+            committer: Politique de durabilité des écritures
+        """
+        self.file_path = Path(file_path)
+        self.committer = committer
+        self.serializer = JSONSerializer(json_backend)
+        self._lock = threading.Lock()
+        try:
+            with open(self.file_path, 'rb') as f:
+                self._cursors: Dict[str, Dict] = self.serializer.loads(f.read())
+        except FileNotFoundError:
+            self._cursors = {}
+        for cursor in self._cursors.values():
+            _migrate_position(cursor)
+            if "resume" in cursor:
+                _migrate_position(cursor["resume"]["newest"])
+    
+    @staticmethod
+    def key(subreddit: str, sort: str) -> str:
+        """Clé d'un curseur (nom de subreddit insensible à la casse)"""
+        return f"{subreddit.lower()}:{sort}"
+    
+    def get(self, subreddit: str, sort: str) -> Optional[Dict]:
+        """
+        Curseur d'un subreddit et d'un tri (None si absent):
+        {"fullname", "created_utc", "updated_at"}, plus "resume": {"after", "newest"}
+        après une collecte incomplète ("fullname" absent si aucune collecte n'a abouti)
+        """
+        with self._lock:
+            cursor = self._cursors.get(self.key(subreddit, sort))
+            return dict(cursor) if cursor else None
+    
+    @staticmethod
+    def _position(post: Dict) -> Dict:
+        """Position d'un post dans le listing ({"fullname", "created_utc" en secondes epoch})"""
+        return {"fullname": f"t3_{post['id']}", "created_utc": post["created_timestamp"]}
+    
+    def advance(self, subreddit: str, sort: str, posts: List[Dict], complete: bool = True) -> Optional[Dict]:
+        """
+        Avance le curseur au plus récent des posts collectés (jamais en arrière)
+        si la collecte est complète, sinon enregistre le point de reprise
+        
+        Args:
+            subreddit: Nom du subreddit
+            sort: Tri du listing
+            posts: Posts collectés
+            complete: Curseur (ou fin du listing) atteint: aucun post manqué
+        
+        Returns:
+            Curseur à jour (None si aucun post et pas de curseur)
+        """
+        key = self.key(subreddit, sort)
+        with self._lock:
+            cursor = self._cursors.get(key)
+            resume = cursor.get("resume") if cursor else None
+            positions = [self._position(post) for post in posts]
+            
+            if complete:
+                # Plus récent post collecté depuis le curseur, reprises comprises
+                if resume:
+                    positions.append(resume["newest"])
+                newest = max(positions, key=lambda position: position["created_utc"], default=None)
+                if newest is None or (cursor and "fullname" in cursor
+                                      and newest["created_utc"] < cursor["created_utc"]):
+                    if not resume:
+                        return dict(cursor) if cursor else None
+                    cursor = {field: value for field, value in cursor.items() if field != "resume"}
+                else:
+                    cursor = {**newest, "updated_at": datetime.now().isoformat()}
+            else:
+                if not positions:
+                    return dict(cursor) if cursor else None
+                oldest = min(positions, key=lambda position: position["created_utc"])
+                newest = resume["newest"] if resume else max(
+                    positions, key=lambda position: position["created_utc"]
+                )
+                cursor = {
+                    **(cursor or {}),
+                    "resume": {"after": oldest["fullname"], "newest": newest}
+                }
+            
+            self._cursors[key] = cursor
+            atomic_write_text(self.file_path, self.serializer.dumps(self._cursors), self.committer)
+            return dict(cursor)
+    
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+
+def _migrate_position(position: Dict):
+    """Convertit un created_utc ISO (anciens curseurs, heure locale) en secondes epoch"""
+    if isinstance(position.get("created_utc"), str):
+        position["created_utc"] = datetime.fromisoformat(position["created_utc"]).timestamp()
\ No newline at end of file
@@ -0,0 +1,174 @@
+"""
+Budget disque des données Reddit brutes
+Fichier: mcp_servers/reddit_server/storage/disk_budget.py
+
+Indépendamment de la rétention par âge, l'espace occupé par les données
+brutes (posts, commentaires, utilisateurs, segments, archives) est borné
+par DISK_BUDGET_BYTES. Au-delà, les fichiers de posts et commentaires les
+moins récemment (LRU) ou les moins souvent (LFU) lus sont supprimés
+jusqu'à repasser sous DISK_LOW_WATERMARK du budget. Leurs entrées d'index
+sont conservées (marquées "evicted"): leur lecture par get_post /
+get_comment demande leur récupération depuis Reddit (voir Refetcher).
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+from storage.access_stats import eviction_key
+from storage.file_manager import FileManager
+
+# Dossiers comptés dans le budget
+BUDGET_DIRECTORIES = ("POSTS_DIR", "COMMENTS_DIR", "USERS_DIR", "SEGMENTS_DIR", "ARCHIVES_DIR",
+                      "THREADS_DIR")
+
+
+def directory_size(directory: Path) -> int:
+    """Taille totale des fichiers d'un dossier (récursif, os.scandir)"""
+    if not directory.exists():
+        return 0
+    total = 0
+    stack = [str(directory)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+                except FileNotFoundError:
+                    # Fichier supprimé pendant le parcours (écriture atomique, rétention)
+                    continue
+    return total
+
+
+class DiskBudget:
+    """Mesure l'espace occupé et évince les données brutes au-delà du budget"""
+    
+    def __init__(self, config, file_manager: FileManager):
+        """
+        Args:
+            config: Configuration (DISK_*, EVICTION_*)
+            file_manager: FileManager dont les fichiers sont évincés
+        """
+        self.config = config
+        self.storage = file_manager
+        self.index = file_manager.index
+        self.budget_bytes = config.DISK_BUDGET_BYTES
+        self.policy = config.EVICTION_POLICY
+        self.batch_size = max(1, config.EVICTION_BATCH_SIZE)
+        
+        self.by_directory: Dict[str, int] = {}
+        self.used_bytes = 0
+        self.measured_at = None
+        self.evicting = False
+        self.evicted = {"posts": 0, "comments": 0}
+        self.evicted_bytes = 0
+        self.exhausted = False
+    
+    def measure(self) -> int:
+        """Mesure l'espace occupé par chaque dossier du budget; retourne le total"""
+        by_directory = {
+            name[:-len("_DIR")].lower(): directory_size(getattr(self.config, name))
+            for name in BUDGET_DIRECTORIES
+        }
+        self.by_directory = by_directory
+        self.used_bytes = sum(by_directory.values())
+        self.measured_at = datetime.now().isoformat()
+        return self.used_bytes
+    
+    def evict_step(self) -> bool:
+        """
+        Évince un lot si l'espace occupé dépasse le budget (hystérésis: une
+        fois commencée, l'éviction continue jusqu'au seuil bas)
+        
+        Returns:
+            True s'il faut encore évincer
+        """
+        if self.budget_bytes <= 0:
+            return False
+        if not self.evicting and self.used_bytes <= self.budget_bytes:
+            return False
+        excess = self.used_bytes - int(self.budget_bytes * self.config.DISK_LOW_WATERMARK)
+        if excess <= 0:
+            self.evicting = False
+            return False
+        self.evicting = True
+        
+        candidates = [
+            (kind, candidate)
+            for kind in ("posts", "comments")
+            for candidate in self.index.eviction_candidates(kind, self.policy, self.batch_size)
+        ]
+        candidates.sort(key=lambda item: eviction_key(self.policy, item[1]))
+        
+        chosen = {"posts": [], "comments": []}
+        planned = 0
+        for kind, candidate in candidates[:self.batch_size]:
+            if planned >= excess:
+                break
+            try:
+                planned += os.stat(candidate["file"]).st_size
+            except FileNotFoundError:
+                pass
+            chosen[kind].append(candidate["id"])
+        
+        # Plus rien d'évinçable (données en segments, utilisateurs): budget non tenu
+        self.exhausted = not candidates
+        if self.exhausted:
+            self.evicting = False
+            return False
+        
+        for kind, ids in chosen.items():
+            if not ids:
+                continue
+            freed = self.storage.evict(kind, ids)
+            self.evicted[kind] += len(ids)
+            self.evicted_bytes += freed
+            self.used_bytes -= freed
+            self.by_directory[kind] = self.by_directory.get(kind, 0) - freed
+        return True
+    
+    def check(self):
+        """Reporte les lectures en attente (pour l'ordre LRU/LFU) puis mesure l'espace occupé"""
+        self.storage.flush_access_stats()
+        self.measure()
+    
+    async def run_forever(self, writer):
+        """
+        Tâche de fond du serveur: mesure toutes les DISK_CHECK_INTERVAL_SECONDS
+        puis évince par lots via la file du thread d'écriture (comme check())
+        
+        Args:
+            writer: BackgroundWriter partagé avec les outils
+        """
+        while True:
+            try:
+                await writer.call(self.storage.flush_access_stats)
+                # Le parcours des dossiers ne touche pas à l'index: hors du thread d'écriture
+                await asyncio.get_running_loop().run_in_executor(None, self.measure)
+                while await writer.call(self.evict_step):
+                    await asyncio.sleep(0)
+            except Exception as e:
+                print(f" Erreur budget disque: {e}")
+            await asyncio.sleep(self.config.DISK_CHECK_INTERVAL_SECONDS)
+    
+    def get_stats(self) -> Dict:
+        """Retourne l'espace occupé (dernière mesure) par rapport au budget"""
+        return {
+            "budget_bytes": self.budget_bytes,
+            "used_bytes": self.used_bytes,
+            "usage_ratio": round(self.used_bytes / self.budget_bytes, 4) if self.budget_bytes else None,
+            "by_directory": dict(self.by_directory),
+            "measured_at": self.measured_at,
+            "policy": self.policy,
+            "evicting": self.evicting,
+            "exhausted": self.exhausted,
+            "evicted": dict(self.evicted),
+            "evicted_bytes": self.evicted_bytes,
+            "refetch_requests": self.storage.refetch_requests,
+            "pending_accesses": len(self.storage.access)
+        }
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""
+Écritures atomiques et politique de durabilité (group commit)
+Fichier: mcp_servers/reddit_server/storage/durability.py
+
+Toute écriture de fichier complet passe par un fichier temporaire,
+synchronisé puis renommé: un arrêt brutal laisse soit l'ancienne version,
+soit la nouvelle, jamais un fichier tronqué. Le coût des autres fsync
+(dossiers des renames, segments et journal complétés en append) est
+réparti selon la politique choisie:
+- "always": fsync à chaque écriture (fichier + dossier)
+- "interval": fsync groupé au plus tard toutes les N ms
+- "records": fsync groupé tous les N enregistrements
+- "none": aucun fsync (le système décide, y compris pour les fichiers temporaires)
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable
+
+
+class GroupCommitter:
+    """Regroupe les fsync des fichiers écrits selon une politique de durabilité"""
+    
+    POLICIES = ["always", "interval", "records", "none"]
+    
+    def __init__(self, policy: str = "interval", interval_ms: int = 200, every_records: int = 100):
+        """
+        Args:
+            policy: "always", "interval", "records" ou "none"
+            interval_ms: Délai maximal avant fsync (politique "interval")
+            every_records: Nombre d'enregistrements par fsync (politique "records")
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Politique fsync invalide: {policy}. Options valides: {self.POLICIES}")
+        
+        self.policy = policy
+        self.interval = interval_ms / 1000
+        self.every_records = every_records
+        
+        self._pending = set()
+        self._pending_dirs = set()
+        self._pending_records = 0
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+        
+        self.commits = 0
+        self.fsyncs = 0
+    
+    @classmethod
+    def from_config(cls, config) -> "GroupCommitter":
+        """Crée le committer décrit par la configuration"""
+        return cls(config.FSYNC_POLICY, config.FSYNC_INTERVAL_MS, config.FSYNC_EVERY_RECORDS)
+    
+    @property
+    def sync_each_write(self) -> bool:
+        """True si chaque écriture doit être durable dès son retour (fichier et dossier)"""
+        return self.policy == "always"
+    
+    def record(self, paths: Iterable[Path], records: int = 1):
+        """
+        Signale des fichiers complétés en append (fichier et dossier à synchroniser)
+        
+        Args:
+            paths: Fichiers modifiés
+            records: Nombre d'enregistrements concernés
+        """
+        paths = set(Path(p) for p in paths)
+        self._add(paths, {path.parent for path in paths}, records)
+    
+    def record_renames(self, paths: Iterable[Path], records: int = 1):
+        """
+        Signale des fichiers remplacés par rename (contenu déjà synchronisé):
+        seul leur dossier reste à synchroniser
+        
+        Args:
+            paths: Fichiers remplacés
+            records: Nombre d'enregistrements concernés
+        """
+        self._add(set(), {Path(p).parent for p in paths}, records)
+    
+    def _add(self, files: set, dirs: set, records: int):
+        """Synchronise tout de suite ("always") ou met en attente du fsync groupé"""
+        if self.policy == "none":
+            return
+        if self.policy == "always":
+            self._sync(files, dirs)
+            return
+        
+        with self._lock:
+            self._pending.update(files)
+            self._pending_dirs.update(dirs)
+            self._pending_records += records
+        self.commit_if_due()
+    
+    def commit_if_due(self):
+        """Effectue le fsync groupé si la politique l'exige"""
+        with self._lock:
+            if not self._pending and not self._pending_dirs:
+                return
+            if self.policy == "records":
+                due = self._pending_records >= self.every_records
+            else:
+                due = time.monotonic() - self._last_commit >= self.interval
+        if due:
+            self.commit()
+    
+    def commit(self):
+        """Synchronise sur le disque tous les fichiers en attente"""
+        with self._lock:
+            pending, pending_dirs = self._pending, self._pending_dirs
+            self._pending = set()
+            self._pending_dirs = set()
+            self._pending_records = 0
+            self._last_commit = time.monotonic()
+        if pending or pending_dirs:
+            self._sync(pending, pending_dirs)
+    
+    def _sync(self, files: set, dirs: set):
+        """fsync des fichiers puis des dossiers (pour rendre les créations et renames durables)"""
+        for path in files:
+            self._fsync_path(path)
+        for directory in dirs:
+            self._fsync_path(directory)
+        self.commits += 1
+    
+    def _fsync_path(self, path: Path):
+        """fsync d'un fichier ou d'un dossier (ignoré s'il a disparu entre-temps)"""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except (FileNotFoundError, IsADirectoryError, PermissionError):
+            return
+        try:
+            os.fsync(fd)
+            self.fsyncs += 1
+        except OSError:
+            # Certains systèmes ne permettent pas le fsync d'un dossier
+            pass
+        finally:
+            os.close(fd)
+    
+    def get_stats(self) -> Dict:
+        """Retourne les compteurs de synchronisation"""
+        return {
+            "policy": self.policy,
+            "pending_files": len(self._pending),
+            "pending_dirs": len(self._pending_dirs),
+            "commits": self.commits,
+            "fsyncs": self.fsyncs
+        }
+
+
+def atomic_write_text(file_path: Path, text: str, committer: GroupCommitter = None):
+    """
+    Écrit un fichier via un fichier temporaire + rename
+    
+    Args:
+        file_path: Fichier de destination
+        text: Contenu
+        committer: Politique de durabilité (aucun fsync si None)
+    """
+    atomic_write_bytes(file_path, text.encode('utf-8'), committer)
+
+
+def atomic_write_bytes(file_path: Path, data: bytes, committer: GroupCommitter = None):
+    """
+    Écrit un fichier binaire via un fichier temporaire + rename
+    
+    Le fichier temporaire est toujours synchronisé avant le rename (sauf politique
+    "none"): le rename ne peut pas publier un contenu encore absent du disque.
+    Seul le fsync du dossier, qui rend le rename durable, suit la politique.
+    
+    Args:
+        file_path: Fichier de destination
+        data: Contenu
+        committer: Politique de durabilité (None: fichier synchronisé, pas le dossier)
+    """
+    file_path = Path(file_path)
+    tmp_path = file_path.with_name(f".{file_path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        if committer is None or committer.policy != "none":
+            f.flush()
+            os.fsync(f.fileno())
+            if committer is not None:
+                committer.fsyncs += 1
+    os.replace(tmp_path, file_path)
+    
+    if committer is not None:
+        committer.record_renames([file_path])
\ No newline at end of file
@@ -3,29 +3,452 @@ Gestion des fichiers de données Reddit
 Fichier: mcp_servers/reddit_server/storage/file_manager.py
 """
 
-import json
+import os
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from pathlib import Path
 from storage.index_manager import IndexManager
+from storage.segment_store import SegmentStore
+from storage.record_cache import RecordCache
+from storage.durability import GroupCommitter, atomic_write_text
+from storage.content_hash import NEW, UPDATED, UNCHANGED, content_hash, count_statuses
+from storage.bloom_filter import ScalableBloomFilter
+from storage.access_stats import ACCESS_FIELDS, AccessTracker
+from storage.text_index import TextIndex
+from storage.vector_index import NUMPY_AVAILABLE, VectorIndex
+from storage.threads import BRANCH_ORDERS, ThreadStore, nest_comments
+from storage.rollups import RollupStats
+from storage.cursors import CursorStore
+from storage.partitioning import (
+    DateLike, day_partition, in_period, iter_partitions, normalize_day,
+    partition_dir, subreddit_partition
+)
+from utils.serializer import JSONSerializer
+
+# Layout cible de relocate() pour archiver des enregistrements (segments compressés)
+ARCHIVE_LAYOUT = "archive"
 
 
 class FileManager:
     """Gestionnaire des fichiers de stockage"""
     
-    def __init__(self, config, index_manager: IndexManager):
+    def __init__(self, config, index_manager: IndexManager, committer: GroupCommitter = None):
         self.config = config
         self.index = index_manager
+        self.committer = committer or GroupCommitter.from_config(config)
+        
+        # Sérialisation des fichiers: compacte sauf si JSON_PRETTY_STORAGE
+        self.serializer = JSONSerializer(config.JSON_BACKEND, pretty=config.JSON_PRETTY_STORAGE)
+        
+        # Posts et commentaires: un fichier par ID ("files"), un fichier par ID dans
+        # {subreddit}/{yyyy-mm-dd}/ ("partitioned") ou segments JSONL ("segments").
+        # Le SegmentStore est toujours créé pour relire les entrées déjà en segments.
+        self.layout = config.STORAGE_LAYOUT
+        self.segments = SegmentStore(
+            config.SEGMENTS_DIR,
+            max_segment_bytes=config.SEGMENT_MAX_BYTES,
+            compression=config.SEGMENT_COMPRESSION,
+            json_backend=config.JSON_BACKEND
+        )
+        # Archives: données froides compactées par la rétention en segments compressés
+        self.archives = SegmentStore(
+            config.ARCHIVES_DIR,
+            max_segment_bytes=config.SEGMENT_MAX_BYTES,
+            compression=config.ARCHIVE_COMPRESSION,
+            json_backend=config.JSON_BACKEND
+        )
+        
+        # Cache des lectures (get_post, get_comment, get_user_data)
+        self.cache = RecordCache(
+            max_entries=config.CACHE_MAX_ENTRIES,
+            max_bytes=config.CACHE_MAX_BYTES
+        )
+        
+        # Filtre de Bloom des IDs déjà stockés (posts, commentaires, utilisateurs)
+        self.known_ids = self._load_known_ids()
+        
+        # Lectures comptées pour l'éviction (uniquement avec un budget disque)
+        self.track_access = config.DISK_BUDGET_BYTES > 0
+        self.access = AccessTracker()
+        # Demande de récupération des enregistrements évincés: fonction(type, id), non bloquante
+        self.refetch_request: Optional[Callable[[str, str], None]] = None
+        self.refetch_requests = 0
+        
+        # Index plein texte (BM25) mis à jour à chaque écriture de posts et commentaires
+        self.text_index = None
+        if config.TEXT_INDEX_ENABLED:
+            self.text_index = TextIndex(
+                config.TEXT_INDEX_FILE,
+                k1=config.TEXT_INDEX_BM25_K1,
+                b=config.TEXT_INDEX_BM25_B,
+                synchronous="FULL" if self.committer.sync_each_write else "NORMAL"
+            )
+        # Index vectoriel des posts (find_similar_posts), mis à jour au même moment
+        self.vector_index = None
+        if config.VECTOR_INDEX_ENABLED and not NUMPY_AVAILABLE:
+            print("  Index vectoriel désactivé: le paquet 'numpy' n'est pas installé (pip install numpy)")
+        elif config.VECTOR_INDEX_ENABLED:
+            self.vector_index = VectorIndex(
+                config.VECTOR_INDEX_FILE,
+                dim=config.VECTOR_DIM,
+                nprobe=config.VECTOR_NPROBE,
+                train_min=config.VECTOR_TRAIN_MIN_POSTS,
+                synchronous="FULL" if self.committer.sync_each_write else "NORMAL"
+            )
+        # Agrégats par subreddit et par jour (reddit://stats), mis à jour au même moment
+        self.rollups = None
+        if config.ROLLUPS_ENABLED:
+            self.rollups = RollupStats(
+                config.ROLLUPS_FILE,
+                relative_accuracy=config.ROLLUPS_RELATIVE_ACCURACY,
+                synchronous="FULL" if self.committer.sync_each_write else "NORMAL"
+            )
+        # Fils de discussion: un document arborescent par post, réécrit avec ses commentaires
+        self.threads = ThreadStore(config.THREADS_DIR, config.JSON_BACKEND, self.committer, self.cache)
+        # Curseurs de collecte incrémentale (plus récent post vu par subreddit et tri)
+        self.cursors = CursorStore(config.CURSORS_FILE, config.JSON_BACKEND, self.committer)
+    
+    @staticmethod
+    def _known_key(kind: str, item_id: str) -> str:
+        """Clé d'un ID dans le filtre ("posts:abc123")"""
+        return f"{kind}:{item_id}"
+    
+    def _load_known_ids(self) -> ScalableBloomFilter:
+        """
+        Charge le filtre des IDs connus, ou le reconstruit depuis l'index.
+        Le fichier est supprimé dès le chargement et réécrit par close():
+        après un arrêt brutal, il est absent et le filtre est reconstruit.
+        """
+        bloom_file = self.config.BLOOM_FILE
+        try:
+            known_ids = ScalableBloomFilter.load(
+                bloom_file, self.config.BLOOM_INITIAL_CAPACITY, self.config.BLOOM_ERROR_RATE
+            )
+            bloom_file.unlink()
+            return known_ids
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            print(f"  {e}: reconstruction depuis l'index")
+        
+        self.rebuild_known_ids()
+        return self.known_ids
+    
+    def rebuild_known_ids(self) -> Dict:
+        """
+        Reconstruit le filtre des IDs connus à partir de l'index
+        
+        Returns:
+            Statistiques du filtre reconstruit
+        """
+        known_ids = ScalableBloomFilter(
+            self.config.BLOOM_INITIAL_CAPACITY, self.config.BLOOM_ERROR_RATE
+        )
+        for kind in ("posts", "comments", "users"):
+            known_ids.update(self._known_key(kind, item_id) for item_id in self.index.iter_ids(kind))
+        self.known_ids = known_ids
+        return known_ids.get_stats()
+    
+    def may_be_known(self, kind: str, item_id: str) -> bool:
+        """Test rapide en mémoire: False signifie que l'ID n'a jamais été stocké"""
+        return self._known_key(kind, item_id) in self.known_ids
+    
+    def filter_known(self, kind: str, ids: Iterable[str]) -> Set[str]:
+        """
+        Retourne les IDs déjà stockés parmi ids
+        
+        Le filtre de Bloom écarte sans accès à l'index les IDs jamais vus;
+        seuls les candidats positifs sont confirmés dans l'index, ce qui
+        élimine les faux positifs.
+        
+        Args:
+            kind: "posts", "comments" ou "users"
+            ids: IDs (ou noms d'utilisateur) à tester
+        """
+        candidates = [item_id for item_id in ids if self.may_be_known(kind, item_id)]
+        if not candidates:
+            return set()
+        if kind == "users":
+            return {username for username in candidates if self.index.get_user(username)}
+        return set(self.index.get_entries(kind, candidates))
+    
+    def close(self):
+        """Reporte les lectures en attente et écrit le filtre des IDs connus sur le disque"""
+        self.flush_access_stats()
+        self.known_ids.save(self.config.BLOOM_FILE, self.committer)
+        self.committer.commit()
+        if self.text_index is not None:
+            self.text_index.close()
+        if self.vector_index is not None:
+            self.vector_index.close()
+        if self.rollups is not None:
+            self.rollups.close()
     
     def _write_json(self, file_path: Path, data: Dict):
-        """Écrit des données JSON dans un fichier"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """Écrit des données JSON dans un fichier (temporaire + rename)"""
+        atomic_write_text(file_path, self.serializer.dumps(data), self.committer)
     
     def _read_json(self, file_path: Path) -> Dict:
         """Lit des données JSON depuis un fichier"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            return self.serializer.loads(f.read())
+    
+    def _segment_store(self, segment: str) -> SegmentStore:
+        """SegmentStore (segments ou archives) qui a écrit un segment"""
+        if Path(segment).parent.parent == self.archives.root:
+            return self.archives
+        return self.segments
+    
+    def _read_entry(self, info: Dict) -> Dict:
+        """Lit un enregistrement à partir de son entrée d'index (fichier, segment ou archive)"""
+        if "offset" in info:
+            return self._segment_store(info["file"]).read(info["file"], info["offset"], info["length"])
+        return self._read_json(Path(info["file"]))
+    
+    def _read_cached(self, kind: str, key: str, info: Dict) -> Dict:
+        """
+        Lit un enregistrement via le cache LRU.
+        La version est l'emplacement dans le segment (immuable) ou le
+        couple mtime/taille du fichier, pour détecter les modifications externes.
+        """
+        if "offset" in info:
+            version = (info["file"], info["offset"], info["length"])
+            size = info["length"]
+        else:
+            stat = os.stat(info["file"])
+            version = (info["file"], stat.st_mtime_ns, stat.st_size)
+            size = stat.st_size
+        
+        data = self.cache.get((kind, key), version)
+        if data is None:
+            data = self._read_entry(info)
+            self.cache.put((kind, key), version, data, size)
+        return data
+    
+    def records_dir(self, kind: str) -> Path:
+        """Dossier des fichiers individuels d'un type"""
+        return self.config.POSTS_DIR if kind == "posts" else self.config.COMMENTS_DIR
+    
+    def _subreddits_of(self, kind: str, records: List[Dict]) -> List[str]:
+        """
+        Subreddit de chaque enregistrement. Les commentaires n'en ont pas:
+        c'est celui de leur post (cherché dans l'index en une requête).
+        """
+        if kind == "posts":
+            return [record.get("subreddit") for record in records]
+        posts = self.index.get_entries("posts", list({record.get("post_id") for record in records}))
+        return [
+            record.get("subreddit") or posts.get(record.get("post_id"), {}).get("subreddit")
+            for record in records
+        ]
+    
+    def _record_paths(self, kind: str, records: List[Dict], layout: str) -> List[Path]:
+        """Fichier de chaque enregistrement (layouts "files" et "partitioned")"""
+        records_dir = self.records_dir(kind)
+        if layout == "partitioned":
+            return [
+                partition_dir(records_dir, subreddit, record) / f"{record['id']}.json"
+                for record, subreddit in zip(records, self._subreddits_of(kind, records))
+            ]
+        return [records_dir / f"{record['id']}.json" for record in records]
+    
+    def _write_records(self, kind: str, records: List[Dict], layout: str = None) -> List[Dict]:
+        """
+        Écrit un lot d'enregistrements selon le layout configuré (ou celui demandé,
+        ARCHIVE_LAYOUT pour les archives compressées)
+        
+        Returns:
+            Emplacements {"file"} (+ "offset", "length" en segments), dans l'ordre des enregistrements
+        """
+        if not records:
+            return []
+        layout = layout or self.layout
+        if layout in (ARCHIVE_LAYOUT, "segments"):
+            store = self.archives if layout == ARCHIVE_LAYOUT else self.segments
+            locations = store.append_many(kind, records)
+            self.committer.record({location["file"] for location in locations}, records=len(records))
+            return locations
+        
+        locations = []
+        created_dirs = set()
+        for record, file_path in zip(records, self._record_paths(kind, records, layout)):
+            if file_path.parent not in created_dirs:
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(file_path.parent)
+            self._write_json(file_path, record)
+            locations.append({"file": str(file_path)})
+        return locations
+    
+    def relocate(self, kind: str, ids: List[str], layout: str = None) -> Dict:
+        """
+        Réécrit des posts ou commentaires déjà stockés dans un autre layout
+        (migration vers les partitions, compaction en segments). Les métadonnées
+        d'index (hash, date de stockage) sont conservées. Les nouveaux fichiers
+        sont synchronisés avant la mise à jour de l'index; les anciens fichiers
+        individuels ne sont supprimés qu'après.
+        
+        Args:
+            kind: "posts" ou "comments"
+            ids: IDs à déplacer
+            layout: Layout cible (layout configuré si None, ARCHIVE_LAYOUT pour archiver)
+        
+        Returns:
+            {"moved": nombre déplacé, "skipped": déjà à leur place, introuvables ou illisibles}
+        """
+        layout = layout or self.layout
+        requested = list(dict.fromkeys(ids))
+        entries = self.index.get_entries(kind, requested)
+        ids = []
+        records = []
+        for item_id in requested:
+            if item_id not in entries or entries[item_id].get("evicted"):
+                continue
+            try:
+                records.append(self._read_entry(entries[item_id]))
+                ids.append(item_id)
+            except (OSError, ValueError) as e:
+                # Entrée orpheline (fichier supprimé à la main): laissée telle quelle
+                print(f"  Lecture impossible de {kind}/{item_id}: {e}")
+        
+        # Déjà à leur place (même fichier cible): rien à faire
+        if layout not in (ARCHIVE_LAYOUT, "segments") and records:
+            targets = self._record_paths(kind, records, layout)
+            keep = [
+                i for i, target in enumerate(targets)
+                if "offset" in entries[ids[i]] or entries[ids[i]]["file"] != str(target)
+            ]
+            ids = [ids[i] for i in keep]
+            records = [records[i] for i in keep]
+        
+        locations = self._write_records(kind, records, layout)
+        self.committer.commit()
+        
+        moved = []
+        for item_id, location in zip(ids, locations):
+            entry = {k: v for k, v in entries[item_id].items() if k not in ("offset", "length")}
+            moved.append({**entry, "id": item_id, **location})
+        if kind == "posts":
+            self.index.add_posts(moved)
+        else:
+            self.index.add_comments(moved)
+        
+        for item_id, location in zip(ids, locations):
+            self.cache.invalidate((kind, item_id))
+            old = entries[item_id]
+            if "offset" not in old and old["file"] != location["file"]:
+                Path(old["file"]).unlink(missing_ok=True)
+        
+        return {"moved": len(moved), "skipped": len(requested) - len(moved)}
+    
+    def delete_records(self, kind: str, ids: List[str]) -> int:
+        """
+        Supprime des posts, commentaires ou utilisateurs (index puis fichiers).
+        Les enregistrements en segments ne sont retirés que de l'index: un
+        segment sans entrée référencée est supprimé par la rétention. Le filtre
+        des IDs connus n'est pas modifié (ses faux positifs sont confirmés par l'index).
+        
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        if kind == "users":
+            entries = {username: self.index.get_user(username) for username in ids}
+            entries = {username: info for username, info in entries.items() if info}
+        else:
+            entries = self.index.get_entries(kind, ids)
+        if not entries:
+            return 0
+        
+        self.index.remove(kind, list(entries))
+        if self.text_index is not None and kind != "users":
+            self.text_index.remove(kind, list(entries))
+        if self.vector_index is not None and kind == "posts":
+            self.vector_index.remove(list(entries))
+        if self.rollups is not None and kind != "users":
+            self.rollups.remove(kind, list(entries))
+        if kind == "posts":
+            for post_id in entries:
+                self.threads.delete(post_id)
+        elif kind == "comments":
+            self._drop_from_threads(entries)
+        for item_id, info in entries.items():
+            self.cache.invalidate((kind, item_id))
+            if "offset" not in info:
+                Path(info["file"]).unlink(missing_ok=True)
+        return len(entries)
+    
+    def evict(self, kind: str, ids: List[str]) -> int:
+        """
+        Supprime le fichier de posts ou commentaires en gardant leur entrée
+        d'index (marquée "evicted"): ils restent connus et leur lecture par
+        get_post / get_comment demande leur récupération (voir Refetcher).
+        Les enregistrements en segments ne sont pas évinçables individuellement.
+        
+        Returns:
+            Nombre d'octets libérés
+        """
+        entries = self.index.get_entries(kind, ids)
+        evicted = []
+        freed = 0
+        for item_id, info in entries.items():
+            if "offset" in info or info.get("evicted"):
+                continue
+            try:
+                freed += os.stat(info["file"]).st_size
+                os.unlink(info["file"])
+            except FileNotFoundError:
+                pass
+            self.cache.invalidate((kind, item_id))
+            evicted.append(item_id)
+        self.index.mark_evicted(kind, evicted)
+        return freed
+    
+    def set_refetcher(self, request: Callable[[str, str], None]):
+        """
+        Déclare la fonction qui demande la récupération d'un enregistrement évincé
+        
+        Args:
+            request: Fonction (type, id) non bloquante (Refetcher.request):
+                     la lecture n'attend pas la récupération
+        """
+        self.refetch_request = request
+    
+    def _refetch(self, kind: str, item_id: str) -> Optional[Dict]:
+        """Demande la récupération d'un enregistrement évincé (aucun appel réseau ici)"""
+        self.refetch_requests += 1
+        if self.refetch_request is not None:
+            self.refetch_request(kind, item_id)
+        return None
+    
+    def flush_access_stats(self):
+        """Reporte dans l'index les lectures comptées depuis le dernier report"""
+        for kind, accesses in self.access.drain().items():
+            self.index.record_accesses(kind, accesses)
+    
+    def delete_searches(self, searches: List[Dict]) -> int:
+        """Supprime des recherches (entrées de get_recent_searches / searches_before)"""
+        if not searches:
+            return 0
+        self.index.remove("searches", [search["search_id"] for search in searches])
+        for search in searches:
+            Path(search["file"]).unlink(missing_ok=True)
+        return len(searches)
+    
+    def update_search_indexes(self, kind: str, records: List[Dict]):
+        """
+        Met à jour l'index plein texte, l'index vectoriel (posts) et les agrégats
+        avec les enregistrements écrits
+        """
+        if not records:
+            return
+        subreddits = None
+        if self.text_index is not None or self.rollups is not None:
+            subreddits = self._subreddits_of(kind, records)
+        if self.text_index is not None:
+            self.text_index.add(kind, records, subreddits)
+        if self.vector_index is not None and kind == "posts":
+            self.vector_index.add(records)
+        if self.rollups is not None:
+            self.rollups.add(kind, records, subreddits)
     
     def save_post(self, post_data: Dict) -> str:
         """
@@ -37,13 +460,100 @@ class FileManager:
         Returns:
             Chemin du fichier créé
         """
-        post_id = post_data["id"]
-        file_path = self.config.POSTS_DIR / f"{post_id}.json"
+        return self.save_posts([post_data])["paths"][0]
+    
+    def _detect_changes(self, kind: str, records: List[Dict]) -> Tuple[List[str], List[str], Dict[str, Dict]]:
+        """
+        Compare le hash de chaque enregistrement à celui enregistré dans l'index
         
-        self._write_json(file_path, post_data)
-        self.index.add_post(post_id, str(file_path), post_data.get("subreddit"))
+        Returns:
+            (hashes, statuts "new"/"updated"/"unchanged", entrées d'index existantes)
+        """
+        # Les IDs absents du filtre de Bloom sont nouveaux: seuls les autres sont cherchés dans l'index
+        existing = self.index.get_entries(
+            kind, [record["id"] for record in records if self.may_be_known(kind, record["id"])]
+        )
+        known = {record_id: entry.get("content_hash") for record_id, entry in existing.items()}
+        # Une entrée évincée n'a plus de fichier: elle est réécrite même inchangée
+        evicted = {record_id for record_id, entry in existing.items() if entry.get("evicted")}
         
-        return str(file_path)
+        hashes = []
+        statuses = []
+        for record in records:
+            digest = content_hash(record)
+            if record["id"] not in known:
+                statuses.append(NEW)
+            elif known[record["id"]] == digest and record["id"] not in evicted:
+                statuses.append(UNCHANGED)
+            else:
+                # Hash différent, ou entrée antérieure au hash: réécrite une fois
+                statuses.append(UPDATED)
+            known[record["id"]] = digest
+            evicted.discard(record["id"])
+            hashes.append(digest)
+        return hashes, statuses, existing
+    
+    @staticmethod
+    def _access_fields(entry: Optional[Dict]) -> Dict:
+        """Statistiques d'accès d'une entrée existante, conservées quand elle est réécrite"""
+        if not entry:
+            return {}
+        return {field: entry[field] for field in ACCESS_FIELDS if field in entry}
+    
+    @staticmethod
+    def _save_result(records: List[Dict], statuses: List[str], changed: List[int],
+                     locations: List[Dict], existing: Dict[str, Dict]) -> Dict:
+        """Résultat d'une sauvegarde groupée: chemins, statuts et compteurs"""
+        written = dict(zip(changed, (location["file"] for location in locations)))
+        written_by_id = {records[i]["id"]: path for i, path in written.items()}
+        paths = [
+            written.get(i) or written_by_id.get(record["id"]) or existing[record["id"]]["file"]
+            for i, record in enumerate(records)
+        ]
+        return {
+            "paths": paths,
+            "statuses": statuses,
+            "count": len(paths),
+            **count_statuses(statuses)
+        }
+    
+    def save_posts(self, posts: List[Dict]) -> Dict:
+        """
+        Sauvegarde un lot de posts avec une seule mise à jour de l'index.
+        Les posts dont le contenu n'a pas changé (hors retrieved_at) ne sont
+        ni réécrits ni réindexés.
+        
+        Args:
+            posts: Liste des posts
+            
+        Returns:
+            {"paths": fichier ou segment de chaque post (dans l'ordre),
+             "statuses": "new"/"updated"/"unchanged" de chaque post,
+             "count", "new", "updated", "unchanged"}
+        """
+        hashes, statuses, existing = self._detect_changes("posts", posts)
+        changed = [i for i, status in enumerate(statuses) if status != UNCHANGED]
+        
+        locations = self._write_records("posts", [posts[i] for i in changed])
+        for i in changed:
+            self.cache.invalidate(("posts", posts[i]["id"]))
+        entries = [
+            {
+                "id": posts[i]["id"],
+                "subreddit": posts[i].get("subreddit"),
+                "author": posts[i].get("author"),
+                "content_hash": hashes[i],
+                **self._access_fields(existing.get(posts[i]["id"])),
+                **location
+            }
+            for i, location in zip(changed, locations)
+        ]
+        
+        self.index.add_posts(entries)
+        self.known_ids.update(self._known_key("posts", entry["id"]) for entry in entries)
+        self.update_search_indexes("posts", [posts[i] for i in changed])
+        
+        return self._save_result(posts, statuses, changed, locations, existing)
     
     def save_comment(self, comment_data: Dict) -> str:
         """
@@ -55,13 +565,145 @@ class FileManager:
         Returns:
             Chemin du fichier créé
         """
-        comment_id = comment_data["id"]
-        file_path = self.config.COMMENTS_DIR / f"{comment_id}.json"
+        return self.save_comments([comment_data])["paths"][0]
+    
+    def save_comments(self, comments: List[Dict]) -> Dict:
+        """
+        Sauvegarde un lot de commentaires avec une seule mise à jour de l'index.
+        Les commentaires inchangés (hors retrieved_at) ne sont ni réécrits ni réindexés.
         
-        self._write_json(file_path, comment_data)
-        self.index.add_comment(comment_id, str(file_path), comment_data.get("post_id"))
+        Args:
+            comments: Liste des commentaires
+            
+        Returns:
+            {"paths": fichier ou segment de chaque commentaire (dans l'ordre),
+             "statuses": "new"/"updated"/"unchanged" de chaque commentaire,
+             "count", "new", "updated", "unchanged"}
+        """
+        hashes, statuses, existing = self._detect_changes("comments", comments)
+        changed = [i for i, status in enumerate(statuses) if status != UNCHANGED]
         
-        return str(file_path)
+        locations = self._write_records("comments", [comments[i] for i in changed])
+        for i in changed:
+            self.cache.invalidate(("comments", comments[i]["id"]))
+        entries = [
+            {
+                "id": comments[i]["id"],
+                "post_id": comments[i].get("post_id"),
+                "author": comments[i].get("author"),
+                "content_hash": hashes[i],
+                **self._access_fields(existing.get(comments[i]["id"])),
+                **location
+            }
+            for i, location in zip(changed, locations)
+        ]
+        
+        self.index.add_comments(entries)
+        self.known_ids.update(self._known_key("comments", entry["id"]) for entry in entries)
+        self.update_search_indexes("comments", [comments[i] for i in changed])
+        self._update_threads([comments[i] for i in changed])
+        
+        return self._save_result(comments, statuses, changed, locations, existing)
+    
+    def save_post_comments(self, post: Dict, comments: List[Dict]) -> Dict:
+        """
+        Sauvegarde un post et ses commentaires en une seule étape du thread
+        d'écriture, puis résume son document de fil (l'appelant n'a aucune
+        lecture disque à faire)
+        
+        Args:
+            post: Données du post
+            comments: Commentaires du post
+        
+        Returns:
+            {"post": résultat de save_posts, "comments": résultat de save_comments,
+             "thread": {"comments", "branches", "max_depth"} ou None si le post n'a pas de fil}
+        """
+        saved_post = self.save_posts([post])
+        saved_comments = self.save_comments(comments)
+        return {
+            "post": saved_post,
+            "comments": saved_comments,
+            "thread": self.thread_summary(post["id"])
+        }
+    
+    def thread_summary(self, post_id: str) -> Optional[Dict]:
+        """
+        Résumé du document de fil d'un post (en-tête seul)
+        
+        Returns:
+            {"comments", "branches", "max_depth"}, None si le post n'a pas de fil
+        """
+        structure = self.threads.read_structure(post_id)
+        if structure is None:
+            return None
+        return {
+            "comments": structure["count"],
+            "branches": len(structure["roots"]),
+            "max_depth": max(structure["depth"], default=0)
+        }
+    
+    def _update_threads(self, comments: List[Dict]):
+        """
+        Réécrit le document de fil des posts des commentaires écrits. Un fil
+        existant est fusionné avec les nouvelles versions; un fil encore absent
+        est construit à partir de tous les commentaires stockés du post.
+        """
+        by_post = {}
+        for comment in comments:
+            if comment.get("post_id"):
+                by_post.setdefault(comment["post_id"], {})[comment["id"]] = comment
+        for post_id, changed in by_post.items():
+            if self.threads.exists(post_id):
+                base = self.threads.read_all(post_id)
+            else:
+                base = self._stored_comments_of(post_id)
+            merged = {comment["id"]: comment for comment in base}
+            merged.update(changed)
+            self.threads.write(post_id, list(merged.values()))
+    
+    def _stored_comments_of(self, post_id: str) -> List[Dict]:
+        """Commentaires stockés d'un post, lus un par un (hors évincés et illisibles)"""
+        comments = []
+        for info in self.index.comments_for_post(post_id):
+            if info.get("evicted"):
+                continue
+            try:
+                comments.append(self._read_entry(info))
+            except (OSError, ValueError):
+                continue
+        return comments
+    
+    def _drop_from_threads(self, entries: Dict[str, Dict]):
+        """Retire des commentaires supprimés du document de fil de leur post"""
+        removed_by_post = {}
+        for comment_id, info in entries.items():
+            if info.get("post_id"):
+                removed_by_post.setdefault(info["post_id"], set()).add(comment_id)
+        for post_id, removed in removed_by_post.items():
+            if not self.threads.exists(post_id):
+                continue
+            remaining = [comment for comment in self.threads.read_all(post_id) if comment["id"] not in removed]
+            if remaining:
+                self.threads.write(post_id, remaining)
+            else:
+                self.threads.delete(post_id)
+    
+    def ensure_thread(self, post_id: str) -> bool:
+        """
+        Construit le document de fil d'un post dont les commentaires ont été
+        stockés avant les documents de fil (à appeler depuis le thread d'écriture)
+        
+        Returns:
+            True si le post a (désormais) un document de fil
+        """
+        if self.threads.exists(post_id):
+            return True
+        comments = self._stored_comments_of(post_id)
+        if not comments:
+            return False
+        self.threads.write(post_id, comments)
+        return True
     
     def save_user_data(self, username: str, user_data: Dict) -> str:
         """
@@ -77,10 +719,92 @@ class FileManager:
         file_path = self.config.USERS_DIR / f"{username}_complete.json"
         
         self._write_json(file_path, user_data)
+        self.cache.invalidate(("users", username))
         self.index.add_user(username, str(file_path))
+        self.known_ids.add(self._known_key("users", username))
         
         return str(file_path)
     
+    @staticmethod
+    def _post_refs(posts: List[Dict]) -> List[Dict]:
+        """Références ordonnées vers des posts stockés, avec leurs métriques de classement"""
+        return [
+            {
+                "id": post["id"],
+                "rank": rank,
+                "score": post.get("score"),
+                "num_comments": post.get("num_comments"),
+                "upvote_ratio": post.get("upvote_ratio")
+            }
+            for rank, post in enumerate(posts, start=1)
+        ]
+    
+    def _materialize(self, refs: List[Dict]) -> Dict:
+        """
+        Reconstruit les posts d'une liste de références depuis le stockage des posts
+        
+        Returns:
+            {"posts": posts trouvés (dans l'ordre, avec "rank"), "missing": IDs introuvables}
+        """
+        posts = []
+        missing = []
+        for ref in refs:
+            post = self.get_post(ref["id"])
+            if post is None:
+                missing.append(ref["id"])
+                continue
+            posts.append({**post, "rank": ref["rank"]})
+        return {"posts": posts, "missing": missing}
+    
+    def load_subreddit_collection(self, file_path: str) -> Dict:
+        """
+        Relit une collection de subreddit en matérialisant ses posts
+        
+        Args:
+            file_path: Fichier retourné par save_subreddit_collection
+            
+        Returns:
+            Collection avec la liste "posts" (format historique avec posts intégrés accepté)
+        """
+        collection = self._read_json(Path(file_path))
+        if "post_refs" in collection:
+            collection.update(self._materialize(collection["post_refs"]))
+        return collection
+    
+    def load_search_results(self, file_path: str) -> Dict:
+        """
+        Relit une recherche en matérialisant ses résultats
+        
+        Args:
+            file_path: Fichier retourné par save_search_results
+            
+        Returns:
+            Recherche avec la liste "results" (format historique avec posts intégrés accepté)
+        """
+        search = self._read_json(Path(file_path))
+        if "result_refs" in search:
+            materialized = self._materialize(search["result_refs"])
+            search["results"] = materialized["posts"]
+            search["missing"] = materialized["missing"]
+        return search
+    
+    def save_cursor(self, subreddit: str, sort: str, posts: List[Dict], complete: bool = True) -> Optional[Dict]:
+        """
+        Avance le curseur de collecte incrémentale d'un subreddit, ou enregistre
+        son point de reprise si la collecte est incomplète
+        (déposé après les posts: le curseur ne dépasse jamais les posts écrits)
+        
+        Args:
+            subreddit: Nom du subreddit
+            sort: Tri du listing
+            posts: Posts collectés
+            complete: Curseur (ou fin du listing) atteint
+            
+        Returns:
+            Curseur à jour
+        """
+        return self.cursors.advance(subreddit, sort, posts, complete)
+    
     def save_subreddit_collection(self, subreddit: str, posts: List[Dict]) -> str:
         """
         Sauvegarde une collection de posts d'un subreddit
@@ -95,11 +819,13 @@ class FileManager:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         file_path = self.config.SUBREDDITS_DIR / f"{subreddit}_collection_{timestamp}.json"
         
+        # Les posts sont déjà stockés par save_posts: la collection ne garde que
+        # leurs IDs dans l'ordre, avec les métriques au moment de la collecte
         collection_data = {
             "subreddit": subreddit,
             "collected_at": datetime.now().isoformat(),
             "count": len(posts),
-            "posts": posts
+            "post_refs": self._post_refs(posts)
         }
         
         self._write_json(file_path, collection_data)
@@ -127,7 +853,7 @@ class FileManager:
             "query": query,
             "retrieved_at": datetime.now().isoformat(),
             "count": len(results),
-            "results": results
+            "result_refs": self._post_refs(results)
         }
         
         self._write_json(file_path, search_data)
@@ -136,15 +862,268 @@ class FileManager:
         return str(file_path)
     
     def get_post(self, post_id: str) -> Dict:
-        """Récupère un post par son ID"""
+        """Récupère un post par son ID (None s'il a été évincé: sa récupération est demandée)"""
         post_info = self.index.get_post(post_id)
         if post_info:
-            return self._read_json(Path(post_info["file"]))
+            return self._read_record("posts", post_id, post_info)
         return None
     
+    def get_comment(self, comment_id: str) -> Dict:
+        """Récupère un commentaire par son ID (None s'il a été évincé: sa récupération est demandée)"""
+        comment_info = self.index.get_comment(comment_id)
+        if comment_info:
+            return self._read_record("comments", comment_id, comment_info)
+        return None
+    
+    def _read_record(self, kind: str, item_id: str, info: Dict) -> Optional[Dict]:
+        """Lecture d'un post ou commentaire indexé, comptée pour l'éviction"""
+        if info.get("evicted"):
+            return self._refetch(kind, item_id)
+        if self.track_access:
+            self.access.touch(kind, item_id)
+        return self._read_cached(kind, item_id, info)
+    
+    def search_corpus(self, query: str, kinds: Iterable[str] = ("posts", "comments"),
+                      subreddit: str = None, since: DateLike = None, until: DateLike = None,
+                      limit: int = 10, match: str = "all") -> Dict:
+        """
+        Recherche BM25 dans les posts et commentaires stockés (index plein texte).
+        Chaque résultat porte son enregistrement ("record"), ou None s'il a été
+        évincé: une recherche locale ne déclenche aucun appel à l'API.
+        
+        Returns:
+            Résultat de TextIndex.search
+        """
+        if self.text_index is None:
+            raise ValueError("Index plein texte désactivé (REDDIT_TEXT_INDEX_ENABLED=false)")
+        result = self.text_index.search(query, kinds, subreddit, since, until, limit, match)
+        self._attach_records(result["hits"])
+        return result
+    
+    def find_similar_posts(self, post_id: str = None, text: str = None, k: int = 10) -> Dict:
+        """
+        Posts stockés les plus proches d'un post (par son ID) ou d'un texte libre
+        (index vectoriel, recherche approchée). Comme search_corpus, chaque
+        résultat porte son enregistrement ou None s'il a été évincé.
+        
+        Returns:
+            {"hits": [{"kind", "id", "score", "record"}], "candidates": vecteurs comparés, "took_ms"}
+        """
+        if self.vector_index is None:
+            raise ValueError("Index vectoriel désactivé (REDDIT_VECTOR_INDEX_ENABLED=false)")
+        if post_id is not None:
+            # Post absent de l'index vectoriel (sans texte, ou stocké avant l'index): vecteur calculé à la volée
+            result = self.vector_index.similar_to_post(post_id, k)
+            if result is None:
+                record = self.get_post(post_id)
+                if record is None and self.index.get_post(post_id):
+                    raise ValueError(f"Post évincé du stockage local: {post_id} (récupération demandée, réessayez)")
+                if record is None:
+                    raise ValueError(f"Post inconnu: {post_id}")
+                result = self.vector_index.similar_to_post(post_id, k, record=record)
+        else:
+            result = self.vector_index.similar_to_text(text, k)
+        for hit in result["hits"]:
+            hit["kind"] = "posts"
+        self._attach_records(result["hits"])
+        return result
+    
+    def _attach_records(self, hits: List[Dict]):
+        """
+        Ajoute à chaque résultat de recherche locale son enregistrement ("record"),
+        None s'il a été évincé: aucune récupération depuis l'API
+        """
+        ids_by_kind = {}
+        for hit in hits:
+            ids_by_kind.setdefault(hit["kind"], []).append(hit["id"])
+        entries = {kind: self.index.get_entries(kind, ids) for kind, ids in ids_by_kind.items()}
+        for hit in hits:
+            info = entries[hit["kind"]].get(hit["id"])
+            hit["record"] = None
+            if info is None or info.get("evicted"):
+                continue
+            try:
+                hit["record"] = self._read_cached(hit["kind"], hit["id"], info)
+            except (OSError, ValueError):
+                continue
+            if self.track_access:
+                self.access.touch(hit["kind"], hit["id"])
+    
+    def _read_thread(self, post_id: str, select: Callable[[Dict], List[Tuple[int, int]]]
+                     ) -> Tuple[Dict, List[List[Dict]]]:
+        """Lit des plages du document de fil d'un post (ValueError s'il n'existe pas)"""
+        found = self.threads.read_ranges(post_id, select)
+        if found is None:
+            raise ValueError(f"Aucun fil de commentaires stocké pour le post: {post_id}")
+        return found
+    
+    def get_comment_subtree(self, post_id: str, comment_id: str, max_depth: int = None) -> Dict:
+        """
+        Sous-arbre d'un commentaire (le commentaire et ses réponses imbriquées),
+        lu en une seule plage du document de fil
+        
+        Args:
+            post_id: ID du post
+            comment_id: ID du commentaire racine du sous-arbre
+            max_depth: Profondeur maximale sous le commentaire (None: illimitée)
+        
+        Returns:
+            {"post_id", "comment_id", "total_comments", "subtree_size", "comments_read", "thread"}
+        """
+        def select(structure: Dict) -> List[Tuple[int, int]]:
+            if comment_id not in structure["ids"]:
+                raise ValueError(f"Commentaire inconnu dans le fil {post_id}: {comment_id}")
+            i = structure["ids"].index(comment_id)
+            return [(i, i + structure["subtree_size"][i])]
+        
+        structure, (comments,) = self._read_thread(post_id, select)
+        start = structure["ids"].index(comment_id)
+        return {
+            "post_id": post_id,
+            "comment_id": comment_id,
+            "total_comments": structure["count"],
+            "subtree_size": structure["subtree_size"][start],
+            "comments_read": len(comments),
+            "thread": nest_comments(structure, start, comments, max_depth)[0]
+        }
+    
+    def get_top_branches(self, post_id: str, k: int = 10, by: str = "score", max_depth: int = None) -> Dict:
+        """
+        K meilleures branches d'un fil (commentaires de premier niveau et leurs
+        réponses), par score de la racine ("score") ou par taille ("size").
+        Les racines étant triées par score, les k meilleures par score forment
+        une seule plage; par taille, une plage par branche.
+        
+        Args:
+            post_id: ID du post
+            k: Nombre de branches
+            by: "score" ou "size"
+            max_depth: Profondeur maximale sous chaque racine (None: illimitée)
+        
+        Returns:
+            {"post_id", "by", "total_comments", "total_branches", "comments_read", "branches"}
+        """
+        if by not in BRANCH_ORDERS:
+            raise ValueError(f"Critère de branche invalide: {by}. Options valides: {BRANCH_ORDERS}")
+        chosen = []
+        
+        def select(structure: Dict) -> List[Tuple[int, int]]:
+            sizes = structure["subtree_size"]
+            if by == "size":
+                chosen.extend(sorted(structure["roots"], key=lambda i: -sizes[i])[:k])
+                return [(i, i + sizes[i]) for i in chosen]
+            chosen.extend(structure["roots"][:k])
+            return [(0, chosen[-1] + sizes[chosen[-1]])] if chosen else []
+        
+        structure, ranges = self._read_thread(post_id, select)
+        branches = []
+        starts = chosen if by == "size" else [0]
+        for start, comments in zip(starts, ranges):
+            branches.extend(nest_comments(structure, start, comments, max_depth))
+        return {
+            "post_id": post_id,
+            "by": by,
+            "total_comments": structure["count"],
+            "total_branches": len(structure["roots"]),
+            "comments_read": sum(len(comments) for comments in ranges),
+            "branches": branches
+        }
+    
     def get_user_data(self, username: str) -> Dict:
         """Récupère les données d'un utilisateur"""
         user_info = self.index.get_user(username)
         if user_info:
-            return self._read_json(Path(user_info["file"]))
-        return None
\ No newline at end of file
+            return self._read_cached("users", username, user_info)
+        return None
+    
+    def iter_posts(self, subreddit: str = None, since: DateLike = None,
+                   until: DateLike = None) -> Iterator[Dict]:
+        """
+        Parcourt séquentiellement les posts stockés (version courante de chacun)
+        
+        Args:
+            subreddit: Ne retourne que ce subreddit (tous si None)
+            since: Premier jour de création inclus (yyyy-mm-dd, date ou datetime)
+            until: Dernier jour de création inclus
+        """
+        return self._iter_records("posts", self.index.get_post, subreddit, since, until)
+    
+    def iter_comments(self, subreddit: str = None, since: DateLike = None,
+                      until: DateLike = None) -> Iterator[Dict]:
+        """Parcourt séquentiellement les commentaires stockés (mêmes filtres que iter_posts)"""
+        return self._iter_records("comments", self.index.get_comment, subreddit, since, until)
+    
+    def _record_filter(self, kind: str, subreddit: Optional[str], since: DateLike,
+                       until: DateLike) -> Optional[Callable[[Dict], bool]]:
+        """
+        Filtre par subreddit et jour de création des enregistrements hors
+        partitions (fichiers à plat, segments); None si aucun filtre
+        """
+        if subreddit is None and since is None and until is None:
+            return None
+        since, until = normalize_day(since), normalize_day(until)
+        wanted = subreddit_partition(subreddit) if subreddit is not None else None
+        post_subreddits = {}
+        
+        def record_subreddit(record: Dict) -> Optional[str]:
+            if kind == "posts" or record.get("subreddit"):
+                return record.get("subreddit")
+            post_id = record.get("post_id")
+            if post_id not in post_subreddits:
+                post_info = self.index.get_post(post_id) or {}
+                post_subreddits[post_id] = post_info.get("subreddit")
+            return post_subreddits[post_id]
+        
+        def matches(record: Dict) -> bool:
+            if wanted is not None and subreddit_partition(record_subreddit(record)) != wanted:
+                return False
+            return in_period(day_partition(record), since, until)
+        
+        return matches
+    
+    def _iter_records(self, kind: str, lookup: Callable[[str], Dict], subreddit: str = None,
+                      since: DateLike = None, until: DateLike = None) -> Iterator[Dict]:
+        """
+        Parcourt les fichiers individuels (à plat puis partitionnés), les
+        archives puis les segments d'un type. Seules les partitions du subreddit et de la période
+        demandés sont ouvertes. Un enregistrement n'est retourné que si l'index
+        pointe vers cet emplacement, ce qui écarte les versions remplacées.
+        """
+        records_dir = self.records_dir(kind)
+        matches = self._record_filter(kind, subreddit, since, until)
+        
+        for file_path in sorted(records_dir.glob("*.json")):
+            info = lookup(file_path.stem)
+            if info and info["file"] == str(file_path):
+                record = self._read_json(file_path)
+                if matches is None or matches(record):
+                    yield record
+        
+        for partition in iter_partitions(records_dir, subreddit, since, until):
+            for file_path in sorted(partition.glob("*.json")):
+                info = lookup(file_path.stem)
+                if info and info["file"] == str(file_path):
+                    yield self._read_json(file_path)
+        
+        # Un segment est lu en entier et dédupliqué: la dernière
+        # occurrence d'un ID dans le segment est la plus récente
+        for store in (self.archives, self.segments):
+            segment_records = {}
+            current_segment = None
+            for segment, record in store.scan(kind):
+                if segment != current_segment:
+                    yield from self._current_records(segment_records, current_segment, lookup)
+                    segment_records = {}
+                    current_segment = segment
+                if matches is None or matches(record):
+                    segment_records[record["id"]] = record
+            yield from self._current_records(segment_records, current_segment, lookup)
+    
+    @staticmethod
+    def _current_records(records: Dict[str, Dict], segment: str,
+                         lookup: Callable[[str], Dict]) -> Iterator[Dict]:
+        """Filtre les enregistrements d'un segment encore référencés par l'index"""
+        for record_id, record in records.items():
+            info = lookup(record_id)
+            if info and info["file"] == segment:
+                yield record
\ No newline at end of file
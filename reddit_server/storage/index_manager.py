@@ -1,20 +1,64 @@
 """
 Gestion de l'index des données Reddit
 Fichier: mcp_servers/reddit_server/storage/index_manager.py
+
+L'index est persisté en deux parties:
+- un snapshot (index.json) réécrit uniquement lors des compactions
+- un journal (index.journal) en append-only, une ligne JSON compacte par insertion
+
+Au démarrage, le snapshot est chargé puis le journal est rejoué.
 """
 
 import json
+import os
+import threading
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
+from storage.locking import synchronized
+from storage.durability import GroupCommitter, atomic_write_text
+from storage.access_stats import eviction_key
+from utils.serializer import JSONSerializer
+
+# Champs optionnels des entrées de posts et commentaires: emplacement en segment,
+# hash du contenu, statistiques d'accès et marque d'éviction
+OPTIONAL_FIELDS = ("offset", "length", "content_hash", "last_access", "access_count", "evicted")
 
 
 class IndexManager:
-    """Gestionnaire de l'index centralisé"""
+    """Gestionnaire de l'index centralisé (snapshot + journal)"""
     
-    def __init__(self, index_file: Path):
+    def __init__(self, index_file: Path, compact_min_records: int = 1000,
+                 compact_ratio: float = 0.5, committer: GroupCommitter = None,
+                 json_backend: str = "auto"):
+        """
+        Args:
+            index_file: Chemin du snapshot de l'index
+            compact_min_records: Nombre minimal d'entrées du journal avant compaction
+            compact_ratio: La compaction a lieu quand le journal dépasse
+                           compact_ratio * taille de l'index (coût amorti constant)
+            committer: Politique fsync du journal (aucun fsync si None)
+            json_backend: Backend de sérialisation du snapshot et du journal
+        """
         self.index_file = index_file
+        self.journal_file = index_file.with_suffix(".journal")
+        self.compact_min_records = compact_min_records
+        self.compact_ratio = compact_ratio
+        self.committer = committer
+        self.serializer = JSONSerializer(json_backend)
+        # Le snapshot est toujours synchronisé: le journal est vidé juste après
+        self._snapshot_committer = GroupCommitter("always")
+        
+        self._lock = threading.RLock()
+        self._journal = None
+        self._journal_records = 0
+        self._seq = 0
+        self.compactions = 0
+        
         self.index = self._load_or_create()
+        self._seq = self.index.get("journal_seq", 0)
+        self._replay_journal()
+        self._journal = open(self.journal_file, 'a', encoding='utf-8')
     
     def _load_or_create(self) -> Dict:
         """Charge l'index ou le crée s'il n'existe pas"""
@@ -26,9 +70,18 @@ class IndexManager:
     def _load(self) -> Dict:
         """Charge l'index depuis le fichier"""
         try:
-            with open(self.index_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+            with open(self.index_file, 'rb') as f:
+                return self.serializer.loads(f.read())
+        except FileNotFoundError:
+            return self._create_new()
+        except json.JSONDecodeError:
+            # Conserver le fichier corrompu au lieu de l'écraser, puis repartir
+            # d'un index vide (le journal sera rejoué par-dessus)
+            corrupt_file = self.index_file.with_name(
+                f"{self.index_file.name}.corrupt-{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            )
+            os.replace(self.index_file, corrupt_file)
+            print(f"  Index corrompu déplacé vers {corrupt_file}")
             return self._create_new()
     
     def _create_new(self) -> Dict:
@@ -40,62 +93,224 @@ class IndexManager:
             "subreddits": {},
             "searches": [],
             "created_at": datetime.now().isoformat(),
-            "last_updated": datetime.now().isoformat()
+            "last_updated": datetime.now().isoformat(),
+            "journal_seq": self._seq
         }
         self._save(index)
         return index
     
     def _save(self, index: Dict = None):
-        """Sauvegarde l'index"""
+        """Écrit le snapshot complet de l'index (fichier temporaire + fsync + rename)"""
         if index is None:
             index = self.index
         
-        index["last_updated"] = datetime.now().isoformat()
+        index["journal_seq"] = self._seq
+        
+        atomic_write_text(
+            self.index_file,
+            self.serializer.dumps(index),
+            self._snapshot_committer
+        )
+    
+    def _replay_journal(self):
+        """Rejoue les entrées du journal postérieures au snapshot"""
+        if not self.journal_file.exists():
+            return
+        
+        # Position de la fin de la dernière ligne valide
+        valid_end = 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Dernière ligne tronquée par un arrêt brutal
+                    break
+                try:
+                    record = self.serializer.loads(line)
+                except json.JSONDecodeError:
+                    break
+                valid_end += len(line)
+                self._journal_records += 1
+                if record["seq"] <= self.index.get("journal_seq", 0):
+                    continue
+                self._apply(record)
+                self._seq = record["seq"]
+            size = f.seek(0, os.SEEK_END)
+        
+        if size > valid_end:
+            # Tronquer la fin invalide: les entrées ajoutées ensuite suivraient
+            # une ligne illisible et seraient perdues au prochain rejeu
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(valid_end)
+                f.flush()
+                os.fsync(f.fileno())
+            print(f"  Journal de l'index tronqué: {size - valid_end} octets invalides ignorés")
+    
+    def _apply(self, record: Dict):
+        """Applique une entrée du journal à l'index en mémoire"""
+        op = record["op"]
+        if op == "searches":
+            self.index["searches"].append(record["entry"])
+        elif op == "remove":
+            kind = record["entry"]["kind"]
+            if kind == "searches":
+                self.index["searches"] = [
+                    search for search in self.index["searches"] if search["search_id"] != record["id"]
+                ]
+            else:
+                self.index[kind].pop(record["id"], None)
+        else:
+            self.index[op][record["id"]] = record["entry"]
+        self.index["last_updated"] = record["ts"]
+    
+    def _append(self, op: str, key: Optional[str], entry: Dict):
+        """Ajoute une entrée au journal puis l'applique en mémoire"""
+        self._append_many(op, [(key, entry)])
+    
+    @synchronized
+    def _append_many(self, op: str, items: List[Tuple[Optional[str], Dict]]):
+        """Ajoute un lot d'entrées au journal avec une seule écriture"""
+        if not items:
+            return
+        
+        lines = []
+        timestamp = datetime.now().isoformat()
+        for key, entry in items:
+            self._seq += 1
+            record = {
+                "seq": self._seq,
+                "op": op,
+                "id": key,
+                "entry": entry,
+                "ts": timestamp
+            }
+            lines.append(self.serializer.dumps(record) + "\n")
+            self._apply(record)
         
-        with open(self.index_file, 'w', encoding='utf-8') as f:
-            json.dump(index, f, indent=2, ensure_ascii=False)
+        self._journal.write("".join(lines))
+        self._journal.flush()
+        self._journal_records += len(lines)
+        if self.committer is not None:
+            self.committer.record([self.journal_file], records=len(lines))
+        
+        if self._journal_records >= self._compaction_threshold():
+            self.compact()
+    
+    def _compaction_threshold(self) -> int:
+        """Seuil de compaction proportionnel à la taille de l'index"""
+        size = (len(self.index["posts"]) + len(self.index["comments"]) +
+                len(self.index["users"]) + len(self.index["searches"]))
+        return max(self.compact_min_records, int(size * self.compact_ratio))
+    
+    @synchronized
+    def compact(self):
+        """Intègre le journal dans le snapshot puis vide le journal"""
+        self._save()
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_file, 'w', encoding='utf-8')
+        self._journal_records = 0
+        self.compactions += 1
+    
+    @synchronized
+    def close(self):
+        """Compacte et ferme le journal"""
+        if self._journal is None:
+            return
+        if self._journal_records:
+            self.compact()
+        self._journal.close()
+        self._journal = None
     
-    def add_post(self, post_id: str, file_path: str, subreddit: str):
+    def add_post(self, post_id: str, file_path: str, subreddit: str, author: str = None):
         """Ajoute un post à l'index"""
-        self.index["posts"][post_id] = {
+        self._append("posts", post_id, {
             "file": file_path,
             "subreddit": subreddit,
+            "author": author,
             "stored_at": datetime.now().isoformat()
-        }
-        self._save()
+        })
     
-    def add_comment(self, comment_id: str, file_path: str, post_id: str):
+    def add_comment(self, comment_id: str, file_path: str, post_id: str, author: str = None):
         """Ajoute un commentaire à l'index"""
-        self.index["comments"][comment_id] = {
+        self._append("comments", comment_id, {
             "file": file_path,
             "post_id": post_id,
+            "author": author,
             "stored_at": datetime.now().isoformat()
-        }
-        self._save()
+        })
+    
+    @staticmethod
+    def _optional_fields(entry: Dict) -> Dict:
+        """Extrait les champs optionnels présents (position dans un segment, hash du contenu)"""
+        return {k: entry[k] for k in OPTIONAL_FIELDS if entry.get(k) is not None}
+    
+    def add_posts(self, posts: List[Dict]):
+        """
+        Ajoute un lot de posts à l'index (une seule écriture du journal)
+        
+        Args:
+            posts: Entrées {"id", "file", "subreddit", "author"}
+                   (+ "offset", "length" pour le stockage en segments, "content_hash",
+                   "stored_at" pour conserver la date d'un enregistrement déplacé)
+        """
+        now = datetime.now().isoformat()
+        self._append_many("posts", [
+            (post["id"], {
+                "file": post["file"],
+                "subreddit": post.get("subreddit"),
+                "author": post.get("author"),
+                "stored_at": post.get("stored_at") or now,
+                **self._optional_fields(post)
+            })
+            for post in posts
+        ])
+    
+    def add_comments(self, comments: List[Dict]):
+        """
+        Ajoute un lot de commentaires à l'index (une seule écriture du journal)
+        
+        Args:
+            comments: Entrées {"id", "file", "post_id", "author"}
+                      (+ "offset", "length" pour le stockage en segments, "content_hash",
+                      "stored_at" pour conserver la date d'un enregistrement déplacé)
+        """
+        now = datetime.now().isoformat()
+        self._append_many("comments", [
+            (comment["id"], {
+                "file": comment["file"],
+                "post_id": comment.get("post_id"),
+                "author": comment.get("author"),
+                "stored_at": comment.get("stored_at") or now,
+                **self._optional_fields(comment)
+            })
+            for comment in comments
+        ])
     
     def add_user(self, username: str, file_path: str):
         """Ajoute un utilisateur à l'index"""
-        self.index["users"][username] = {
+        self._append("users", username, {
             "file": file_path,
             "stored_at": datetime.now().isoformat()
-        }
-        self._save()
+        })
     
     def add_search(self, search_id: str, query: str, file_path: str, count: int):
         """Ajoute une recherche à l'index"""
-        self.index["searches"].append({
+        self._append("searches", None, {
             "search_id": search_id,
             "query": query,
             "file": file_path,
             "count": count,
             "timestamp": datetime.now().isoformat()
         })
-        self._save()
     
     def get_post(self, post_id: str) -> Dict:
         """Récupère les infos d'un post depuis l'index"""
         return self.index["posts"].get(post_id)
     
+    def get_comment(self, comment_id: str) -> Dict:
+        """Récupère les infos d'un commentaire depuis l'index"""
+        return self.index["comments"].get(comment_id)
+    
     def get_user(self, username: str) -> Dict:
         """Récupère les infos d'un utilisateur depuis l'index"""
         return self.index["users"].get(username)
@@ -104,6 +319,140 @@ class IndexManager:
         """Récupère les recherches récentes"""
         return self.index["searches"][-limit:]
     
+    @synchronized
+    def get_entries(self, kind: str, ids: List[str]) -> Dict[str, Dict]:
+        """
+        Récupère en une fois les entrées de plusieurs posts ou commentaires
+        
+        Args:
+            kind: "posts" ou "comments"
+            ids: IDs recherchés
+        
+        Returns:
+            {id: entrée} pour les IDs présents dans l'index
+        """
+        entries = self.index[kind]
+        return {item_id: entries[item_id] for item_id in ids if item_id in entries}
+    
+    @synchronized
+    def iter_ids(self, kind: str) -> Iterator[str]:
+        """
+        Parcourt les IDs indexés d'un type ("posts", "comments" ou "users")
+        (copie prise sous verrou: les ajouts concurrents ne sont pas visibles)
+        """
+        return iter(list(self.index[kind]))
+    
+    @synchronized
+    def ids_stored_before(self, kind: str, before: str, limit: int) -> List[str]:
+        """
+        IDs d'un type ("posts", "comments" ou "users") stockés avant une date,
+        les plus anciens d'abord (parcours complet)
+        """
+        stored = [
+            (info["stored_at"], item_id)
+            for item_id, info in self.index[kind].items()
+            if info["stored_at"] < before
+        ]
+        return [item_id for _, item_id in sorted(stored)[:limit]]
+    
+    @synchronized
+    def searches_before(self, before: str, limit: int) -> List[Dict]:
+        """Recherches enregistrées avant une date, les plus anciennes d'abord"""
+        return [search for search in self.index["searches"] if search["timestamp"] < before][:limit]
+    
+    @synchronized
+    def segment_counts(self, kind: str) -> Dict[str, int]:
+        """Nombre d'entrées encore référencées par segment (fichier)"""
+        counts = {}
+        for info in self.index[kind].values():
+            if "offset" in info:
+                counts[info["file"]] = counts.get(info["file"], 0) + 1
+        return counts
+    
+    def remove(self, kind: str, ids: List[str]):
+        """
+        Retire des entrées de l'index (une seule écriture du journal)
+        
+        Args:
+            kind: "posts", "comments", "users" ou "searches" (IDs de recherche)
+            ids: IDs à retirer
+        """
+        self._append_many("remove", [(item_id, {"kind": kind}) for item_id in ids])
+    
+    @synchronized
+    def record_accesses(self, kind: str, accesses: Dict[str, Tuple[str, int]]):
+        """
+        Reporte des lectures dans l'index (une seule écriture du journal)
+        
+        Args:
+            kind: "posts" ou "comments"
+            accesses: {id: (dernière lecture, nombre de lectures à ajouter)}
+        """
+        entries = self.index[kind]
+        self._append_many(kind, [
+            (item_id, {
+                **entries[item_id],
+                "last_access": last_access,
+                "access_count": entries[item_id].get("access_count", 0) + count
+            })
+            for item_id, (last_access, count) in accesses.items()
+            if item_id in entries
+        ])
+    
+    @synchronized
+    def mark_evicted(self, kind: str, ids: List[str]):
+        """Marque des entrées comme évincées (fichier supprimé, métadonnées conservées)"""
+        entries = self.index[kind]
+        self._append_many(kind, [
+            (item_id, {**entries[item_id], "evicted": True}) for item_id in ids if item_id in entries
+        ])
+    
+    @synchronized
+    def eviction_candidates(self, kind: str, policy: str, limit: int) -> List[Dict]:
+        """
+        Entrées évinçables (fichier individuel, non évincées) dans l'ordre de la
+        politique: moins récemment lues ("lru") ou moins souvent lues ("lfu").
+        Une entrée jamais lue compte comme lue à sa date de stockage (parcours complet).
+        
+        Returns:
+            [{"id", "file", "last_access", "access_count"}]
+        """
+        candidates = [
+            {
+                "id": item_id,
+                "file": info["file"],
+                "last_access": info.get("last_access") or info["stored_at"],
+                "access_count": info.get("access_count", 0)
+            }
+            for item_id, info in self.index[kind].items()
+            if "offset" not in info and not info.get("evicted")
+        ]
+        candidates.sort(key=lambda candidate: eviction_key(policy, candidate))
+        return candidates[:limit]
+    
+    @synchronized
+    def comments_for_post(self, post_id: str) -> List[Dict]:
+        """Récupère les commentaires indexés d'un post (parcours complet)"""
+        return [
+            {"id": comment_id, **info}
+            for comment_id, info in self.index["comments"].items()
+            if info.get("post_id") == post_id
+        ]
+    
+    @synchronized
+    def posts_in_subreddit(self, subreddit: str,
+                           since: Union[str, datetime] = None) -> List[Dict]:
+        """Récupère les posts indexés d'un subreddit (parcours complet)"""
+        if isinstance(since, datetime):
+            since = since.isoformat()
+        return [
+            {"id": post_id, **info}
+            for post_id, info in self.index["posts"].items()
+            if info.get("subreddit") == subreddit
+            and (since is None or info["stored_at"] >= since)
+        ]
+    
+    @synchronized
     def get_stats(self) -> Dict:
         """Retourne les statistiques de l'index"""
         return {
@@ -111,6 +460,10 @@ class IndexManager:
             "total_comments": len(self.index["comments"]),
             "total_users": len(self.index["users"]),
             "total_searches": len(self.index["searches"]),
+            "evicted_posts": sum(1 for info in self.index["posts"].values() if info.get("evicted")),
+            "evicted_comments": sum(1 for info in self.index["comments"].values() if info.get("evicted")),
+            "journal_records": self._journal_records,
+            "compactions": self.compactions,
             "created_at": self.index["created_at"],
             "last_updated": self.index["last_updated"]
         }
\ No newline at end of file
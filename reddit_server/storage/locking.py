@@ -0,0 +1,15 @@
+"""
+Verrouillage des gestionnaires d'index partagés entre threads
+Fichier: mcp_servers/reddit_server/storage/locking.py
+"""
+
+import functools
+
+
+def synchronized(method):
+    """Exécute la méthode sous self._lock (index partagé avec le thread d'écriture)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Partitionnement des posts et commentaires par subreddit et par jour
+Fichier: mcp_servers/reddit_server/storage/partitioning.py
+
+Layout "partitioned": posts/{subreddit}/{yyyy-mm-dd}/{id}.json (idem pour
+comments/, avec le subreddit du post parent). Le jour est celui de la
+création sur Reddit (created_utc). Les lectures filtrées par subreddit ou
+par période ne parcourent que les dossiers concernés (élagage des partitions).
+"""
+
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+# Partition des enregistrements dont le subreddit ou la date est inconnu
+UNKNOWN_PARTITION = "_unknown"
+
+_UNSAFE_CHARS = re.compile(r"[^a-z0-9_-]")
+_DAY_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+DateLike = Union[str, date, datetime, None]
+
+
+def subreddit_partition(subreddit: Optional[str]) -> str:
+    """Nom du dossier d'un subreddit (minuscules: les noms Reddit ne tiennent pas compte de la casse)"""
+    if not subreddit:
+        return UNKNOWN_PARTITION
+    return _UNSAFE_CHARS.sub("_", subreddit.lower())
+
+
+def day_partition(record: Dict) -> str:
+    """Jour de création (yyyy-mm-dd) d'un enregistrement, d'après created_utc"""
+    created = record.get("created_utc")
+    if isinstance(created, (int, float)):
+        return datetime.fromtimestamp(created).strftime('%Y-%m-%d')
+    if isinstance(created, str) and _DAY_PATTERN.match(created[:10]):
+        return created[:10]
+    return UNKNOWN_PARTITION
+
+
+def partition_dir(root: Path, subreddit: Optional[str], record: Dict) -> Path:
+    """Dossier de la partition d'un enregistrement: root/{subreddit}/{yyyy-mm-dd}"""
+    return root / subreddit_partition(subreddit) / day_partition(record)
+
+
+def normalize_day(value: DateLike) -> Optional[str]:
+    """Convertit une borne de période en yyyy-mm-dd (comparable aux noms de partitions)"""
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)[:10]
+
+
+def in_period(day: str, since: Optional[str], until: Optional[str]) -> bool:
+    """True si le jour est dans [since, until] (bornes incluses, None = non bornée)"""
+    if day == UNKNOWN_PARTITION:
+        return since is None and until is None
+    return (since is None or day >= since) and (until is None or day <= until)
+
+
+def iter_partitions(root: Path, subreddit: Optional[str] = None,
+                    since: DateLike = None, until: DateLike = None) -> Iterator[Path]:
+    """
+    Liste les dossiers de partitions qui peuvent contenir des enregistrements
+    du subreddit et de la période demandés, sans parcourir les autres
+    
+    Args:
+        root: Dossier des posts ou des commentaires
+        subreddit: Subreddit (tous si None)
+        since: Premier jour inclus (yyyy-mm-dd, date ou datetime)
+        until: Dernier jour inclus
+    """
+    since, until = normalize_day(since), normalize_day(until)
+    if subreddit is not None:
+        subreddit_dirs = [root / subreddit_partition(subreddit)]
+    else:
+        subreddit_dirs = sorted(path for path in root.iterdir() if path.is_dir()) if root.exists() else []
+    
+    for subreddit_dir in subreddit_dirs:
+        if not subreddit_dir.is_dir():
+            continue
+        for day_dir in sorted(subreddit_dir.iterdir()):
+            if day_dir.is_dir() and in_period(day_dir.name, since, until):
+                yield day_dir
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Cache LRU des enregistrements lus sur disque
+Fichier: mcp_servers/reddit_server/storage/record_cache.py
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class RecordCache:
+    """
+    Cache LRU borné en nombre d'entrées et en octets.
+    
+    Chaque entrée est associée à un jeton de version (mtime/taille du fichier,
+    ou emplacement dans un segment): si le jeton ne correspond plus, l'entrée
+    est considérée comme périmée. Les objets retournés sont partagés et ne
+    doivent pas être modifiés par l'appelant.
+    """
+    
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        """Retourne la valeur en cache si elle existe pour cette version"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key: Hashable, version: Hashable, value: Any, size: int):
+        """Ajoute une valeur en cache puis évince les entrées les moins récentes"""
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (version, value, size)
+            self._bytes += size
+            
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+    
+    def invalidate(self, key: Hashable):
+        """Retire une entrée (appelé par le chemin d'écriture)"""
+        with self._lock:
+            if self._remove(key):
+                self.invalidations += 1
+    
+    def _remove(self, key: Hashable) -> bool:
+        """Retire une entrée (verrou déjà acquis); retourne True si elle existait"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+    
+    def get_stats(self) -> Dict:
+        """Retourne les compteurs du cache"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+Récupération des posts et commentaires évincés
+Fichier: mcp_servers/reddit_server/storage/refetcher.py
+
+Une lecture d'un enregistrement évincé par le budget disque ne fait aucun
+appel réseau: get_post / get_comment retournent None et demandent sa
+récupération. Celle-ci passe par le client d'API asynchrone (ordonnanceur
+de débit, priorité "bulk") puis l'enregistrement est restocké par la file du
+thread d'écriture, comme les écritures des outils. Les demandes répétées
+d'un même enregistrement sont fusionnées tant qu'il est en cours de
+récupération.
+"""
+
+import asyncio
+from typing import Dict, Optional, Set, Tuple
+
+
+class Refetcher:
+    """Récupère en tâche de fond les enregistrements évincés demandés par les lectures"""
+    
+    def __init__(self, api_client, writer, priority: str = "bulk"):
+        """
+        Args:
+            api_client: Client d'API asynchrone (create_api_client)
+            writer: BackgroundWriter qui restocke les enregistrements récupérés
+            priority: Priorité des appels dans l'ordonnanceur de débit
+        """
+        self.fetchers = {
+            "posts": api_client.get_post_by_id,
+            "comments": api_client.get_comment_by_id
+        }
+        self.writer = writer
+        self.priority = priority
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Enregistrements en cours de récupération et tâches associées (boucle uniquement)
+        self._pending: Set[Tuple[str, str]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        
+        self.requested = 0
+        self.refetched = 0
+        self.not_found = 0
+        self.failed = 0
+    
+    def start(self):
+        """Attache le récupérateur à la boucle en cours (à appeler depuis la boucle du serveur)"""
+        self._loop = asyncio.get_running_loop()
+    
+    def request(self, kind: str, item_id: str):
+        """
+        Demande la récupération d'un enregistrement évincé, sans attendre.
+        Appelable depuis la boucle comme depuis un autre thread.
+        
+        Args:
+            kind: "posts" ou "comments"
+            item_id: ID de l'enregistrement
+        """
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._schedule, kind, item_id)
+    
+    def _schedule(self, kind: str, item_id: str):
+        """Lance la récupération si elle n'est pas déjà en cours (dans la boucle)"""
+        self.requested += 1
+        key = (kind, item_id)
+        if key in self._pending:
+            return
+        self._pending.add(key)
+        task = asyncio.ensure_future(self._refetch(kind, item_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _refetch(self, kind: str, item_id: str):
+        """Récupère l'enregistrement depuis Reddit puis le restocke via le thread d'écriture"""
+        try:
+            record = await self.fetchers[kind](item_id, priority=self.priority)
+            if record is None:
+                self.not_found += 1
+                return
+            await self.writer.submit(f"save_{kind}", [record])
+            self.refetched += 1
+        except Exception as e:
+            self.failed += 1
+            print(f"  Récupération impossible de {kind}/{item_id}: {e}")
+        finally:
+            self._pending.discard((kind, item_id))
+    
+    async def close(self):
+        """Abandonne les récupérations en cours (arrêt du serveur)"""
+        self._loop = None
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._pending.clear()
+    
+    def get_stats(self) -> Dict:
+        """Retourne les demandes de récupération et leur issue"""
+        return {
+            "requested": self.requested,
+            "in_flight": len(self._pending),
+            "refetched": self.refetched,
+            "not_found": self.not_found,
+            "failed": self.failed
+        }
\ No newline at end of file
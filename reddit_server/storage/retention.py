@@ -0,0 +1,289 @@
+"""
+Rétention et archivage des données Reddit
+Fichier: mcp_servers/reddit_server/storage/retention.py
+
+Une passe de rétention applique la politique configurée:
+- suppression des posts, commentaires, utilisateurs et recherches plus
+  anciens que l'âge maximal de leur type (date de stockage)
+- conservation des N collections les plus récentes par subreddit
+- archivage des données froides (partitions, fichiers, segments plus
+  anciens que ARCHIVE_AFTER_DAYS) en segments compressés, toujours lisibles
+- suppression des segments dont plus aucune entrée n'est référencée
+
+La passe est découpée en étapes courtes (un lot chacune) exécutées par le
+thread d'écriture: elles s'intercalent avec les écritures des outils au
+lieu de les bloquer pendant toute la passe.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from storage.file_manager import ARCHIVE_LAYOUT, FileManager
+from storage.partitioning import iter_partitions
+
+# Séparateur des noms de collections: {subreddit}_collection_{yyyymmdd_hhmmss}.json
+COLLECTION_MARKER = "_collection_"
+
+
+class RetentionManager:
+    """Applique la politique de rétention par petites étapes"""
+    
+    def __init__(self, config, file_manager: FileManager):
+        """
+        Args:
+            config: Configuration (RETENTION_*, ARCHIVE_*)
+            file_manager: FileManager dont les données sont purgées et archivées
+        """
+        self.config = config
+        self.storage = file_manager
+        self.index = file_manager.index
+        self.batch_size = max(1, config.RETENTION_BATCH_SIZE)
+        
+        self._pass = None
+        self._current = None
+        self._started = 0.0
+        self.passes = 0
+        self.last_pass = None
+    
+    @staticmethod
+    def _cutoff(days: int) -> Optional[datetime]:
+        """Date limite d'un âge maximal (None si conservé indéfiniment)"""
+        if days <= 0:
+            return None
+        return datetime.now() - timedelta(days=days)
+    
+    def run_step(self) -> bool:
+        """
+        Exécute une étape de la passe en cours (en démarre une au besoin)
+        
+        Returns:
+            True s'il reste des étapes, False quand la passe est terminée
+        """
+        if self._pass is None:
+            self._current = {
+                "started_at": datetime.now().isoformat(),
+                "deleted": {kind: 0 for kind in self.config.RETENTION_MAX_AGE_DAYS},
+                "archived": {"posts": 0, "comments": 0},
+                "segments_removed": 0,
+                "steps": 0
+            }
+            self._started = time.perf_counter()
+            self._pass = self._steps()
+        
+        try:
+            next(self._pass)
+            self._current["steps"] += 1
+            return True
+        except StopIteration:
+            pass
+        except Exception:
+            # Passe en échec abandonnée: la suivante repart de zéro
+            self._pass = None
+            raise
+        
+        self._current["duration_ms"] = round((time.perf_counter() - self._started) * 1000, 1)
+        self.last_pass = self._current
+        self.passes += 1
+        self._pass = None
+        self.storage.committer.commit()
+        return False
+    
+    def run_pass(self) -> Dict:
+        """Exécute une passe complète dans le thread appelant (scripts, tests)"""
+        while self.run_step():
+            pass
+        return self.last_pass
+    
+    async def run_forever(self, writer):
+        """
+        Tâche de fond du serveur: une passe toutes les RETENTION_INTERVAL_SECONDS,
+        chaque étape étant déposée dans la file du thread d'écriture
+        
+        Args:
+            writer: BackgroundWriter partagé avec les outils
+        """
+        while True:
+            try:
+                while await writer.call(self.run_step):
+                    await asyncio.sleep(0)
+            except Exception as e:
+                print(f" Erreur rétention: {e}")
+            await asyncio.sleep(self.config.RETENTION_INTERVAL_SECONDS)
+    
+    def _steps(self) -> Iterator[None]:
+        """Étapes d'une passe (un yield par lot traité)"""
+        max_age = self.config.RETENTION_MAX_AGE_DAYS
+        
+        for kind in ("posts", "comments", "users"):
+            cutoff = self._cutoff(max_age[kind])
+            if cutoff is not None:
+                yield from self._expire_records(kind, cutoff.isoformat())
+        
+        cutoff = self._cutoff(max_age["searches"])
+        if cutoff is not None:
+            yield from self._expire_searches(cutoff.isoformat())
+        
+        yield from self._expire_collections(self._cutoff(max_age["collections"]))
+        
+        cutoff = self._cutoff(self.config.ARCHIVE_AFTER_DAYS)
+        if cutoff is not None:
+            for kind in ("posts", "comments"):
+                yield from self._archive_partitions(kind, cutoff)
+                yield from self._archive_flat_files(kind, cutoff)
+                yield from self._archive_segments(kind, cutoff)
+        
+        for kind in ("posts", "comments"):
+            yield from self._remove_dead_segments(kind)
+    
+    def _expire_records(self, kind: str, before: str) -> Iterator[None]:
+        """Supprime par lots les enregistrements stockés avant une date"""
+        while True:
+            ids = self.index.ids_stored_before(kind, before, self.batch_size)
+            if not ids:
+                return
+            self._current["deleted"][kind] += self.storage.delete_records(kind, ids)
+            yield
+    
+    def _expire_searches(self, before: str) -> Iterator[None]:
+        """Supprime par lots les recherches enregistrées avant une date"""
+        while True:
+            searches = self.index.searches_before(before, self.batch_size)
+            if not searches:
+                return
+            self._current["deleted"]["searches"] += self.storage.delete_searches(searches)
+            yield
+    
+    def _expire_collections(self, cutoff: Optional[datetime]) -> Iterator[None]:
+        """
+        Supprime les collections trop anciennes et celles au-delà des
+        RETENTION_KEEP_COLLECTIONS plus récentes de chaque subreddit
+        """
+        keep = self.config.RETENTION_KEEP_COLLECTIONS
+        if cutoff is None and keep <= 0:
+            return
+        
+        by_subreddit = {}
+        for path in self.config.SUBREDDITS_DIR.glob(f"*{COLLECTION_MARKER}*.json"):
+            subreddit, _, stamp = path.stem.rpartition(COLLECTION_MARKER)
+            by_subreddit.setdefault(subreddit, []).append((self._collection_time(path, stamp), path))
+        
+        expired = []
+        for collections in by_subreddit.values():
+            collections.sort(reverse=True)
+            for rank, (collected_at, path) in enumerate(collections):
+                if (keep > 0 and rank >= keep) or (cutoff is not None and collected_at < cutoff):
+                    expired.append(path)
+        
+        for start in range(0, len(expired), self.batch_size):
+            batch = expired[start:start + self.batch_size]
+            for path in batch:
+                path.unlink(missing_ok=True)
+            self._current["deleted"]["collections"] += len(batch)
+            yield
+    
+    @staticmethod
+    def _collection_time(path: Path, stamp: str) -> datetime:
+        """Date d'une collection d'après son nom (date de modification à défaut)"""
+        try:
+            return datetime.strptime(stamp, '%Y%m%d_%H%M%S')
+        except ValueError:
+            return datetime.fromtimestamp(path.stat().st_mtime)
+    
+    def _archive_files(self, kind: str, paths: List[Path]) -> Iterator[None]:
+        """
+        Archive par lots des fichiers individuels. Un fichier que l'index ne
+        référence plus (ancienne version) est simplement supprimé.
+        """
+        for start in range(0, len(paths), self.batch_size):
+            batch = paths[start:start + self.batch_size]
+            entries = self.index.get_entries(kind, [path.stem for path in batch])
+            current = []
+            for path in batch:
+                info = entries.get(path.stem)
+                if info is not None and "offset" not in info and info["file"] == str(path):
+                    current.append(path.stem)
+                else:
+                    path.unlink(missing_ok=True)
+            result = self.storage.relocate(kind, current, ARCHIVE_LAYOUT)
+            self._current["archived"][kind] += result["moved"]
+            yield
+    
+    def _archive_partitions(self, kind: str, cutoff: datetime) -> Iterator[None]:
+        """Archive les partitions dont le jour est antérieur à la date limite"""
+        records_dir = self.storage.records_dir(kind)
+        last_day = (cutoff - timedelta(days=1)).strftime('%Y-%m-%d')
+        for partition in list(iter_partitions(records_dir, until=last_day)):
+            yield from self._archive_files(kind, sorted(partition.glob("*.json")))
+            # Partition (et dossier du subreddit) vide: supprimée
+            for directory in (partition, partition.parent):
+                try:
+                    directory.rmdir()
+                except OSError:
+                    break
+    
+    def _archive_flat_files(self, kind: str, cutoff: datetime) -> Iterator[None]:
+        """Archive les fichiers à plat (layout "files") écrits avant la date limite"""
+        records_dir = self.storage.records_dir(kind)
+        if not records_dir.exists():
+            return
+        limit = cutoff.timestamp()
+        with os.scandir(records_dir) as entries:
+            cold = [
+                Path(entry.path) for entry in entries
+                if entry.is_file() and entry.name.endswith(".json") and entry.stat().st_mtime < limit
+            ]
+        yield from self._archive_files(kind, sorted(cold))
+    
+    def _closed_segments(self, store, kind: str) -> List[Path]:
+        """Segments d'un store hors segment courant (encore ouvert en écriture)"""
+        return store.segments(kind)[:-1]
+    
+    def _archive_segments(self, kind: str, cutoff: datetime) -> Iterator[None]:
+        """Recopie dans les archives les entrées des segments fermés avant la date limite"""
+        limit = cutoff.timestamp()
+        for segment in self._closed_segments(self.storage.segments, kind):
+            if segment.stat().st_mtime >= limit:
+                continue
+            ids = [record["id"] for _, _, record in self.storage.segments.scan_locations(segment)]
+            entries = self.index.get_entries(kind, ids)
+            live = [item_id for item_id, info in entries.items() if info["file"] == str(segment)]
+            moved = 0
+            for start in range(0, len(live), self.batch_size):
+                result = self.storage.relocate(kind, live[start:start + self.batch_size], ARCHIVE_LAYOUT)
+                moved += result["moved"]
+                self._current["archived"][kind] += result["moved"]
+                yield
+            if moved < len(live):
+                # Entrées illisibles ou modifiées entre-temps: le segment est conservé,
+                # _remove_dead_segments le supprimera quand plus rien ne le référence
+                print(f"  Segment {segment.name} conservé: {len(live) - moved} entrée(s) non archivée(s)")
+                continue
+            segment.unlink()
+            self._current["segments_removed"] += 1
+            yield
+    
+    def _remove_dead_segments(self, kind: str) -> Iterator[None]:
+        """Supprime les segments et archives fermés dont aucune entrée n'est référencée"""
+        counts = self.index.segment_counts(kind)
+        for store in (self.storage.segments, self.storage.archives):
+            for segment in self._closed_segments(store, kind):
+                if counts.get(str(segment), 0) == 0:
+                    segment.unlink()
+                    self._current["segments_removed"] += 1
+        yield
+    
+    def get_stats(self) -> Dict:
+        """Retourne la politique appliquée et le bilan de la dernière passe"""
+        return {
+            "enabled": self.config.RETENTION_ENABLED,
+            "max_age_days": dict(self.config.RETENTION_MAX_AGE_DAYS),
+            "keep_collections": self.config.RETENTION_KEEP_COLLECTIONS,
+            "archive_after_days": self.config.ARCHIVE_AFTER_DAYS,
+            "running": self._pass is not None,
+            "passes": self.passes,
+            "last_pass": self.last_pass
+        }
\ No newline at end of file
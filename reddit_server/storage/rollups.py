@@ -0,0 +1,384 @@
+"""
+Agrégats incrémentaux des posts et commentaires stockés
+Fichier: mcp_servers/reddit_server/storage/rollups.py
+
+Compteurs par (type, subreddit, jour) et sketches de quantiles DDSketch
+(score et num_comments des posts, score des commentaires) par
+(métrique, subreddit, jour), mis à jour par deltas à chaque sauvegarde.
+Les sketches de plusieurs jours ou subreddits se fusionnent par simple
+somme des compteurs de buckets: une lecture du tableau de bord ne dépend
+que du nombre de (subreddit, jour, bucket), jamais du nombre d'enregistrements.
+
+DDSketch (erreur relative alpha): une valeur v > 0 tombe dans le bucket
+ceil(log(v) / log(gamma)), gamma = (1 + alpha) / (1 - alpha); les valeurs
+négatives dans le bucket opposé. Les buckets sont ordonnés comme les valeurs.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from storage.locking import synchronized
+from storage.partitioning import UNKNOWN_PARTITION, DateLike, day_partition, normalize_day, subreddit_partition
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    kind TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    subreddit TEXT NOT NULL,
+    day TEXT NOT NULL,
+    score INTEGER,
+    num_comments INTEGER,
+    PRIMARY KEY (kind, item_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily (
+    kind TEXT NOT NULL,
+    subreddit TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (kind, subreddit, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_daily_day ON daily (day);
+
+CREATE TABLE IF NOT EXISTS sketches (
+    metric TEXT NOT NULL,
+    subreddit TEXT NOT NULL,
+    day TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (metric, subreddit, day, bucket)
+) WITHOUT ROWID;
+"""
+
+# Métriques suivies par type: {métrique: champ de l'enregistrement}
+METRICS = {
+    "posts": {"post_score": "score", "post_num_comments": "num_comments"},
+    "comments": {"comment_score": "score"}
+}
+
+# Colonne de la table items de chaque champ
+ITEM_FIELDS = ("score", "num_comments")
+
+# Quantiles retournés par défaut
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+# Nombre maximal de paramètres par requête IN (...)
+MAX_QUERY_PARAMS = 500
+
+
+def _metric_value(record: Dict, field: str) -> Optional[int]:
+    """Valeur numérique d'un champ (None si absente)"""
+    value = record.get(field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return int(value)
+
+
+class QuantileSketch:
+    """Correspondance valeur <-> bucket d'un DDSketch à erreur relative fixe"""
+    
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"Précision relative invalide: {relative_accuracy}. Options valides: ]0, 1[")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+    
+    def bucket(self, value: float) -> int:
+        """Bucket d'une valeur: 0 pour 0, ±(clé + 1) sinon (|v| < 1 compte comme 1)"""
+        if value == 0:
+            return 0
+        key = max(math.ceil(math.log(abs(value)) / self._log_gamma), 0)
+        return key + 1 if value > 0 else -(key + 1)
+    
+    def value(self, bucket: int) -> float:
+        """Valeur représentative d'un bucket (erreur relative <= relative_accuracy)"""
+        if bucket == 0:
+            return 0.0
+        estimate = 2 * self.gamma ** (abs(bucket) - 1) / (self.gamma + 1)
+        return estimate if bucket > 0 else -estimate
+    
+    def quantiles(self, buckets: List[Tuple[int, int]], quantiles: Iterable[float]) -> Dict:
+        """
+        Quantiles d'un sketch fusionné
+        
+        Args:
+            buckets: (bucket, nombre) triés par bucket croissant
+            quantiles: Quantiles demandés (entre 0 et 1)
+        
+        Returns:
+            {"count", "min", "max", "p50", ...} (valeurs à relative_accuracy près)
+        """
+        buckets = [(bucket, count) for bucket, count in buckets if count > 0]
+        total = sum(count for _, count in buckets)
+        result = {"count": total}
+        if not total:
+            return result
+        result["min"] = round(self.value(buckets[0][0]), 2)
+        result["max"] = round(self.value(buckets[-1][0]), 2)
+        for q in quantiles:
+            rank = q * (total - 1)
+            seen = 0
+            for bucket, count in buckets:
+                seen += count
+                if seen > rank:
+                    break
+            result[f"p{q * 100:g}"] = round(self.value(bucket), 2)
+        return result
+
+
+class RollupStats:
+    """Compteurs par subreddit et par jour et sketches de quantiles, tenus à jour à l'écriture"""
+    
+    def __init__(self, db_file: Path, relative_accuracy: float = 0.01, synchronous: str = "NORMAL"):
+        """
+        Args:
+            db_file: Fichier de la base SQLite des agrégats
+            relative_accuracy: Erreur relative des quantiles (DDSketch)
+            synchronous: Niveau PRAGMA synchronous
+        """
+        self.db_file = db_file
+        self.sketch = QuantileSketch(relative_accuracy)
+        # Connexion d'écriture (thread d'écriture, statistiques)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(db_file), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        # Connexion de lecture des requêtes: en WAL, elle lit le dernier état validé
+        # sans attendre le verrou tenu par le thread d'écriture pendant add()
+        self._read_lock = threading.Lock()
+        self.read_conn = sqlite3.connect(str(db_file), check_same_thread=False)
+        self.read_conn.execute("PRAGMA query_only=ON")
+        
+        self.queries = 0
+        self.query_ms_total = 0.0
+    
+    def _items(self, kind: str, ids: List[str]) -> Dict[str, Tuple]:
+        """Contributions enregistrées des éléments: {id: (subreddit, jour, score, num_comments)}"""
+        items = {}
+        for start in range(0, len(ids), MAX_QUERY_PARAMS):
+            chunk = ids[start:start + MAX_QUERY_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self.conn.execute(
+                f"SELECT item_id, subreddit, day, score, num_comments FROM items "
+                f"WHERE kind = ? AND item_id IN ({placeholders})", [kind, *chunk]
+            ):
+                items[row[0]] = row[1:]
+        return items
+    
+    def _contribute(self, kind: str, item: Tuple, sign: int, daily: Counter, sketches: Counter):
+        """Ajoute (sign = 1) ou retire (sign = -1) la contribution d'un élément aux deltas"""
+        subreddit, day, *values = item
+        daily[(kind, subreddit, day)] += sign
+        row = dict(zip(ITEM_FIELDS, values))
+        for metric, field in METRICS[kind].items():
+            if row[field] is not None:
+                sketches[(metric, subreddit, day, self.sketch.bucket(row[field]))] += sign
+    
+    def _apply(self, daily: Counter, sketches: Counter):
+        """Applique des deltas de compteurs (transaction de l'appelant), sans laisser de compteur nul"""
+        daily = {key: delta for key, delta in daily.items() if delta}
+        sketches = {key: delta for key, delta in sketches.items() if delta}
+        self.conn.executemany(
+            "INSERT INTO daily (kind, subreddit, day, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (kind, subreddit, day) DO UPDATE SET count = count + excluded.count",
+            [(*key, delta) for key, delta in daily.items()]
+        )
+        self.conn.executemany(
+            "INSERT INTO sketches (metric, subreddit, day, bucket, count) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (metric, subreddit, day, bucket) DO UPDATE SET count = count + excluded.count",
+            [(*key, delta) for key, delta in sketches.items()]
+        )
+        self.conn.executemany(
+            "DELETE FROM daily WHERE kind = ? AND subreddit = ? AND day = ? AND count <= 0",
+            [key for key, delta in daily.items() if delta < 0]
+        )
+        self.conn.executemany(
+            "DELETE FROM sketches WHERE metric = ? AND subreddit = ? AND day = ? AND bucket = ? AND count <= 0",
+            [key for key, delta in sketches.items() if delta < 0]
+        )
+    
+    @synchronized
+    def add(self, kind: str, records: List[Dict], subreddits: List[Optional[str]]):
+        """
+        Compte (ou recompte) un lot de posts ou commentaires en une transaction:
+        la contribution précédente d'un élément déjà compté est retirée
+        
+        Args:
+            kind: "posts" ou "comments"
+            records: Enregistrements (la dernière occurrence d'un ID l'emporte)
+            subreddits: Subreddit de chaque enregistrement (celui du post pour un commentaire)
+        """
+        latest = {}
+        for record, subreddit in zip(records, subreddits):
+            latest[record["id"]] = (
+                subreddit_partition(subreddit),
+                day_partition(record),
+                *(_metric_value(record, field) for field in ITEM_FIELDS)
+            )
+        if not latest:
+            return
+        
+        daily = Counter()
+        sketches = Counter()
+        with self.conn:
+            for item in self._items(kind, list(latest)).values():
+                self._contribute(kind, item, -1, daily, sketches)
+            for item in latest.values():
+                self._contribute(kind, item, 1, daily, sketches)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO items (kind, item_id, subreddit, day, score, num_comments) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(kind, item_id, *item) for item_id, item in latest.items()]
+            )
+            self._apply(daily, sketches)
+    
+    @synchronized
+    def remove(self, kind: str, ids: List[str]) -> int:
+        """Retire des éléments des agrégats; retourne le nombre retiré"""
+        ids = list(ids)
+        daily = Counter()
+        sketches = Counter()
+        with self.conn:
+            items = self._items(kind, ids)
+            for item in items.values():
+                self._contribute(kind, item, -1, daily, sketches)
+            self.conn.executemany(
+                "DELETE FROM items WHERE kind = ? AND item_id = ?", [(kind, item_id) for item_id in items]
+            )
+            self._apply(daily, sketches)
+        return len(items)
+    
+    @synchronized
+    def clear(self):
+        """Vide les agrégats (avant une reconstruction complète)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM items")
+            self.conn.execute("DELETE FROM daily")
+            self.conn.execute("DELETE FROM sketches")
+    
+    @staticmethod
+    def _filters(subreddit: Optional[str], since: Optional[str], until: Optional[str]) -> Tuple[str, List]:
+        """Clause WHERE d'une requête d'agrégats (un filtre de période exclut les jours inconnus)"""
+        clauses = []
+        params = []
+        if subreddit is not None:
+            clauses.append("subreddit = ?")
+            params.append(subreddit_partition(subreddit))
+        if since is not None or until is not None:
+            clauses.append("day != ?")
+            params.append(UNKNOWN_PARTITION)
+        if since is not None:
+            clauses.append("day >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("day <= ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+    
+    def query(self, subreddit: str = None, since: DateLike = None, until: DateLike = None,
+              quantiles: Iterable[float] = DEFAULT_QUANTILES, top_subreddits: int = 20) -> Dict:
+        """
+        Agrégats d'un subreddit (ou de tous) sur une période
+        
+        Args:
+            subreddit: Subreddit (tous si None)
+            since: Premier jour de création inclus (yyyy-mm-dd, date ou datetime)
+            until: Dernier jour de création inclus
+            quantiles: Quantiles des sketches (entre 0 et 1)
+            top_subreddits: Nombre de subreddits détaillés (sans filtre de subreddit)
+        
+        Returns:
+            {"totals", "by_day", "by_subreddit", "quantiles", "took_ms"}
+        """
+        started = time.perf_counter()
+        with self._read_lock:
+            # Une seule transaction de lecture: compteurs et sketches du même état
+            self.read_conn.execute("BEGIN")
+            try:
+                result = self._query(self.read_conn, subreddit, since, until, quantiles, top_subreddits)
+            finally:
+                self.read_conn.rollback()
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.queries += 1
+        self.query_ms_total += elapsed_ms
+        result["took_ms"] = round(elapsed_ms, 2)
+        return result
+    
+    def _query(self, conn: sqlite3.Connection, subreddit: Optional[str], since: DateLike, until: DateLike,
+               quantiles: Iterable[float], top_subreddits: int) -> Dict:
+        """Agrégats sur une connexion (voir query)"""
+        since, until = normalize_day(since), normalize_day(until)
+        where, params = self._filters(subreddit, since, until)
+        
+        totals = {kind: 0 for kind in METRICS}
+        by_day = {}
+        for day, kind, count in conn.execute(
+            f"SELECT day, kind, SUM(count) FROM daily{where} GROUP BY day, kind ORDER BY day", params
+        ):
+            totals[kind] += count
+            by_day.setdefault(day, {"day": day, **{kind: 0 for kind in METRICS}})[kind] = count
+        
+        result = {
+            "subreddit": subreddit_partition(subreddit) if subreddit else "all",
+            "since": since,
+            "until": until,
+            "totals": totals,
+            "by_day": list(by_day.values())
+        }
+        
+        if subreddit is None:
+            by_subreddit = {}
+            for name, kind, count in conn.execute(
+                f"SELECT subreddit, kind, SUM(count) FROM daily{where} GROUP BY subreddit, kind", params
+            ):
+                by_subreddit.setdefault(name, {"subreddit": name, **{kind: 0 for kind in METRICS}})[kind] = count
+            ranked = sorted(by_subreddit.values(), key=lambda row: (-row["posts"], -row["comments"]))
+            result["subreddits_total"] = len(ranked)
+            result["by_subreddit"] = ranked[:top_subreddits]
+        
+        buckets = {metric: [] for fields in METRICS.values() for metric in fields}
+        for metric, bucket, count in conn.execute(
+            f"SELECT metric, bucket, SUM(count) FROM sketches{where} GROUP BY metric, bucket ORDER BY metric, bucket",
+            params
+        ):
+            buckets[metric].append((bucket, count))
+        quantiles = list(quantiles)
+        result["quantiles"] = {
+            metric: self.sketch.quantiles(metric_buckets, quantiles) for metric, metric_buckets in buckets.items()
+        }
+        return result
+    
+    @synchronized
+    def get_stats(self) -> Dict:
+        """Retourne la taille des agrégats et le temps moyen des lectures"""
+        counted = dict(self.conn.execute("SELECT kind, SUM(count) FROM daily GROUP BY kind").fetchall())
+        return {
+            "posts": counted.get("posts", 0),
+            "comments": counted.get("comments", 0),
+            "daily_rows": self.conn.execute("SELECT COUNT(*) FROM daily").fetchone()[0],
+            "sketch_buckets": self.conn.execute("SELECT COUNT(*) FROM sketches").fetchone()[0],
+            "relative_accuracy": self.sketch.relative_accuracy,
+            "queries": self.queries,
+            "avg_query_ms": round(self.query_ms_total / self.queries, 2) if self.queries else 0
+        }
+    
+    @synchronized
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    
+    @synchronized
+    def close(self):
+        """Ferme la base"""
+        with self._read_lock:
+            self.read_conn.close()
+        self.conn.close()
\ No newline at end of file
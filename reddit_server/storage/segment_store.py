@@ -0,0 +1,255 @@
+"""
+Stockage des enregistrements Reddit en segments JSONL
+Fichier: mcp_servers/reddit_server/storage/segment_store.py
+
+Les enregistrements sont ajoutés à des segments de taille bornée
+(segments/{type}/{type}-000001.jsonl[.gz|.zst]) au lieu d'un fichier par ID.
+Chaque enregistrement est une ligne JSON, compressée individuellement
+(un membre gzip ou une frame zstd) pour rester lisible à partir de
+(segment, offset, length). Les membres/frames concaténés forment un flux
+valide: un segment complet se lit donc aussi en streaming.
+
+Un arrêt brutal peut laisser une dernière frame tronquée: elle est coupée
+avant le premier ajout au segment, et la lecture séquentielle saute les
+frames illisibles au lieu de s'arrêter.
+"""
+
+import gzip
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+from utils.serializer import JSONSerializer
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Erreurs de décompression d'une frame invalide
+FRAME_ERRORS = (zlib.error, zstandard.ZstdError) if zstandard else (zlib.error,)
+
+
+# Fenêtre lue pour délimiter une frame compressée (agrandie si la frame est plus longue)
+FRAME_WINDOW_BYTES = 64 * 1024
+
+# Début de chaque frame compressée: point de reprise après une frame illisible
+FRAME_MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "zstd": b"\x28\xb5\x2f\xfd"
+}
+
+SEGMENT_SUFFIXES = {
+    "none": ".jsonl",
+    "gzip": ".jsonl.gz",
+    "zstd": ".jsonl.zst"
+}
+
+
+class SegmentStore:
+    """Stockage append-only en segments JSONL (optionnellement compressés)"""
+    
+    def __init__(self, root: Path, max_segment_bytes: int = 64 * 1024 * 1024,
+                 compression: str = "none", json_backend: str = "auto"):
+        """
+        Args:
+            root: Dossier racine des segments
+            max_segment_bytes: Taille au-delà de laquelle un nouveau segment est ouvert
+            compression: "none", "gzip" ou "zstd"
+            json_backend: Backend de sérialisation (voir JSONSerializer)
+        """
+        if compression not in SEGMENT_SUFFIXES:
+            raise ValueError(
+                f"Compression invalide: {compression}. Options valides: {list(SEGMENT_SUFFIXES)}"
+            )
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("La compression zstd nécessite le paquet 'zstandard'")
+        
+        self.root = root
+        self.max_segment_bytes = max_segment_bytes
+        self.compression = compression
+        self.suffix = SEGMENT_SUFFIXES[compression]
+        # Une ligne par enregistrement: toujours en sortie compacte
+        self.serializer = JSONSerializer(json_backend)
+        
+        if compression == "zstd":
+            self._zstd_compressor = zstandard.ZstdCompressor()
+            self._zstd_decompressor = zstandard.ZstdDecompressor()
+        
+        # Segments dont la fin a été vérifiée avant le premier ajout
+        self._checked_segments = set()
+    
+    def _encode(self, record: Dict) -> bytes:
+        """Sérialise (et compresse) un enregistrement"""
+        line = self.serializer.dumps_bytes(record) + b"\n"
+        if self.compression == "gzip":
+            return gzip.compress(line)
+        if self.compression == "zstd":
+            return self._zstd_compressor.compress(line)
+        return line
+    
+    def _decode(self, data: bytes) -> Dict:
+        """Décompresse et désérialise un enregistrement"""
+        if self.compression == "gzip":
+            data = gzip.decompress(data)
+        elif self.compression == "zstd":
+            data = self._zstd_decompressor.decompress(data)
+        return self.serializer.loads(data)
+    
+    def _segments(self, kind: str) -> List[Path]:
+        """Liste les segments d'un type, du plus ancien au plus récent"""
+        kind_dir = self.root / kind
+        if not kind_dir.exists():
+            return []
+        return sorted(kind_dir.glob(f"{kind}-*{self.suffix}"))
+    
+    def _active_segment(self, kind: str) -> Path:
+        """Retourne le segment courant, ou en ouvre un nouveau s'il est plein"""
+        kind_dir = self.root / kind
+        kind_dir.mkdir(parents=True, exist_ok=True)
+        
+        segments = self._segments(kind)
+        if segments and segments[-1].stat().st_size < self.max_segment_bytes:
+            return segments[-1]
+        
+        number = int(segments[-1].name[len(kind) + 1:].split(".")[0]) + 1 if segments else 1
+        return kind_dir / f"{kind}-{number:06d}{self.suffix}"
+    
+    def append_many(self, kind: str, records: List[Dict]) -> List[Dict]:
+        """
+        Ajoute un lot d'enregistrements au segment courant
+        
+        Args:
+            kind: Type d'enregistrement ("posts", "comments", ...)
+            records: Enregistrements à ajouter
+        
+        Returns:
+            Emplacements {"file", "offset", "length"} dans l'ordre des enregistrements
+        """
+        locations = []
+        segment = None
+        f = None
+        try:
+            for record in records:
+                if f is None or f.tell() >= self.max_segment_bytes:
+                    if f is not None:
+                        f.close()
+                    segment = self._active_segment(kind)
+                    self._truncate_torn_tail(segment)
+                    f = open(segment, 'ab')
+                
+                data = self._encode(record)
+                offset = f.tell()
+                f.write(data)
+                locations.append({"file": str(segment), "offset": offset, "length": len(data)})
+        finally:
+            if f is not None:
+                f.close()
+        
+        return locations
+    
+    def _truncate_torn_tail(self, segment: Path):
+        """
+        Coupe la dernière frame tronquée d'un segment (arrêt brutal pendant un ajout)
+        avant d'y ajouter: les enregistrements suivants ne doivent pas suivre des
+        octets illisibles. Vérifié une fois par segment.
+        """
+        if segment in self._checked_segments:
+            return
+        self._checked_segments.add(segment)
+        if not segment.exists():
+            return
+        
+        valid_end = 0
+        for offset, length, _ in self.scan_locations(segment):
+            valid_end = offset + length
+        size = segment.stat().st_size
+        if size > valid_end:
+            with open(segment, 'r+b') as f:
+                f.truncate(valid_end)
+                f.flush()
+                os.fsync(f.fileno())
+            print(f"  Segment {segment.name} tronqué: {size - valid_end} octets invalides ignorés")
+    
+    def read(self, segment: str, offset: int, length: int) -> Dict:
+        """Lit un enregistrement à partir de son emplacement"""
+        with open(segment, 'rb') as f:
+            f.seek(offset)
+            return self._decode(f.read(length))
+    
+    def scan(self, kind: str) -> Iterator[Tuple[str, Dict]]:
+        """
+        Parcourt séquentiellement tous les segments d'un type
+        
+        Yields:
+            (chemin du segment, enregistrement), dans l'ordre d'écriture
+        """
+        for segment in self._segments(kind):
+            for _, _, record in self.scan_locations(segment):
+                yield str(segment), record
+    
+    def segments(self, kind: str) -> List[Path]:
+        """Liste les segments d'un type (compression configurée), du plus ancien au plus récent"""
+        return self._segments(kind)
+    
+    def scan_locations(self, segment: Path) -> Iterator[Tuple[int, int, Dict]]:
+        """
+        Parcourt un segment en retrouvant l'emplacement de chaque enregistrement
+        (reconstruction de l'index, archivage). Une frame illisible (tronquée par
+        un arrêt brutal) est sautée: la lecture reprend à la ligne ou à la frame
+        suivante, et une dernière frame tronquée est ignorée.
+        
+        Yields:
+            (offset, length, enregistrement), dans l'ordre d'écriture
+        """
+        data = memoryview(Path(segment).read_bytes())
+        offset = 0
+        skipped = 0
+        while offset < len(data):
+            if self.compression == "none":
+                end = data.obj.find(b"\n", offset)
+                if end == -1:
+                    skipped += 1
+                    break
+                length = end + 1 - offset
+                line = data[offset:end + 1]
+            else:
+                line, length = self._read_frame(data, offset)
+                if line is None:
+                    # Reprendre au début de la frame suivante
+                    skipped += 1
+                    offset = data.obj.find(FRAME_MAGIC[self.compression], offset + 1)
+                    if offset == -1:
+                        break
+                    continue
+            try:
+                record = self.serializer.loads(bytes(line))
+            except ValueError:
+                record = None
+            if record is None:
+                skipped += 1
+            else:
+                yield offset, length, record
+            offset += length
+        if skipped:
+            print(f"  Segment {Path(segment).name}: {skipped} frame(s) illisible(s) ignorée(s)")
+    
+    def _read_frame(self, data: memoryview, offset: int) -> Tuple[bytes, int]:
+        """Décompresse la frame (membre gzip ou frame zstd) qui commence à offset"""
+        window = FRAME_WINDOW_BYTES
+        while True:
+            chunk = data[offset:offset + window]
+            if self.compression == "gzip":
+                decompressor = zlib.decompressobj(wbits=31)
+            else:
+                decompressor = self._zstd_decompressor.decompressobj()
+            try:
+                line = decompressor.decompress(chunk)
+            except FRAME_ERRORS:
+                return None, 0
+            if decompressor.eof:
+                return line, len(chunk) - len(decompressor.unused_data)
+            if offset + window >= len(data):
+                # Frame tronquée par un arrêt brutal
+                return None, 0
+            window *= 4
\ No newline at end of file
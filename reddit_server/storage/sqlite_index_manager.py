@@ -0,0 +1,544 @@
+"""
+Index des données Reddit sur SQLite (mode WAL)
+Fichier: mcp_servers/reddit_server/storage/sqlite_index_manager.py
+
+Backend alternatif à IndexManager: même interface, mais les entrées restent
+sur disque et les requêtes secondaires (par post, subreddit, auteur, date)
+utilisent des index SQL au lieu d'un parcours complet.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple, Union
+from pathlib import Path
+from storage.locking import synchronized
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    subreddit TEXT,
+    author TEXT,
+    stored_at TEXT NOT NULL,
+    "offset" INTEGER,
+    length INTEGER,
+    content_hash TEXT,
+    last_access TEXT,
+    access_count INTEGER,
+    evicted INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_posts_subreddit ON posts (subreddit, stored_at);
+CREATE INDEX IF NOT EXISTS idx_posts_author ON posts (author);
+CREATE INDEX IF NOT EXISTS idx_posts_stored_at ON posts (stored_at);
+
+CREATE TABLE IF NOT EXISTS comments (
+    id TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    post_id TEXT,
+    author TEXT,
+    stored_at TEXT NOT NULL,
+    "offset" INTEGER,
+    length INTEGER,
+    content_hash TEXT,
+    last_access TEXT,
+    access_count INTEGER,
+    evicted INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_comments_post_id ON comments (post_id);
+CREATE INDEX IF NOT EXISTS idx_comments_author ON comments (author);
+CREATE INDEX IF NOT EXISTS idx_comments_stored_at ON comments (stored_at);
+
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    stored_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS searches (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    search_id TEXT NOT NULL,
+    query TEXT,
+    file TEXT NOT NULL,
+    count INTEGER,
+    timestamp TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Colonnes ajoutées après la création du schéma (migrées par ALTER TABLE).
+# Ce sont aussi les champs optionnels des entrées de posts et commentaires.
+ADDED_COLUMNS = {
+    "offset": "INTEGER",
+    "length": "INTEGER",
+    "content_hash": "TEXT",
+    "last_access": "TEXT",
+    "access_count": "INTEGER",
+    "evicted": "INTEGER"
+}
+
+# Colonne parente de chaque table d'enregistrements
+PARENT_COLUMNS = {
+    "posts": "subreddit",
+    "comments": "post_id"
+}
+
+# Ordre de sélection des candidats à l'éviction (les premiers sont évincés)
+EVICTION_ORDER = {
+    "lru": "last_access",
+    "lfu": "access_count, last_access"
+}
+
+# Nombre maximal de paramètres par requête IN (...)
+MAX_QUERY_PARAMS = 500
+
+# Clé primaire de chaque table parcourable par iter_ids
+ID_COLUMNS = {
+    "posts": "id",
+    "comments": "id",
+    "users": "username"
+}
+
+# Taille des pages de iter_ids
+ID_PAGE_SIZE = 10000
+
+
+class SQLiteIndexManager:
+    """Gestionnaire de l'index centralisé stocké dans SQLite"""
+    
+    def __init__(self, db_file: Path, synchronous: str = "NORMAL"):
+        """
+        Args:
+            db_file: Fichier de la base SQLite
+            synchronous: Niveau PRAGMA synchronous ("NORMAL" ou "FULL" pour un fsync par transaction)
+        """
+        self.db_file = db_file
+        # Connexion partagée entre la boucle asyncio et le thread d'écriture
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(db_file), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('created_at', ?)", (now,)
+            )
+            self.conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('last_updated', ?)", (now,)
+            )
+    
+    def _migrate(self):
+        """Ajoute les colonnes absentes des bases créées par une version antérieure"""
+        for table in ("posts", "comments"):
+            columns = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            for column, column_type in ADDED_COLUMNS.items():
+                if column not in columns:
+                    self.conn.execute(f'ALTER TABLE {table} ADD COLUMN "{column}" {column_type}')
+        self.conn.commit()
+    
+    def _touch(self, timestamp: str):
+        """Met à jour la date de dernière modification (dans la transaction courante)"""
+        self.conn.execute(
+            "UPDATE meta SET value = ? WHERE key = 'last_updated'", (timestamp,)
+        )
+    
+    @synchronized
+    def get_meta(self, key: str) -> str:
+        """Lit une valeur de la table meta"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+    
+    def _insert_records(self, kind: str, rows: List[Tuple[str, Dict]], now: str):
+        """
+        Insère ou remplace des posts ou commentaires (transaction de l'appelant)
+        
+        Args:
+            kind: "posts" ou "comments"
+            rows: (id, entrée) avec "file", le champ parent, "author" et les champs optionnels
+            now: Date de stockage des entrées qui n'en ont pas
+        """
+        columns = ["id", "file", PARENT_COLUMNS[kind], "author", "stored_at", *ADDED_COLUMNS]
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        placeholders = ", ".join("?" * len(columns))
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO {kind} ({column_list}) VALUES ({placeholders})",
+            [(item_id, info["file"], info.get(PARENT_COLUMNS[kind]), info.get("author"),
+              info.get("stored_at") or now, *(info.get(column) for column in ADDED_COLUMNS))
+             for item_id, info in rows]
+        )
+    
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row, key: str = None) -> Dict:
+        """Convertit une ligne en dictionnaire sans les colonnes vides"""
+        if row is None:
+            return None
+        data = {k: row[k] for k in row.keys() if row[k] is not None}
+        if key is not None:
+            data.pop(key, None)
+        return data
+    
+    @synchronized
+    def import_json_index(self, index: Dict):
+        """
+        Importe un index JSON (IndexManager.index) en une seule transaction.
+        Marque la base pour que l'import ne soit fait qu'une fois.
+        
+        Args:
+            index: Contenu de l'index JSON (snapshot + journal rejoué)
+        """
+        with self.conn:
+            now = datetime.now().isoformat()
+            self._insert_records("posts", list(index["posts"].items()), now)
+            self._insert_records("comments", list(index["comments"].items()), now)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO users (username, file, stored_at) VALUES (?, ?, ?)",
+                [(username, info["file"], info["stored_at"])
+                 for username, info in index["users"].items()]
+            )
+            self.conn.executemany(
+                "INSERT INTO searches (search_id, query, file, count, timestamp) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(search["search_id"], search.get("query"), search["file"],
+                  search.get("count"), search["timestamp"])
+                 for search in index["searches"]]
+            )
+            self.conn.execute(
+                "UPDATE meta SET value = ? WHERE key = 'created_at'", (index["created_at"],)
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported_at', ?)",
+                (datetime.now().isoformat(),)
+            )
+    
+    @synchronized
+    def compact(self):
+        """Intègre le WAL dans la base principale"""
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    @synchronized
+    def close(self):
+        """Ferme la connexion"""
+        if self.conn is None:
+            return
+        self.compact()
+        self.conn.close()
+        self.conn = None
+    
+    @synchronized
+    def add_post(self, post_id: str, file_path: str, subreddit: str, author: str = None):
+        """Ajoute un post à l'index"""
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO posts (id, file, subreddit, author, stored_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (post_id, file_path, subreddit, author, now)
+            )
+            self._touch(now)
+    
+    @synchronized
+    def add_comment(self, comment_id: str, file_path: str, post_id: str, author: str = None):
+        """Ajoute un commentaire à l'index"""
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO comments (id, file, post_id, author, stored_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (comment_id, file_path, post_id, author, now)
+            )
+            self._touch(now)
+    
+    @synchronized
+    def add_posts(self, posts: List[Dict]):
+        """
+        Ajoute un lot de posts à l'index (une seule transaction)
+        
+        Args:
+            posts: Entrées {"id", "file", "subreddit", "author"}
+                   (+ "offset", "length" pour le stockage en segments, "content_hash",
+                   "stored_at" pour conserver la date d'un enregistrement déplacé,
+                   statistiques d'accès et marque d'éviction)
+        """
+        if not posts:
+            return
+        now = datetime.now().isoformat()
+        with self.conn:
+            self._insert_records("posts", [(post["id"], post) for post in posts], now)
+            self._touch(now)
+    
+    @synchronized
+    def add_comments(self, comments: List[Dict]):
+        """
+        Ajoute un lot de commentaires à l'index (une seule transaction)
+        
+        Args:
+            comments: Entrées {"id", "file", "post_id", "author"}
+                      (+ "offset", "length" pour le stockage en segments, "content_hash",
+                      "stored_at" pour conserver la date d'un enregistrement déplacé,
+                      statistiques d'accès et marque d'éviction)
+        """
+        if not comments:
+            return
+        now = datetime.now().isoformat()
+        with self.conn:
+            self._insert_records("comments", [(comment["id"], comment) for comment in comments], now)
+            self._touch(now)
+    
+    @synchronized
+    def add_user(self, username: str, file_path: str):
+        """Ajoute un utilisateur à l'index"""
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO users (username, file, stored_at) VALUES (?, ?, ?)",
+                (username, file_path, now)
+            )
+            self._touch(now)
+    
+    @synchronized
+    def add_search(self, search_id: str, query: str, file_path: str, count: int):
+        """Ajoute une recherche à l'index"""
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO searches (search_id, query, file, count, timestamp) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (search_id, query, file_path, count, now)
+            )
+            self._touch(now)
+    
+    @synchronized
+    def get_post(self, post_id: str) -> Dict:
+        """Récupère les infos d'un post depuis l'index"""
+        row = self.conn.execute("SELECT * FROM posts WHERE id = ?", (post_id,)).fetchone()
+        return self._row_to_dict(row, "id")
+    
+    @synchronized
+    def get_comment(self, comment_id: str) -> Dict:
+        """Récupère les infos d'un commentaire depuis l'index"""
+        row = self.conn.execute("SELECT * FROM comments WHERE id = ?", (comment_id,)).fetchone()
+        return self._row_to_dict(row, "id")
+    
+    @synchronized
+    def get_user(self, username: str) -> Dict:
+        """Récupère les infos d'un utilisateur depuis l'index"""
+        row = self.conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+        return self._row_to_dict(row, "username")
+    
+    @synchronized
+    def get_recent_searches(self, limit: int = 10) -> List[Dict]:
+        """Récupère les recherches récentes"""
+        rows = self.conn.execute(
+            "SELECT search_id, query, file, count, timestamp FROM searches "
+            "ORDER BY seq DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self._row_to_dict(row) for row in reversed(rows)]
+    
+    @synchronized
+    def get_entries(self, kind: str, ids: List[str]) -> Dict[str, Dict]:
+        """
+        Récupère en une fois les entrées de plusieurs posts ou commentaires
+        
+        Args:
+            kind: "posts" ou "comments"
+            ids: IDs recherchés
+        
+        Returns:
+            {id: entrée} pour les IDs présents dans l'index
+        """
+        if kind not in ("posts", "comments"):
+            raise ValueError(f"Type d'entrée invalide: {kind}. Options valides: ['posts', 'comments']")
+        
+        entries = {}
+        ids = list(dict.fromkeys(ids))
+        for start in range(0, len(ids), MAX_QUERY_PARAMS):
+            chunk = ids[start:start + MAX_QUERY_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT * FROM {kind} WHERE id IN ({placeholders})", chunk
+            ).fetchall()
+            for row in rows:
+                entries[row["id"]] = self._row_to_dict(row, "id")
+        return entries
+    
+    def iter_ids(self, kind: str) -> Iterator[str]:
+        """
+        Parcourt les IDs indexés d'un type ("posts", "comments" ou "users").
+        Lecture par pages triées sur la clé primaire: le verrou n'est tenu que
+        le temps de chaque page.
+        """
+        if kind not in ID_COLUMNS:
+            raise ValueError(f"Type d'entrée invalide: {kind}. Options valides: {list(ID_COLUMNS)}")
+        
+        after = ""
+        while True:
+            page = self._id_page(kind, ID_COLUMNS[kind], after)
+            yield from page
+            if len(page) < ID_PAGE_SIZE:
+                return
+            after = page[-1]
+    
+    @synchronized
+    def _id_page(self, table: str, column: str, after: str) -> List[str]:
+        """Page d'IDs strictement supérieurs à after"""
+        rows = self.conn.execute(
+            f"SELECT {column} FROM {table} WHERE {column} > ? ORDER BY {column} LIMIT ?",
+            (after, ID_PAGE_SIZE)
+        ).fetchall()
+        return [row[0] for row in rows]
+    
+    @synchronized
+    def ids_stored_before(self, kind: str, before: str, limit: int) -> List[str]:
+        """
+        IDs d'un type ("posts", "comments" ou "users") stockés avant une date,
+        les plus anciens d'abord
+        """
+        if kind not in ID_COLUMNS:
+            raise ValueError(f"Type d'entrée invalide: {kind}. Options valides: {list(ID_COLUMNS)}")
+        rows = self.conn.execute(
+            f"SELECT {ID_COLUMNS[kind]} FROM {kind} WHERE stored_at < ? ORDER BY stored_at LIMIT ?",
+            (before, limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+    
+    @synchronized
+    def searches_before(self, before: str, limit: int) -> List[Dict]:
+        """Recherches enregistrées avant une date, les plus anciennes d'abord"""
+        rows = self.conn.execute(
+            "SELECT search_id, query, file, count, timestamp FROM searches "
+            "WHERE timestamp < ? ORDER BY seq LIMIT ?", (before, limit)
+        ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+    
+    @synchronized
+    def segment_counts(self, kind: str) -> Dict[str, int]:
+        """Nombre d'entrées encore référencées par segment (fichier)"""
+        if kind not in ("posts", "comments"):
+            raise ValueError(f"Type d'entrée invalide: {kind}. Options valides: ['posts', 'comments']")
+        rows = self.conn.execute(
+            f'SELECT file, COUNT(*) FROM {kind} WHERE "offset" IS NOT NULL GROUP BY file'
+        ).fetchall()
+        return {row[0]: row[1] for row in rows}
+    
+    @synchronized
+    def remove(self, kind: str, ids: List[str]):
+        """
+        Retire des entrées de l'index (une seule transaction)
+        
+        Args:
+            kind: "posts", "comments", "users" ou "searches" (IDs de recherche)
+            ids: IDs à retirer
+        """
+        columns = {**ID_COLUMNS, "searches": "search_id"}
+        if kind not in columns:
+            raise ValueError(f"Type d'entrée invalide: {kind}. Options valides: {list(columns)}")
+        if not ids:
+            return
+        ids = list(ids)
+        with self.conn:
+            for start in range(0, len(ids), MAX_QUERY_PARAMS):
+                chunk = ids[start:start + MAX_QUERY_PARAMS]
+                placeholders = ", ".join("?" * len(chunk))
+                self.conn.execute(f"DELETE FROM {kind} WHERE {columns[kind]} IN ({placeholders})", chunk)
+            self._touch(datetime.now().isoformat())
+    
+    @synchronized
+    def record_accesses(self, kind: str, accesses: Dict[str, Tuple[str, int]]):
+        """
+        Reporte des lectures dans l'index (une seule transaction)
+        
+        Args:
+            kind: "posts" ou "comments"
+            accesses: {id: (dernière lecture, nombre de lectures à ajouter)}
+        """
+        if kind not in PARENT_COLUMNS:
+            raise ValueError(f"Type d'entrée invalide: {kind}. Options valides: {list(PARENT_COLUMNS)}")
+        with self.conn:
+            self.conn.executemany(
+                f"UPDATE {kind} SET last_access = ?, access_count = COALESCE(access_count, 0) + ? "
+                "WHERE id = ?",
+                [(last_access, count, item_id) for item_id, (last_access, count) in accesses.items()]
+            )
+    
+    @synchronized
+    def mark_evicted(self, kind: str, ids: List[str]):
+        """Marque des entrées comme évincées (fichier supprimé, métadonnées conservées)"""
+        if kind not in PARENT_COLUMNS:
+            raise ValueError(f"Type d'entrée invalide: {kind}. Options valides: {list(PARENT_COLUMNS)}")
+        ids = list(ids)
+        with self.conn:
+            for start in range(0, len(ids), MAX_QUERY_PARAMS):
+                chunk = ids[start:start + MAX_QUERY_PARAMS]
+                placeholders = ", ".join("?" * len(chunk))
+                self.conn.execute(f"UPDATE {kind} SET evicted = 1 WHERE id IN ({placeholders})", chunk)
+    
+    @synchronized
+    def eviction_candidates(self, kind: str, policy: str, limit: int) -> List[Dict]:
+        """
+        Entrées évinçables (fichier individuel, non évincées) dans l'ordre de la
+        politique: moins récemment lues ("lru") ou moins souvent lues ("lfu").
+        Une entrée jamais lue compte comme lue à sa date de stockage.
+        
+        Returns:
+            [{"id", "file", "last_access", "access_count"}]
+        """
+        if kind not in PARENT_COLUMNS:
+            raise ValueError(f"Type d'entrée invalide: {kind}. Options valides: {list(PARENT_COLUMNS)}")
+        if policy not in EVICTION_ORDER:
+            raise ValueError(f"Politique d'éviction invalide: {policy}. Options valides: {list(EVICTION_ORDER)}")
+        rows = self.conn.execute(
+            "SELECT id, file, COALESCE(last_access, stored_at) AS last_access, "
+            f"COALESCE(access_count, 0) AS access_count FROM {kind} "
+            f'WHERE evicted IS NULL AND "offset" IS NULL ORDER BY {EVICTION_ORDER[policy]} LIMIT ?',
+            (limit,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    @synchronized
+    def comments_for_post(self, post_id: str) -> List[Dict]:
+        """Récupère les commentaires indexés d'un post"""
+        rows = self.conn.execute(
+            "SELECT * FROM comments WHERE post_id = ? ORDER BY stored_at", (post_id,)
+        ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+    
+    @synchronized
+    def posts_in_subreddit(self, subreddit: str,
+                           since: Union[str, datetime] = None) -> List[Dict]:
+        """Récupère les posts indexés d'un subreddit, éventuellement depuis une date"""
+        if isinstance(since, datetime):
+            since = since.isoformat()
+        rows = self.conn.execute(
+            "SELECT * FROM posts WHERE subreddit = ? AND stored_at >= ? ORDER BY stored_at",
+            (subreddit, since or "")
+        ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+    
+    @synchronized
+    def get_stats(self) -> Dict:
+        """Retourne les statistiques de l'index"""
+        row = self.conn.execute(
+            "SELECT "
+            "(SELECT COUNT(*) FROM posts) AS total_posts, "
+            "(SELECT COUNT(*) FROM comments) AS total_comments, "
+            "(SELECT COUNT(*) FROM users) AS total_users, "
+            "(SELECT COUNT(*) FROM searches) AS total_searches, "
+            "(SELECT COUNT(DISTINCT subreddit) FROM posts) AS total_subreddits, "
+            "(SELECT COUNT(*) FROM posts WHERE evicted IS NOT NULL) AS evicted_posts, "
+            "(SELECT COUNT(*) FROM comments WHERE evicted IS NOT NULL) AS evicted_comments"
+        ).fetchone()
+        stats = dict(row)
+        stats.update({
+            "created_at": self.get_meta("created_at"),
+            "last_updated": self.get_meta("last_updated")
+        })
+        return stats
\ No newline at end of file
@@ -0,0 +1,418 @@
+"""
+Index plein texte des posts et commentaires stockés (BM25)
+Fichier: mcp_servers/reddit_server/storage/text_index.py
+
+Index inversé incrémental sur SQLite: chaque post (titre + selftext) et
+chaque commentaire (body) est découpé en termes normalisés (minuscules,
+sans accents, sans mots vides); les listes de postings (terme -> documents,
+fréquence) sont mises à jour à chaque sauvegarde par le FileManager. Les
+recherches sont classées par BM25 et filtrables par subreddit et par jour
+de création, sans aucun appel à l'API Reddit.
+"""
+
+import math
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from storage.locking import synchronized
+from storage.partitioning import (
+    UNKNOWN_PARTITION, DateLike, day_partition, normalize_day, subreddit_partition
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    subreddit TEXT,
+    day TEXT,
+    length INTEGER NOT NULL,
+    UNIQUE (kind, item_id)
+);
+CREATE INDEX IF NOT EXISTS idx_docs_subreddit ON docs (subreddit, day);
+CREATE INDEX IF NOT EXISTS idx_docs_day ON docs (day);
+
+CREATE TABLE IF NOT EXISTS terms (
+    term_id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE,
+    df INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term_id, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id);
+
+CREATE TABLE IF NOT EXISTS corpus (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO corpus (key, value) VALUES ('doc_count', 0), ('total_length', 0);
+"""
+
+# Champs indexés de chaque type (le titre d'un post compte TITLE_WEIGHT fois)
+TEXT_FIELDS = {
+    "posts": ("title", "selftext"),
+    "comments": ("body",)
+}
+TITLE_WEIGHT = 2
+
+# Mots vides (anglais et français), ignorés à l'indexation comme à la recherche
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have i if in is it its of on or so that the
+their there this to was were will with you your not no do does did
+au aux avec ce ces dans de des du elle en et eux il je la le les leur lui ma mais me
+mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te
+tes toi ton tu un une vos votre vous est sont
+""".split())
+
+# Termes plus longs ignorés (URLs, hashes)
+MAX_TERM_LENGTH = 40
+
+# Textes supprimés ou retirés par Reddit: non indexés
+REMOVED_TEXTS = {"[deleted]", "[removed]"}
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Cache de pages SQLite (Kio): les listes de postings des termes fréquents restent en mémoire
+CACHE_KIB = 64 * 1024
+
+# Nombre maximal de paramètres par requête IN (...)
+MAX_QUERY_PARAMS = 500
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Découpe un texte en termes: minuscules, accents retirés, mots vides et termes d'un caractère écartés"""
+    if not text:
+        return []
+    folded = text.lower()
+    if not folded.isascii():
+        folded = unicodedata.normalize("NFKD", folded)
+        folded = "".join(char for char in folded if not unicodedata.combining(char))
+    return [
+        token for token in _TOKEN_PATTERN.findall(folded)
+        if 1 < len(token) <= MAX_TERM_LENGTH and token not in STOPWORDS
+    ]
+
+
+def document_terms(kind: str, record: Dict) -> List[str]:
+    """Termes indexés d'un post ou d'un commentaire"""
+    terms = []
+    for field in TEXT_FIELDS[kind]:
+        text = record.get(field)
+        if text in REMOVED_TEXTS:
+            continue
+        tokens = tokenize(text)
+        terms.extend(tokens * TITLE_WEIGHT if field == "title" else tokens)
+    return terms
+
+
+class TextIndex:
+    """Index inversé des posts et commentaires, classement BM25"""
+    
+    def __init__(self, db_file: Path, k1: float = 1.2, b: float = 0.75, synchronous: str = "NORMAL"):
+        """
+        Args:
+            db_file: Fichier de la base SQLite de l'index
+            k1: Saturation de la fréquence des termes (BM25)
+            b: Normalisation par la longueur des documents (BM25)
+            synchronous: Niveau PRAGMA synchronous
+        """
+        self.db_file = db_file
+        self.k1 = k1
+        self.b = b
+        # Connexion d'écriture (thread d'écriture, statistiques)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(db_file), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        # Connexion de lecture des recherches: en WAL, elle lit le dernier état validé
+        # sans attendre le verrou tenu par le thread d'écriture pendant add()
+        self._read_lock = threading.Lock()
+        self.read_conn = sqlite3.connect(str(db_file), check_same_thread=False)
+        self.read_conn.row_factory = sqlite3.Row
+        self.read_conn.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+        self.read_conn.execute("PRAGMA query_only=ON")
+        
+        self.queries = 0
+        self.query_ms_total = 0.0
+    
+    def _corpus(self, conn: sqlite3.Connection = None) -> Tuple[int, int]:
+        """(nombre de documents, longueur totale)"""
+        rows = dict((conn or self.conn).execute("SELECT key, value FROM corpus").fetchall())
+        return rows["doc_count"], rows["total_length"]
+    
+    def _term_ids(self, terms: Iterable[str], create: bool = False) -> Dict[str, int]:
+        """Identifiants des termes (créés à df = 0 si create)"""
+        terms = list(terms)
+        if create:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO terms (term, df) VALUES (?, 0)", [(term,) for term in terms]
+            )
+        ids = {}
+        for start in range(0, len(terms), MAX_QUERY_PARAMS):
+            chunk = terms[start:start + MAX_QUERY_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self.conn.execute(
+                f"SELECT term, term_id FROM terms WHERE term IN ({placeholders})", chunk
+            ):
+                ids[row["term"]] = row["term_id"]
+        return ids
+    
+    def _remove_docs(self, doc_ids: List[int]) -> Tuple[int, int]:
+        """
+        Retire des documents et leurs postings (transaction de l'appelant)
+        
+        Returns:
+            (documents retirés, longueur totale retirée)
+        """
+        removed = 0
+        length = 0
+        for start in range(0, len(doc_ids), MAX_QUERY_PARAMS):
+            chunk = doc_ids[start:start + MAX_QUERY_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            df = self.conn.execute(
+                f"SELECT term_id, COUNT(*) FROM postings WHERE doc_id IN ({placeholders}) GROUP BY term_id", chunk
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE terms SET df = df - ? WHERE term_id = ?", [(count, term_id) for term_id, count in df]
+            )
+            self.conn.execute(f"DELETE FROM postings WHERE doc_id IN ({placeholders})", chunk)
+            row = self.conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs WHERE doc_id IN ({placeholders})", chunk
+            ).fetchone()
+            removed += row[0]
+            length += row[1]
+            self.conn.execute(f"DELETE FROM docs WHERE doc_id IN ({placeholders})", chunk)
+        return removed, length
+    
+    def _doc_ids(self, kind: str, ids: List[str]) -> List[int]:
+        """Identifiants internes des documents d'un type"""
+        doc_ids = []
+        for start in range(0, len(ids), MAX_QUERY_PARAMS):
+            chunk = ids[start:start + MAX_QUERY_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            doc_ids.extend(
+                row[0] for row in self.conn.execute(
+                    f"SELECT doc_id FROM docs WHERE kind = ? AND item_id IN ({placeholders})", [kind, *chunk]
+                )
+            )
+        return doc_ids
+    
+    def _update_corpus(self, doc_delta: int, length_delta: int):
+        """Met à jour les statistiques du corpus (transaction de l'appelant)"""
+        self.conn.execute("UPDATE corpus SET value = value + ? WHERE key = 'doc_count'", (doc_delta,))
+        self.conn.execute("UPDATE corpus SET value = value + ? WHERE key = 'total_length'", (length_delta,))
+    
+    @synchronized
+    def add(self, kind: str, records: List[Dict], subreddits: List[Optional[str]]):
+        """
+        Indexe (ou réindexe) un lot de posts ou commentaires en une transaction
+        
+        Args:
+            kind: "posts" ou "comments"
+            records: Enregistrements (la dernière occurrence d'un ID l'emporte)
+            subreddits: Subreddit de chaque enregistrement (celui du post pour un commentaire)
+        """
+        latest = {}
+        for record, subreddit in zip(records, subreddits):
+            latest[record["id"]] = (record, subreddit)
+        if not latest:
+            return
+        
+        documents = [
+            (item_id, subreddit, record, Counter(document_terms(kind, record)))
+            for item_id, (record, subreddit) in latest.items()
+        ]
+        with self.conn:
+            removed, removed_length = self._remove_docs(self._doc_ids(kind, list(latest)))
+            term_ids = self._term_ids({term for *_, counts in documents for term in counts}, create=True)
+            
+            # Identifiants attribués ici (sous verrou) pour insérer documents et postings par lots
+            next_id = self.conn.execute("SELECT COALESCE(MAX(doc_id), 0) FROM docs").fetchone()[0] + 1
+            docs = []
+            postings = []
+            df = Counter()
+            for doc_id, (item_id, subreddit, record, counts) in enumerate(documents, start=next_id):
+                docs.append((doc_id, kind, item_id, subreddit_partition(subreddit), day_partition(record),
+                             sum(counts.values())))
+                for term, tf in counts.items():
+                    postings.append((term_ids[term], doc_id, tf))
+                    df[term_ids[term]] += 1
+            
+            self.conn.executemany(
+                "INSERT INTO docs (doc_id, kind, item_id, subreddit, day, length) VALUES (?, ?, ?, ?, ?, ?)", docs
+            )
+            self.conn.executemany("INSERT INTO postings (term_id, doc_id, tf) VALUES (?, ?, ?)", postings)
+            self.conn.executemany(
+                "UPDATE terms SET df = df + ? WHERE term_id = ?", [(count, term_id) for term_id, count in df.items()]
+            )
+            self._update_corpus(len(documents) - removed, sum(doc[-1] for doc in docs) - removed_length)
+    
+    @synchronized
+    def remove(self, kind: str, ids: List[str]) -> int:
+        """Retire des documents de l'index; retourne le nombre retiré"""
+        with self.conn:
+            removed, length = self._remove_docs(self._doc_ids(kind, list(ids)))
+            self._update_corpus(-removed, -length)
+        return removed
+    
+    @synchronized
+    def clear(self):
+        """Vide l'index (avant une reconstruction complète)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM postings")
+            self.conn.execute("DELETE FROM docs")
+            self.conn.execute("DELETE FROM terms")
+            self.conn.execute("UPDATE corpus SET value = 0")
+    
+    def search(self, query: str, kinds: Iterable[str] = ("posts", "comments"), subreddit: str = None,
+               since: DateLike = None, until: DateLike = None, limit: int = 10,
+               match: str = "all") -> Dict:
+        """
+        Recherche des documents par BM25
+        
+        Args:
+            query: Texte de la recherche (découpé comme les documents)
+            kinds: Types recherchés ("posts", "comments")
+            subreddit: Ne retourne que ce subreddit (tous si None)
+            since: Premier jour de création inclus (yyyy-mm-dd, date ou datetime)
+            until: Dernier jour de création inclus
+            limit: Nombre maximal de résultats
+            match: "all" (tous les termes requis) ou "any" (au moins un)
+        
+        Returns:
+            {"terms": termes recherchés, "ignored": termes absents du corpus,
+             "total": documents correspondants, "hits": [{"kind", "id", "subreddit", "day", "score"}],
+             "took_ms"}
+        """
+        started = time.perf_counter()
+        with self._read_lock:
+            # Une seule transaction de lecture: termes, corpus et postings du même état
+            self.read_conn.execute("BEGIN")
+            try:
+                result = self._search(self.read_conn, query, kinds, subreddit, since, until, limit, match)
+            finally:
+                self.read_conn.rollback()
+        
+        took_ms = (time.perf_counter() - started) * 1000
+        self.queries += 1
+        self.query_ms_total += took_ms
+        result["took_ms"] = round(took_ms, 2)
+        return result
+    
+    def _search(self, conn: sqlite3.Connection, query: str, kinds: Iterable[str], subreddit: Optional[str],
+                since: DateLike, until: DateLike, limit: int, match: str) -> Dict:
+        """Recherche BM25 sur une connexion (voir search)"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        result = {"terms": terms, "ignored": [], "total": 0, "hits": []}
+        
+        rows = conn.execute(
+            f"SELECT term, term_id, df FROM terms WHERE term IN ({', '.join('?' * len(terms))}) AND df > 0",
+            terms
+        ).fetchall() if terms else []
+        found = {row["term"]: row for row in rows}
+        result["ignored"] = [term for term in terms if term not in found]
+        
+        if found and not (match == "all" and result["ignored"]):
+            doc_count, total_length = self._corpus(conn)
+            avg_length = total_length / doc_count if doc_count else 1.0
+            # IDF BM25 (variante toujours positive)
+            weights = [
+                (row["term_id"], math.log(1 + (doc_count - row["df"] + 0.5) / (row["df"] + 0.5)))
+                for row in found.values()
+            ]
+            
+            kinds = list(kinds)
+            filters = [f"d.kind IN ({', '.join('?' * len(kinds))})"]
+            params = list(kinds)
+            if subreddit is not None:
+                filters.append("d.subreddit = ?")
+                params.append(subreddit_partition(subreddit))
+            since, until = normalize_day(since), normalize_day(until)
+            if since is not None or until is not None:
+                # Documents sans date de création: exclus dès qu'une période est demandée (comme in_period)
+                filters.append("d.day != ?")
+                params.append(UNKNOWN_PARTITION)
+            if since is not None:
+                filters.append("d.day >= ?")
+                params.append(since)
+            if until is not None:
+                filters.append("d.day <= ?")
+                params.append(until)
+            having = f"HAVING COUNT(*) = {len(weights)}" if match == "all" else ""
+            
+            matching = f"""
+                WITH q (term_id, idf) AS (VALUES {', '.join(['(?, ?)'] * len(weights))}),
+                     bm25 (k1, b, avg_length) AS (SELECT ?, ?, ?)
+                SELECT d.kind, d.item_id, d.subreddit, d.day,
+                       SUM(q.idf * p.tf * (bm25.k1 + 1)
+                           / (p.tf + bm25.k1 * (1 - bm25.b + bm25.b * d.length / bm25.avg_length))) AS score
+                FROM q
+                JOIN postings p ON p.term_id = q.term_id
+                JOIN docs d ON d.doc_id = p.doc_id
+                CROSS JOIN bm25
+                WHERE {' AND '.join(filters)}
+                GROUP BY p.doc_id
+                {having}
+            """
+            params = [value for weight in weights for value in weight] + [self.k1, self.b, avg_length] + params
+            
+            # Nombre total de correspondances calculé dans la même passe (fenêtre évaluée avant LIMIT)
+            rows = conn.execute(
+                f"SELECT *, COUNT(*) OVER () AS total FROM ({matching}) ORDER BY score DESC LIMIT ?",
+                params + [limit]
+            ).fetchall()
+            result["total"] = rows[0]["total"] if rows else 0
+            result["hits"] = [
+                {
+                    "kind": row["kind"],
+                    "id": row["item_id"],
+                    "subreddit": row["subreddit"],
+                    "day": row["day"],
+                    "score": round(row["score"], 4)
+                }
+                for row in rows
+            ]
+        
+        return result
+    
+    @synchronized
+    def get_stats(self) -> Dict:
+        """Retourne la taille de l'index et le temps moyen des recherches"""
+        doc_count, total_length = self._corpus()
+        by_kind = dict(self.conn.execute("SELECT kind, COUNT(*) FROM docs GROUP BY kind").fetchall())
+        return {
+            "documents": doc_count,
+            "posts": by_kind.get("posts", 0),
+            "comments": by_kind.get("comments", 0),
+            "terms": self.conn.execute("SELECT COUNT(*) FROM terms WHERE df > 0").fetchone()[0],
+            "avg_length": round(total_length / doc_count, 1) if doc_count else 0,
+            "queries": self.queries,
+            "avg_query_ms": round(self.query_ms_total / self.queries, 2) if self.queries else 0
+        }
+    
+    @synchronized
+    def __len__(self) -> int:
+        return self._corpus()[0]
+    
+    @synchronized
+    def close(self):
+        """Ferme la base"""
+        with self._read_lock:
+            self.read_conn.close()
+        self.conn.close()
\ No newline at end of file
@@ -0,0 +1,260 @@
+"""
+Fils de discussion: commentaires d'un post stockés en un document arborescent
+Fichier: mcp_servers/reddit_server/storage/threads.py
+
+Chaque post a un document threads/{post_id}.jsonl:
+- ligne 1: structure précalculée de l'arbre (ids, parent, profondeur,
+  taille de sous-arbre, tableau d'adjacence des enfants, racines, offsets)
+- puis un commentaire par ligne, en ordre préfixe (parcours en profondeur),
+  les enfants de chaque nœud triés par score décroissant
+
+En ordre préfixe, le sous-arbre du nœud i occupe les positions
+[i, i + subtree_size[i]): un sous-arbre, comme les k meilleures branches
+(les k premières racines), se lit en un seul seek dans le fichier, sans
+charger le reste du fil.
+"""
+
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from storage.durability import GroupCommitter, atomic_write_bytes
+from storage.record_cache import RecordCache
+from utils.serializer import JSONSerializer
+
+# Version du format de document (ligne d'en-tête)
+THREAD_FORMAT = 1
+
+# Critères de classement des branches (get_top_branches)
+BRANCH_ORDERS = ["score", "size"]
+
+
+def _score(comment: Dict) -> int:
+    """Score d'un commentaire (0 s'il est absent)"""
+    score = comment.get("score")
+    return score if isinstance(score, (int, float)) else 0
+
+
+def build_thread(post_id: str, comments: List[Dict]) -> Tuple[List[Dict], Dict]:
+    """
+    Construit l'arbre d'un fil à partir de ses commentaires (dans un ordre quelconque)
+    
+    Le parent est résolu par parent_id ("t1_<id>" pour un commentaire,
+    "t3_<id>" pour le post). Un commentaire dont le parent n'est pas dans
+    le fil (non collecté) devient une racine.
+    
+    Args:
+        post_id: ID du post
+        comments: Commentaires du post (un par ID)
+    
+    Returns:
+        (commentaires en ordre préfixe, structure de l'arbre indexée par position)
+    """
+    position = {comment["id"]: i for i, comment in enumerate(comments)}
+    children = [[] for _ in comments]
+    roots = []
+    for i, comment in enumerate(comments):
+        parent_id = comment.get("parent_id") or ""
+        parent = position.get(parent_id[3:]) if parent_id.startswith("t1_") else None
+        if parent is None or parent == i:
+            roots.append(i)
+        else:
+            children[parent].append(i)
+    
+    def by_score(i: int):
+        return (-_score(comments[i]), comments[i].get("created_utc") or "", comments[i]["id"])
+    
+    # Parcours préfixe itératif (pas de récursion: fils profonds). Les nœuds
+    # non atteints sont sur un cycle de parent_id (données incohérentes): le
+    # premier de chaque cycle devient une racine.
+    order = []
+    depth = [0] * len(comments)
+    tree_parent = {}
+    visited = [False] * len(comments)
+    stack = [(i, -1) for i in sorted(roots, key=by_score, reverse=True)]
+    next_unvisited = 0
+    while stack or len(order) < len(comments):
+        if not stack:
+            while visited[next_unvisited]:
+                next_unvisited += 1
+            roots.append(next_unvisited)
+            stack.append((next_unvisited, -1))
+        i, parent = stack.pop()
+        if visited[i]:
+            continue
+        visited[i] = True
+        tree_parent[i] = parent
+        order.append(i)
+        depth[i] = depth[parent] + 1 if parent >= 0 else 0
+        stack.extend((child, i) for child in sorted(children[i], key=by_score, reverse=True))
+    
+    new_position = {old: new for new, old in enumerate(order)}
+    ordered = [comments[i] for i in order]
+    parent = [new_position[tree_parent[old]] if tree_parent[old] >= 0 else -1 for old in order]
+    tree_children = [[] for _ in order]
+    for new, old in enumerate(order):
+        tree_children[new] = [
+            new_position[child] for child in sorted(children[old], key=by_score)
+            if tree_parent[child] == old
+        ]
+    
+    # Taille des sous-arbres: en ordre préfixe inverse, chaque enfant est vu avant son parent
+    subtree_size = [1] * len(order)
+    for i in range(len(order) - 1, -1, -1):
+        if parent[i] >= 0:
+            subtree_size[parent[i]] += subtree_size[i]
+    
+    structure = {
+        "format": THREAD_FORMAT,
+        "post_id": post_id,
+        "count": len(ordered),
+        "ids": [comment["id"] for comment in ordered],
+        "parent": parent,
+        "depth": [depth[i] for i in order],
+        "subtree_size": subtree_size,
+        "children": tree_children,
+        "roots": sorted(new_position[i] for i in roots),
+        "scores": [_score(comment) for comment in ordered]
+    }
+    return ordered, structure
+
+
+def nest_comments(structure: Dict, start: int, comments: List[Dict],
+                  max_depth: Optional[int] = None) -> List[Dict]:
+    """
+    Imbrique une plage contiguë de commentaires en ordre préfixe
+    
+    Args:
+        structure: Structure du fil
+        start: Position du premier commentaire de la plage
+        comments: Commentaires des positions start, start+1, ...
+        max_depth: Profondeur maximale sous le premier commentaire (None: illimitée)
+    
+    Returns:
+        Nœuds de premier niveau de la plage, chacun avec "depth",
+        "subtree_size" et ses réponses imbriquées ("replies")
+    """
+    depths = structure["depth"]
+    base = depths[start] if comments else 0
+    top = []
+    stack = []
+    for offset, comment in enumerate(comments):
+        i = start + offset
+        if max_depth is not None and depths[i] - base > max_depth:
+            continue
+        node = {
+            **comment,
+            "depth": depths[i],
+            "subtree_size": structure["subtree_size"][i],
+            "replies": []
+        }
+        while stack and stack[-1]["depth"] >= depths[i]:
+            stack.pop()
+        (stack[-1]["replies"] if stack else top).append(node)
+        stack.append(node)
+    return top
+
+
+class ThreadStore:
+    """Documents de fil (un fichier par post) lisibles par plages"""
+    
+    def __init__(self, root: Path, json_backend: str = "auto", committer: GroupCommitter = None,
+                 cache: RecordCache = None):
+        """
+        Args:
+            root: Dossier des documents de fil
+            json_backend: Backend de sérialisation (voir JSONSerializer)
+            committer: Politique de durabilité des écritures
+            cache: Cache des en-têtes déjà décodés (optionnel)
+        """
+        self.root = Path(root)
+        self.committer = committer
+        self.cache = cache
+        # Une ligne par commentaire: toujours en sortie compacte
+        self.serializer = JSONSerializer(json_backend)
+    
+    def path(self, post_id: str) -> Path:
+        """Document de fil d'un post"""
+        return self.root / f"{post_id}.jsonl"
+    
+    def exists(self, post_id: str) -> bool:
+        """True si le post a un document de fil"""
+        return self.path(post_id).exists()
+    
+    def write(self, post_id: str, comments: List[Dict]) -> Dict:
+        """
+        Construit et écrit (atomiquement) le document de fil d'un post
+        
+        Args:
+            post_id: ID du post
+            comments: Tous les commentaires du fil
+        
+        Returns:
+            Structure écrite
+        """
+        ordered, structure = build_thread(post_id, comments)
+        lines = [self.serializer.dumps_bytes(comment) + b"\n" for comment in ordered]
+        offsets = [0]
+        for line in lines:
+            offsets.append(offsets[-1] + len(line))
+        structure["offsets"] = offsets
+        structure["updated_at"] = datetime.now().isoformat()
+        
+        self.root.mkdir(parents=True, exist_ok=True)
+        header = self.serializer.dumps_bytes(structure) + b"\n"
+        atomic_write_bytes(self.path(post_id), header + b"".join(lines), self.committer)
+        return structure
+    
+    def read_structure(self, post_id: str) -> Optional[Dict]:
+        """Lit uniquement la ligne d'en-tête d'un document de fil (None si absent)"""
+        try:
+            with open(self.path(post_id), 'rb') as f:
+                return self.serializer.loads(f.readline())
+        except FileNotFoundError:
+            return None
+    
+    def read_ranges(self, post_id: str, select: Callable[[Dict], List[Tuple[int, int]]]
+                    ) -> Optional[Tuple[Dict, List[List[Dict]]]]:
+        """
+        Lit l'en-tête puis des plages [début, fin) de positions, un seek et une
+        lecture par plage. L'en-tête décodé est mis en cache, versionné par le
+        fichier ouvert (inode, mtime, taille): une réécriture concurrente
+        (rename) ne désynchronise jamais l'en-tête des plages lues.
+        
+        Args:
+            post_id: ID du post
+            select: Fonction structure -> plages à lire
+        
+        Returns:
+            (structure, commentaires de chaque plage), None si le post n'a pas de fil
+        """
+        try:
+            f = open(self.path(post_id), 'rb')
+        except FileNotFoundError:
+            return None
+        with f:
+            stat = os.fstat(f.fileno())
+            version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            structure = self.cache.get(("threads", post_id), version) if self.cache else None
+            if structure is None:
+                header = f.readline()
+                structure = self.serializer.loads(header)
+                structure["body_start"] = len(header)
+                if self.cache is not None:
+                    self.cache.put(("threads", post_id), version, structure, len(header))
+            offsets = structure["offsets"]
+            results = []
+            for start, end in select(structure):
+                f.seek(structure["body_start"] + offsets[start])
+                data = f.read(offsets[end] - offsets[start])
+                results.append([self.serializer.loads(line) for line in data.splitlines()])
+        return structure, results
+    
+    def read_all(self, post_id: str) -> List[Dict]:
+        """Lit tous les commentaires d'un fil (en ordre préfixe)"""
+        found = self.read_ranges(post_id, lambda structure: [(0, structure["count"])])
+        return found[1][0] if found else []
+    
+    def delete(self, post_id: str):
+        """Supprime le document de fil d'un post"""
+        self.path(post_id).unlink(missing_ok=True)
\ No newline at end of file
@@ -0,0 +1,456 @@
+"""
+Index vectoriel des posts stockés (similarité, recherche approchée)
+Fichier: mcp_servers/reddit_server/storage/vector_index.py
+
+Chaque post (titre + selftext) est représenté par un vecteur calculé sur
+CPU, sans modèle ni réseau: les termes et bigrammes (mêmes règles que
+l'index plein texte) sont hachés puis projetés aléatoirement (projection
+creuse, graine fixe) dans VECTOR_DIM dimensions, et normalisés.
+
+La recherche des plus proches voisins (cosinus) est approchée par un index
+IVF: les vecteurs sont répartis entre ~sqrt(N) listes autour de centroïdes
+(k-means sphérique) et seules les VECTOR_NPROBE listes les plus proches de
+la requête sont comparées. En dessous de VECTOR_TRAIN_MIN_POSTS vecteurs,
+la comparaison est exhaustive. Les centroïdes sont réentraînés quand le
+nombre de vecteurs a doublé depuis le dernier entraînement.
+
+Les vecteurs sont persistés dans SQLite (un BLOB par post) et chargés en
+mémoire à la première utilisation.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from storage.locking import synchronized
+from storage.text_index import REMOVED_TEXTS, TITLE_WEIGHT, tokenize
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# L'index vectoriel est désactivé (avec un avertissement) quand numpy est absent
+NUMPY_AVAILABLE = numpy is not None
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vectors (
+    post_id TEXT PRIMARY KEY,
+    list_no INTEGER NOT NULL,
+    vector BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS centroids (
+    list_no INTEGER PRIMARY KEY,
+    vector BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Espace de hachage des termes, projeté ensuite dans dim dimensions
+HASH_BUCKETS = 1 << 20
+# Dimensions non nulles de la projection de chaque terme haché
+PROJECTION_NONZEROS = 4
+# Graine de la projection: la changer invalide tous les vecteurs stockés
+PROJECTION_SEED = 20240101
+
+# Entraînement des centroïdes: échantillon maximal et itérations de k-means
+TRAIN_SAMPLE = 20000
+KMEANS_ITERATIONS = 10
+# Lignes par bloc lors de l'affectation des vecteurs aux listes
+ASSIGN_CHUNK = 10000
+
+# Liste des vecteurs sans centroïde (index pas encore entraîné)
+NO_LIST = -1
+
+
+def post_features(record: Dict) -> List[str]:
+    """Termes (le titre compte TITLE_WEIGHT fois) et bigrammes d'un post"""
+    features = []
+    for field in ("title", "selftext"):
+        text = record.get(field)
+        if text in REMOVED_TEXTS:
+            continue
+        tokens = tokenize(text)
+        bigrams = [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+        features.extend((tokens + bigrams) * TITLE_WEIGHT if field == "title" else tokens + bigrams)
+    return features
+
+
+class VectorIndex:
+    """Vecteurs des posts et index IVF des plus proches voisins"""
+    
+    def __init__(self, db_file: Path, dim: int = 256, nprobe: int = 16,
+                 train_min: int = 2048, synchronous: str = "NORMAL"):
+        """
+        Args:
+            db_file: Fichier de la base SQLite des vecteurs
+            dim: Dimension des vecteurs
+            nprobe: Nombre de listes IVF comparées par recherche
+            train_min: Nombre de vecteurs à partir duquel l'index IVF est entraîné
+            synchronous: Niveau PRAGMA synchronous
+        """
+        if numpy is None:
+            raise ValueError("L'index vectoriel nécessite le paquet 'numpy'")
+        if not 0 < dim <= numpy.iinfo(numpy.int16).max:
+            raise ValueError(f"Dimension des vecteurs invalide: {dim}")
+        
+        self.db_file = db_file
+        self.dim = dim
+        self.nprobe = max(1, nprobe)
+        self.train_min = max(1, train_min)
+        # Vecteurs et connexion partagés entre les recherches (pool de threads) et le thread d'écriture
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(db_file), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.executescript(SCHEMA)
+        
+        stored_dim = self._get_meta("dim")
+        if stored_dim is None:
+            with self.conn:
+                self._set_meta("dim", dim)
+        elif int(stored_dim) != dim:
+            raise ValueError(
+                f"Dimension des vecteurs invalide: {dim} (index créé en {stored_dim}). "
+                f"Reconstruisez l'index vectoriel ou rétablissez REDDIT_VECTOR_DIM={stored_dim}"
+            )
+        
+        # Projection creuse, générée à la première utilisation (_projection)
+        self._projection_dims = None
+        self._projection_signs = None
+        
+        # Vecteurs en mémoire, chargés à la première utilisation (_ensure_loaded)
+        self._loaded = False
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix = numpy.zeros((0, dim), dtype=numpy.float32)
+        self._lists = numpy.zeros(0, dtype=numpy.int32)
+        self._alive = numpy.zeros(0, dtype=bool)
+        self._count = 0
+        self._centroids = None
+        self._members: Dict[int, List[int]] = {}
+        self.trained_size = 0
+        
+        self.queries = 0
+        self.query_ms_total = 0.0
+        self.candidates_total = 0
+        self.trainings = 0
+    
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _set_meta(self, key: str, value):
+        """Écrit une valeur de la table meta (transaction de l'appelant)"""
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+    
+    def _projection(self):
+        """Dimensions et signes (±1) de la projection de chaque terme haché"""
+        # Les vecteurs étant normalisés, l'échelle de la projection est sans effet
+        if self._projection_dims is None:
+            rng = numpy.random.default_rng(PROJECTION_SEED)
+            self._projection_dims = rng.integers(
+                0, self.dim, size=(HASH_BUCKETS, PROJECTION_NONZEROS), dtype=numpy.int16
+            )
+            self._projection_signs = rng.integers(
+                0, 2, size=(HASH_BUCKETS, PROJECTION_NONZEROS), dtype=numpy.int8
+            ) * 2 - 1
+        return self._projection_dims, self._projection_signs
+    
+    def embed(self, records: List[Dict]) -> "numpy.ndarray":
+        """
+        Vecteurs normalisés d'un lot de posts (ligne nulle si le post n'a aucun terme)
+        
+        Returns:
+            Matrice (len(records), dim) en float32
+        """
+        doc_rows = []
+        buckets = []
+        weights = []
+        for row, record in enumerate(records):
+            counts = {}
+            for feature in post_features(record):
+                counts[feature] = counts.get(feature, 0) + 1
+            for feature, tf in counts.items():
+                doc_rows.append(row)
+                buckets.append(zlib.crc32(feature.encode("utf-8")) & (HASH_BUCKETS - 1))
+                # Fréquence amortie: un terme répété ne domine pas le vecteur
+                weights.append(1.0 + math.log(tf))
+        
+        vectors = numpy.zeros(len(records) * self.dim, dtype=numpy.float64)
+        if buckets:
+            dims, signs = self._projection()
+            buckets = numpy.array(buckets)
+            cells = numpy.array(doc_rows)[:, None] * self.dim + dims[buckets].astype(numpy.int64)
+            values = signs[buckets] * numpy.array(weights, dtype=numpy.float32)[:, None]
+            vectors += numpy.bincount(cells.ravel(), weights=values.ravel(), minlength=vectors.size)
+        vectors = vectors.reshape(len(records), self.dim).astype(numpy.float32)
+        norms = numpy.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / numpy.where(norms > 0, norms, 1.0)
+    
+    def _ensure_loaded(self):
+        """Charge les vecteurs et centroïdes persistés (une seule fois)"""
+        if self._loaded:
+            return
+        rows = self.conn.execute("SELECT list_no, vector FROM centroids ORDER BY list_no").fetchall()
+        if rows:
+            self._centroids = numpy.frombuffer(b"".join(row[1] for row in rows), dtype=numpy.float32).reshape(-1, self.dim)
+        self.trained_size = int(self._get_meta("trained_size") or 0)
+        
+        rows = self.conn.execute("SELECT post_id, list_no, vector FROM vectors").fetchall()
+        self._ids = [row[0] for row in rows]
+        self._rows = {post_id: i for i, post_id in enumerate(self._ids)}
+        self._count = len(rows)
+        if rows:
+            self._matrix = numpy.frombuffer(b"".join(row[2] for row in rows), dtype=numpy.float32).reshape(-1, self.dim).copy()
+        self._lists = numpy.array([row[1] for row in rows], dtype=numpy.int32)
+        self._alive = numpy.ones(self._count, dtype=bool)
+        self._rebuild_members()
+        self._loaded = True
+    
+    def _rebuild_members(self):
+        """Reconstruit les listes IVF (lignes de chaque liste) à partir des affectations"""
+        self._members = {}
+        for row in numpy.flatnonzero(self._alive[:self._count]):
+            self._members.setdefault(int(self._lists[row]), []).append(int(row))
+    
+    def _grow(self, needed: int):
+        """Agrandit les tableaux en mémoire (capacité doublée)"""
+        capacity = len(self._matrix)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        matrix = numpy.zeros((capacity, self.dim), dtype=numpy.float32)
+        matrix[:self._count] = self._matrix[:self._count]
+        lists = numpy.full(capacity, NO_LIST, dtype=numpy.int32)
+        lists[:self._count] = self._lists[:self._count]
+        alive = numpy.zeros(capacity, dtype=bool)
+        alive[:self._count] = self._alive[:self._count]
+        self._matrix, self._lists, self._alive = matrix, lists, alive
+    
+    def _assign(self, vectors: "numpy.ndarray") -> "numpy.ndarray":
+        """Liste IVF (centroïde le plus proche) de chaque vecteur"""
+        if self._centroids is None:
+            return numpy.full(len(vectors), NO_LIST, dtype=numpy.int32)
+        lists = numpy.empty(len(vectors), dtype=numpy.int32)
+        for start in range(0, len(vectors), ASSIGN_CHUNK):
+            chunk = vectors[start:start + ASSIGN_CHUNK]
+            lists[start:start + len(chunk)] = numpy.argmax(chunk @ self._centroids.T, axis=1)
+        return lists
+    
+    def _drop_rows(self, post_ids: List[str]) -> int:
+        """Marque les lignes de posts comme supprimées (retirées des listes à la compaction)"""
+        dropped = 0
+        for post_id in post_ids:
+            row = self._rows.pop(post_id, None)
+            if row is not None:
+                self._alive[row] = False
+                self._ids[row] = None
+                dropped += 1
+        return dropped
+    
+    @synchronized
+    def add(self, records: List[Dict]):
+        """
+        Calcule et enregistre (ou remplace) les vecteurs d'un lot de posts.
+        Les posts sans aucun terme (titre et texte vides ou supprimés) sont retirés.
+        """
+        latest = {record["id"]: record for record in records}
+        if not latest:
+            return
+        self._ensure_loaded()
+        post_ids = list(latest)
+        vectors = self.embed(list(latest.values()))
+        has_terms = numpy.any(vectors != 0, axis=1)
+        kept = [post_id for post_id, keep in zip(post_ids, has_terms) if keep]
+        vectors = vectors[has_terms]
+        lists = self._assign(vectors)
+        
+        with self.conn:
+            self.conn.executemany("DELETE FROM vectors WHERE post_id = ?", [(post_id,) for post_id in post_ids])
+            self.conn.executemany(
+                "INSERT INTO vectors (post_id, list_no, vector) VALUES (?, ?, ?)",
+                [(post_id, int(list_no), vector.tobytes()) for post_id, list_no, vector in zip(kept, lists, vectors)]
+            )
+        
+        # Une nouvelle version remplace l'ancienne ligne (ajoutée en fin de tableau)
+        self._drop_rows(post_ids)
+        self._grow(self._count + len(kept))
+        start = self._count
+        self._matrix[start:start + len(kept)] = vectors
+        self._lists[start:start + len(kept)] = lists
+        self._alive[start:start + len(kept)] = True
+        for offset, (post_id, list_no) in enumerate(zip(kept, lists)):
+            self._ids.append(post_id)
+            self._rows[post_id] = start + offset
+            self._members.setdefault(int(list_no), []).append(start + offset)
+        self._count += len(kept)
+        
+        size = len(self._rows)
+        if size >= self.train_min and size >= 2 * self.trained_size:
+            self.train()
+        elif self._count > 2 * size + 1024:
+            self._compact()
+    
+    @synchronized
+    def remove(self, post_ids: List[str]) -> int:
+        """Retire des posts de l'index; retourne le nombre retiré"""
+        self._ensure_loaded()
+        with self.conn:
+            self.conn.executemany("DELETE FROM vectors WHERE post_id = ?", [(post_id,) for post_id in post_ids])
+        return self._drop_rows(post_ids)
+    
+    @synchronized
+    def clear(self):
+        """Vide l'index (avant une reconstruction complète)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM vectors")
+            self.conn.execute("DELETE FROM centroids")
+            self._set_meta("trained_size", 0)
+        self._loaded = False
+        self._centroids = None
+        self._ensure_loaded()
+    
+    def _compact(self):
+        """Retire des tableaux en mémoire les lignes supprimées ou remplacées"""
+        keep = numpy.flatnonzero(self._alive[:self._count])
+        self._matrix = self._matrix[keep]
+        self._lists = self._lists[keep]
+        self._ids = [self._ids[row] for row in keep]
+        self._rows = {post_id: i for i, post_id in enumerate(self._ids)}
+        self._count = len(keep)
+        self._alive = numpy.ones(self._count, dtype=bool)
+        self._rebuild_members()
+    
+    def _kmeans(self, data: "numpy.ndarray", nlist: int, rng) -> "numpy.ndarray":
+        """k-means sphérique (similarité cosinus) sur des vecteurs normalisés"""
+        centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = numpy.argmax(data @ centroids.T, axis=1)
+            sums = numpy.zeros_like(centroids)
+            numpy.add.at(sums, assignment, data)
+            counts = numpy.bincount(assignment, minlength=nlist)
+            # Liste vide: centroïde réinitialisé sur un vecteur tiré au hasard
+            empty = numpy.flatnonzero(counts == 0)
+            sums[empty] = data[rng.choice(len(data), len(empty))]
+            norms = numpy.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / numpy.where(norms > 0, norms, 1.0)
+        return centroids.astype(numpy.float32)
+    
+    @synchronized
+    def train(self):
+        """Entraîne les centroïdes (~sqrt(N) listes) puis réaffecte tous les vecteurs"""
+        self._ensure_loaded()
+        self._compact()
+        size = self._count
+        if size == 0:
+            return
+        nlist = max(1, int(math.sqrt(size)))
+        rng = numpy.random.default_rng(PROJECTION_SEED + size)
+        sample = self._matrix[rng.choice(size, min(size, TRAIN_SAMPLE), replace=False)]
+        self._centroids = self._kmeans(sample, min(nlist, len(sample)), rng)
+        self._lists = self._assign(self._matrix[:size])
+        self._rebuild_members()
+        self.trained_size = size
+        self.trainings += 1
+        
+        with self.conn:
+            self.conn.execute("DELETE FROM centroids")
+            self.conn.executemany(
+                "INSERT INTO centroids (list_no, vector) VALUES (?, ?)",
+                [(list_no, centroid.tobytes()) for list_no, centroid in enumerate(self._centroids)]
+            )
+            self.conn.executemany(
+                "UPDATE vectors SET list_no = ? WHERE post_id = ?",
+                [(int(list_no), post_id) for post_id, list_no in zip(self._ids, self._lists)]
+            )
+            self._set_meta("trained_size", size)
+    
+    def _search(self, query: "numpy.ndarray", k: int, exclude: Optional[str] = None) -> Dict:
+        """Plus proches voisins d'un vecteur normalisé (sous verrou)"""
+        started = time.perf_counter()
+        if self._centroids is None or not numpy.any(query):
+            candidates = numpy.flatnonzero(self._alive[:self._count])
+        else:
+            probe = numpy.argsort(-(self._centroids @ query))[:self.nprobe]
+            rows = [self._members.get(int(list_no), []) for list_no in probe]
+            # Vecteurs ajoutés avant le premier entraînement et jamais réaffectés
+            rows.append(self._members.get(NO_LIST, []))
+            candidates = numpy.fromiter((row for members in rows for row in members), dtype=numpy.int64)
+            candidates = candidates[self._alive[candidates]]
+        
+        scores = self._matrix[candidates] @ query
+        if exclude is not None and exclude in self._rows:
+            scores[candidates == self._rows[exclude]] = -numpy.inf
+        top = min(k, len(candidates))
+        best = numpy.argpartition(-scores, top - 1)[:top] if top else numpy.zeros(0, dtype=numpy.int64)
+        best = best[numpy.argsort(-scores[best])]
+        hits = [
+            {"id": self._ids[candidates[i]], "score": round(float(scores[i]), 4)}
+            for i in best if scores[i] > -numpy.inf
+        ]
+        
+        took_ms = (time.perf_counter() - started) * 1000
+        self.queries += 1
+        self.query_ms_total += took_ms
+        self.candidates_total += len(candidates)
+        return {"hits": hits, "candidates": int(len(candidates)), "took_ms": round(took_ms, 2)}
+    
+    @synchronized
+    def similar_to_post(self, post_id: str, k: int = 10, record: Dict = None) -> Optional[Dict]:
+        """
+        Posts les plus proches d'un post indexé (ou de son enregistrement s'il
+        ne l'est pas encore); None si le post est inconnu de l'index et sans enregistrement
+        """
+        self._ensure_loaded()
+        row = self._rows.get(post_id)
+        if row is not None:
+            query = self._matrix[row]
+        elif record is not None:
+            query = self.embed([record])[0]
+        else:
+            return None
+        return self._search(query, k, exclude=post_id)
+    
+    @synchronized
+    def similar_to_text(self, text: str, k: int = 10) -> Dict:
+        """Posts les plus proches d'un texte libre (traité comme le selftext d'un post)"""
+        self._ensure_loaded()
+        return self._search(self.embed([{"selftext": text}])[0], k)
+    
+    @synchronized
+    def __len__(self) -> int:
+        if self._loaded:
+            return len(self._rows)
+        return self.conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+    
+    @synchronized
+    def get_stats(self) -> Dict:
+        """Retourne la taille de l'index, son état d'entraînement et le coût moyen des recherches"""
+        return {
+            "loaded": self._loaded,
+            "vectors": len(self),
+            "dim": self.dim,
+            "lists": len(self._centroids) if self._centroids is not None else 0,
+            "nprobe": self.nprobe,
+            "trained_size": self.trained_size,
+            "trainings": self.trainings,
+            "queries": self.queries,
+            "avg_query_ms": round(self.query_ms_total / self.queries, 2) if self.queries else 0,
+            "avg_candidates": round(self.candidates_total / self.queries, 1) if self.queries else 0
+        }
+    
+    @synchronized
+    def close(self):
+        """Ferme la base"""
+        self.conn.close()
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+Configuration des tests
+Fichier: mcp_servers/reddit_server/tests/conftest.py
+
+Les modules du serveur s'importent à plat depuis reddit_server/ (comme
+server.py): le dossier est ajouté au chemin d'import.
+
+Usage (depuis reddit_server/):
+    python -m pytest -q
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def config(tmp_path):
+    """RedditConfig dont les dossiers et fichiers de données sont dans tmp_path"""
+    from config import RedditConfig
+    
+    attrs = {"DATA_DIR": tmp_path}
+    for name in dir(RedditConfig):
+        value = getattr(RedditConfig, name)
+        if name.endswith(("_DIR", "_FILE")) and name != "DATA_DIR" and isinstance(value, Path):
+            attrs[name] = tmp_path / value.relative_to(RedditConfig.DATA_DIR)
+    test_config = type("TestConfig", (RedditConfig,), attrs)
+    test_config.create_directories()
+    return test_config
+
+
+@pytest.fixture
+def file_manager(config):
+    """FileManager sur la configuration de test (fermé après le test)"""
+    from storage.backends import create_index_manager
+    from storage.file_manager import FileManager
+    
+    index_manager = create_index_manager(config)
+    manager = FileManager(config, index_manager)
+    yield manager
+    manager.close()
+    index_manager.close()
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Tests du pool d'exécution des appels à l'API (limites par outil, voies, mesures)
+Fichier: mcp_servers/reddit_server/tests/test_api_pool.py
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from utils.api_pool import ApiCallPool, parse_tool_limits
+
+
+@pytest.fixture
+def pool():
+    pool = ApiCallPool(pool_size=2, fast_pool_size=1, tool_limits={"collect_user_data": 2})
+    yield pool
+    pool.close()
+
+
+def test_parse_tool_limits():
+    assert parse_tool_limits(" collect_user_data=2, collect_post_comments=4 ,") == {
+        "collect_user_data": 2, "collect_post_comments": 4
+    }
+    assert parse_tool_limits("") == {}
+    for spec in ("collect_user_data=0", "collect_user_data", "=3", "collect_user_data=x"):
+        with pytest.raises(ValueError):
+            parse_tool_limits(spec)
+
+
+def test_invalid_pool_size_rejected():
+    with pytest.raises(ValueError):
+        ApiCallPool(pool_size=0)
+
+
+def test_tool_limit_caps_concurrent_calls(pool):
+    running = []
+    peak = []
+    
+    async def execute(arguments):
+        running.append(arguments)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(arguments)
+        return arguments
+    
+    async def run():
+        limited = [pool.run_tool("collect_user_data", execute, i) for i in range(5)]
+        return await asyncio.gather(*limited)
+    
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+    assert max(peak) == 2
+    stats = pool.get_stats()["tools"]["collect_user_data"]
+    assert stats["calls"] == 5 and stats["waiting"] == 0 and stats["running"] == 0
+    assert stats["max_wait_ms"] > 0
+
+
+def test_unlimited_tool_runs_without_waiting(pool):
+    peak = []
+    running = []
+    
+    async def execute(arguments):
+        running.append(arguments)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(arguments)
+    
+    async def run():
+        await asyncio.gather(*(pool.run_tool("search_reddit", execute, i) for i in range(4)))
+    
+    asyncio.run(run())
+    
+    assert max(peak) == 4
+
+
+def test_failed_tool_is_counted_and_releases_its_slot(pool):
+    async def fail(arguments):
+        raise RuntimeError("échec")
+    
+    async def succeed(arguments):
+        return "ok"
+    
+    async def run():
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await pool.run_tool("collect_user_data", fail, None)
+        return await asyncio.wait_for(pool.run_tool("collect_user_data", succeed, None), 5)
+    
+    assert asyncio.run(run()) == "ok"
+    stats = pool.get_stats()["tools"]["collect_user_data"]
+    assert (stats["calls"], stats["errors"]) == (4, 3)
+
+
+def test_blocking_calls_run_in_their_lane(pool):
+    release = threading.Event()
+    
+    def slow(value):
+        release.wait(5)
+        return (value, threading.current_thread().name)
+    
+    def quick(value):
+        return (value, threading.current_thread().name)
+    
+    async def run():
+        # Les deux threads de la voie principale occupés: la voie rapide répond quand même
+        busy = [asyncio.create_task(pool.run(slow, i)) for i in range(2)]
+        while pool.get_stats()["lanes"]["default"]["running"] < 2:
+            await asyncio.sleep(0.01)
+        fast = await asyncio.wait_for(pool.run(quick, "fast", lane="fast"), 5)
+        assert not any(task.done() for task in busy)
+        release.set()
+        return fast, await asyncio.gather(*busy)
+    
+    fast, busy = asyncio.run(run())
+    
+    assert fast[0] == "fast" and fast[1].startswith("reddit-api-fast")
+    assert [value for value, _ in busy] == [0, 1]
+    assert all(name.startswith("reddit-api_") for _, name in busy)
+    lanes = pool.get_stats()["lanes"]
+    assert (lanes["default"]["calls"], lanes["default"]["threads"]) == (2, 2)
+    assert (lanes["fast"]["calls"], lanes["fast"]["threads"]) == (1, 1)
+
+
+def test_blocking_call_error_propagates(pool):
+    def fail():
+        raise ValueError("échec")
+    
+    with pytest.raises(ValueError):
+        asyncio.run(pool.run(fail))
+    
+    stats = pool.get_stats()["lanes"]["default"]
+    assert (stats["calls"], stats["errors"], stats["running"], stats["waiting"]) == (1, 1, 0, 0)
+
+
+def test_from_config(config):
+    config.API_POOL_SIZE = 3
+    config.API_FAST_POOL_SIZE = 1
+    config.API_TOOL_CONCURRENCY = "collect_post_comments=4"
+    
+    pool = ApiCallPool.from_config(config)
+    
+    assert (pool.pool_size, pool.fast_pool_size) == (3, 1)
+    assert pool.get_stats()["tool_limits"] == {"collect_post_comments": 4}
+    pool.close()
\ No newline at end of file
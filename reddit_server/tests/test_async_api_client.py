@@ -0,0 +1,158 @@
+"""
+Tests des clients asynchrones de l'API Reddit (pool de threads, ordonnanceur, collecte incrémentale)
+Fichier: mcp_servers/reddit_server/tests/test_async_api_client.py
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("praw")
+
+import utils.async_api_client as async_api_client
+from utils.api_pool import ApiCallPool
+from utils.async_api_client import ThreadedRedditAPIClient, create_api_client
+from utils.rate_limiter import estimate_requests
+
+LIMITS = {"remaining": 500, "used": 100, "reset_timestamp": None}
+
+
+class FakeBlocking:
+    """RedditAPIClient sans réseau: note le thread de chaque appel"""
+    
+    def __init__(self, pages=None):
+        self.reddit = SimpleNamespace(auth=SimpleNamespace(limits=LIMITS))
+        self.threads = {}
+        self.release = threading.Event()
+        self.release.set()
+        self.pages = pages or {}
+        self.page_calls = []
+    
+    def get_subreddit_posts(self, subreddit, sort, limit, time_filter):
+        self.threads["get_subreddit_posts"] = threading.current_thread().name
+        self.release.wait(5)
+        return [{"id": "p1", "subreddit": subreddit}]
+    
+    def get_post_by_id(self, post_id):
+        self.threads["get_post_by_id"] = threading.current_thread().name
+        return {"id": post_id}
+    
+    def get_comment_by_id(self, comment_id):
+        raise Exception(f"Erreur lors de la récupération du commentaire {comment_id}")
+    
+    def get_new_posts_page(self, subreddit, limit, after):
+        self.page_calls.append(after)
+        return self.pages[after]
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.acquired = []
+        self.observed = []
+    
+    async def acquire(self, cost, priority):
+        self.acquired.append((cost, priority))
+    
+    def observe(self, limits):
+        self.observed.append(limits)
+
+
+@pytest.fixture
+def pool():
+    pool = ApiCallPool(pool_size=1, fast_pool_size=1)
+    yield pool
+    pool.close()
+
+
+def threaded_client(pool, blocking, scheduler=None) -> ThreadedRedditAPIClient:
+    client = ThreadedRedditAPIClient("id", "secret", "tests", pool, scheduler)
+    client.blocking = blocking
+    return client
+
+
+def test_calls_go_through_the_scheduler(pool):
+    scheduler = FakeScheduler()
+    client = threaded_client(pool, FakeBlocking(), scheduler)
+    
+    posts = asyncio.run(client.get_subreddit_posts("python", limit=250, priority="bulk"))
+    
+    assert posts == [{"id": "p1", "subreddit": "python"}]
+    assert scheduler.acquired == [(estimate_requests(250), "bulk")]
+    assert scheduler.observed == [LIMITS]
+
+
+def test_quota_observed_even_when_the_call_fails(pool):
+    scheduler = FakeScheduler()
+    client = threaded_client(pool, FakeBlocking(), scheduler)
+    
+    with pytest.raises(Exception, match="commentaire c1"):
+        asyncio.run(client.get_comment_by_id("c1"))
+    
+    assert scheduler.observed == [LIMITS]
+    assert pool.get_stats()["lanes"]["fast"]["errors"] == 1
+
+
+def test_short_calls_use_the_fast_lane_while_the_pool_is_busy(pool):
+    blocking = FakeBlocking()
+    blocking.release.clear()
+    client = threaded_client(pool, blocking)
+    
+    async def run():
+        # Seul thread de la voie principale occupé par un long appel
+        slow = asyncio.create_task(client.get_subreddit_posts("python"))
+        while "get_subreddit_posts" not in blocking.threads:
+            await asyncio.sleep(0.01)
+        post = await asyncio.wait_for(client.get_post_by_id("p2"), 5)
+        assert not slow.done()
+        blocking.release.set()
+        await slow
+        return post
+    
+    assert asyncio.run(run()) == {"id": "p2"}
+    assert blocking.threads["get_subreddit_posts"].startswith("reddit-api_")
+    assert blocking.threads["get_post_by_id"].startswith("reddit-api-fast")
+
+
+def new_post(number: int) -> dict:
+    return {"id": f"p{number}", "created_timestamp": 1000 + number}
+
+
+def test_new_posts_stop_at_the_cursor(pool):
+    blocking = FakeBlocking(pages={
+        None: ([new_post(9), new_post(8)], "t3_p8"),
+        "t3_p8": ([new_post(7), new_post(6)], "t3_p6")
+    })
+    client = threaded_client(pool, blocking)
+    
+    result = asyncio.run(client.get_new_posts("python", cursor={"fullname": "t3_p6", "created_utc": 1006}))
+    
+    assert [p["id"] for p in result["posts"]] == ["p9", "p8", "p7"]
+    assert blocking.page_calls == [None, "t3_p8"]
+    assert result["reached_cursor"] and result["complete"]
+
+
+def test_new_posts_complete_at_the_end_of_the_listing(pool):
+    blocking = FakeBlocking(pages={None: ([new_post(2), new_post(1)], None)})
+    client = threaded_client(pool, blocking)
+    
+    result = asyncio.run(client.get_new_posts("python", cursor=None))
+    
+    assert result["pages"] == 1
+    assert result["complete"] and not result["reached_cursor"]
+
+
+def test_invalid_backend_rejected(config):
+    config.API_BACKEND = "curl"
+    
+    with pytest.raises(ValueError, match="Backend d'API invalide"):
+        create_api_client(config)
+
+
+def test_asyncpraw_backend_requires_the_package(config, monkeypatch):
+    config.API_BACKEND = "asyncpraw"
+    monkeypatch.setattr(async_api_client, "asyncpraw", None)
+    
+    with pytest.raises(ValueError, match="asyncpraw"):
+        create_api_client(config)
\ No newline at end of file
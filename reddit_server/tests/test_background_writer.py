@@ -0,0 +1,132 @@
+"""
+Tests du thread d'écriture (fusion des lots, ordre, erreurs)
+Fichier: mcp_servers/reddit_server/tests/test_background_writer.py
+"""
+
+import asyncio
+
+import pytest
+
+from storage.background_writer import BackgroundWriter
+
+
+class FakeCommitter:
+    interval = 0.05
+    
+    def __init__(self):
+        self.commits = 0
+    
+    def commit(self):
+        self.commits += 1
+    
+    def commit_if_due(self):
+        pass
+
+
+class FakeStorage:
+    """FileManager simulé: enregistre les appels reçus par le thread d'écriture"""
+    
+    def __init__(self):
+        self.committer = FakeCommitter()
+        self.calls = []
+    
+    def save_posts(self, posts):
+        self.calls.append(("save_posts", [post["id"] for post in posts]))
+        return {
+            "paths": [f"posts/{post['id']}.json" for post in posts],
+            "statuses": ["unchanged" if post.get("same") else "new" for post in posts],
+            "count": len(posts)
+        }
+    
+    def save_user_data(self, username, data):
+        self.calls.append(("save_user_data", username))
+        if data is None:
+            raise ValueError("données manquantes")
+        return f"users/{username}.json"
+
+
+def posts(*ids, same=False):
+    return [{"id": post_id, "same": same} for post_id in ids]
+
+
+def run_queued(storage, *calls):
+    """Dépose tous les appels avant de démarrer le thread (un seul lot)"""
+    async def run():
+        writer = BackgroundWriter(storage)
+        tasks = [asyncio.create_task(call(writer)) for call in calls]
+        await asyncio.sleep(0)
+        writer.start()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        writer.close()
+        return results, writer.get_stats()
+    return asyncio.run(run())
+
+
+def test_consecutive_saves_are_merged_and_split_back():
+    storage = FakeStorage()
+    results, stats = run_queued(
+        storage,
+        lambda writer: writer.save_posts(posts("a", "b")),
+        lambda writer: writer.save_posts(posts("c", same=True))
+    )
+    
+    assert storage.calls == [("save_posts", ["a", "b", "c"])]
+    assert results[0]["paths"] == ["posts/a.json", "posts/b.json"]
+    assert (results[0]["count"], results[0]["new"]) == (2, 2)
+    assert (results[1]["count"], results[1]["unchanged"], results[1]["new"]) == (1, 1, 0)
+    assert stats["batches_written"] == 1 and stats["items_written"] == 2
+
+
+def test_other_calls_keep_the_queue_order():
+    storage = FakeStorage()
+    run_queued(
+        storage,
+        lambda writer: writer.save_posts(posts("a")),
+        lambda writer: writer.save_user_data("alice", {}),
+        lambda writer: writer.save_posts(posts("b"))
+    )
+    
+    assert storage.calls == [("save_posts", ["a"]), ("save_user_data", "alice"), ("save_posts", ["b"])]
+
+
+def test_errors_reach_the_caller_only():
+    storage = FakeStorage()
+    results, stats = run_queued(
+        storage,
+        lambda writer: writer.save_user_data("alice", None),
+        lambda writer: writer.save_user_data("bob", {})
+    )
+    
+    assert isinstance(results[0], ValueError)
+    assert results[1] == "users/bob.json"
+    assert stats["errors"] == 1
+
+
+def test_flush_waits_for_queued_writes():
+    storage = FakeStorage()
+    
+    async def run():
+        writer = BackgroundWriter(storage)
+        writer.start()
+        task = asyncio.create_task(writer.save_posts(posts("a")))
+        await asyncio.sleep(0)
+        await writer.flush()
+        assert storage.calls == [("save_posts", ["a"])]
+        await task
+        writer.close()
+    
+    asyncio.run(run())
+    # Fermeture: fsync groupé final
+    assert storage.committer.commits >= 1
+
+
+@pytest.mark.parametrize("sizes", [[1], [2, 3], [0, 2]])
+def test_split_result(sizes):
+    total = sum(sizes)
+    merged = {"paths": list(range(total)), "statuses": ["new"] * total, "count": total}
+    
+    parts = BackgroundWriter._split_result(merged, sizes)
+    
+    assert [part["count"] for part in parts] == sizes
+    assert [part["new"] for part in parts] == sizes
+    assert sum((part["paths"] for part in parts), []) == list(range(total))
\ No newline at end of file
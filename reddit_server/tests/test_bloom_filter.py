@@ -0,0 +1,73 @@
+"""
+Tests du filtre de Bloom des IDs collectés
+Fichier: mcp_servers/reddit_server/tests/test_bloom_filter.py
+"""
+
+import pytest
+
+from storage.backends import create_index_manager
+from storage.bloom_filter import ScalableBloomFilter
+from storage.file_manager import FileManager
+
+
+def test_grows_without_false_negatives():
+    bloom = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+    
+    added = bloom.update(f"posts:p{i}" for i in range(1000))
+    
+    assert len(bloom.filters) > 1
+    assert all(f"posts:p{i}" in bloom for i in range(1000))
+    assert added == len(bloom)
+    false_positives = sum(1 for i in range(10000) if f"posts:other{i}" in bloom)
+    assert false_positives / 10000 < 0.02
+
+
+def test_save_and_load_round_trip(tmp_path):
+    bloom = ScalableBloomFilter(initial_capacity=50, error_rate=0.01)
+    bloom.update(f"posts:p{i}" for i in range(200))
+    bloom.save(tmp_path / "known_ids.bloom")
+    
+    loaded = ScalableBloomFilter.load(tmp_path / "known_ids.bloom")
+    
+    assert len(loaded) == len(bloom) and len(loaded.filters) == len(bloom.filters)
+    assert all(f"posts:p{i}" in loaded for i in range(200))
+    assert loaded.initial_capacity == 50
+
+
+def test_truncated_file_rejected(tmp_path):
+    bloom = ScalableBloomFilter(initial_capacity=50)
+    bloom.update(["posts:p1"])
+    bloom.save(tmp_path / "known_ids.bloom")
+    data = (tmp_path / "known_ids.bloom").read_bytes()
+    (tmp_path / "known_ids.bloom").write_bytes(data[:len(data) // 2])
+    
+    with pytest.raises(ValueError):
+        ScalableBloomFilter.load(tmp_path / "known_ids.bloom")
+
+
+def open_manager(config):
+    index_manager = create_index_manager(config)
+    return FileManager(config, index_manager), index_manager
+
+
+def test_filter_persisted_on_close_and_rebuilt_after_a_crash(config):
+    manager, index_manager = open_manager(config)
+    manager.save_posts([{"id": "p1", "title": "post", "subreddit": "python"}])
+    manager.close()
+    index_manager.close()
+    assert config.BLOOM_FILE.exists()
+    
+    # Chargé puis supprimé: un arrêt brutal laisse le fichier absent
+    manager, index_manager = open_manager(config)
+    assert not config.BLOOM_FILE.exists()
+    assert manager.filter_known("posts", ["p1", "p2"]) == {"p1"}
+    manager.save_posts([{"id": "p2", "title": "post", "subreddit": "python"}])
+    crashed = (manager, index_manager)
+    
+    # Filtre reconstruit depuis l'index: aucun ID stocké n'est perdu
+    manager, index_manager = open_manager(config)
+    assert manager.filter_known("posts", ["p1", "p2", "p3"]) == {"p1", "p2"}
+    manager.close()
+    index_manager.close()
+    for closable in crashed:
+        closable.close()
\ No newline at end of file
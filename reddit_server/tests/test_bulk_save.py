@@ -0,0 +1,43 @@
+"""
+Tests de la sauvegarde groupée des posts et commentaires
+Fichier: mcp_servers/reddit_server/tests/test_bulk_save.py
+"""
+
+
+def post(number: int) -> dict:
+    return {"id": f"p{number}", "title": f"post {number}", "author": "alice", "subreddit": "python",
+            "created_utc": "2024-01-01T00:00:00", "score": number}
+
+
+def comment(number: int, post_id: str = "p1") -> dict:
+    return {"id": f"c{number}", "post_id": post_id, "parent_id": f"t3_{post_id}",
+            "author": "bob", "body": f"comment {number}", "score": number}
+
+
+def test_save_posts_single_index_write(file_manager, monkeypatch):
+    batches = []
+    add_posts = file_manager.index.add_posts
+    monkeypatch.setattr(file_manager.index, "add_posts", lambda entries: batches.append(entries) or add_posts(entries))
+    
+    result = file_manager.save_posts([post(i) for i in range(5)])
+    
+    assert len(batches) == 1 and len(batches[0]) == 5
+    assert result["count"] == 5 and result["new"] == 5
+    assert [file_manager.get_post(f"p{i}")["score"] for i in range(5)] == list(range(5))
+
+
+def test_save_comments_indexed_under_their_post(file_manager):
+    result = file_manager.save_comments([comment(2), comment(1), comment(3)])
+    
+    assert len(result["paths"]) == 3
+    assert [file_manager.get_comment(f"c{i}")["body"] for i in (1, 2, 3)] == [f"comment {i}" for i in (1, 2, 3)]
+    assert {entry["id"] for entry in file_manager.index.comments_for_post("p1")} == {"c1", "c2", "c3"}
+
+
+def test_duplicate_ids_in_a_batch_keep_the_last(file_manager):
+    updated = {**post(1), "score": 99}
+    
+    result = file_manager.save_posts([post(1), updated])
+    
+    assert result["paths"][0] == result["paths"][1]
+    assert file_manager.get_post("p1")["score"] == 99
\ No newline at end of file
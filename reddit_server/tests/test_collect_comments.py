@@ -0,0 +1,71 @@
+"""
+Tests de l'outil collect_post_comments (skip_known sans appel à l'API)
+Fichier: mcp_servers/reddit_server/tests/test_collect_comments.py
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from storage.background_writer import BackgroundWriter
+
+
+def post() -> dict:
+    return {"id": "p1", "title": "Titre", "author": "alice", "subreddit": "python",
+            "created_utc": "2024-01-01T00:00:00", "score": 10}
+
+
+def comments() -> list:
+    return [
+        {"id": "c1", "post_id": "p1", "parent_id": "t3_p1", "body": "a", "score": 3},
+        {"id": "c2", "post_id": "p1", "parent_id": "t1_c1", "body": "b", "score": 1}
+    ]
+
+
+class FakeApi:
+    def __init__(self):
+        self.calls = 0
+    
+    async def get_post_with_comments(self, post_id, limit, priority, max_staleness):
+        self.calls += 1
+        return post(), comments()
+
+
+def test_thread_summary(file_manager):
+    assert file_manager.thread_summary("p1") is None
+    
+    saved = file_manager.save_post_comments(post(), comments())
+    
+    assert saved["thread"] == {"comments": 2, "branches": 1, "max_depth": 1}
+    assert file_manager.thread_summary("p1") == saved["thread"]
+
+
+def test_skip_known_does_not_call_the_api(file_manager):
+    pytest.importorskip("mcp.types")
+    from tools.collect_comments import CollectCommentsTool
+    
+    async def run():
+        writer = BackgroundWriter(file_manager)
+        writer.start()
+        api = FakeApi()
+        tool = CollectCommentsTool(api, file_manager, writer)
+        results = []
+        for arguments in ({"post_id": "p1"},
+                          {"post_id": "p1", "skip_known": True},
+                          {"post_id": "p1", "skip_known": True, "max_staleness": 0}):
+            response = await tool.execute(arguments)
+            results.append((json.loads(response[0].text), api.calls))
+        await writer.flush()
+        writer.close()
+        return results
+    
+    (first, calls1), (skipped, calls2), (refreshed, calls3) = asyncio.run(run())
+    
+    assert first["status"] == "success" and calls1 == 1
+    # Post et fil déjà stockés: aucun appel à l'API
+    assert skipped["skipped"] and calls2 == 1
+    assert skipped["thread"]["comments"] == 2
+    assert skipped["post"]["title"] == "Titre"
+    # max_staleness=0: recollecte demandée
+    assert "skipped" not in refreshed and calls3 == 2
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""
+Tests de la détection des changements par hash de contenu
+Fichier: mcp_servers/reddit_server/tests/test_content_hash.py
+"""
+
+import os
+
+from storage.content_hash import content_hash
+
+
+def post(score: int = 1, retrieved_at: str = "2024-01-01T00:00:00") -> dict:
+    return {"id": "p1", "title": "post", "subreddit": "python", "score": score, "retrieved_at": retrieved_at}
+
+
+def test_hash_ignores_retrieval_time_and_key_order():
+    assert content_hash(post()) == content_hash(post(retrieved_at="2024-06-01T00:00:00"))
+    assert content_hash({"a": 1, "b": 2}) == content_hash({"b": 2, "a": 1})
+    assert content_hash(post(score=1)) != content_hash(post(score=2))
+
+
+def test_unchanged_post_is_not_rewritten(file_manager):
+    first = file_manager.save_posts([post()])
+    path = file_manager.index.get_post("p1")["file"]
+    mtime = os.stat(path).st_mtime_ns
+    
+    again = file_manager.save_posts([post(retrieved_at="2024-06-01T00:00:00")])
+    
+    assert first["statuses"] == ["new"]
+    assert again["statuses"] == ["unchanged"] and again["paths"] == [path]
+    assert os.stat(path).st_mtime_ns == mtime
+
+
+def test_changed_post_is_rewritten(file_manager):
+    file_manager.save_posts([post(score=1)])
+    
+    result = file_manager.save_posts([post(score=5)])
+    
+    assert result["statuses"] == ["updated"]
+    assert file_manager.get_post("p1")["score"] == 5
+    assert file_manager.index.get_post("p1")["content_hash"] == content_hash(post(score=5))
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Tests des curseurs de collecte incrémentale
+Fichier: mcp_servers/reddit_server/tests/test_cursors.py
+"""
+
+import json
+from datetime import datetime
+
+from storage.cursors import CursorStore
+
+
+def post(number: int) -> dict:
+    return {
+        "id": f"p{number}",
+        "created_utc": f"2024-01-01T00:{number:02d}:00",
+        "created_timestamp": 1704067200.0 + number * 60
+    }
+
+
+def test_advance_to_newest_post(tmp_path):
+    cursors = CursorStore(tmp_path / "cursors.json")
+    cursor = cursors.advance("Python", "new", [post(3), post(5), post(4)])
+    
+    assert cursor["fullname"] == "t3_p5"
+    assert cursor["created_utc"] == post(5)["created_timestamp"]
+    # Nom de subreddit insensible à la casse
+    assert cursors.get("python", "new")["fullname"] == "t3_p5"
+    assert cursors.get("python", "hot") is None
+
+
+def test_advance_never_moves_backwards(tmp_path):
+    cursors = CursorStore(tmp_path / "cursors.json")
+    cursors.advance("python", "new", [post(5)])
+    
+    assert cursors.advance("python", "new", [post(2)])["fullname"] == "t3_p5"
+    assert cursors.advance("python", "new", [])["fullname"] == "t3_p5"
+    assert cursors.advance("rust", "new", []) is None
+    assert len(cursors) == 1
+
+
+def test_cursors_persist(tmp_path):
+    CursorStore(tmp_path / "cursors.json").advance("python", "new", [post(7)])
+    
+    assert CursorStore(tmp_path / "cursors.json").get("python", "new")["fullname"] == "t3_p7"
+
+
+def test_incomplete_collection_keeps_cursor_and_records_resume_point(tmp_path):
+    cursors = CursorStore(tmp_path / "cursors.json")
+    cursors.advance("python", "new", [post(1)])
+    
+    cursor = cursors.advance("python", "new", [post(9), post(8), post(7)], complete=False)
+    assert cursor["fullname"] == "t3_p1"
+    assert cursor["resume"] == {
+        "after": "t3_p7",
+        "newest": {"fullname": "t3_p9", "created_utc": post(9)["created_timestamp"]}
+    }
+    
+    # Reprise encore incomplète: "after" recule, "newest" reste celui de la première collecte
+    cursor = cursors.advance("python", "new", [post(6), post(5)], complete=False)
+    assert cursor["fullname"] == "t3_p1"
+    assert cursor["resume"]["after"] == "t3_p5"
+    assert cursor["resume"]["newest"]["fullname"] == "t3_p9"
+    
+    # Reprise complète: le curseur passe au plus récent post collecté depuis l'ancien curseur
+    cursor = cursors.advance("python", "new", [post(4), post(3), post(2)], complete=True)
+    assert cursor["fullname"] == "t3_p9"
+    assert "resume" not in cursor
+
+
+def test_incomplete_first_collection(tmp_path):
+    cursors = CursorStore(tmp_path / "cursors.json")
+    
+    cursor = cursors.advance("python", "new", [post(9), post(8)], complete=False)
+    assert "fullname" not in cursor
+    assert cursor["resume"]["after"] == "t3_p8"
+    
+    # Fin du listing atteinte sans nouveau post
+    cursor = cursors.advance("python", "new", [], complete=True)
+    assert cursor["fullname"] == "t3_p9"
+    assert "resume" not in cursor
+
+
+def test_incomplete_collection_without_posts_changes_nothing(tmp_path):
+    cursors = CursorStore(tmp_path / "cursors.json")
+    cursors.advance("python", "new", [post(1)])
+    
+    assert cursors.advance("python", "new", [], complete=False) == cursors.get("python", "new")
+    assert "resume" not in cursors.get("python", "new")
+
+
+def test_positions_compare_epoch_seconds_across_dst_fall_back(tmp_path):
+    cursors = CursorStore(tmp_path / "cursors.json")
+    # Heure répétée au passage à l'heure d'hiver: la date locale du post le plus
+    # récent (01:10, deuxième passage) précède celle du plus ancien (01:50)
+    older = {"id": "a", "created_utc": "2024-11-03T01:50:00", "created_timestamp": 1730613000.0}
+    newer = {"id": "b", "created_utc": "2024-11-03T01:10:00", "created_timestamp": 1730614200.0}
+    
+    assert cursors.advance("python", "new", [older, newer])["fullname"] == "t3_b"
+    assert cursors.advance("python", "new", [older])["fullname"] == "t3_b"
+
+
+def test_legacy_iso_cursor_is_migrated(tmp_path):
+    legacy = {"python:new": {"fullname": "t3_p5", "created_utc": "2024-01-01T00:05:00", "updated_at": "x"}}
+    (tmp_path / "cursors.json").write_text(json.dumps(legacy))
+    
+    cursor = CursorStore(tmp_path / "cursors.json").get("python", "new")
+    assert cursor["created_utc"] == datetime.fromisoformat("2024-01-01T00:05:00").timestamp()
\ No newline at end of file
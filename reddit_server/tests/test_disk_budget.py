@@ -0,0 +1,113 @@
+"""
+Tests du budget disque, de l'éviction LRU et de la récupération des évincés
+Fichier: mcp_servers/reddit_server/tests/test_disk_budget.py
+"""
+
+import asyncio
+
+import pytest
+
+from storage.backends import create_index_manager
+from storage.disk_budget import DiskBudget, directory_size
+from storage.file_manager import FileManager
+from storage.refetcher import Refetcher
+
+
+def post(number: int) -> dict:
+    return {"id": f"p{number}", "title": f"post {number}", "subreddit": "python", "selftext": "x" * 2000}
+
+
+@pytest.fixture
+def budget_manager(config):
+    """FileManager avec budget disque (lectures comptées pour l'éviction)"""
+    config.DISK_BUDGET_BYTES = 1
+    config.EVICTION_POLICY = "lru"
+    index_manager = create_index_manager(config)
+    manager = FileManager(config, index_manager)
+    yield manager
+    manager.close()
+    index_manager.close()
+
+
+def test_evicts_least_recently_read_down_to_the_low_watermark(config, budget_manager):
+    budget_manager.save_posts([post(i) for i in range(10)])
+    for i in range(5, 10):
+        budget_manager.get_post(f"p{i}")
+    budget = DiskBudget(config, budget_manager)
+    budget.check()
+    used = budget.used_bytes
+    budget.budget_bytes = int(used * 0.7)
+    
+    while budget.evict_step():
+        pass
+    
+    assert budget.used_bytes <= budget.budget_bytes * config.DISK_LOW_WATERMARK
+    assert budget.measure() == budget.used_bytes
+    evicted = {i for i in range(10) if budget_manager.index.get_post(f"p{i}").get("evicted")}
+    assert evicted and evicted <= set(range(5))
+
+
+def test_reading_an_evicted_post_requests_its_refetch(budget_manager):
+    requests = []
+    budget_manager.set_refetcher(lambda kind, item_id: requests.append((kind, item_id)))
+    budget_manager.save_posts([post(1)])
+    
+    budget_manager.evict("posts", ["p1"])
+    
+    assert budget_manager.get_post("p1") is None
+    assert requests == [("posts", "p1")]
+    assert budget_manager.filter_known("posts", ["p1"]) == {"p1"}
+
+
+def test_directory_size(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "x.json").write_bytes(b"x" * 10)
+    (tmp_path / "y.json").write_bytes(b"y" * 5)
+    
+    assert directory_size(tmp_path) == 15
+    assert directory_size(tmp_path / "missing") == 0
+
+
+class FakeApi:
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+    
+    async def get_post_by_id(self, post_id, priority):
+        self.calls.append((post_id, priority))
+        await self.release.wait()
+        return None if post_id == "gone" else post(1)
+    
+    async def get_comment_by_id(self, comment_id, priority):
+        return None
+
+
+class FakeWriter:
+    def __init__(self):
+        self.submitted = []
+    
+    async def submit(self, method, records):
+        self.submitted.append((method, [record["id"] for record in records]))
+
+
+def test_refetcher_merges_repeated_requests():
+    async def run():
+        api = FakeApi()
+        writer = FakeWriter()
+        refetcher = Refetcher(api, writer)
+        refetcher.start()
+        for item_id in ("p1", "p1", "gone"):
+            refetcher.request("posts", item_id)
+        await asyncio.sleep(0)
+        assert refetcher.get_stats()["in_flight"] == 2
+        api.release.set()
+        while refetcher.get_stats()["in_flight"]:
+            await asyncio.sleep(0)
+        await refetcher.close()
+        return api, writer, refetcher.get_stats()
+    
+    api, writer, stats = asyncio.run(run())
+    
+    assert api.calls == [("p1", "bulk"), ("gone", "bulk")]
+    assert writer.submitted == [("save_posts", ["p1"])]
+    assert (stats["requested"], stats["refetched"], stats["not_found"]) == (3, 1, 1)
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+Tests des écritures atomiques et des politiques fsync (group commit)
+Fichier: mcp_servers/reddit_server/tests/test_durability.py
+"""
+
+import time
+
+import pytest
+
+from storage.durability import GroupCommitter, atomic_write_text
+
+
+def write(committer: GroupCommitter, path, text: str = "x"):
+    atomic_write_text(path, text, committer)
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        GroupCommitter("sometimes")
+
+
+def test_always_syncs_every_write(tmp_path):
+    committer = GroupCommitter("always")
+    for i in range(3):
+        write(committer, tmp_path / f"f{i}.json")
+    
+    assert committer.sync_each_write
+    assert committer.commits == 3
+    assert committer.get_stats()["pending_files"] == 0
+
+
+def test_none_never_syncs(tmp_path):
+    committer = GroupCommitter("none")
+    for i in range(3):
+        write(committer, tmp_path / f"f{i}.json")
+    committer.commit()
+    
+    assert committer.commits == 0
+    assert committer.fsyncs == 0
+
+
+def test_records_groups_fsyncs(tmp_path):
+    committer = GroupCommitter("records", every_records=3)
+    write(committer, tmp_path / "a.json")
+    write(committer, tmp_path / "b.json")
+    assert committer.commits == 0
+    # Fichiers déjà synchronisés avant le rename: seul le dossier reste en attente
+    assert committer.get_stats()["pending_files"] == 0
+    assert committer.get_stats()["pending_dirs"] == 1
+    
+    write(committer, tmp_path / "c.json")
+    assert committer.commits == 1
+    assert committer.get_stats()["pending_dirs"] == 0
+
+
+def test_records_counts_appended_records(tmp_path):
+    committer = GroupCommitter("records", every_records=100)
+    journal = tmp_path / "index.journal"
+    journal.write_text("")
+    committer.record([journal], records=99)
+    assert committer.commits == 0
+    
+    # Même fichier: un seul fsync pour tout le groupe
+    committer.record([journal], records=1)
+    assert committer.commits == 1
+
+
+def test_interval_commits_when_due(tmp_path):
+    committer = GroupCommitter("interval", interval_ms=50)
+    committer.commit()
+    write(committer, tmp_path / "a.json")
+    assert committer.commits == 0
+    
+    committer.commit_if_due()
+    assert committer.commits == 0
+    time.sleep(0.06)
+    committer.commit_if_due()
+    assert committer.commits == 1
+
+
+def test_commit_flushes_pending_files(tmp_path):
+    committer = GroupCommitter("interval", interval_ms=60_000)
+    write(committer, tmp_path / "a.json")
+    write(committer, tmp_path / "b.json")
+    committer.commit()
+    
+    assert committer.commits == 1
+    assert committer.get_stats()["pending_files"] == 0
+    # Rien en attente: pas de fsync
+    committer.commit()
+    assert committer.commits == 1
+
+
+def test_atomic_write_syncs_file_before_rename(tmp_path):
+    committer = GroupCommitter("interval", interval_ms=60_000)
+    committer.commit()
+    write(committer, tmp_path / "a.json")
+    
+    # Le contenu est sur le disque avant le rename, quel que soit le groupe
+    assert committer.fsyncs == 1
+    assert committer.commits == 0
+    committer.commit()
+    assert committer.fsyncs == 2
+    
+    unsynced = GroupCommitter("none")
+    write(unsynced, tmp_path / "b.json")
+    assert unsynced.fsyncs == 0
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    path = tmp_path / "data.json"
+    atomic_write_text(path, "old")
+    atomic_write_text(path, "new", GroupCommitter("always"))
+    
+    assert path.read_text() == "new"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
\ No newline at end of file
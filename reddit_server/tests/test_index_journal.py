@@ -0,0 +1,98 @@
+"""
+Tests de l'index journalisé (snapshot + journal)
+Fichier: mcp_servers/reddit_server/tests/test_index_journal.py
+"""
+
+import json
+
+from storage.index_manager import IndexManager
+
+
+def crash(manager: IndexManager):
+    """Simule un arrêt brutal: le journal est fermé sans compaction"""
+    manager._journal.close()
+    manager._journal = None
+
+
+def test_journal_replayed_after_crash(tmp_path):
+    index_file = tmp_path / "index.json"
+    manager = IndexManager(index_file)
+    manager.add_post("a", "posts/a.json", "python")
+    manager.add_comment("c1", "comments/c1.json", "a")
+    crash(manager)
+    
+    reopened = IndexManager(index_file)
+    assert reopened.get_post("a")["subreddit"] == "python"
+    assert reopened.get_comment("c1")["post_id"] == "a"
+    assert reopened.get_stats()["journal_records"] == 2
+    reopened.close()
+
+
+def test_torn_journal_tail_is_truncated(tmp_path):
+    index_file = tmp_path / "index.json"
+    manager = IndexManager(index_file)
+    manager.add_post("a", "posts/a.json", "python")
+    manager.add_post("b", "posts/b.json", "python")
+    crash(manager)
+    with open(index_file.with_suffix(".journal"), 'ab') as f:
+        f.write(b'{"seq": 3, "op": "po')
+    
+    # Les entrées ajoutées après la ligne tronquée survivent au redémarrage suivant
+    manager = IndexManager(index_file)
+    manager.add_post("c", "posts/c.json", "python")
+    manager.add_post("d", "posts/d.json", "python")
+    crash(manager)
+    
+    reopened = IndexManager(index_file)
+    assert sorted(reopened.index["posts"]) == ["a", "b", "c", "d"]
+    with open(index_file.with_suffix(".journal"), 'rb') as f:
+        assert all(json.loads(line) for line in f)
+    reopened.close()
+
+
+def test_compaction_at_threshold(tmp_path):
+    index_file = tmp_path / "index.json"
+    manager = IndexManager(index_file, compact_min_records=10, compact_ratio=0.5)
+    for i in range(25):
+        manager.add_post(f"p{i}", f"posts/p{i}.json", "python")
+    
+    # Seuil max(10, 0.5 * taille): compactions à 10 puis 20 entrées
+    assert manager.compactions == 2
+    assert manager.get_stats()["journal_records"] == 5
+    with open(index_file, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    assert len(snapshot["posts"]) == 20
+    assert snapshot["journal_seq"] == 20
+    crash(manager)
+    
+    reopened = IndexManager(index_file)
+    assert len(reopened.index["posts"]) == 25
+    reopened.close()
+
+
+def test_entries_already_in_snapshot_are_not_replayed(tmp_path):
+    index_file = tmp_path / "index.json"
+    manager = IndexManager(index_file)
+    manager.add_post("a", "posts/a.json", "python")
+    journal = index_file.with_suffix(".journal").read_bytes()
+    manager.remove("posts", ["a"])
+    manager.close()
+    
+    # Arrêt entre l'écriture du snapshot et le vidage du journal
+    index_file.with_suffix(".journal").write_bytes(journal)
+    reopened = IndexManager(index_file)
+    assert reopened.get_post("a") is None
+    assert reopened.get_stats()["total_posts"] == 0
+    reopened.close()
+
+
+def test_close_compacts_the_journal(tmp_path):
+    index_file = tmp_path / "index.json"
+    manager = IndexManager(index_file)
+    manager.add_search("s1", "asyncio", "searches/s1.json", 3)
+    manager.close()
+    
+    assert index_file.with_suffix(".journal").read_bytes() == b""
+    reopened = IndexManager(index_file)
+    assert reopened.get_recent_searches()[0]["query"] == "asyncio"
+    reopened.close()
\ No newline at end of file
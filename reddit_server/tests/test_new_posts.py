@@ -0,0 +1,98 @@
+"""
+Tests du parcours incrémental du listing "new" (get_new_posts)
+Fichier: mcp_servers/reddit_server/tests/test_new_posts.py
+"""
+
+import asyncio
+
+from utils.async_api_client import _ScheduledClient
+
+
+def post(number: int) -> dict:
+    return {
+        "id": f"p{number}",
+        "created_utc": f"2024-01-01T00:{number:02d}:00",
+        "created_timestamp": 1704067200.0 + number * 60
+    }
+
+
+class FakeListingClient(_ScheduledClient):
+    """Listing "new" simulé: pages courtes, posts supprimés en cours de parcours"""
+    
+    def __init__(self, numbers, page_size: int = 3):
+        # Du plus récent au plus ancien, comme Reddit
+        self.posts = [post(number) for number in sorted(numbers, reverse=True)]
+        self.page_size = page_size
+        self.requests = []
+        self.delete_after_request = {}
+    
+    def _limits(self):
+        return None
+    
+    async def _new_posts_page(self, subreddit, limit, after, priority):
+        self.requests.append(after)
+        fullnames = [f"t3_{p['id']}" for p in self.posts]
+        if after is not None and after not in fullnames:
+            # Reddit renvoie une page vide, sans page suivante, si `after` a disparu
+            page, next_after = [], None
+        else:
+            start = fullnames.index(after) + 1 if after else 0
+            # Pages plus courtes que la limite demandée, en cours de listing
+            page = self.posts[start:start + min(limit, self.page_size)]
+            more = start + len(page) < len(self.posts)
+            next_after = f"t3_{page[-1]['id']}" if page and more else None
+        deleted = self.delete_after_request.pop(len(self.requests), None)
+        if deleted is not None:
+            self.posts = [p for p in self.posts if p["id"] != deleted]
+        return page, next_after
+
+
+def collect(client, **kwargs):
+    return asyncio.run(client.get_new_posts("python", **kwargs))
+
+
+def test_short_pages_do_not_end_the_listing():
+    client = FakeListingClient(range(1, 11), page_size=3)
+    result = collect(client)
+    
+    assert [p["id"] for p in result["posts"]] == [f"p{n}" for n in range(10, 0, -1)]
+    assert result["pages"] == 4
+    assert result["complete"]
+
+
+def test_stops_at_cursor():
+    client = FakeListingClient(range(1, 11))
+    result = collect(client, cursor={"fullname": "t3_p6", "created_utc": post(6)["created_timestamp"]})
+    
+    assert [p["id"] for p in result["posts"]] == ["p10", "p9", "p8", "p7"]
+    assert result["reached_cursor"] and result["complete"]
+
+
+def test_limit_leaves_collection_incomplete():
+    client = FakeListingClient(range(1, 11))
+    result = collect(client, limit=5)
+    
+    assert len(result["posts"]) == 5
+    assert not result["complete"]
+
+
+def test_deleted_resume_point_restarts_from_the_top():
+    client = FakeListingClient(range(1, 11))
+    cursor = {"fullname": "t3_p2", "created_utc": post(2)["created_timestamp"]}
+    result = collect(client, cursor=cursor, after="t3_gone")
+    
+    # La page vide n'est pas une fin de listing: reprise au début, jusqu'au curseur
+    assert client.requests[:2] == ["t3_gone", None]
+    assert [p["id"] for p in result["posts"]] == [f"p{n}" for n in range(10, 2, -1)]
+    assert result["complete"]
+
+
+def test_post_deleted_during_the_walk_resumes_at_the_previous_post():
+    client = FakeListingClient(range(1, 11), page_size=3)
+    # Le dernier post de la première page disparaît avant la requête suivante
+    client.delete_after_request[1] = "p8"
+    result = collect(client)
+    
+    assert client.requests[:3] == [None, "t3_p8", "t3_p9"]
+    assert [p["id"] for p in result["posts"]] == ["p10", "p9", "p8", "p7", "p6", "p5", "p4", "p3", "p2", "p1"]
+    assert result["complete"]
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+Tests du layout partitionné par subreddit et par jour
+Fichier: mcp_servers/reddit_server/tests/test_partitioning.py
+"""
+
+from pathlib import Path
+
+import pytest
+
+from storage.backends import create_index_manager
+from storage.file_manager import FileManager
+from storage.partitioning import UNKNOWN_PARTITION, day_partition, in_period, iter_partitions, subreddit_partition
+
+
+def post(post_id: str, subreddit: str, day: str) -> dict:
+    return {"id": post_id, "title": post_id, "subreddit": subreddit, "created_utc": f"{day}T12:00:00"}
+
+
+@pytest.fixture
+def partitioned_manager(config):
+    """FileManager en layout partitionné (posts/{subreddit}/{jour})"""
+    config.STORAGE_LAYOUT = "partitioned"
+    index_manager = create_index_manager(config)
+    manager = FileManager(config, index_manager)
+    yield manager
+    manager.close()
+    index_manager.close()
+
+
+def test_partition_names():
+    assert subreddit_partition("Python") == "python"
+    assert subreddit_partition("../etc") == "___etc"
+    assert subreddit_partition(None) == UNKNOWN_PARTITION
+    assert day_partition({"created_utc": "2024-03-05T23:59:59"}) == "2024-03-05"
+    assert day_partition({"created_utc": "hier"}) == UNKNOWN_PARTITION
+    assert in_period("2024-03-05", "2024-03-01", "2024-03-05")
+    assert not in_period(UNKNOWN_PARTITION, "2024-03-01", None)
+
+
+def test_records_stored_by_subreddit_and_day(partitioned_manager, config):
+    partitioned_manager.save_posts([post("p1", "Python", "2024-01-01"), post("p2", "rust", "2024-01-02")])
+    partitioned_manager.save_comments([{"id": "c1", "post_id": "p1", "body": "a"}])
+    
+    assert Path(partitioned_manager.index.get_post("p1")["file"]) == config.POSTS_DIR / "python" / "2024-01-01" / "p1.json"
+    # Commentaire: subreddit du post parent
+    assert Path(partitioned_manager.index.get_comment("c1")["file"]).parent.parent == config.COMMENTS_DIR / "python"
+
+
+def test_filtered_reads_open_only_matching_partitions(partitioned_manager, config):
+    partitioned_manager.save_posts([
+        post("p1", "python", "2024-01-01"),
+        post("p2", "python", "2024-01-05"),
+        post("p3", "rust", "2024-01-05")
+    ])
+    
+    partitions = list(iter_partitions(config.POSTS_DIR, "python", since="2024-01-02"))
+    
+    assert partitions == [config.POSTS_DIR / "python" / "2024-01-05"]
+    assert [p["id"] for p in partitioned_manager.iter_posts(subreddit="python", since="2024-01-02")] == ["p2"]
+    assert {p["id"] for p in partitioned_manager.iter_posts(until="2024-01-05")} == {"p1", "p2", "p3"}
+
+
+def test_flat_files_migrated_to_partitions(file_manager, config):
+    file_manager.save_posts([post("p1", "python", "2024-01-01")])
+    assert Path(file_manager.index.get_post("p1")["file"]).parent == config.POSTS_DIR
+    
+    result = file_manager.relocate("posts", ["p1"], "partitioned")
+    
+    assert result["moved"] == 1
+    assert Path(file_manager.index.get_post("p1")["file"]).parent == config.POSTS_DIR / "python" / "2024-01-01"
+    assert file_manager.get_post("p1")["title"] == "p1"
+    assert not (config.POSTS_DIR / "p1.json").exists()
\ No newline at end of file
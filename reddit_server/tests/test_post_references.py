@@ -0,0 +1,47 @@
+"""
+Tests des recherches et collections stockées par références de posts
+Fichier: mcp_servers/reddit_server/tests/test_post_references.py
+"""
+
+import json
+
+
+def post(number: int, score: int = 1) -> dict:
+    return {"id": f"p{number}", "title": f"post {number}", "subreddit": "python", "score": score,
+            "num_comments": 0, "created_utc": "2024-01-01T00:00:00"}
+
+
+def test_collection_keeps_references_only(file_manager):
+    posts = [post(2, score=20), post(1, score=10)]
+    file_manager.save_posts(posts)
+    
+    path = file_manager.save_subreddit_collection("python", posts)
+    
+    with open(path) as f:
+        stored = json.load(f)
+    assert "posts" not in stored
+    assert [(ref["id"], ref["rank"], ref["score"]) for ref in stored["post_refs"]] == [("p2", 1, 20), ("p1", 2, 10)]
+    
+    collection = file_manager.load_subreddit_collection(path)
+    assert [(p["id"], p["rank"], p["title"]) for p in collection["posts"]] == [("p2", 1, "post 2"), ("p1", 2, "post 1")]
+    assert collection["missing"] == []
+
+
+def test_search_lists_posts_no_longer_stored(file_manager):
+    file_manager.save_posts([post(1)])
+    
+    path = file_manager.save_search_results("asyncio", [post(1), post(2)])
+    search = file_manager.load_search_results(path)
+    
+    assert [p["id"] for p in search["results"]] == ["p1"]
+    assert search["missing"] == ["p2"]
+    assert file_manager.index.get_recent_searches(1)[0]["count"] == 2
+
+
+def test_legacy_collection_with_embedded_posts(file_manager, config):
+    path = config.SUBREDDITS_DIR / "python_collection_20240101_000000.json"
+    legacy = {"subreddit": "python", "count": 1, "posts": [post(1)]}
+    with open(path, 'w') as f:
+        json.dump(legacy, f)
+    
+    assert file_manager.load_subreddit_collection(str(path)) == legacy
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Tests de l'ordonnanceur de débit (priorités et réserve des appels interactifs)
+Fichier: mcp_servers/reddit_server/tests/test_rate_limiter.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from utils.rate_limiter import RateLimitScheduler, estimate_requests
+
+
+def test_estimate_requests():
+    assert estimate_requests(1) == 1
+    assert estimate_requests(100) == 1
+    assert estimate_requests(101) == 2
+    assert estimate_requests(250, listings=2) == 6
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        RateLimitScheduler(requests_per_window=0)
+    with pytest.raises(ValueError):
+        RateLimitScheduler(burst=0)
+    with pytest.raises(ValueError):
+        RateLimitScheduler(bulk_reserve=-1)
+
+
+def test_burst_then_wait():
+    async def run():
+        scheduler = RateLimitScheduler(requests_per_window=50, window_seconds=1, burst=2)
+        started = time.monotonic()
+        for _ in range(3):
+            await scheduler.acquire()
+        return time.monotonic() - started, scheduler.get_stats()
+    
+    elapsed, stats = asyncio.run(run())
+    # Deux appels dans la rafale, le troisième attend un jeton (1 / 50 s)
+    assert elapsed >= 0.015
+    assert stats["acquired"]["interactive"] == 3
+    assert stats["delayed"]["interactive"] == 1
+
+
+def test_interactive_calls_pass_before_queued_bulk_calls():
+    async def run():
+        scheduler = RateLimitScheduler(requests_per_window=100, window_seconds=1, burst=1)
+        await scheduler.acquire()
+        order = []
+        
+        async def call(name, priority):
+            await scheduler.acquire(1, priority)
+            order.append(name)
+        
+        tasks = [asyncio.create_task(call(f"bulk{i}", "bulk")) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(call("interactive", "interactive")))
+        await asyncio.gather(*tasks)
+        return order
+    
+    order = asyncio.run(run())
+    assert order[0] == "interactive"
+    assert order[1:] == ["bulk0", "bulk1", "bulk2"]
+
+
+def test_bulk_calls_leave_the_reserve_to_interactive_calls():
+    async def run():
+        scheduler = RateLimitScheduler(burst=10, bulk_reserve=50)
+        scheduler.observe({"remaining": 60, "reset_timestamp": time.time() + 600, "used": 940})
+        
+        # 60 - 20 < 50: l'appel bulk attend la fenêtre suivante
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scheduler.acquire(20, "bulk"), timeout=0.05)
+        # L'appel interactif peut entamer la réserve
+        await asyncio.wait_for(scheduler.acquire(10, "interactive"), timeout=0.05)
+        return scheduler.get_stats()
+    
+    stats = asyncio.run(run())
+    assert stats["remaining"] == 50
+    assert stats["acquired"] == {"interactive": 1, "bulk": 0}
+
+
+def test_observe_paces_the_remaining_quota():
+    scheduler = RateLimitScheduler()
+    scheduler.observe({"remaining": 120, "reset_timestamp": time.time() + 60, "used": 880})
+    stats = scheduler.get_stats()
+    
+    assert stats["remaining"] == 120
+    assert stats["rate_per_second"] == pytest.approx(2.0, rel=0.05)
+    
+    scheduler.observe({"remaining": 0, "reset_timestamp": time.time() + 60, "used": 1000})
+    assert scheduler.get_stats()["exhausted"] == 1
+    # Avant la première réponse: aucune information de quota
+    scheduler.observe(None)
+    assert scheduler.get_stats()["remaining"] == 0
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+Tests de la reconstruction de l'index (rebuild_index.py)
+Fichier: mcp_servers/reddit_server/tests/test_rebuild_index.py
+"""
+
+import json
+import os
+
+from rebuild_index import build_index
+from storage.segment_store import SegmentStore
+
+
+def post(post_id: str, title: str, retrieved_at: str) -> dict:
+    return {"id": post_id, "title": title, "author": "alice", "subreddit": "python",
+            "retrieved_at": retrieved_at}
+
+
+def write_file(config, record: dict):
+    path = config.POSTS_DIR / f"{record['id']}.json"
+    path.write_text(json.dumps(record))
+    return path
+
+
+def test_index_entries_from_files_and_segments(config):
+    write_file(config, post("a", "fichier", "2024-01-01T10:00:00"))
+    segments = SegmentStore(config.SEGMENTS_DIR)
+    segments.append_many("posts", [post("b", "segment", "2024-01-02T10:00:00")])
+    
+    index, stats = build_index(config, workers=2, chunk_size=10)
+    
+    assert set(index["posts"]) == {"a", "b"}
+    assert index["posts"]["b"]["offset"] == 0
+    assert index["posts"]["a"]["subreddit"] == "python"
+    assert stats["files"] == 1 and stats["segments"] == 1 and stats["errors"] == 0
+
+
+def test_newest_collection_wins_over_newer_file(config):
+    # Copie fraîche en fichier, puis copie périmée archivée plus tard (mtime plus récent)
+    live = write_file(config, post("a", "récent", "2024-03-01T10:00:00"))
+    os.utime(live, (1_000_000, 1_000_000))
+    archives = SegmentStore(config.ARCHIVES_DIR)
+    archives.append_many("posts", [post("a", "ancien", "2024-01-01T10:00:00")])
+    
+    index, _ = build_index(config, workers=2, chunk_size=10)
+    
+    entry = index["posts"]["a"]
+    assert entry["file"] == str(live)
+    # Date de stockage: celle de la collecte, pas le mtime du fichier
+    assert entry["stored_at"] == "2024-03-01T10:00:00"
+
+
+def test_segment_records_keep_their_own_date(config):
+    segments = SegmentStore(config.SEGMENTS_DIR)
+    segments.append_many("posts", [
+        post("a", "premier", "2024-01-01T10:00:00"),
+        post("b", "second", "2024-02-01T10:00:00"),
+        # Réécriture plus récente de "a" dans le même segment: la dernière occurrence gagne
+        post("a", "premier modifié", "2024-02-01T10:00:00")
+    ])
+    
+    index, _ = build_index(config, workers=2, chunk_size=10)
+    
+    assert index["posts"]["b"]["stored_at"] == "2024-02-01T10:00:00"
+    assert index["posts"]["a"]["offset"] > index["posts"]["b"]["offset"]
+
+
+def test_mtime_fallback_without_retrieved_at(config):
+    older = write_file(config, {"id": "a", "title": "x", "subreddit": "python"})
+    os.utime(older, (1_000_000, 1_000_000))
+    segments = SegmentStore(config.SEGMENTS_DIR)
+    segments.append_many("posts", [{"id": "a", "title": "y", "subreddit": "python"}])
+    
+    index, _ = build_index(config, workers=2, chunk_size=10)
+    
+    assert index["posts"]["a"]["file"].endswith(".jsonl")
\ No newline at end of file
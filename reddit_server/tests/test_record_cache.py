@@ -0,0 +1,59 @@
+"""
+Tests du cache LRU des enregistrements
+Fichier: mcp_servers/reddit_server/tests/test_record_cache.py
+"""
+
+import json
+import os
+
+from storage.record_cache import RecordCache
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = RecordCache(max_entries=2, max_bytes=100)
+    cache.put("a", 1, "A", 10)
+    cache.put("b", 1, "B", 10)
+    assert cache.get("a", 1) == "A"
+    # "b" est le moins récemment utilisé
+    cache.put("c", 1, "C", 10)
+    
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == "A" and cache.get("c", 1) == "C"
+    
+    cache.put("big", 1, "X", 95)
+    assert cache.get_stats()["bytes"] <= 100
+    assert cache.get_stats()["evictions"] == 3
+
+
+def test_stale_version_and_invalidation():
+    cache = RecordCache()
+    cache.put("a", ("file", 1), "old", 10)
+    
+    assert cache.get("a", ("file", 2)) is None
+    cache.invalidate("a")
+    assert cache.get("a", ("file", 1)) is None
+    assert cache.get_stats()["invalidations"] == 1
+
+
+def test_oversized_value_not_cached():
+    cache = RecordCache(max_bytes=10)
+    cache.put("a", 1, "A", 11)
+    
+    assert cache.get("a", 1) is None
+
+
+def test_file_manager_reads_through_the_cache(file_manager):
+    file_manager.save_post({"id": "p1", "title": "original", "subreddit": "python"})
+    
+    assert file_manager.get_post("p1")["title"] == "original"
+    assert file_manager.get_post("p1")["title"] == "original"
+    assert file_manager.cache.get_stats()["hits"] == 1
+    
+    # Modification externe du fichier: détectée par la version (mtime, taille)
+    path = file_manager.index.get_post("p1")["file"]
+    with open(path, 'w') as f:
+        json.dump({"id": "p1", "title": "edited by hand", "subreddit": "python"}, f)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    
+    assert file_manager.get_post("p1")["title"] == "edited by hand"
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Tests du cache des réponses de l'API (TTL, max_staleness, limites)
+Fichier: mcp_servers/reddit_server/tests/test_response_cache.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from utils.response_cache import CachedAPIClient, ResponseCache, parse_ttls
+
+
+class FakeClient:
+    """Client d'API qui compte ses appels"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def get_subreddit_posts(self, subreddit, sort, limit, priority="interactive"):
+        self.calls += 1
+        return [{"id": f"p{i}", "call": self.calls} for i in range(limit)]
+    
+    async def get_subreddit_info(self, subreddit, priority="interactive"):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"name": subreddit, "call": self.calls}
+
+
+def test_parse_ttls():
+    assert parse_ttls("get_subreddit_info=3600, get_subreddit_posts:hot=60,") == {
+        "get_subreddit_info": 3600.0,
+        "get_subreddit_posts:hot": 60.0
+    }
+    with pytest.raises(ValueError):
+        parse_ttls("get_subreddit_info=abc")
+    with pytest.raises(ValueError):
+        parse_ttls("get_subreddit_info=-1")
+
+
+def test_ttl_per_sort():
+    cache = ResponseCache({"get_subreddit_posts": 300, "get_subreddit_posts:hot": 60})
+    
+    assert cache.ttl("get_subreddit_posts", {"sort": "hot"}) == 60
+    assert cache.ttl("get_subreddit_posts", {"sort": "top"}) == 300
+    assert cache.ttl("search_posts", {}) == 0
+
+
+def test_key_ignores_case_and_limit():
+    cache = ResponseCache({})
+    
+    assert (cache.key("search_posts", {"query": "Async  IO", "subreddit": "Python", "limit": 10})
+            == cache.key("search_posts", {"query": "async io", "subreddit": "python", "limit": 50}))
+
+
+def test_entry_expires_after_its_ttl():
+    cache = ResponseCache({"get_subreddit_info": 60})
+    cache.put("k", None, b"{}", stored_at=time.time() - 30)
+    assert cache.get("k", "get_subreddit_info", None, max_age=60) == b"{}"
+    
+    cache.put("k", None, b"{}", stored_at=time.time() - 61)
+    assert cache.get("k", "get_subreddit_info", None, max_age=60) is None
+    assert cache.get_stats()["expired"] == 1
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_max_age_stricter_than_ttl():
+    cache = ResponseCache({"get_subreddit_info": 3600})
+    cache.put("k", None, b"{}", stored_at=time.time() - 120)
+    
+    assert cache.get("k", "get_subreddit_info", None, max_age=60) is None
+    # Trop ancienne pour cet appel seulement: toujours servie aux autres
+    assert cache.get("k", "get_subreddit_info", None, max_age=3600) == b"{}"
+
+
+def test_smaller_limit_served_from_larger_limit():
+    cache = ResponseCache({"get_subreddit_posts": 60})
+    cache.put("k", 50, b"[]")
+    
+    assert cache.get("k", "get_subreddit_posts", 10, max_age=60) == b"[]"
+    assert cache.get("k", "get_subreddit_posts", 100, max_age=60) is None
+
+
+def test_lru_bounds():
+    cache = ResponseCache({"m": 60}, max_entries=2)
+    cache.put("a", None, b"1")
+    cache.put("b", None, b"2")
+    cache.get("a", "m", None, max_age=60)
+    cache.put("c", None, b"3")
+    
+    assert cache.get("b", "m", None, max_age=60) is None
+    assert cache.get("a", "m", None, max_age=60) == b"1"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_persisted_entries_reloaded(tmp_path):
+    cache = ResponseCache({"get_subreddit_info": 60}, persist_file=tmp_path / "cache.jsonl")
+    fresh = cache.key("get_subreddit_info", {"subreddit": "python"})
+    old = cache.key("get_subreddit_info", {"subreddit": "rust"})
+    cache.put(fresh, None, b'{"a":1}')
+    cache.put(old, None, b'{"a":2}', stored_at=time.time() - 120)
+    cache.save()
+    
+    # Les réponses expirées ne sont pas rechargées
+    reloaded = ResponseCache({"get_subreddit_info": 60}, persist_file=tmp_path / "cache.jsonl")
+    assert reloaded.get_stats()["loaded"] == 1
+    assert reloaded.get(fresh, "get_subreddit_info", None, max_age=60) == b'{"a":1}'
+
+
+def test_cached_client_max_staleness():
+    async def run():
+        client = FakeClient()
+        api = CachedAPIClient(client, ResponseCache({"get_subreddit_posts": 600}))
+        first = await api.get_subreddit_posts("Python", sort="hot", limit=20)
+        smaller = await api.get_subreddit_posts("python", sort="hot", limit=5)
+        fresh = await api.get_subreddit_posts("python", sort="hot", limit=5, max_staleness=0)
+        return client.calls, first, smaller, fresh
+    
+    calls, first, smaller, fresh = asyncio.run(run())
+    assert calls == 2
+    assert smaller == first[:5]
+    assert fresh[0]["call"] == 2
+
+
+def test_cached_client_coalesces_identical_calls():
+    async def run():
+        client = FakeClient()
+        cache = ResponseCache({"get_subreddit_info": 600})
+        api = CachedAPIClient(client, cache)
+        results = await asyncio.gather(*(api.get_subreddit_info("python") for _ in range(5)))
+        return client.calls, results, cache.get_stats()
+    
+    calls, results, stats = asyncio.run(run())
+    assert calls == 1
+    assert all(result == results[0] for result in results)
+    assert stats["coalesced"] == 4
+    assert stats["hits"] == 4 and stats["misses"] == 1
\ No newline at end of file
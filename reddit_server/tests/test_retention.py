@@ -0,0 +1,70 @@
+"""
+Tests de la rétention et de l'archivage des segments
+Fichier: mcp_servers/reddit_server/tests/test_retention.py
+"""
+
+import os
+import time
+
+import pytest
+
+from storage.backends import create_index_manager
+from storage.file_manager import FileManager
+from storage.retention import RetentionManager
+
+
+def post(number: int) -> dict:
+    return {"id": f"p{number}", "title": f"post {number}", "subreddit": "python",
+            "created_utc": "2024-01-01T00:00:00", "score": number}
+
+
+@pytest.fixture
+def segment_manager(config):
+    """FileManager en layout "segments", segments de petite taille"""
+    config.STORAGE_LAYOUT = "segments"
+    config.SEGMENT_MAX_BYTES = 256
+    config.ARCHIVE_AFTER_DAYS = 1
+    index_manager = create_index_manager(config)
+    manager = FileManager(config, index_manager)
+    yield manager
+    manager.close()
+    index_manager.close()
+
+
+def age_segments(manager: FileManager, days: int = 2):
+    """Antidate les segments de posts (archivage par date de modification)"""
+    old = time.time() - days * 86400
+    for segment in manager.segments.segments("posts"):
+        os.utime(segment, (old, old))
+
+
+def test_archives_closed_segments(config, segment_manager):
+    segment_manager.save_posts([post(i) for i in range(6)])
+    closed = segment_manager.segments.segments("posts")[:-1]
+    assert closed
+    age_segments(segment_manager)
+    
+    result = RetentionManager(config, segment_manager).run_pass()
+    
+    assert result["archived"]["posts"] > 0
+    assert not any(segment.exists() for segment in closed)
+    assert [segment_manager.get_post(f"p{i}")["id"] for i in range(6)] == [f"p{i}" for i in range(6)]
+
+
+def test_keeps_segment_when_entries_were_not_archived(config, segment_manager, monkeypatch):
+    segment_manager.save_posts([post(i) for i in range(6)])
+    closed = segment_manager.segments.segments("posts")[:-1]
+    age_segments(segment_manager)
+    relocate = segment_manager.relocate
+    
+    def partial_relocate(kind, ids, layout=None):
+        # La première entrée de chaque lot reste illisible
+        result = relocate(kind, ids[1:], layout)
+        return {**result, "skipped": result["skipped"] + 1}
+    
+    monkeypatch.setattr(segment_manager, "relocate", partial_relocate)
+    RetentionManager(config, segment_manager).run_pass()
+    
+    # Les entrées non archivées pointent toujours vers leur segment, qui est conservé
+    assert all(segment.exists() for segment in closed)
+    assert [segment_manager.get_post(f"p{i}")["id"] for i in range(6)] == [f"p{i}" for i in range(6)]
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Tests des agrégats par subreddit et par jour
+Fichier: mcp_servers/reddit_server/tests/test_rollups.py
+"""
+
+import threading
+
+import pytest
+
+from storage.rollups import QuantileSketch, RollupStats
+
+
+def post(post_id: str, score: int, day: str = "2024-01-01", num_comments: int = 0) -> dict:
+    return {"id": post_id, "score": score, "num_comments": num_comments, "created_utc": f"{day}T12:00:00"}
+
+
+def test_counts_by_day_and_subreddit(tmp_path):
+    rollups = RollupStats(tmp_path / "rollups.db")
+    rollups.add("posts", [post("a", 1), post("b", 2, "2024-01-02"), post("c", 3)], ["python", "python", "rust"])
+    
+    result = rollups.query()
+    
+    assert result["totals"]["posts"] == 3
+    assert [(row["day"], row["posts"]) for row in result["by_day"]] == [("2024-01-01", 2), ("2024-01-02", 1)]
+    assert [(row["subreddit"], row["posts"]) for row in result["by_subreddit"]] == [("python", 2), ("rust", 1)]
+    assert rollups.query(subreddit="python", since="2024-01-02")["totals"]["posts"] == 1
+    rollups.close()
+
+
+def test_recount_replaces_previous_contribution(tmp_path):
+    rollups = RollupStats(tmp_path / "rollups.db")
+    rollups.add("posts", [post("a", 10)], ["python"])
+    # Le post est recollecté après une variation de son score
+    rollups.add("posts", [post("a", 500)], ["python"])
+    
+    result = rollups.query()
+    
+    assert result["totals"]["posts"] == 1
+    assert result["quantiles"]["post_score"]["count"] == 1
+    assert result["quantiles"]["post_score"]["max"] == pytest.approx(500, rel=0.01)
+    
+    assert rollups.remove("posts", ["a", "missing"]) == 1
+    assert rollups.query()["totals"]["posts"] == 0
+    assert rollups.get_stats()["daily_rows"] == 0
+    rollups.close()
+
+
+def test_quantiles_within_relative_accuracy(tmp_path):
+    rollups = RollupStats(tmp_path / "rollups.db", relative_accuracy=0.01)
+    rollups.add("posts", [post(f"p{i}", i) for i in range(1, 1001)], ["python"] * 1000)
+    
+    quantiles = rollups.query(quantiles=[0.5, 0.9])["quantiles"]["post_score"]
+    
+    assert quantiles["count"] == 1000
+    assert quantiles["p50"] == pytest.approx(500, rel=0.02)
+    assert quantiles["p90"] == pytest.approx(900, rel=0.02)
+    rollups.close()
+
+
+def test_sketch_bucket_round_trip():
+    sketch = QuantileSketch(0.01)
+    
+    for value in (1, 7, 42, 1234, -50):
+        assert sketch.value(sketch.bucket(value)) == pytest.approx(value, rel=0.01)
+    assert sketch.value(sketch.bucket(0)) == 0
+
+
+def test_query_does_not_wait_for_the_writer(tmp_path):
+    rollups = RollupStats(tmp_path / "rollups.db")
+    rollups.add("posts", [post("a", 1)], ["python"])
+    results = []
+    
+    # Le thread d'écriture tient le verrou de la connexion d'écriture (add en cours)
+    with rollups._lock:
+        reader = threading.Thread(target=lambda: results.append(rollups.query()))
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+    
+    assert results[0]["totals"]["posts"] == 1
+    rollups.close()
\ No newline at end of file
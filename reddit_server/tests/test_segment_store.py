@@ -0,0 +1,76 @@
+"""
+Tests du stockage en segments JSONL
+Fichier: mcp_servers/reddit_server/tests/test_segment_store.py
+"""
+
+import pytest
+
+from storage.segment_store import SegmentStore
+
+
+def records(start: int, count: int):
+    return [{"id": f"p{i}", "title": f"post {i}"} for i in range(start, start + count)]
+
+
+def read(store: SegmentStore, location: dict):
+    return store.read(location["file"], location["offset"], location["length"])
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_append_read_and_scan(tmp_path, compression):
+    store = SegmentStore(tmp_path, compression=compression)
+    locations = store.append_many("posts", records(0, 3))
+    
+    assert [read(store, location)["id"] for location in locations] == ["p0", "p1", "p2"]
+    assert [record["id"] for _, record in store.scan("posts")] == ["p0", "p1", "p2"]
+    offsets = [(offset, length) for offset, length, _ in store.scan_locations(store.segments("posts")[0])]
+    assert offsets == [(location["offset"], location["length"]) for location in locations]
+
+
+def test_segment_rolls_over_at_max_bytes(tmp_path):
+    store = SegmentStore(tmp_path, max_segment_bytes=64)
+    locations = store.append_many("posts", records(0, 4))
+    
+    assert len(store.segments("posts")) > 1
+    assert len({location["file"] for location in locations}) == len(store.segments("posts"))
+    assert [record["id"] for _, record in store.scan("posts")] == ["p0", "p1", "p2", "p3"]
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_torn_tail_truncated_before_next_append(tmp_path, compression):
+    store = SegmentStore(tmp_path, compression=compression)
+    store.append_many("posts", records(0, 2))
+    segment = store.segments("posts")[0]
+    valid_size = segment.stat().st_size
+    # Arrêt brutal pendant l'ajout suivant: une frame à moitié écrite
+    torn = store._encode({"id": "torn", "title": "x" * 200})
+    with open(segment, 'ab') as f:
+        f.write(torn[:len(torn) // 2])
+    
+    # Un nouveau processus ouvre le segment: la fin invalide est coupée avant l'ajout
+    reopened = SegmentStore(tmp_path, compression=compression)
+    locations = reopened.append_many("posts", records(2, 1))
+    
+    assert locations[0]["offset"] == valid_size
+    assert read(reopened, locations[0])["id"] == "p2"
+    assert [record["id"] for _, record in reopened.scan("posts")] == ["p0", "p1", "p2"]
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_scan_skips_torn_frame_followed_by_records(tmp_path, compression):
+    store = SegmentStore(tmp_path, compression=compression)
+    store.append_many("posts", records(0, 1))
+    segment = store.segments("posts")[0]
+    torn = store._encode({"id": "torn", "title": "x" * 200})
+    # Segment écrit avant la troncature: des enregistrements suivent la frame tronquée
+    with open(segment, 'ab') as f:
+        f.write(torn[:len(torn) // 2])
+        f.write(store._encode({"id": "p1", "title": "post 1"}))
+        f.write(store._encode({"id": "p2", "title": "post 2"}))
+    
+    ids = [record["id"] for _, record in store.scan("posts")]
+    assert ids[0] == "p0" and ids[-1] == "p2"
+    assert "torn" not in ids
+    if compression == "gzip":
+        # Reprise au début de la frame suivante: aucun enregistrement valide perdu
+        assert ids == ["p0", "p1", "p2"]
\ No newline at end of file
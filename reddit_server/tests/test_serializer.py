@@ -0,0 +1,52 @@
+"""
+Tests du sérialiseur JSON à backend interchangeable
+Fichier: mcp_servers/reddit_server/tests/test_serializer.py
+"""
+
+import json
+
+import pytest
+
+from utils.serializer import JSONSerializer, available_backends
+
+RECORD = {"id": "p1", "title": "Café ☕", "score": 42, "ratio": 0.5, "tags": [None, True]}
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_round_trip_on_every_installed_backend(backend):
+    serializer = JSONSerializer(backend)
+    
+    data = serializer.dumps_bytes(RECORD)
+    
+    assert serializer.loads(data) == RECORD
+    assert json.loads(data) == RECORD
+    assert b"\n" not in data and "Café".encode('utf-8') in data
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_unsupported_values_fall_back_to_stdlib(backend):
+    # Entier > 64 bits: non supporté par orjson et msgspec
+    data = JSONSerializer(backend).dumps_bytes({"score": 2 ** 70})
+    
+    assert json.loads(data) == {"score": 2 ** 70}
+
+
+def test_pretty_output_is_indented():
+    text = JSONSerializer("json", pretty=True).dumps({"a": [1]})
+    
+    assert text == '{\n  "a": [\n    1\n  ]\n}'
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_invalid_document_raises_json_decode_error(backend):
+    with pytest.raises(json.JSONDecodeError):
+        JSONSerializer(backend).loads(b'{"id": ')
+
+
+def test_unknown_or_missing_backend_rejected():
+    with pytest.raises(ValueError, match="Options valides"):
+        JSONSerializer("yaml")
+    missing = [backend for backend in ("orjson", "msgspec") if backend not in available_backends()]
+    for backend in missing:
+        with pytest.raises(ValueError):
+            JSONSerializer(backend)
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""
+Tests du backend d'index SQLite
+Fichier: mcp_servers/reddit_server/tests/test_sqlite_index.py
+"""
+
+import pytest
+
+from storage.sqlite_index_manager import SQLiteIndexManager
+
+
+def test_batch_insert_and_secondary_lookups(tmp_path):
+    index = SQLiteIndexManager(tmp_path / "index.db")
+    index.add_posts([
+        {"id": "p1", "file": "posts/p1.json", "subreddit": "python", "author": "alice"},
+        {"id": "p2", "file": "posts/p2.json", "subreddit": "rust", "author": "bob"}
+    ])
+    index.add_comments([
+        {"id": "c1", "file": "comments/c1.json", "post_id": "p1", "author": "bob"},
+        {"id": "c2", "file": "comments/c2.json", "post_id": "p1", "author": "alice"}
+    ])
+    
+    assert index.get_post("p1")["subreddit"] == "python"
+    assert set(index.get_entries("posts", ["p1", "p2", "missing"])) == {"p1", "p2"}
+    assert [entry["id"] for entry in index.posts_in_subreddit("python")] == ["p1"]
+    assert {entry["id"] for entry in index.comments_for_post("p1")} == {"c1", "c2"}
+    
+    index.remove("comments", ["c1"])
+    
+    assert index.get_comment("c1") is None
+    assert index.get_stats()["total_comments"] == 1
+    index.close()
+
+
+def test_entries_survive_reopening(tmp_path):
+    index = SQLiteIndexManager(tmp_path / "index.db")
+    index.add_posts([{"id": "p1", "file": "segments/posts-000001.jsonl", "subreddit": "python",
+                      "offset": 10, "length": 20, "content_hash": "abc"}])
+    index.close()
+    
+    reopened = SQLiteIndexManager(tmp_path / "index.db")
+    entry = reopened.get_post("p1")
+    
+    assert (entry["offset"], entry["length"], entry["content_hash"]) == (10, 20, "abc")
+    reopened.close()
+
+
+def test_invalid_kind_rejected(tmp_path):
+    index = SQLiteIndexManager(tmp_path / "index.db")
+    
+    with pytest.raises(ValueError):
+        index.get_entries("users", ["alice"])
+    index.close()
\ No newline at end of file
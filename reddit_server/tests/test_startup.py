@@ -0,0 +1,53 @@
+"""
+Tests de l'ouverture de l'index au démarrage
+Fichier: mcp_servers/reddit_server/tests/test_startup.py
+"""
+
+import sqlite3
+
+from storage.backends import create_index_manager
+from storage.sqlite_index_manager import SQLiteIndexManager
+
+
+def test_sqlite_open_reads_no_entries(tmp_path, monkeypatch):
+    index = SQLiteIndexManager(tmp_path / "index.db")
+    index.add_posts([{"id": f"p{i}", "file": f"posts/p{i}.json", "subreddit": "python"} for i in range(1000)])
+    index.close()
+    
+    statements = []
+    connect = sqlite3.connect
+    
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+    
+    monkeypatch.setattr(sqlite3, "connect", traced_connect)
+    reopened = SQLiteIndexManager(tmp_path / "index.db")
+    opening = list(statements)
+    
+    # Ouverture: schéma et meta uniquement, aucune lecture des entrées
+    assert opening
+    assert not [sql for sql in opening if "FROM posts" in sql or "FROM comments" in sql]
+    assert reopened.get_post("p500")["file"] == "posts/p500.json"
+    reopened.close()
+
+
+def test_json_index_imported_once(config):
+    config.INDEX_BACKEND = "json"
+    legacy = create_index_manager(config)
+    legacy.add_posts([{"id": "p1", "file": "posts/p1.json", "subreddit": "python"}])
+    legacy.close()
+    
+    config.INDEX_BACKEND = "sqlite"
+    index = create_index_manager(config)
+    
+    assert index.get_post("p1")["file"] == "posts/p1.json"
+    assert index.get_meta("json_imported_at") is not None
+    index.remove("posts", ["p1"])
+    index.close()
+    
+    # Second lancement: l'index JSON n'est pas réimporté
+    index = create_index_manager(config)
+    assert index.get_post("p1") is None
+    index.close()
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""
+Tests de l'index plein texte BM25
+Fichier: mcp_servers/reddit_server/tests/test_text_index.py
+"""
+
+import threading
+
+from storage.text_index import TextIndex
+
+
+def post(post_id: str, title: str, created: str = "2024-01-01T12:00:00", body: str = "") -> dict:
+    return {"id": post_id, "title": title, "selftext": body, "created_utc": created}
+
+
+def index_with(tmp_path, records, subreddits=None) -> TextIndex:
+    index = TextIndex(tmp_path / "text_index.db")
+    index.add("posts", records, subreddits or ["python"] * len(records))
+    return index
+
+
+def test_ranks_documents_by_term_frequency(tmp_path):
+    index = index_with(tmp_path, [
+        post("a", "asyncio tutorial"),
+        post("b", "asyncio asyncio asyncio event loop"),
+        post("c", "django models")
+    ])
+    
+    result = index.search("asyncio", kinds=["posts"])
+    
+    assert [hit["id"] for hit in result["hits"]] == ["b", "a"]
+    assert result["total"] == 2
+    index.close()
+
+
+def test_match_all_any_and_filters(tmp_path):
+    index = index_with(tmp_path, [
+        post("a", "asyncio threads", "2024-01-01T12:00:00"),
+        post("b", "asyncio only", "2024-02-01T12:00:00"),
+        post("c", "threads only", "2024-02-01T12:00:00")
+    ], ["python", "python", "learnpython"])
+    
+    assert [hit["id"] for hit in index.search("asyncio threads", kinds=["posts"])["hits"]] == ["a"]
+    assert {hit["id"] for hit in index.search("asyncio threads", kinds=["posts"], match="any")["hits"]} == {"a", "b", "c"}
+    assert {hit["id"] for hit in index.search("threads", kinds=["posts"], subreddit="learnpython")["hits"]} == {"c"}
+    assert {hit["id"] for hit in index.search("asyncio", kinds=["posts"], since="2024-01-15")["hits"]} == {"b"}
+    assert index.search("asyncio missing", kinds=["posts"])["ignored"] == ["missing"]
+    index.close()
+
+
+def test_search_does_not_wait_for_the_writer(tmp_path):
+    index = index_with(tmp_path, [post("a", "asyncio tutorial")])
+    results = []
+    
+    # Le thread d'écriture tient le verrou de la connexion d'écriture (add en cours)
+    with index._lock:
+        reader = threading.Thread(target=lambda: results.append(index.search("asyncio", kinds=["posts"])))
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+    
+    assert [hit["id"] for hit in results[0]["hits"]] == ["a"]
+    index.close()
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Tests des documents de fil (arbre précalculé, lecture par plages)
+Fichier: mcp_servers/reddit_server/tests/test_threads.py
+"""
+
+from storage.record_cache import RecordCache
+from storage.threads import ThreadStore, build_thread, nest_comments
+
+
+def comment(comment_id: str, parent: str, score: int = 0) -> dict:
+    parent_id = f"t3_{parent}" if parent == "post" else f"t1_{parent}"
+    return {"id": comment_id, "parent_id": parent_id, "score": score}
+
+
+# post
+# ├── a (10)
+# │   ├── a1 (1)
+# │   └── a2 (5)
+# │       └── a2x (0)
+# └── b (20)
+THREAD = [
+    comment("a1", "a", 1), comment("b", "post", 20), comment("a2x", "a2"),
+    comment("a", "post", 10), comment("a2", "a", 5)
+]
+
+
+def test_preorder_with_children_by_score():
+    ordered, structure = build_thread("post", THREAD)
+    
+    assert [c["id"] for c in ordered] == ["b", "a", "a2", "a2x", "a1"]
+    assert structure["depth"] == [0, 0, 1, 2, 1]
+    assert structure["subtree_size"] == [1, 4, 2, 1, 1]
+    assert structure["roots"] == [0, 1]
+    assert structure["parent"] == [-1, -1, 1, 2, 1]
+
+
+def test_subtree_is_a_contiguous_range():
+    ordered, structure = build_thread("post", THREAD)
+    i = structure["ids"].index("a2")
+    
+    subtree = ordered[i:i + structure["subtree_size"][i]]
+    
+    assert [c["id"] for c in subtree] == ["a2", "a2x"]
+
+
+def test_missing_parent_becomes_a_root():
+    ordered, structure = build_thread("post", [comment("x", "not_collected"), comment("y", "x")])
+    
+    assert [c["id"] for c in ordered] == ["x", "y"]
+    assert structure["roots"] == [0]
+
+
+def test_parent_cycle_does_not_loop_or_drop_comments():
+    # Données incohérentes: c1 -> c2 -> c1
+    cycle = [comment("c1", "c2"), comment("c2", "c1"), comment("c3", "post")]
+    
+    ordered, structure = build_thread("post", cycle)
+    
+    assert sorted(c["id"] for c in ordered) == ["c1", "c2", "c3"]
+    assert structure["count"] == 3
+    assert sum(structure["subtree_size"][i] for i in structure["roots"]) == 3
+
+
+def test_nest_comments_with_max_depth():
+    ordered, structure = build_thread("post", THREAD)
+    
+    nested = nest_comments(structure, 1, ordered[1:5], max_depth=1)
+    
+    assert [node["id"] for node in nested] == ["a"]
+    assert [reply["id"] for reply in nested[0]["replies"]] == ["a2", "a1"]
+    assert nested[0]["replies"][0]["replies"] == []
+
+
+def test_store_reads_ranges_with_cached_header(tmp_path):
+    cache = RecordCache()
+    store = ThreadStore(tmp_path, json_backend="json", cache=cache)
+    store.write("post", THREAD)
+    
+    structure, ranges = store.read_ranges("post", lambda s: [(1, 1 + s["subtree_size"][1])])
+    store.read_ranges("post", lambda s: [(0, 1)])
+    
+    assert [c["id"] for c in ranges[0]] == ["a", "a2", "a2x", "a1"]
+    assert cache.get_stats()["hits"] == 1
+    assert [c["id"] for c in store.read_all("post")] == ["b", "a", "a2", "a2x", "a1"]
+    
+    # Réécriture: le nouvel en-tête remplace celui en cache
+    store.write("post", THREAD + [comment("c", "post", 30)])
+    assert store.read_all("post")[0]["id"] == "c"
+    assert store.read_ranges("missing", lambda s: []) is None
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Tests de l'index vectoriel des posts
+Fichier: mcp_servers/reddit_server/tests/test_vector_index.py
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from storage.vector_index import VectorIndex
+
+
+def post(post_id: str, title: str, body: str = "") -> dict:
+    return {"id": post_id, "title": title, "selftext": body}
+
+
+def test_similar_to_post_excludes_the_post_itself(tmp_path):
+    index = VectorIndex(tmp_path / "vectors.db", dim=64)
+    index.add([
+        post("a", "asyncio event loop tutorial"),
+        post("b", "asyncio event loop explained"),
+        post("c", "baking sourdough bread")
+    ])
+    
+    result = index.similar_to_post("a", k=2)
+    
+    assert [hit["id"] for hit in result["hits"]][0] == "b"
+    assert "a" not in [hit["id"] for hit in result["hits"]]
+    index.close()
+
+
+def test_similar_to_text_and_unknown_post(tmp_path):
+    index = VectorIndex(tmp_path / "vectors.db", dim=64)
+    index.add([post("a", "asyncio event loop"), post("b", "sourdough bread recipe")])
+    
+    assert index.similar_to_text("sourdough bread", k=1)["hits"][0]["id"] == "b"
+    assert index.similar_to_post("missing") is None
+    assert index.similar_to_post("missing", record=post("missing", "asyncio loop"), k=1)["hits"][0]["id"] == "a"
+    index.close()
+
+
+def test_posts_without_terms_are_not_indexed(tmp_path):
+    index = VectorIndex(tmp_path / "vectors.db", dim=64)
+    index.add([post("a", "asyncio"), post("b", "")])
+    
+    assert len(index) == 1
+    assert index.remove(["a"]) == 1
+    assert len(index) == 0
+    index.close()
\ No newline at end of file
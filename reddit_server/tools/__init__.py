@@ -8,11 +8,17 @@ from .collect_subreddit import CollectSubredditTool
 from .collect_comments import CollectCommentsTool
 from .user_data import UserDataTool
 from .subreddit_info import SubredditInfoTool
+from .search_local_corpus import SearchLocalCorpusTool
+from .find_similar_posts import FindSimilarPostsTool
+from .comment_thread import CommentThreadTool
 
 __all__ = [
     "SearchPostsTool",
     "CollectSubredditTool",
     "CollectCommentsTool",
     "UserDataTool",
-    "SubredditInfoTool"
+    "SubredditInfoTool",
+    "SearchLocalCorpusTool",
+    "FindSimilarPostsTool",
+    "CommentThreadTool"
 ]
\ No newline at end of file
@@ -3,18 +3,20 @@ Outil MCP: Collecte des commentaires d'un post
 Fichier: mcp_servers/reddit_server/tools/collect_comments.py
 """
 
-import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from mcp.types import Tool, TextContent
+from utils.serializer import response_serializer
+from storage.content_hash import count_statuses
 from utils.validators import RedditValidator, ValidationError
 
 
 class CollectCommentsTool:
     """Outil pour collecter les commentaires d'un post"""
     
-    def __init__(self, api_client, file_manager):
+    def __init__(self, api_client, file_manager, writer):
         self.api = api_client
         self.storage = file_manager
+        self.writer = writer
     
     @staticmethod
     def get_definition() -> Tool:
@@ -36,12 +38,52 @@ class CollectCommentsTool:
                         "default": 100,
                         "minimum": 1,
                         "description": "Nombre maximum de commentaires à collecter"
+                    },
+                    "skip_known": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Post et fil déjà collectés: données stockées, sans "
+                                       "appel à l'API (max_staleness=0 pour recollecter). Sinon, "
+                                       "ignorer les commentaires déjà collectés (ni sauvegardés "
+                                       "ni retournés)"
+                    },
+                    "priority": {
+                        "type": "string",
+                        "enum": ["interactive", "bulk"],
+                        "default": "interactive",
+                        "description": "Priorité des appels à l'API: 'bulk' pour les collectes de masse, "
+                                       "qui passent après les appels interactifs"
+                    },
+                    "max_staleness": {
+                        "type": "integer",
+                        "minimum": 0,
+                        "description": "Âge maximal en secondes d'une réponse en cache "
+                                       "(optionnel, défaut: TTL de la méthode; 0: appel à l'API)"
                     }
                 },
                 "required": ["post_id"]
             }
         )
     
+    def _stored(self, post_id: str) -> Optional[Dict]:
+        """Résultat tiré du stockage (None si le post ou son document de fil manque)"""
+        thread = self.storage.thread_summary(post_id)
+        if thread is None:
+            return None
+        post = self.storage.get_post(post_id)
+        if post is None:
+            return None
+        return {
+            "status": "success",
+            "post_id": post_id,
+            "skipped": True,
+            "post_title": post.get("title"),
+            "post_author": post.get("author"),
+            "subreddit": post.get("subreddit"),
+            "thread": thread,
+            "post": post
+        }
+    
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """
         Exécute la collecte des commentaires
@@ -57,20 +99,39 @@ class CollectCommentsTool:
             params = RedditValidator.validate_post_id(arguments)
             
             post_id = params["post_id"]
+            
+            # Post et fil déjà collectés: données stockées, sans appel à l'API
+            # (max_staleness=0 demande une nouvelle collecte)
+            refresh = params["max_staleness"] == 0
+            if params["skip_known"] and not refresh and self.storage.filter_known("posts", [post_id]):
+                stored = self._stored(post_id)
+                if stored is not None:
+                    print(f"💬 {post_id} déjà collecté: fil stocké")
+                    return [TextContent(
+                        type="text",
+                        text=response_serializer.dumps(stored)
+                    )]
+            
             print(f"💬 Collecte commentaires: {post_id}")
             
             # Collecter le post et ses commentaires
-            post, comments = self.api.get_post_with_comments(
+            post, comments = await self.api.get_post_with_comments(
                 post_id=post_id,
-                limit=params["limit"]
+                limit=params["limit"],
+                priority=params["priority"],
+                max_staleness=params["max_staleness"]
             )
             
-            # Sauvegarder le post
-            self.storage.save_post(post)
+            # Écarter les commentaires déjà stockés (filtre de Bloom, confirmé par l'index)
+            new_comments = comments
+            if params["skip_known"]:
+                known = self.storage.filter_known("comments", [comment["id"] for comment in comments])
+                new_comments = [comment for comment in comments if comment["id"] not in known]
             
-            # Sauvegarder chaque commentaire
-            for comment in comments:
-                self.storage.save_comment(comment)
+            # Sauvegarder le post et les commentaires (une étape d'écriture, document de fil
+            # mis à jour et résumé dans le thread d'écriture)
+            saved = await self.writer.save_post_comments(post, new_comments)
+            saved_comments = saved["comments"]
             
             result = {
                 "status": "success",
@@ -79,33 +140,41 @@ class CollectCommentsTool:
                 "post_author": post.get("author"),
                 "subreddit": post.get("subreddit"),
                 "comments_collected": len(comments),
+                "comments_skipped": len(comments) - len(new_comments),
+                "storage": {
+                    "posts": count_statuses(saved["post"]["statuses"]),
+                    "comments": count_statuses(saved_comments["statuses"])
+                },
+                "thread": saved["thread"],
                 "post": post,
-                "comments": comments
+                "comments": new_comments
             }
             
-            print(f"✅ {len(comments)} commentaires collectés pour {post_id}")
+            print(f"✅ {len(comments)} commentaires collectés pour {post_id} "
+                  f"({saved_comments['new']} nouveaux, {saved_comments['updated']} modifiés, "
+                  f"{saved_comments['unchanged']} inchangés)")
             
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
+                text=response_serializer.dumps(result)
             )]
             
         except ValidationError as e:
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "validation_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
         except Exception as e:
             print(f"❌ Erreur: {e}")
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "execution_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
\ No newline at end of file
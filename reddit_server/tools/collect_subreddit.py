@@ -3,18 +3,20 @@ Outil MCP: Collecte des posts d'un subreddit
 Fichier: mcp_servers/reddit_server/tools/collect_subreddit.py
 """
 
-import json
 from typing import Any, Dict, List
 from mcp.types import Tool, TextContent
+from utils.serializer import response_serializer
+from storage.content_hash import count_statuses
 from utils.validators import RedditValidator, ValidationError
 
 
 class CollectSubredditTool:
     """Outil pour collecter les posts d'un subreddit"""
     
-    def __init__(self, api_client, file_manager):
+    def __init__(self, api_client, file_manager, writer):
         self.api = api_client
         self.storage = file_manager
+        self.writer = writer
     
     @staticmethod
     def get_definition() -> Tool:
@@ -22,7 +24,8 @@ class CollectSubredditTool:
         return Tool(
             name="collect_subreddit_posts",
             description="Collecte les posts d'un subreddit spécifique. "
-                       "Permet de récupérer les posts hot, new, top ou rising.",
+                       "Permet de récupérer les posts hot, new, top ou rising. "
+                       "En mode incrémental, ne collecte que les posts publiés depuis la collecte précédente.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -40,14 +43,39 @@ class CollectSubredditTool:
                         "type": "integer",
                         "default": 25,
                         "minimum": 1,
-                        "maximum": 100,
-                        "description": "Nombre de posts à collecter"
+                        "maximum": 1000,
+                        "description": "Nombre de posts à collecter (100 au plus, 1000 en mode incrémental)"
                     },
                     "time_filter": {
                         "type": "string",
                         "enum": ["hour", "day", "week", "month", "year", "all"],
                         "default": "day",
                         "description": "Filtre temporel (seulement pour sort='top')"
+                    },
+                    "incremental": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Ne collecter que les posts plus récents que le dernier post déjà vu "
+                                       "(sort='new'): les pages sont lues jusqu'à ce post, puis la collecte s'arrête. "
+                                       "Une collecte interrompue par la limite reprend là où elle s'est arrêtée"
+                    },
+                    "skip_known": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Ignorer les posts déjà collectés (ni sauvegardés ni retournés)"
+                    },
+                    "priority": {
+                        "type": "string",
+                        "enum": ["interactive", "bulk"],
+                        "default": "interactive",
+                        "description": "Priorité des appels à l'API: 'bulk' pour les collectes de masse, "
+                                       "qui passent après les appels interactifs"
+                    },
+                    "max_staleness": {
+                        "type": "integer",
+                        "minimum": 0,
+                        "description": "Âge maximal en secondes d'une réponse en cache "
+                                       "(optionnel, défaut: TTL de la méthode; 0: appel à l'API)"
                     }
                 },
                 "required": ["subreddit"]
@@ -71,20 +99,45 @@ class CollectSubredditTool:
             subreddit = params["subreddit"]
             print(f"📂 Collecte: r/{subreddit} (tri: {params['sort']})")
             
-            # Collecter les posts
-            posts = self.api.get_subreddit_posts(
-                subreddit=subreddit,
-                sort=params["sort"],
-                limit=params["limit"],
-                time_filter=params["time_filter"]
-            )
+            # Collecter les posts (mode incrémental: seulement ceux publiés depuis le curseur)
+            cursor = None
+            resume = None
+            incremental = None
+            if params["incremental"]:
+                cursor = self.storage.cursors.get(subreddit, params["sort"])
+                # Après une collecte incomplète: reprise là où elle s'est arrêtée
+                resume = cursor.get("resume") if cursor else None
+                incremental = await self.api.get_new_posts(
+                    subreddit=subreddit,
+                    cursor=cursor if cursor and "fullname" in cursor else None,
+                    limit=params["limit"],
+                    priority=params["priority"],
+                    after=resume["after"] if resume else None
+                )
+                posts = incremental["posts"]
+            else:
+                posts = await self.api.get_subreddit_posts(
+                    subreddit=subreddit,
+                    sort=params["sort"],
+                    limit=params["limit"],
+                    time_filter=params["time_filter"],
+                    priority=params["priority"],
+                    max_staleness=params["max_staleness"]
+                )
             
-            # Sauvegarder chaque post
-            for post in posts:
-                self.storage.save_post(post)
+            # Écarter les posts déjà stockés (filtre de Bloom, confirmé par l'index)
+            new_posts = posts
+            if params["skip_known"]:
+                known = self.storage.filter_known("posts", [post["id"] for post in posts])
+                new_posts = [post for post in posts if post["id"] not in known]
             
-            # Sauvegarder la collection complète
-            collection_file = self.storage.save_subreddit_collection(subreddit, posts)
+            # Sauvegarder les posts (écriture groupée)
+            saved = await self.writer.save_posts(new_posts)
+            
+            # Sauvegarder la collection complète (pas de collection vide en mode incrémental)
+            collection_file = None
+            if posts or not params["incremental"]:
+                collection_file = await self.writer.save_subreddit_collection(subreddit, posts)
             
             result = {
                 "status": "success",
@@ -92,33 +145,50 @@ class CollectSubredditTool:
                 "sort": params["sort"],
                 "time_filter": params["time_filter"],
                 "posts_collected": len(posts),
+                "posts_skipped": len(posts) - len(new_posts),
+                "storage": {"posts": count_statuses(saved["statuses"])},
                 "collection_file": collection_file,
-                "posts": posts
+                "posts": new_posts
             }
             
-            print(f"✅ {len(posts)} posts collectés de r/{subreddit}")
+            if incremental is not None:
+                # Curseur avancé après l'écriture des posts, seulement si la collecte est
+                # complète (sinon point de reprise: aucun post sauté entre deux collectes)
+                result["incremental"] = {
+                    "previous_cursor": cursor,
+                    "cursor": await self.writer.save_cursor(
+                        subreddit, params["sort"], posts, incremental["complete"]
+                    ),
+                    "resumed": resume is not None,
+                    "pages": incremental["pages"],
+                    "reached_cursor": incremental["reached_cursor"],
+                    "complete": incremental["complete"]
+                }
+            
+            print(f"✅ {len(posts)} posts collectés de r/{subreddit} "
+                  f"({saved['new']} nouveaux, {saved['updated']} modifiés, {saved['unchanged']} inchangés)")
             
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
+                text=response_serializer.dumps(result)
             )]
             
         except ValidationError as e:
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "validation_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
         except Exception as e:
             print(f"❌ Erreur: {e}")
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "execution_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Outil MCP: Lecture d'un fil de commentaires stocké
+Fichier: mcp_servers/reddit_server/tools/comment_thread.py
+"""
+
+from typing import Any, Dict, List
+from mcp.types import Tool, TextContent
+from utils.serializer import response_serializer
+from utils.validators import RedditValidator, ValidationError
+
+
+class CommentThreadTool:
+    """Outil pour lire un sous-arbre ou les meilleures branches d'un fil déjà collecté"""
+    
+    def __init__(self, file_manager, writer):
+        self.storage = file_manager
+        self.writer = writer
+    
+    @staticmethod
+    def get_definition() -> Tool:
+        """Retourne la définition de l'outil pour MCP"""
+        return Tool(
+            name="get_comment_thread",
+            description="Lit l'arborescence des commentaires déjà collectés d'un post: "
+                       "les meilleures branches (par score ou par taille) ou le sous-arbre "
+                       "d'un commentaire, sans charger tout le fil ni appeler l'API Reddit.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "post_id": {
+                        "type": "string",
+                        "description": "ID du post Reddit (ex: '1a2b3c4d')"
+                    },
+                    "comment_id": {
+                        "type": "string",
+                        "description": "ID d'un commentaire: retourne son sous-arbre (optionnel)"
+                    },
+                    "top_k": {
+                        "type": "integer",
+                        "default": 10,
+                        "minimum": 1,
+                        "maximum": 100,
+                        "description": "Nombre de branches retournées (sans comment_id)"
+                    },
+                    "by": {
+                        "type": "string",
+                        "enum": ["score", "size"],
+                        "default": "score",
+                        "description": "Classement des branches: score du commentaire ou nombre de réponses"
+                    },
+                    "max_depth": {
+                        "type": "integer",
+                        "minimum": 0,
+                        "description": "Profondeur maximale des réponses (optionnel, 0: sans réponses)"
+                    }
+                },
+                "required": ["post_id"]
+            }
+        )
+    
+    async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """
+        Exécute la lecture du fil
+        
+        Args:
+            arguments: Arguments de l'outil
+        
+        Returns:
+            Sous-arbre ou branches, commentaires imbriqués dans "replies"
+        """
+        try:
+            # Valider les paramètres
+            params = RedditValidator.validate_comment_thread_params(arguments)
+            
+            post_id = params["post_id"]
+            print(f"🌳 Fil de commentaires: {post_id}")
+            
+            # Commentaires stockés avant les documents de fil: construction dans le thread d'écriture
+            if not self.storage.threads.exists(post_id):
+                await self.writer.call(self.storage.ensure_thread, post_id)
+            
+            if params["comment_id"]:
+                found = self.storage.get_comment_subtree(
+                    post_id, params["comment_id"], max_depth=params["max_depth"]
+                )
+            else:
+                found = self.storage.get_top_branches(
+                    post_id, k=params["top_k"], by=params["by"], max_depth=params["max_depth"]
+                )
+            
+            result = {"status": "success", **found}
+            
+            print(f"✅ {found['comments_read']} commentaires lus sur {found['total_comments']}")
+            
+            return [TextContent(
+                type="text",
+                text=response_serializer.dumps(result)
+            )]
+        
+        except ValidationError as e:
+            return [TextContent(
+                type="text",
+                text=response_serializer.dumps({
+                    "status": "error",
+                    "error": "validation_error",
+                    "message": str(e)
+                })
+            )]
+        except Exception as e:
+            print(f"❌ Erreur: {e}")
+            return [TextContent(
+                type="text",
+                text=response_serializer.dumps({
+                    "status": "error",
+                    "error": "execution_error",
+                    "message": str(e)
+                })
+            )]
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""
+Outil MCP: Posts similaires
+Fichier: mcp_servers/reddit_server/tools/find_similar_posts.py
+"""
+
+import asyncio
+from functools import partial
+from typing import Any, Dict, List
+from mcp.types import Tool, TextContent
+from utils.serializer import response_serializer
+from utils.validators import RedditValidator, ValidationError
+
+
+class FindSimilarPostsTool:
+    """Outil pour trouver les posts stockés les plus proches d'un post ou d'un texte"""
+    
+    def __init__(self, file_manager):
+        self.storage = file_manager
+    
+    @staticmethod
+    def get_definition() -> Tool:
+        """Retourne la définition de l'outil pour MCP"""
+        return Tool(
+            name="find_similar_posts",
+            description="Trouve les posts déjà collectés les plus similaires à un post (par son ID) "
+                       "ou à un texte libre: déduplication, contenus apparentés. "
+                       "Recherche vectorielle locale, sans appel à l'API Reddit.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "post_id": {
+                        "type": "string",
+                        "description": "ID du post de référence (ex: '1abc23d')"
+                    },
+                    "text": {
+                        "type": "string",
+                        "description": "Texte de référence (à la place de post_id)"
+                    },
+                    "k": {
+                        "type": "integer",
+                        "default": 10,
+                        "minimum": 1,
+                        "maximum": 100,
+                        "description": "Nombre de posts similaires retournés"
+                    }
+                }
+            }
+        )
+    
+    async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """
+        Exécute la recherche de posts similaires
+        
+        Args:
+            arguments: Arguments de l'outil
+        
+        Returns:
+            Posts classés par similarité cosinus décroissante
+        """
+        try:
+            # Valider les paramètres
+            params = RedditValidator.validate_similar_posts_params(arguments)
+            
+            post_id = params["post_id"]
+            print("🔍 Posts similaires à " + (post_id or "un texte"))
+            
+            # Calcul des similarités et lecture des segments hors de la boucle asyncio
+            found = await asyncio.get_running_loop().run_in_executor(None, partial(
+                self.storage.find_similar_posts,
+                post_id=post_id,
+                text=params["text"],
+                k=params["k"]
+            ))
+            
+            result = {
+                "status": "success",
+                "post_id": post_id,
+                "k": params["k"],
+                "results_count": len(found["hits"]),
+                "candidates": found["candidates"],
+                "took_ms": found["took_ms"],
+                "results": found["hits"]
+            }
+            
+            print(f"✅ {len(found['hits'])} posts similaires "
+                  f"({found['candidates']} comparés, {found['took_ms']} ms)")
+            
+            return [TextContent(
+                type="text",
+                text=response_serializer.dumps(result)
+            )]
+        
+        except ValidationError as e:
+            return [TextContent(
+                type="text",
+                text=response_serializer.dumps({
+                    "status": "error",
+                    "error": "validation_error",
+                    "message": str(e)
+                })
+            )]
+        except Exception as e:
+            print(f"❌ Erreur: {e}")
+            return [TextContent(
+                type="text",
+                text=response_serializer.dumps({
+                    "status": "error",
+                    "error": "execution_error",
+                    "message": str(e)
+                })
+            )]
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Outil MCP: Recherche dans le corpus local
+Fichier: mcp_servers/reddit_server/tools/search_local_corpus.py
+"""
+
+import asyncio
+from functools import partial
+from typing import Any, Dict, List
+from mcp.types import Tool, TextContent
+from utils.serializer import response_serializer
+from utils.validators import RedditValidator, ValidationError
+
+
+class SearchLocalCorpusTool:
+    """Outil pour rechercher dans les posts et commentaires déjà stockés (sans appel à l'API)"""
+    
+    def __init__(self, file_manager):
+        self.storage = file_manager
+    
+    @staticmethod
+    def get_definition() -> Tool:
+        """Retourne la définition de l'outil pour MCP"""
+        return Tool(
+            name="search_local_corpus",
+            description="Recherche plein texte (classement BM25) dans les posts et commentaires "
+                       "déjà collectés, filtrable par subreddit et par période. "
+                       "Ne consomme aucun quota d'API Reddit.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Mots-clés recherchés (titres, selftext et commentaires)"
+                    },
+                    "subreddit": {
+                        "type": "string",
+                        "description": "Subreddit spécifique (optionnel, ex: 'python')"
+                    },
+                    "since": {
+                        "type": "string",
+                        "description": "Premier jour de création inclus (yyyy-mm-dd, optionnel)"
+                    },
+                    "until": {
+                        "type": "string",
+                        "description": "Dernier jour de création inclus (yyyy-mm-dd, optionnel)"
+                    },
+                    "kinds": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["posts", "comments"]},
+                        "default": ["posts", "comments"],
+                        "description": "Types de documents recherchés"
+                    },
+                    "match": {
+                        "type": "string",
+                        "enum": ["all", "any"],
+                        "default": "all",
+                        "description": "Tous les mots-clés requis ('all') ou au moins un ('any')"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "default": 10,
+                        "minimum": 1,
+                        "maximum": 100,
+                        "description": "Nombre maximum de résultats"
+                    }
+                },
+                "required": ["query"]
+            }
+        )
+    
+    async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """
+        Exécute la recherche dans le corpus local
+        
+        Args:
+            arguments: Arguments de l'outil
+        
+        Returns:
+            Résultats classés par score BM25
+        """
+        try:
+            # Valider les paramètres
+            params = RedditValidator.validate_local_search_params(arguments)
+            
+            query = params["query"]
+            subreddit = params["subreddit"]
+            
+            print(f"🔍 Recherche locale: '{query}'" +
+                  (f" dans r/{subreddit}" if subreddit else " (corpus complet)"))
+            
+            # Lecture SQLite et segments hors de la boucle asyncio
+            found = await asyncio.get_running_loop().run_in_executor(None, partial(
+                self.storage.search_corpus,
+                query,
+                kinds=params["kinds"],
+                subreddit=subreddit,
+                since=params["since"],
+                until=params["until"],
+                limit=params["limit"],
+                match=params["match"]
+            ))
+            
+            result = {
+                "status": "success",
+                "query": query,
+                "subreddit": subreddit or "all",
+                "since": params["since"],
+                "until": params["until"],
+                "match": params["match"],
+                "terms": found["terms"],
+                "ignored_terms": found["ignored"],
+                "total_matches": found["total"],
+                "results_count": len(found["hits"]),
+                "took_ms": found["took_ms"],
+                "results": found["hits"]
+            }
+            
+            print(f"✅ {found['total']} documents correspondants ({found['took_ms']} ms)")
+            
+            return [TextContent(
+                type="text",
+                text=response_serializer.dumps(result)
+            )]
+        
+        except ValidationError as e:
+            return [TextContent(
+                type="text",
+                text=response_serializer.dumps({
+                    "status": "error",
+                    "error": "validation_error",
+                    "message": str(e)
+                })
+            )]
+        except Exception as e:
+            print(f"❌ Erreur: {e}")
+            return [TextContent(
+                type="text",
+                text=response_serializer.dumps({
+                    "status": "error",
+                    "error": "execution_error",
+                    "message": str(e)
+                })
+            )]
\ No newline at end of file
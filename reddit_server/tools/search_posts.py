@@ -3,18 +3,20 @@ Outil MCP: Recherche de posts Reddit
 Fichier: mcp_servers/reddit_server/tools/search_posts.py
 """
 
-import json
 from typing import Any, Dict, List
 from mcp.types import Tool, TextContent
+from utils.serializer import response_serializer
+from storage.content_hash import count_statuses
 from utils.validators import RedditValidator, ValidationError
 
 
 class SearchPostsTool:
     """Outil pour rechercher des posts sur Reddit"""
     
-    def __init__(self, api_client, file_manager):
+    def __init__(self, api_client, file_manager, writer):
         self.api = api_client
         self.storage = file_manager
+        self.writer = writer
     
     @staticmethod
     def get_definition() -> Tool:
@@ -46,6 +48,24 @@ class SearchPostsTool:
                         "minimum": 1,
                         "maximum": 100,
                         "description": "Nombre maximum de résultats"
+                    },
+                    "skip_known": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Ignorer les posts déjà collectés (ni sauvegardés ni retournés)"
+                    },
+                    "priority": {
+                        "type": "string",
+                        "enum": ["interactive", "bulk"],
+                        "default": "interactive",
+                        "description": "Priorité des appels à l'API: 'bulk' pour les collectes de masse, "
+                                       "qui passent après les appels interactifs"
+                    },
+                    "max_staleness": {
+                        "type": "integer",
+                        "minimum": 0,
+                        "description": "Âge maximal en secondes d'une réponse en cache "
+                                       "(optionnel, défaut: TTL de la méthode; 0: appel à l'API)"
                     }
                 },
                 "required": ["query"]
@@ -73,19 +93,26 @@ class SearchPostsTool:
                   (f" dans r/{subreddit}" if subreddit else " (global)"))
             
             # Effectuer la recherche
-            posts = self.api.search_posts(
+            posts = await self.api.search_posts(
                 query=query,
                 subreddit=subreddit,
                 sort=params["sort"],
-                limit=params["limit"]
+                limit=params["limit"],
+                priority=params["priority"],
+                max_staleness=params["max_staleness"]
             )
             
-            # Sauvegarder les posts
-            for post in posts:
-                self.storage.save_post(post)
+            # Écarter les posts déjà stockés (filtre de Bloom, confirmé par l'index)
+            new_posts = posts
+            if params["skip_known"]:
+                known = self.storage.filter_known("posts", [post["id"] for post in posts])
+                new_posts = [post for post in posts if post["id"] not in known]
+            
+            # Sauvegarder les posts (écriture groupée)
+            saved = await self.writer.save_posts(new_posts)
             
             # Sauvegarder les résultats de recherche
-            search_file = self.storage.save_search_results(query, posts)
+            search_file = await self.writer.save_search_results(query, posts)
             
             result = {
                 "status": "success",
@@ -93,33 +120,36 @@ class SearchPostsTool:
                 "subreddit": subreddit or "all",
                 "sort": params["sort"],
                 "posts_found": len(posts),
+                "posts_skipped": len(posts) - len(new_posts),
+                "storage": {"posts": count_statuses(saved["statuses"])},
                 "search_file": search_file,
-                "posts": posts
+                "posts": new_posts
             }
             
-            print(f"✅ {len(posts)} posts trouvés")
+            print(f"✅ {len(posts)} posts trouvés "
+                  f"({saved['new']} nouveaux, {saved['updated']} modifiés, {saved['unchanged']} inchangés)")
             
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
+                text=response_serializer.dumps(result)
             )]
             
         except ValidationError as e:
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "validation_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
         except Exception as e:
             print(f"❌ Erreur: {e}")
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "execution_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
\ No newline at end of file
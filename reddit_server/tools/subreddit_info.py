@@ -3,9 +3,9 @@ Outil MCP: Informations d'un subreddit
 Fichier: mcp_servers/reddit_server/tools/subreddit_info.py
 """
 
-import json
 from typing import Any, Dict, List
 from mcp.types import Tool, TextContent
+from utils.serializer import response_serializer
 from utils.validators import RedditValidator, ValidationError
 
 
@@ -29,6 +29,19 @@ class SubredditInfoTool:
                     "subreddit": {
                         "type": "string",
                         "description": "Nom du subreddit (sans le 'r/', ex: 'python')"
+                    },
+                    "priority": {
+                        "type": "string",
+                        "enum": ["interactive", "bulk"],
+                        "default": "interactive",
+                        "description": "Priorité des appels à l'API: 'bulk' pour les collectes de masse, "
+                                       "qui passent après les appels interactifs"
+                    },
+                    "max_staleness": {
+                        "type": "integer",
+                        "minimum": 0,
+                        "description": "Âge maximal en secondes d'une réponse en cache "
+                                       "(optionnel, défaut: TTL de la méthode; 0: appel à l'API)"
                     }
                 },
                 "required": ["subreddit"]
@@ -53,7 +66,9 @@ class SubredditInfoTool:
             print(f"  Info subreddit: r/{subreddit}")
             
             # Collecter les informations
-            info = self.api.get_subreddit_info(subreddit)
+            info = await self.api.get_subreddit_info(
+                subreddit, priority=params["priority"], max_staleness=params["max_staleness"]
+            )
             
             result = {
                 "status": "success",
@@ -66,25 +81,25 @@ class SubredditInfoTool:
             
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
+                text=response_serializer.dumps(result)
             )]
             
         except ValidationError as e:
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "validation_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
         except Exception as e:
             print(f" Erreur: {e}")
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "execution_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
\ No newline at end of file
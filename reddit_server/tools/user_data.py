@@ -3,18 +3,19 @@ Outil MCP: Collecte des données d'un utilisateur
 Fichier: mcp_servers/reddit_server/tools/user_data.py
 """
 
-import json
 from typing import Any, Dict, List
 from mcp.types import Tool, TextContent
+from utils.serializer import response_serializer
 from utils.validators import RedditValidator, ValidationError
 
 
 class UserDataTool:
     """Outil pour collecter les données d'un utilisateur"""
     
-    def __init__(self, api_client, file_manager):
+    def __init__(self, api_client, file_manager, writer):
         self.api = api_client
         self.storage = file_manager
+        self.writer = writer
     
     @staticmethod
     def get_definition() -> Tool:
@@ -45,6 +46,25 @@ class UserDataTool:
                         "default": 100,
                         "minimum": 1,
                         "description": "Nombre maximum d'éléments par catégorie"
+                    },
+                    "skip_known": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Si l'utilisateur a déjà été collecté, retourner les données "
+                                       "stockées sans appeler l'API"
+                    },
+                    "priority": {
+                        "type": "string",
+                        "enum": ["interactive", "bulk"],
+                        "default": "interactive",
+                        "description": "Priorité des appels à l'API: 'bulk' pour les collectes de masse, "
+                                       "qui passent après les appels interactifs"
+                    },
+                    "max_staleness": {
+                        "type": "integer",
+                        "minimum": 0,
+                        "description": "Âge maximal en secondes d'une réponse en cache "
+                                       "(optionnel, défaut: TTL de la méthode; 0: appel à l'API)"
                     }
                 },
                 "required": ["username"]
@@ -66,18 +86,34 @@ class UserDataTool:
             params = RedditValidator.validate_username(arguments)
             
             username = params["username"]
+            
+            # Utilisateur déjà collecté: données stockées, sans appel à l'API
+            if params["skip_known"] and self.storage.filter_known("users", [username]):
+                print(f" u/{username} déjà collecté: données stockées")
+                return [TextContent(
+                    type="text",
+                    text=response_serializer.dumps({
+                        "status": "success",
+                        "username": username,
+                        "skipped": True,
+                        "user_data": self.storage.get_user_data(username)
+                    })
+                )]
+            
             print(f" Collecte données: u/{username}")
             
             # Collecter les données utilisateur
-            user_data = self.api.get_user_data(
+            user_data = await self.api.get_user_data(
                 username=username,
                 include_posts=params["include_posts"],
                 include_comments=params["include_comments"],
-                limit=params["limit"]
+                limit=params["limit"],
+                priority=params["priority"],
+                max_staleness=params["max_staleness"]
             )
             
             # Sauvegarder les données
-            user_file = self.storage.save_user_data(username, user_data)
+            user_file = await self.writer.save_user_data(username, user_data)
             
             result = {
                 "status": "success",
@@ -97,25 +133,25 @@ class UserDataTool:
             
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
+                text=response_serializer.dumps(result)
             )]
             
         except ValidationError as e:
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "validation_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
         except Exception as e:
             print(f"❌ Erreur: {e}")
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=response_serializer.dumps({
                     "status": "error",
                     "error": "execution_error",
                     "message": str(e)
-                }, indent=2)
+                })
             )]
\ No newline at end of file
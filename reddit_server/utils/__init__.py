@@ -4,10 +4,24 @@ Fichier: mcp_servers/reddit_server/utils/__init__.py
 """
 
 from .api_client import RedditAPIClient
+from .api_pool import ApiCallPool
+from .async_api_client import AsyncRedditAPIClient, ThreadedRedditAPIClient, create_api_client
+from .rate_limiter import RateLimitScheduler
+from .response_cache import CachedAPIClient, ResponseCache
 from .validators import RedditValidator, ValidationError
+from .serializer import JSONSerializer, response_serializer
 
 __all__ = [
     "RedditAPIClient",
+    "AsyncRedditAPIClient",
+    "ThreadedRedditAPIClient",
+    "ApiCallPool",
+    "RateLimitScheduler",
+    "ResponseCache",
+    "CachedAPIClient",
+    "create_api_client",
     "RedditValidator",
-    "ValidationError"
+    "ValidationError",
+    "JSONSerializer",
+    "response_serializer"
 ]
\ No newline at end of file
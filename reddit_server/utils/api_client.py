@@ -8,6 +8,110 @@ from typing import Dict, List, Optional, Tuple
 import praw
 
 
+def extract_post_data(post, include_extra: bool = False) -> Dict:
+    """Extrait les données d'un post Reddit (objet PRAW ou Async PRAW)"""
+    base_data = {
+        "id": post.id,
+        "title": post.title,
+        "selftext": post.selftext,
+        "author": str(post.author) if post.author else "[deleted]",
+        "subreddit": post.subreddit.display_name,
+        "created_utc": datetime.fromtimestamp(post.created_utc).isoformat(),
+        "score": post.score,
+        "upvote_ratio": post.upvote_ratio,
+        "num_comments": post.num_comments,
+        "permalink": post.permalink,
+        "url": post.url,
+        "is_self": post.is_self,
+        "link_flair_text": post.link_flair_text,
+        "retrieved_at": datetime.now().isoformat()
+    }
+    
+    if include_extra:
+        base_data.update({
+            "is_video": post.is_video,
+            "over_18": post.over_18,
+            # Date brute (secondes epoch UTC): comparable sans ambiguïté d'heure locale
+            "created_timestamp": post.created_utc
+        })
+    
+    return base_data
+
+
+def listing_after(listing) -> Optional[str]:
+    """
+    Fullname de la page suivante d'un listing parcouru (objet PRAW ou Async PRAW),
+    None si Reddit n'en indique pas: fin du listing
+    """
+    return getattr(listing._listing, "after", None)
+
+
+def extract_comment_data(comment, post_id: str) -> Dict:
+    """Extrait les données d'un commentaire Reddit (objet PRAW ou Async PRAW)"""
+    return {
+        "id": comment.id,
+        "post_id": post_id,
+        "author": str(comment.author) if comment.author else "[deleted]",
+        "body": comment.body,
+        "score": comment.score,
+        "created_utc": datetime.fromtimestamp(comment.created_utc).isoformat(),
+        "parent_id": comment.parent_id,
+        "retrieved_at": datetime.now().isoformat()
+    }
+
+
+def extract_user_data(user, username: str) -> Dict:
+    """Extrait le profil d'un utilisateur Reddit (sans ses posts ni commentaires)"""
+    return {
+        "username": username,
+        "comment_karma": user.comment_karma,
+        "link_karma": user.link_karma,
+        "created_utc": datetime.fromtimestamp(user.created_utc).isoformat(),
+        "is_gold": user.is_gold,
+        "retrieved_at": datetime.now().isoformat(),
+        "posts": [],
+        "comments": []
+    }
+
+
+def extract_user_post(submission) -> Dict:
+    """Extrait un post de l'historique d'un utilisateur"""
+    return {
+        "id": submission.id,
+        "title": submission.title,
+        "selftext": submission.selftext,
+        "subreddit": submission.subreddit.display_name,
+        "score": submission.score,
+        "created_utc": datetime.fromtimestamp(submission.created_utc).isoformat()
+    }
+
+
+def extract_user_comment(comment) -> Dict:
+    """Extrait un commentaire de l'historique d'un utilisateur (body tronqué à 200 caractères)"""
+    return {
+        "id": comment.id,
+        "body": comment.body[:200] + "..." if len(comment.body) > 200 else comment.body,
+        "subreddit": comment.subreddit.display_name,
+        "score": comment.score,
+        "created_utc": datetime.fromtimestamp(comment.created_utc).isoformat()
+    }
+
+
+def extract_subreddit_info(sub) -> Dict:
+    """Extrait les informations d'un subreddit"""
+    return {
+        "name": sub.display_name,
+        "title": sub.title,
+        "description": sub.public_description,
+        "subscribers": sub.subscribers,
+        "created_utc": datetime.fromtimestamp(sub.created_utc).isoformat(),
+        "over18": sub.over18,
+        "subreddit_type": sub.subreddit_type,
+        "url": sub.url,
+        "retrieved_at": datetime.now().isoformat()
+    }
+
+
 class RedditAPIClient:
     """Client pour interagir avec l'API Reddit"""
     
@@ -19,33 +123,6 @@ class RedditAPIClient:
             user_agent=user_agent
         )
     
-    def _extract_post_data(self, post, include_extra: bool = False) -> Dict:
-        """Extrait les données d'un post Reddit"""
-        base_data = {
-            "id": post.id,
-            "title": post.title,
-            "selftext": post.selftext,
-            "author": str(post.author) if post.author else "[deleted]",
-            "subreddit": post.subreddit.display_name,
-            "created_utc": datetime.fromtimestamp(post.created_utc).isoformat(),
-            "score": post.score,
-            "upvote_ratio": post.upvote_ratio,
-            "num_comments": post.num_comments,
-            "permalink": post.permalink,
-            "url": post.url,
-            "is_self": post.is_self,
-            "link_flair_text": post.link_flair_text,
-            "retrieved_at": datetime.now().isoformat()
-        }
-        
-        if include_extra:
-            base_data.update({
-                "is_video": post.is_video,
-                "over_18": post.over_18
-            })
-        
-        return base_data
-    
     def search_posts(self, query: str, subreddit: Optional[str] = None, 
                     sort: str = "relevance", limit: int = 10) -> List[Dict]:
         """Recherche des posts sur Reddit"""
@@ -56,7 +133,7 @@ class RedditAPIClient:
             else:
                 posts = self.reddit.subreddit("all").search(query, sort=sort, limit=limit)
             
-            return [self._extract_post_data(post) for post in posts]
+            return [extract_post_data(post) for post in posts]
             
         except Exception as e:
             raise Exception(f"Erreur recherche posts: {e}")
@@ -76,7 +153,24 @@ class RedditAPIClient:
             else:
                 posts = sub.rising(limit=limit)
             
-            return [self._extract_post_data(post, include_extra=True) for post in posts]
+            return [extract_post_data(post, include_extra=True) for post in posts]
+            
+        except Exception as e:
+            raise Exception(f"Erreur collecte subreddit: {e}")
+    
+    def get_new_posts_page(self, subreddit: str, limit: int = 100,
+                           after: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Récupère une page du listing "new" d'un subreddit (une requête), après le fullname `after`
+        
+        Returns:
+            (posts, fullname de la page suivante, None en fin de listing)
+        """
+        try:
+            sub = self.reddit.subreddit(subreddit)
+            listing = sub.new(limit=limit, params={"after": after} if after else None)
+            posts = [extract_post_data(post, include_extra=True) for post in listing]
+            return posts, listing_after(listing)
             
         except Exception as e:
             raise Exception(f"Erreur collecte subreddit: {e}")
@@ -87,65 +181,49 @@ class RedditAPIClient:
             submission = self.reddit.submission(id=post_id)
             submission.comments.replace_more(limit=0)
             
-            post_data = self._extract_post_data(submission)
+            post_data = extract_post_data(submission)
             
             comments = []
             for comment in submission.comments.list()[:limit]:
                 if hasattr(comment, 'body'):
-                    comments.append({
-                        "id": comment.id,
-                        "post_id": post_id,
-                        "author": str(comment.author) if comment.author else "[deleted]",
-                        "body": comment.body,
-                        "score": comment.score,
-                        "created_utc": datetime.fromtimestamp(comment.created_utc).isoformat(),
-                        "parent_id": comment.parent_id,
-                        "retrieved_at": datetime.now().isoformat()
-                    })
+                    comments.append(extract_comment_data(comment, post_id))
             
             return post_data, comments
             
         except Exception as e:
             raise Exception(f"Erreur collecte commentaires: {e}")
     
+    def get_post_by_id(self, post_id: str) -> Dict:
+        """Récupère un post par son ID (récupération d'un post évincé du disque)"""
+        try:
+            return extract_post_data(self.reddit.submission(id=post_id))
+        except Exception as e:
+            raise Exception(f"Erreur récupération post: {e}")
+    
+    def get_comment_by_id(self, comment_id: str) -> Dict:
+        """Récupère un commentaire par son ID (récupération d'un commentaire évincé du disque)"""
+        try:
+            comment = self.reddit.comment(id=comment_id)
+            # link_id: "t3_<id du post>"
+            return extract_comment_data(comment, comment.link_id.split("_", 1)[-1])
+        except Exception as e:
+            raise Exception(f"Erreur récupération commentaire: {e}")
+    
     def get_user_data(self, username: str, include_posts: bool = True, 
                      include_comments: bool = True, limit: int = 100) -> Dict:
         """Récupère les données d'un utilisateur"""
         try:
             user = self.reddit.redditor(username)
-            
-            user_data = {
-                "username": username,
-                "comment_karma": user.comment_karma,
-                "link_karma": user.link_karma,
-                "created_utc": datetime.fromtimestamp(user.created_utc).isoformat(),
-                "is_gold": user.is_gold,
-                "retrieved_at": datetime.now().isoformat(),
-                "posts": [],
-                "comments": []
-            }
+            user_data = extract_user_data(user, username)
             
             if include_posts:
                 for submission in user.submissions.new(limit=limit):
-                    user_data["posts"].append({
-                        "id": submission.id,
-                        "title": submission.title,
-                        "selftext": submission.selftext,
-                        "subreddit": submission.subreddit.display_name,
-                        "score": submission.score,
-                        "created_utc": datetime.fromtimestamp(submission.created_utc).isoformat()
-                    })
+                    user_data["posts"].append(extract_user_post(submission))
             
             if include_comments:
                 for comment in user.comments.new(limit=limit):
                     if hasattr(comment, 'body'):
-                        user_data["comments"].append({
-                            "id": comment.id,
-                            "body": comment.body[:200] + "..." if len(comment.body) > 200 else comment.body,
-                            "subreddit": comment.subreddit.display_name,
-                            "score": comment.score,
-                            "created_utc": datetime.fromtimestamp(comment.created_utc).isoformat()
-                        })
+                        user_data["comments"].append(extract_user_comment(comment))
             
             return user_data
             
@@ -155,19 +233,7 @@ class RedditAPIClient:
     def get_subreddit_info(self, subreddit: str) -> Dict:
         """Récupère les informations d'un subreddit"""
         try:
-            sub = self.reddit.subreddit(subreddit)
-            
-            return {
-                "name": sub.display_name,
-                "title": sub.title,
-                "description": sub.public_description,
-                "subscribers": sub.subscribers,
-                "created_utc": datetime.fromtimestamp(sub.created_utc).isoformat(),
-                "over18": sub.over18,
-                "subreddit_type": sub.subreddit_type,
-                "url": sub.url,
-                "retrieved_at": datetime.now().isoformat()
-            }
+            return extract_subreddit_info(self.reddit.subreddit(subreddit))
             
         except Exception as e:
             raise Exception(f"Erreur info subreddit: {e}")
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""
+Pool d'exécution des appels à l'API Reddit
+Fichier: mcp_servers/reddit_server/utils/api_pool.py
+
+- concurrence par outil: un sémaphore par outil limité (ex: au plus 2
+  collect_user_data simultanés), appliqué quel que soit le backend d'API
+- appels PRAW bloquants (backend "praw"): pool de threads borné, plus une
+  voie rapide séparée pour les appels courts (infos d'un subreddit) qui
+  n'attendent jamais derrière la collecte d'un long fil de commentaires
+
+L'attente (sémaphore, file du pool) et l'exécution sont mesurées séparément.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict
+
+# Voies d'exécution des appels bloquants
+LANES = ["default", "fast"]
+
+
+def parse_tool_limits(spec: str) -> Dict[str, int]:
+    """
+    Lit les limites de concurrence par outil
+    
+    Args:
+        spec: "outil=N,outil=N" (ex: "collect_user_data=2,collect_post_comments=4")
+    
+    Returns:
+        {nom de l'outil: nombre maximal d'appels simultanés}
+    """
+    limits = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, value = item.partition("=")
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = 0
+        if not name.strip() or limit < 1:
+            raise ValueError(
+                f"Limite de concurrence invalide: {item}. Format attendu: outil=N (N >= 1)"
+            )
+        limits[name.strip()] = limit
+    return limits
+
+
+class _Timings:
+    """Temps d'attente et d'exécution cumulés d'un outil ou d'une voie"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.waiting = 0
+        self.running = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_exec_ms = 0.0
+        self.max_exec_ms = 0.0
+    
+    def record(self, wait_ms: float, exec_ms: float, failed: bool):
+        self.calls += 1
+        self.errors += failed
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.total_exec_ms += exec_ms
+        self.max_exec_ms = max(self.max_exec_ms, exec_ms)
+    
+    def get_stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "waiting": self.waiting,
+            "running": self.running,
+            "avg_wait_ms": round(self.total_wait_ms / self.calls, 2) if self.calls else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+            "avg_exec_ms": round(self.total_exec_ms / self.calls, 2) if self.calls else 0.0,
+            "max_exec_ms": round(self.max_exec_ms, 2)
+        }
+
+
+class ApiCallPool:
+    """Limites de concurrence par outil et pool de threads des appels PRAW bloquants"""
+    
+    def __init__(self, pool_size: int = 8, fast_pool_size: int = 2,
+                 tool_limits: Dict[str, int] = None):
+        """
+        Args:
+            pool_size: Threads de la voie principale
+            fast_pool_size: Threads de la voie rapide (appels courts)
+            tool_limits: {outil: appels simultanés maximum} (outils absents: illimités)
+        """
+        if pool_size < 1 or fast_pool_size < 1:
+            raise ValueError(
+                f"Taille de pool invalide: {pool_size}/{fast_pool_size}. Minimum: 1"
+            )
+        self.pool_size = pool_size
+        self.fast_pool_size = fast_pool_size
+        self.tool_limits = dict(tool_limits or {})
+        self._executors = {
+            "default": ThreadPoolExecutor(pool_size, thread_name_prefix="reddit-api"),
+            "fast": ThreadPoolExecutor(fast_pool_size, thread_name_prefix="reddit-api-fast")
+        }
+        # Sémaphores créés à la première utilisation, dans la boucle du serveur
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Les voies sont mises à jour depuis les threads du pool
+        self._lock = threading.Lock()
+        self.tools: Dict[str, _Timings] = {}
+        self.lanes = {lane: _Timings() for lane in LANES}
+    
+    @classmethod
+    def from_config(cls, config) -> "ApiCallPool":
+        """Crée le pool décrit par la configuration"""
+        return cls(
+            config.API_POOL_SIZE,
+            config.API_FAST_POOL_SIZE,
+            parse_tool_limits(config.API_TOOL_CONCURRENCY)
+        )
+    
+    async def run_tool(self, name: str, execute: Callable[[Any], Awaitable], arguments: Any):
+        """
+        Exécute un outil dans sa limite de concurrence
+        
+        Args:
+            name: Nom de l'outil
+            execute: Coroutine de l'outil (tool.execute)
+            arguments: Arguments de l'outil
+        
+        Returns:
+            Résultat de l'outil
+        """
+        timings = self.tools.setdefault(name, _Timings())
+        semaphore = None
+        if name in self.tool_limits:
+            semaphore = self._semaphores.get(name)
+            if semaphore is None:
+                semaphore = self._semaphores[name] = asyncio.Semaphore(self.tool_limits[name])
+        
+        submitted = time.perf_counter()
+        if semaphore is not None:
+            timings.waiting += 1
+            try:
+                await semaphore.acquire()
+            finally:
+                timings.waiting -= 1
+        started = time.perf_counter()
+        timings.running += 1
+        failed = True
+        try:
+            result = await execute(arguments)
+            failed = False
+            return result
+        finally:
+            timings.running -= 1
+            if semaphore is not None:
+                semaphore.release()
+            timings.record((started - submitted) * 1000, (time.perf_counter() - started) * 1000, failed)
+    
+    async def run(self, func: Callable, *args, lane: str = "default"):
+        """
+        Exécute un appel bloquant dans le pool de threads
+        
+        Args:
+            func: Fonction bloquante (méthode de RedditAPIClient)
+            *args: Arguments de la fonction
+            lane: "default", ou "fast" pour les appels courts
+        
+        Returns:
+            Résultat de la fonction
+        """
+        timings = self.lanes[lane]
+        submitted = time.perf_counter()
+        with self._lock:
+            timings.waiting += 1
+        
+        def timed():
+            started = time.perf_counter()
+            with self._lock:
+                timings.waiting -= 1
+                timings.running += 1
+            failed = True
+            try:
+                result = func(*args)
+                failed = False
+                return result
+            finally:
+                with self._lock:
+                    timings.running -= 1
+                    timings.record(
+                        (started - submitted) * 1000, (time.perf_counter() - started) * 1000, failed
+                    )
+        
+        return await asyncio.get_running_loop().run_in_executor(self._executors[lane], timed)
+    
+    def close(self):
+        """Arrête les threads du pool (les appels en file sont abandonnés)"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def get_stats(self) -> Dict:
+        """Retourne les temps d'attente et d'exécution par outil et par voie"""
+        with self._lock:
+            lanes = {lane: timings.get_stats() for lane, timings in self.lanes.items()}
+        lanes["default"]["threads"] = self.pool_size
+        lanes["fast"]["threads"] = self.fast_pool_size
+        return {
+            "tool_limits": self.tool_limits,
+            "tools": {name: timings.get_stats() for name, timings in self.tools.items()},
+            "lanes": lanes
+        }
\ No newline at end of file
@@ -0,0 +1,392 @@
+"""
+Clients asynchrones de l'API Reddit
+Fichier: mcp_servers/reddit_server/utils/async_api_client.py
+
+Les outils attendent (await) le client d'API: les allers-retours HTTP ne
+bloquent plus la boucle asyncio et plusieurs appels d'outils se recouvrent.
+- backend "asyncpraw": AsyncRedditAPIClient, requêtes HTTP non bloquantes (Async PRAW)
+- backend "praw": ThreadedRedditAPIClient, le client PRAW synchrone exécuté
+  dans le pool de threads borné d'ApiCallPool (voie rapide pour les appels courts)
+
+Les deux exposent les mêmes coroutines.
+
+Chaque coroutine passe par l'ordonnanceur de débit partagé (RateLimitScheduler)
+avec sa priorité ("interactive" ou "bulk"), puis lui transmet le quota observé.
+
+Collecte incrémentale (get_new_posts): le listing "new" est parcouru page par
+page (after) jusqu'au curseur du subreddit; seules les pages lues sont payées.
+La fin du listing est celle indiquée par Reddit (pas de page suivante), pas
+une page courte.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from utils.api_client import (
+    RedditAPIClient, extract_comment_data, extract_post_data, extract_subreddit_info,
+    extract_user_comment, extract_user_data, extract_user_post, listing_after
+)
+from utils.api_pool import ApiCallPool
+from utils.rate_limiter import PAGE_SIZE, RateLimitScheduler, estimate_requests
+from utils.response_cache import CachedAPIClient, ResponseCache
+
+try:
+    import asyncpraw
+except ImportError:
+    asyncpraw = None
+
+
+class _ScheduledClient(ABC):
+    """Passage des appels par l'ordonnanceur de débit (optionnel)"""
+    
+    scheduler: Optional[RateLimitScheduler] = None
+    
+    @abstractmethod
+    def _limits(self) -> Optional[Dict]:
+        """Quota observé par le client PRAW (reddit.auth.limits)"""
+    
+    async def _acquire(self, cost: int, priority: str):
+        """Attend son tour auprès de l'ordonnanceur"""
+        if self.scheduler is not None:
+            await self.scheduler.acquire(cost, priority)
+    
+    def _observe(self):
+        """Transmet le quota observé après l'appel"""
+        if self.scheduler is not None:
+            self.scheduler.observe(self._limits())
+    
+    @abstractmethod
+    async def _new_posts_page(self, subreddit: str, limit: int, after: Optional[str],
+                              priority: str) -> Tuple[List[Dict], Optional[str]]:
+        """Une page du listing "new" (une requête) et le fullname de la page suivante"""
+    
+    async def get_new_posts(self, subreddit: str, cursor: Optional[Dict] = None,
+                            limit: int = 1000, priority: str = "interactive",
+                            after: Optional[str] = None) -> Dict:
+        """
+        Récupère les posts plus récents que le curseur, du plus récent au plus ancien
+        
+        Args:
+            subreddit: Nom du subreddit
+            cursor: Plus récent post déjà collecté ({"fullname", "created_utc" en secondes epoch},
+                    None: première collecte)
+            limit: Nombre maximal de nouveaux posts
+            priority: "interactive" ou "bulk"
+            after: Fullname à partir duquel reprendre le listing (None: depuis le plus récent)
+        
+        Returns:
+            {"posts", "pages", "reached_cursor" (post déjà vu atteint),
+             "complete" (curseur ou fin du listing atteint: aucun post manqué)}
+        """
+        posts = []
+        seen = set()
+        pages = 0
+        reached_cursor = False
+        exhausted = False
+        restarted = False
+        while len(posts) < limit:
+            page_limit = min(PAGE_SIZE, limit - len(posts))
+            page, next_after = await self._new_posts_page(subreddit, page_limit, after, priority)
+            pages += 1
+            if not page and after is not None:
+                # Page vide après `after`: ce post a été supprimé du listing. Reprendre au
+                # post parcouru juste avant, ou une fois au début du listing (le curseur
+                # arrête le parcours, les posts déjà vus sont ignorés)
+                walked = [f"t3_{post['id']}" for post in posts]
+                earlier = walked[:walked.index(after)] if after in walked else []
+                if earlier:
+                    after = earlier[-1]
+                    continue
+                if restarted:
+                    break
+                after = None
+                restarted = True
+                continue
+            for post in page:
+                # Le post du curseur, ou plus ancien s'il a été supprimé du listing
+                if cursor and (f"t3_{post['id']}" == cursor["fullname"]
+                               or post["created_timestamp"] < cursor["created_utc"]):
+                    reached_cursor = True
+                    break
+                if post["id"] not in seen:
+                    seen.add(post["id"])
+                    posts.append(post)
+            if reached_cursor:
+                break
+            if next_after is None:
+                # Reddit n'indique pas de page suivante: fin du listing (une page
+                # courte ne suffit pas, Reddit en renvoie en cours de listing)
+                exhausted = True
+                break
+            after = next_after
+        return {
+            "posts": posts,
+            "pages": pages,
+            "reached_cursor": reached_cursor,
+            "complete": reached_cursor or exhausted
+        }
+
+
+class AsyncRedditAPIClient(_ScheduledClient):
+    """Client Reddit non bloquant (Async PRAW), même interface que RedditAPIClient en coroutines"""
+    
+    def __init__(self, client_id: str, client_secret: str, user_agent: str,
+                 scheduler: RateLimitScheduler = None):
+        """Prépare le client Async PRAW (créé au premier appel, dans la boucle asyncio)"""
+        if asyncpraw is None:
+            raise ValueError("Le backend d'API 'asyncpraw' nécessite le paquet 'asyncpraw'")
+        self._credentials = {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "user_agent": user_agent
+        }
+        self._reddit = None
+        self.scheduler = scheduler
+    
+    @property
+    def reddit(self):
+        """Instance Async PRAW (sa session HTTP est liée à la boucle qui l'a créée)"""
+        if self._reddit is None:
+            self._reddit = asyncpraw.Reddit(**self._credentials)
+        return self._reddit
+    
+    def _limits(self) -> Optional[Dict]:
+        return self._reddit.auth.limits if self._reddit is not None else None
+    
+    async def close(self):
+        """Ferme la session HTTP"""
+        if self._reddit is not None:
+            await self._reddit.close()
+            self._reddit = None
+    
+    async def search_posts(self, query: str, subreddit: Optional[str] = None,
+                           sort: str = "relevance", limit: int = 10,
+                           priority: str = "interactive") -> List[Dict]:
+        """Recherche des posts sur Reddit"""
+        await self._acquire(estimate_requests(limit), priority)
+        try:
+            sub = await self.reddit.subreddit(subreddit or "all")
+            return [extract_post_data(post) async for post in sub.search(query, sort=sort, limit=limit)]
+        
+        except Exception as e:
+            raise Exception(f"Erreur recherche posts: {e}")
+        finally:
+            self._observe()
+    
+    async def get_subreddit_posts(self, subreddit: str, sort: str = "hot",
+                                  limit: int = 25, time_filter: str = "day",
+                                  priority: str = "interactive") -> List[Dict]:
+        """Récupère les posts d'un subreddit"""
+        await self._acquire(estimate_requests(limit), priority)
+        try:
+            sub = await self.reddit.subreddit(subreddit)
+            
+            if sort == "hot":
+                posts = sub.hot(limit=limit)
+            elif sort == "new":
+                posts = sub.new(limit=limit)
+            elif sort == "top":
+                posts = sub.top(time_filter=time_filter, limit=limit)
+            else:
+                posts = sub.rising(limit=limit)
+            
+            return [extract_post_data(post, include_extra=True) async for post in posts]
+        
+        except Exception as e:
+            raise Exception(f"Erreur collecte subreddit: {e}")
+        finally:
+            self._observe()
+    
+    async def _new_posts_page(self, subreddit: str, limit: int, after: Optional[str],
+                              priority: str) -> Tuple[List[Dict], Optional[str]]:
+        await self._acquire(1, priority)
+        try:
+            sub = await self.reddit.subreddit(subreddit)
+            listing = sub.new(limit=limit, params={"after": after} if after else None)
+            posts = [extract_post_data(post, include_extra=True) async for post in listing]
+            return posts, listing_after(listing)
+        
+        except Exception as e:
+            raise Exception(f"Erreur collecte subreddit: {e}")
+        finally:
+            self._observe()
+    
+    async def get_post_with_comments(self, post_id: str, limit: int = 100,
+                                     priority: str = "interactive") -> Tuple[Dict, List[Dict]]:
+        """Récupère un post avec ses commentaires"""
+        await self._acquire(1, priority)
+        try:
+            submission = await self.reddit.submission(id=post_id)
+            await submission.comments.replace_more(limit=0)
+            
+            post_data = extract_post_data(submission)
+            
+            comments = []
+            for comment in submission.comments.list()[:limit]:
+                if hasattr(comment, 'body'):
+                    comments.append(extract_comment_data(comment, post_id))
+            
+            return post_data, comments
+        
+        except Exception as e:
+            raise Exception(f"Erreur collecte commentaires: {e}")
+        finally:
+            self._observe()
+    
+    async def get_post_by_id(self, post_id: str, priority: str = "interactive") -> Dict:
+        """Récupère un post par son ID"""
+        await self._acquire(1, priority)
+        try:
+            return extract_post_data(await self.reddit.submission(id=post_id))
+        except Exception as e:
+            raise Exception(f"Erreur récupération post: {e}")
+        finally:
+            self._observe()
+    
+    async def get_comment_by_id(self, comment_id: str, priority: str = "interactive") -> Dict:
+        """Récupère un commentaire par son ID"""
+        await self._acquire(1, priority)
+        try:
+            comment = await self.reddit.comment(id=comment_id)
+            # link_id: "t3_<id du post>"
+            return extract_comment_data(comment, comment.link_id.split("_", 1)[-1])
+        except Exception as e:
+            raise Exception(f"Erreur récupération commentaire: {e}")
+        finally:
+            self._observe()
+    
+    async def get_user_data(self, username: str, include_posts: bool = True,
+                            include_comments: bool = True, limit: int = 100,
+                            priority: str = "interactive") -> Dict:
+        """Récupère les données d'un utilisateur"""
+        await self._acquire(1 + estimate_requests(limit, include_posts + include_comments), priority)
+        try:
+            user = await self.reddit.redditor(username, fetch=True)
+            user_data = extract_user_data(user, username)
+            
+            if include_posts:
+                async for submission in user.submissions.new(limit=limit):
+                    user_data["posts"].append(extract_user_post(submission))
+            
+            if include_comments:
+                async for comment in user.comments.new(limit=limit):
+                    if hasattr(comment, 'body'):
+                        user_data["comments"].append(extract_user_comment(comment))
+            
+            return user_data
+        
+        except Exception as e:
+            raise Exception(f"Erreur données utilisateur: {e}")
+        finally:
+            self._observe()
+    
+    async def get_subreddit_info(self, subreddit: str, priority: str = "interactive") -> Dict:
+        """Récupère les informations d'un subreddit"""
+        await self._acquire(1, priority)
+        try:
+            return extract_subreddit_info(await self.reddit.subreddit(subreddit, fetch=True))
+        
+        except Exception as e:
+            raise Exception(f"Erreur info subreddit: {e}")
+        finally:
+            self._observe()
+
+
+class ThreadedRedditAPIClient(_ScheduledClient):
+    """Client PRAW synchrone exposé en coroutines: chaque appel s'exécute dans le pool de threads"""
+    
+    def __init__(self, client_id: str, client_secret: str, user_agent: str, pool: ApiCallPool = None,
+                 scheduler: RateLimitScheduler = None):
+        self.blocking = RedditAPIClient(client_id, client_secret, user_agent)
+        self.pool = pool or ApiCallPool()
+        self.scheduler = scheduler
+    
+    def _limits(self) -> Optional[Dict]:
+        return self.blocking.reddit.auth.limits
+    
+    async def _run(self, cost: int, priority: str, func, *args, lane: str = "default"):
+        """Exécute un appel bloquant dans le pool, à son tour auprès de l'ordonnanceur"""
+        await self._acquire(cost, priority)
+        try:
+            return await self.pool.run(func, *args, lane=lane)
+        finally:
+            self._observe()
+    
+    async def close(self):
+        """Rien à fermer (PRAW n'a pas de session à libérer; le pool appartient au serveur)"""
+    
+    async def search_posts(self, query: str, subreddit: Optional[str] = None,
+                           sort: str = "relevance", limit: int = 10,
+                           priority: str = "interactive") -> List[Dict]:
+        """Recherche des posts sur Reddit"""
+        return await self._run(
+            estimate_requests(limit), priority, self.blocking.search_posts, query, subreddit, sort, limit
+        )
+    
+    async def get_subreddit_posts(self, subreddit: str, sort: str = "hot",
+                                  limit: int = 25, time_filter: str = "day",
+                                  priority: str = "interactive") -> List[Dict]:
+        """Récupère les posts d'un subreddit"""
+        return await self._run(
+            estimate_requests(limit), priority,
+            self.blocking.get_subreddit_posts, subreddit, sort, limit, time_filter
+        )
+    
+    async def _new_posts_page(self, subreddit: str, limit: int, after: Optional[str],
+                              priority: str) -> Tuple[List[Dict], Optional[str]]:
+        return await self._run(1, priority, self.blocking.get_new_posts_page, subreddit, limit, after)
+    
+    async def get_post_with_comments(self, post_id: str, limit: int = 100,
+                                     priority: str = "interactive") -> Tuple[Dict, List[Dict]]:
+        """Récupère un post avec ses commentaires"""
+        return await self._run(1, priority, self.blocking.get_post_with_comments, post_id, limit)
+    
+    async def get_post_by_id(self, post_id: str, priority: str = "interactive") -> Dict:
+        """Récupère un post par son ID"""
+        return await self._run(1, priority, self.blocking.get_post_by_id, post_id, lane="fast")
+    
+    async def get_comment_by_id(self, comment_id: str, priority: str = "interactive") -> Dict:
+        """Récupère un commentaire par son ID"""
+        return await self._run(1, priority, self.blocking.get_comment_by_id, comment_id, lane="fast")
+    
+    async def get_user_data(self, username: str, include_posts: bool = True,
+                            include_comments: bool = True, limit: int = 100,
+                            priority: str = "interactive") -> Dict:
+        """Récupère les données d'un utilisateur"""
+        return await self._run(
+            1 + estimate_requests(limit, include_posts + include_comments), priority,
+            self.blocking.get_user_data, username, include_posts, include_comments, limit
+        )
+    
+    async def get_subreddit_info(self, subreddit: str, priority: str = "interactive") -> Dict:
+        """Récupère les informations d'un subreddit"""
+        return await self._run(1, priority, self.blocking.get_subreddit_info, subreddit, lane="fast")
+
+
+def create_api_client(config, pool: ApiCallPool = None, scheduler: RateLimitScheduler = None,
+                      cache: ResponseCache = None) -> CachedAPIClient:
+    """
+    Crée le client d'API configuré par API_BACKEND
+    
+    Args:
+        config: Classe de configuration (RedditConfig)
+        pool: Pool de threads des appels bloquants (backend "praw")
+        scheduler: Ordonnanceur de débit partagé (None: pas de limitation)
+        cache: Cache des réponses (None: pas de cache)
+    
+    Returns:
+        AsyncRedditAPIClient (backend "asyncpraw") ou ThreadedRedditAPIClient (backend "praw"),
+        précédé du cache de réponses
+    """
+    backend = config.API_BACKEND
+    if backend == "asyncpraw":
+        client = AsyncRedditAPIClient(config.CLIENT_ID, config.CLIENT_SECRET, config.USER_AGENT, scheduler)
+        return CachedAPIClient(client, cache)
+    if backend == "praw":
+        client = ThreadedRedditAPIClient(
+            config.CLIENT_ID, config.CLIENT_SECRET, config.USER_AGENT, pool, scheduler
+        )
+        return CachedAPIClient(client, cache)
+    raise ValueError(
+        f"Backend d'API invalide: {backend}. Options valides: {config.VALID_API_BACKENDS}"
+    )
\ No newline at end of file
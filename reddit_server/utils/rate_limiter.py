@@ -0,0 +1,214 @@
+"""
+Ordonnanceur des appels à l'API Reddit (seau à jetons piloté par les en-têtes de quota)
+Fichier: mcp_servers/reddit_server/utils/rate_limiter.py
+
+Chaque appel du client d'API réserve des jetons (une estimation du nombre de
+requêtes HTTP) avant de partir. Le seau se remplit au débit qui répartit le
+quota restant (X-Ratelimit-Remaining) sur le temps restant avant la
+réinitialisation de la fenêtre (X-Ratelimit-Reset), lus après chaque appel via
+reddit.auth.limits: le débit soutenu est maximal sans jamais épuiser la fenêtre,
+et PRAW n'a plus à dormir au milieu d'une requête (429).
+
+Priorités: les appels "interactive" passent avant les appels "bulk" en attente,
+et les appels "bulk" laissent une réserve du quota aux appels interactifs.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import Dict, Optional
+
+# Priorités, de la plus haute à la plus basse
+PRIORITIES = ["interactive", "bulk"]
+
+# Résultats par page des listings Reddit
+PAGE_SIZE = 100
+
+
+def estimate_requests(limit: int, listings: int = 1) -> int:
+    """Nombre de requêtes HTTP d'un ou plusieurs listings de `limit` éléments"""
+    return listings * max(1, math.ceil(limit / PAGE_SIZE))
+
+
+class RateLimitScheduler:
+    """Seau à jetons partagé par tous les appels à l'API, avec file d'attente par priorité"""
+    
+    def __init__(self, requests_per_window: int = 1000, window_seconds: float = 600,
+                 burst: int = 10, bulk_reserve: int = 50):
+        """
+        Args:
+            requests_per_window: Quota par fenêtre tant qu'aucun en-tête n'a été observé
+            window_seconds: Durée de la fenêtre de quota
+            burst: Capacité du seau (appels partant sans attendre après une pause)
+            bulk_reserve: Requêtes du quota restant réservées aux appels interactifs
+        """
+        if requests_per_window < 1 or window_seconds <= 0 or burst < 1 or bulk_reserve < 0:
+            raise ValueError(
+                f"Limite de débit invalide: {requests_per_window} requêtes / {window_seconds} s, "
+                f"rafale {burst}, réserve {bulk_reserve}"
+            )
+        self.requests_per_window = requests_per_window
+        self.window_seconds = window_seconds
+        self.burst = burst
+        self.bulk_reserve = bulk_reserve
+        
+        self.tokens = float(burst)
+        self.rate = requests_per_window / window_seconds
+        self._updated = time.monotonic()
+        # Quota observé (None: inconnu) et fin de la fenêtre, en temps monotone
+        self.remaining: Optional[float] = None
+        self._reset_at: Optional[float] = None
+        
+        # File d'attente: (rang de priorité, ordre d'arrivée, coût, future)
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        
+        self.acquired = {priority: 0 for priority in PRIORITIES}
+        self.delayed = {priority: 0 for priority in PRIORITIES}
+        self._total_wait_ms = {priority: 0.0 for priority in PRIORITIES}
+        self.max_wait_ms = {priority: 0.0 for priority in PRIORITIES}
+        self.exhausted = 0
+    
+    @classmethod
+    def from_config(cls, config) -> Optional["RateLimitScheduler"]:
+        """Crée l'ordonnanceur décrit par la configuration (None s'il est désactivé)"""
+        if not config.RATE_LIMIT_ENABLED:
+            return None
+        return cls(
+            config.RATE_LIMIT_REQUESTS,
+            config.RATE_LIMIT_WINDOW_SECONDS,
+            config.RATE_LIMIT_BURST,
+            config.RATE_LIMIT_BULK_RESERVE
+        )
+    
+    def _refill(self, now: float):
+        """Ajoute les jetons accumulés depuis la dernière mise à jour"""
+        if self._reset_at is not None and now >= self._reset_at:
+            # Nouvelle fenêtre: quota de nouveau inconnu, débit par défaut
+            self.remaining = None
+            self._reset_at = None
+            self.rate = self.requests_per_window / self.window_seconds
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def _try_take(self, cost: int, rank: int, now: float) -> bool:
+        """Consomme les jetons d'un appel si le seau et le quota le permettent"""
+        self._refill(now)
+        if self.tokens < min(cost, self.burst):
+            return False
+        if self.remaining is not None:
+            reserve = self.bulk_reserve if rank > 0 else 0
+            if self.remaining - cost < reserve:
+                return False
+            self.remaining -= cost
+        self.tokens -= cost
+        return True
+    
+    def _delay(self, cost: int, rank: int, now: float) -> float:
+        """Temps avant que l'appel en tête de file puisse partir"""
+        if self.remaining is not None and self._reset_at is not None:
+            reserve = self.bulk_reserve if rank > 0 else 0
+            if self.remaining - cost < reserve:
+                return max(self._reset_at - now, 0.001)
+        missing = min(cost, self.burst) - self.tokens
+        return max(missing / self.rate, 0.001) if self.rate > 0 else self.window_seconds
+    
+    def _dispatch(self):
+        """Libère les appels en attente, par priorité, tant que les jetons suffisent"""
+        self._timer = None
+        now = time.monotonic()
+        while self._waiters:
+            rank, _, cost, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._try_take(cost, rank, now):
+                self._timer = asyncio.get_running_loop().call_later(
+                    self._delay(cost, rank, now), self._dispatch
+                )
+                return
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+    
+    async def acquire(self, cost: int = 1, priority: str = "interactive"):
+        """
+        Attend que l'appel puisse partir
+        
+        Args:
+            cost: Requêtes HTTP estimées de l'appel
+            priority: "interactive" ou "bulk"
+        """
+        rank = PRIORITIES.index(priority)
+        started = time.monotonic()
+        if not self._waiters and self._try_take(cost, rank, started):
+            self.acquired[priority] += 1
+            return
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (rank, next(self._sequence), cost, future))
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+        await future
+        
+        wait_ms = (time.monotonic() - started) * 1000
+        self.acquired[priority] += 1
+        self.delayed[priority] += 1
+        self._total_wait_ms[priority] += wait_ms
+        self.max_wait_ms[priority] = max(self.max_wait_ms[priority], wait_ms)
+    
+    def observe(self, limits: Dict):
+        """
+        Recale le seau sur le quota observé
+        
+        Args:
+            limits: reddit.auth.limits ({"remaining", "reset_timestamp", "used"}, None avant la première réponse)
+        """
+        remaining = limits.get("remaining") if limits else None
+        reset_timestamp = limits.get("reset_timestamp") if limits else None
+        if remaining is None or reset_timestamp is None:
+            return
+        now = time.monotonic()
+        self._refill(now)
+        seconds = max(reset_timestamp - time.time(), 0.0)
+        self.remaining = float(remaining)
+        self._reset_at = now + seconds
+        if self.remaining <= 0:
+            self.exhausted += 1
+        # Débit qui répartit le quota restant sur la fin de la fenêtre
+        self.rate = max(self.remaining, 0.0) / max(seconds, 1.0)
+        if self._waiters:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._dispatch()
+    
+    def get_stats(self) -> Dict:
+        """Retourne le quota restant, l'état du seau et la file d'attente"""
+        now = time.monotonic()
+        self._refill(now)
+        queued = {priority: 0 for priority in PRIORITIES}
+        for rank, _, _, future in self._waiters:
+            if not future.done():
+                queued[PRIORITIES[rank]] += 1
+        return {
+            "remaining": self.remaining,
+            "reset_in_seconds": round(self._reset_at - now, 1) if self._reset_at is not None else None,
+            "tokens": round(self.tokens, 2),
+            "rate_per_second": round(self.rate, 3),
+            "burst": self.burst,
+            "bulk_reserve": self.bulk_reserve,
+            "queue_depth": sum(queued.values()),
+            "queued": queued,
+            "acquired": dict(self.acquired),
+            "delayed": dict(self.delayed),
+            "avg_wait_ms": {
+                priority: round(self._total_wait_ms[priority] / self.delayed[priority], 2)
+                if self.delayed[priority] else 0.0
+                for priority in PRIORITIES
+            },
+            "max_wait_ms": {priority: round(ms, 2) for priority, ms in self.max_wait_ms.items()},
+            "exhausted": self.exhausted
+        }
\ No newline at end of file
@@ -0,0 +1,380 @@
+"""
+Cache des réponses de l'API Reddit (TTL par méthode, clés normalisées)
+Fichier: mcp_servers/reddit_server/utils/response_cache.py
+
+Les lectures répétées avec les mêmes paramètres (infos d'un subreddit,
+recherches, listings) sont servies depuis la mémoire tant que la réponse a
+moins de TTL secondes, sans consommer de quota d'API:
+- TTL par méthode, et par tri pour les listings ("get_subreddit_posts:hot")
+- clé normalisée: noms de subreddit, d'utilisateur et requête insensibles à la
+  casse; la limite ne fait pas partie de la clé: une réponse collectée avec une
+  limite plus grande sert aussi les limites plus petites (préfixe)
+- LRU borné en nombre d'entrées et en octets (réponses stockées sérialisées:
+  chaque lecture retourne une copie)
+- appels identiques simultanés regroupés en un seul appel à l'API
+- persistance optionnelle entre deux redémarrages
+- max_staleness (outils): âge maximal accepté pour un appel (0: appel à l'API)
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from storage.durability import atomic_write_bytes
+from utils.serializer import JSONSerializer
+
+# Paramètres comparés sans tenir compte de la casse
+CASE_INSENSITIVE_PARAMS = ("query", "subreddit", "username")
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """
+    Lit les TTL par méthode
+    
+    Args:
+        spec: "méthode=secondes,méthode:tri=secondes" (ex: "get_subreddit_info=3600,get_subreddit_posts:hot=60")
+    
+    Returns:
+        {méthode ou méthode:tri: TTL en secondes}
+    """
+    ttls = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, value = item.partition("=")
+        try:
+            ttl = float(value)
+        except ValueError:
+            ttl = -1
+        if not name.strip() or ttl < 0:
+            raise ValueError(
+                f"TTL de cache invalide: {item}. Format attendu: méthode=secondes (>= 0)"
+            )
+        ttls[name.strip()] = ttl
+    return ttls
+
+
+def truncate(method: str, value: Any, limit: Optional[int]) -> Any:
+    """Réduit une réponse collectée avec une limite plus grande à la limite demandée"""
+    if limit is None:
+        return value
+    if method == "get_post_with_comments":
+        post, comments = value
+        return post, comments[:limit]
+    if method == "get_user_data":
+        return {**value, "posts": value["posts"][:limit], "comments": value["comments"][:limit]}
+    if isinstance(value, list):
+        return value[:limit]
+    return value
+
+
+class ResponseCache:
+    """Réponses de l'API en cache LRU, servies tant qu'elles ont moins que leur TTL"""
+    
+    def __init__(self, ttls: Dict[str, float], max_entries: int = 1000,
+                 max_bytes: int = 32 * 1024 * 1024, persist_file: Path = None,
+                 json_backend: str = "auto"):
+        """
+        Args:
+            ttls: {méthode ou méthode:tri: TTL en secondes} (absentes ou 0: pas de cache)
+            max_entries: Nombre maximal de réponses
+            max_bytes: Taille maximale des réponses sérialisées
+            persist_file: Fichier de sauvegarde entre deux redémarrages (optionnel)
+            json_backend: Backend de sérialisation (voir JSONSerializer)
+        """
+        self.ttls = dict(ttls)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.persist_file = Path(persist_file) if persist_file else None
+        self.serializer = JSONSerializer(json_backend)
+        
+        # clé -> (date de collecte (epoch), limite, réponse sérialisée)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[int], bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.coalesced = 0
+        self.expired = 0
+        self.evictions = 0
+        self.loaded = 0
+        
+        if self.persist_file is not None:
+            self.load()
+    
+    @classmethod
+    def from_config(cls, config) -> Optional["ResponseCache"]:
+        """Crée le cache décrit par la configuration (None s'il est désactivé)"""
+        if not config.API_CACHE_ENABLED:
+            return None
+        return cls(
+            parse_ttls(config.API_CACHE_TTLS),
+            config.API_CACHE_MAX_ENTRIES,
+            config.API_CACHE_MAX_BYTES,
+            config.API_CACHE_FILE if config.API_CACHE_PERSIST else None,
+            config.JSON_BACKEND
+        )
+    
+    def ttl(self, method: str, params: Dict[str, Any]) -> float:
+        """TTL d'une méthode (par tri pour les listings), 0 si elle n'est pas mise en cache"""
+        sort = params.get("sort")
+        if sort is not None and f"{method}:{sort}" in self.ttls:
+            return self.ttls[f"{method}:{sort}"]
+        return self.ttls.get(method, 0)
+    
+    def key(self, method: str, params: Dict[str, Any]) -> str:
+        """Clé normalisée d'un appel (sans la limite)"""
+        normalized = {}
+        for name, value in params.items():
+            if name == "limit":
+                continue
+            if name in CASE_INSENSITIVE_PARAMS and isinstance(value, str):
+                value = " ".join(value.split()).lower()
+            normalized[name] = value
+        return f"{method}:{self.serializer.dumps(dict(sorted(normalized.items())))}"
+    
+    def get(self, key: str, method: str, limit: Optional[int], max_age: float) -> Optional[bytes]:
+        """
+        Retourne une réponse en cache assez récente et assez complète
+        
+        Args:
+            key: Clé normalisée
+            method: Méthode (compteurs)
+            limit: Limite demandée (None: sans limite)
+            max_age: Âge maximal accepté en secondes
+        
+        Returns:
+            Réponse sérialisée, None si absente, trop ancienne ou collectée avec une limite plus petite
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, stored_limit, data = entry
+                age = time.time() - stored_at
+                if age > self._max_ttl(method):
+                    # Expirée pour tous les appels: libérée tout de suite
+                    self._remove(key)
+                    self.expired += 1
+                elif age <= max_age and (limit is None or stored_limit is None or stored_limit >= limit):
+                    self._entries.move_to_end(key)
+                    self.hits[method] = self.hits.get(method, 0) + 1
+                    return data
+            self.misses[method] = self.misses.get(method, 0) + 1
+            return None
+    
+    def put(self, key: str, limit: Optional[int], data: bytes, stored_at: float = None):
+        """Ajoute une réponse sérialisée puis évince les moins récemment utilisées"""
+        if self.max_entries <= 0 or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (stored_at or time.time(), limit, data)
+            self._bytes += len(data)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+    
+    def record_coalesced(self, method: str):
+        """Compte comme un succès un appel servi par un appel identique en cours"""
+        with self._lock:
+            self.misses[method] -= 1
+            self.hits[method] = self.hits.get(method, 0) + 1
+            self.coalesced += 1
+    
+    def _max_ttl(self, method: str) -> float:
+        """Plus grand TTL d'une méthode (tous tris confondus)"""
+        return max(
+            (ttl for name, ttl in self.ttls.items() if name == method or name.startswith(f"{method}:")),
+            default=0
+        )
+    
+    def _remove(self, key: str):
+        """Retire une entrée (verrou déjà acquis)"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[2])
+    
+    def load(self):
+        """Recharge les réponses sauvegardées encore valides"""
+        try:
+            with open(self.persist_file, 'rb') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return
+        now = time.time()
+        for line in lines:
+            try:
+                item = self.serializer.loads(line)
+            except Exception:
+                # Fichier tronqué: les lignes suivantes sont ignorées
+                break
+            method = item["key"].split(":", 1)[0]
+            if now - item["stored_at"] <= self._max_ttl(method):
+                self.put(item["key"], item["limit"], self.serializer.dumps_bytes(item["value"]), item["stored_at"])
+                self.loaded += 1
+    
+    def save(self):
+        """Sauvegarde les réponses (atomiquement), des moins récemment utilisées aux plus récentes"""
+        if self.persist_file is None:
+            return
+        with self._lock:
+            entries = list(self._entries.items())
+        lines = [
+            self.serializer.dumps_bytes({
+                "key": key,
+                "stored_at": stored_at,
+                "limit": limit,
+                "value": self.serializer.loads(data)
+            }) + b"\n"
+            for key, (stored_at, limit, data) in entries
+        ]
+        self.persist_file.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(self.persist_file, b"".join(lines))
+    
+    def get_stats(self) -> Dict:
+        """Retourne les compteurs du cache (taux de succès global et par méthode)"""
+        hits = sum(self.hits.values())
+        lookups = hits + sum(self.misses.values())
+        methods = sorted(set(self.hits) | set(self.misses))
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "by_method": {
+                method: {
+                    "hits": self.hits.get(method, 0),
+                    "misses": self.misses.get(method, 0),
+                    "hit_ratio": round(
+                        self.hits.get(method, 0) / (self.hits.get(method, 0) + self.misses.get(method, 0)), 4
+                    )
+                }
+                for method in methods
+            },
+            "coalesced": self.coalesced,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "loaded": self.loaded,
+            "ttls": self.ttls
+        }
+
+
+class CachedAPIClient:
+    """Client d'API précédé du cache de réponses (même interface, plus max_staleness)"""
+    
+    def __init__(self, client, cache: Optional[ResponseCache]):
+        """
+        Args:
+            client: AsyncRedditAPIClient ou ThreadedRedditAPIClient
+            cache: Cache des réponses (None: appels transmis tels quels)
+        """
+        self.client = client
+        self.cache = cache
+        # Appels en cours par clé (limite, réponse à venir): les appels identiques
+        # de limite inférieure ou égale attendent la même réponse
+        self._inflight: Dict[str, Tuple[Optional[int], asyncio.Future]] = {}
+    
+    async def close(self):
+        """Ferme le client"""
+        await self.client.close()
+    
+    async def _call(self, method: str, params: Dict[str, Any], priority: str,
+                    max_staleness: Optional[float]):
+        """Sert un appel depuis le cache, ou appelle l'API et met la réponse en cache"""
+        call = getattr(self.client, method)
+        ttl = self.cache.ttl(method, params) if self.cache is not None else 0
+        if ttl <= 0:
+            return await call(**params, priority=priority)
+        
+        key = self.cache.key(method, params)
+        limit = params.get("limit")
+        max_age = ttl if max_staleness is None else min(ttl, max_staleness)
+        data = self.cache.get(key, method, limit, max_age)
+        inflight = self._inflight.get(key)
+        if data is None and inflight is not None and (limit is None or inflight[0] is None or inflight[0] >= limit):
+            # Même appel en cours: sa réponse sera plus récente que la demande
+            data = await asyncio.shield(inflight[1])
+            if data is not None:
+                self.cache.record_coalesced(method)
+        if data is not None:
+            value = self.cache.serializer.loads(data)
+            if method == "get_post_with_comments":
+                value = tuple(value)
+            return truncate(method, value, limit)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (limit, future)
+        try:
+            value = await call(**params, priority=priority)
+            data = self.cache.serializer.dumps_bytes(value)
+            self.cache.put(key, limit, data)
+            future.set_result(data)
+            return value
+        finally:
+            if not future.done():
+                # Échec: les appels en attente interrogent l'API eux-mêmes
+                future.set_result(None)
+            if self._inflight.get(key, (None, None))[1] is future:
+                del self._inflight[key]
+    
+    async def search_posts(self, query: str, subreddit: Optional[str] = None,
+                           sort: str = "relevance", limit: int = 10,
+                           priority: str = "interactive", max_staleness: Optional[float] = None):
+        """Recherche des posts sur Reddit"""
+        params = {"query": query, "subreddit": subreddit, "sort": sort, "limit": limit}
+        return await self._call("search_posts", params, priority, max_staleness)
+    
+    async def get_subreddit_posts(self, subreddit: str, sort: str = "hot",
+                                  limit: int = 25, time_filter: str = "day",
+                                  priority: str = "interactive", max_staleness: Optional[float] = None):
+        """Récupère les posts d'un subreddit"""
+        params = {"subreddit": subreddit, "sort": sort, "limit": limit}
+        if sort == "top":
+            params["time_filter"] = time_filter
+        return await self._call("get_subreddit_posts", params, priority, max_staleness)
+    
+    async def get_new_posts(self, subreddit: str, cursor: Optional[Dict] = None,
+                            limit: int = 1000, priority: str = "interactive",
+                            after: Optional[str] = None) -> Dict:
+        """Récupère les posts plus récents que le curseur (jamais en cache)"""
+        return await self.client.get_new_posts(subreddit, cursor, limit, priority=priority, after=after)
+    
+    async def get_post_with_comments(self, post_id: str, limit: int = 100,
+                                     priority: str = "interactive", max_staleness: Optional[float] = None):
+        """Récupère un post avec ses commentaires"""
+        params = {"post_id": post_id, "limit": limit}
+        return await self._call("get_post_with_comments", params, priority, max_staleness)
+    
+    async def get_post_by_id(self, post_id: str, priority: str = "interactive"):
+        """Récupère un post par son ID (jamais en cache)"""
+        return await self.client.get_post_by_id(post_id, priority=priority)
+    
+    async def get_comment_by_id(self, comment_id: str, priority: str = "interactive"):
+        """Récupère un commentaire par son ID (jamais en cache)"""
+        return await self.client.get_comment_by_id(comment_id, priority=priority)
+    
+    async def get_user_data(self, username: str, include_posts: bool = True,
+                            include_comments: bool = True, limit: int = 100,
+                            priority: str = "interactive", max_staleness: Optional[float] = None):
+        """Récupère les données d'un utilisateur"""
+        params = {
+            "username": username,
+            "include_posts": include_posts,
+            "include_comments": include_comments,
+            "limit": limit
+        }
+        return await self._call("get_user_data", params, priority, max_staleness)
+    
+    async def get_subreddit_info(self, subreddit: str, priority: str = "interactive",
+                                 max_staleness: Optional[float] = None):
+        """Récupère les informations d'un subreddit"""
+        return await self._call("get_subreddit_info", {"subreddit": subreddit}, priority, max_staleness)
\ No newline at end of file
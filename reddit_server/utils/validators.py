@@ -3,7 +3,8 @@ Validateurs pour les paramètres du serveur Reddit
 Fichier: mcp_servers/reddit_server/utils/validators.py
 """
 
-from typing import Any, Dict
+from datetime import datetime
+from typing import Any, Dict, Optional
 from config import RedditConfig
 
 
@@ -15,6 +16,34 @@ class ValidationError(Exception):
 class RedditValidator:
     """Validateur pour les paramètres des outils Reddit"""
     
+    @staticmethod
+    def validate_flag(args: Dict[str, Any], name: str, default: bool = False) -> bool:
+        """Valide un paramètre booléen optionnel"""
+        value = args.get(name, default)
+        if not isinstance(value, bool):
+            raise ValidationError(f"Le paramètre '{name}' doit être un booléen")
+        return value
+    
+    @staticmethod
+    def validate_priority(args: Dict[str, Any]) -> str:
+        """Valide la priorité des appels à l'API ("interactive" par défaut)"""
+        priority = args.get("priority", "interactive")
+        if priority not in RedditConfig.VALID_PRIORITIES:
+            raise ValidationError(
+                f"Priorité invalide: {priority}. Options valides: {RedditConfig.VALID_PRIORITIES}"
+            )
+        return priority
+    
+    @staticmethod
+    def validate_max_staleness(args: Dict[str, Any]) -> Optional[int]:
+        """Valide l'âge maximal accepté d'une réponse en cache (secondes, optionnel)"""
+        max_staleness = args.get("max_staleness")
+        if max_staleness is None:
+            return None
+        if not isinstance(max_staleness, int) or isinstance(max_staleness, bool) or max_staleness < 0:
+            raise ValidationError("Max staleness doit être un nombre de secondes positif ou nul")
+        return max_staleness
+    
     @staticmethod
     def validate_search_params(args: Dict[str, Any]) -> Dict[str, Any]:
         """Valide les paramètres de recherche"""
@@ -36,9 +65,147 @@ class RedditValidator:
             "query": query.strip(),
             "subreddit": args.get("subreddit"),
             "sort": sort,
+            "limit": limit,
+            "skip_known": RedditValidator.validate_flag(args, "skip_known"),
+            "priority": RedditValidator.validate_priority(args),
+            "max_staleness": RedditValidator.validate_max_staleness(args)
+        }
+    
+    @staticmethod
+    def validate_day(args: Dict[str, Any], name: str) -> Optional[str]:
+        """Valide une date optionnelle au format yyyy-mm-dd"""
+        value = args.get(name)
+        if value is None:
+            return None
+        try:
+            return datetime.strptime(str(value), '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            raise ValidationError(f"Le paramètre '{name}' doit être une date au format yyyy-mm-dd")
+    
+    @staticmethod
+    def validate_local_search_params(args: Dict[str, Any]) -> Dict[str, Any]:
+        """Valide les paramètres de recherche dans le corpus local"""
+        query = args.get("query")
+        if not query or not query.strip():
+            raise ValidationError("Le paramètre 'query' est requis et ne peut pas être vide")
+        
+        kinds = args.get("kinds", ["posts", "comments"])
+        if not isinstance(kinds, list) or not kinds or any(kind not in ("posts", "comments") for kind in kinds):
+            raise ValidationError(f"Kinds invalide: {kinds}. Options valides: ['posts', 'comments']")
+        
+        match = args.get("match", "all")
+        if match not in RedditConfig.VALID_TEXT_MATCH_MODES:
+            raise ValidationError(
+                f"Match invalide: {match}. Options valides: {RedditConfig.VALID_TEXT_MATCH_MODES}"
+            )
+        
+        limit = args.get("limit", RedditConfig.DEFAULT_SEARCH_LIMIT)
+        if not isinstance(limit, int) or limit < 1 or limit > 100:
+            raise ValidationError("Limit doit être entre 1 et 100")
+        
+        since = RedditValidator.validate_day(args, "since")
+        until = RedditValidator.validate_day(args, "until")
+        if since and until and since > until:
+            raise ValidationError("Le paramètre 'since' doit précéder 'until'")
+        
+        subreddit = args.get("subreddit")
+        return {
+            "query": query.strip(),
+            "subreddit": subreddit.strip() if subreddit and subreddit.strip() else None,
+            "since": since,
+            "until": until,
+            "kinds": list(dict.fromkeys(kinds)),
+            "match": match,
             "limit": limit
         }
     
+    @staticmethod
+    def validate_stats_params(args: Dict[str, str]) -> Dict[str, Any]:
+        """Valide les paramètres de requête de reddit://stats (chaînes de l'URI)"""
+        unknown = sorted(set(args) - {"subreddit", "since", "until", "quantiles", "top"})
+        if unknown:
+            raise ValidationError(
+                f"Paramètres inconnus: {unknown}. Options valides: ['subreddit', 'since', 'until', 'quantiles', 'top']"
+            )
+        
+        since = RedditValidator.validate_day(args, "since")
+        until = RedditValidator.validate_day(args, "until")
+        if since and until and since > until:
+            raise ValidationError("Le paramètre 'since' doit précéder 'until'")
+        
+        try:
+            quantiles = [float(q) for q in args.get("quantiles", "0.5,0.9,0.99").split(",") if q.strip()]
+        except ValueError:
+            raise ValidationError("Quantiles doit être une liste de nombres séparés par des virgules (ex: 0.5,0.9)")
+        if not quantiles or len(quantiles) > 20 or any(not 0 <= q <= 1 for q in quantiles):
+            raise ValidationError("Quantiles doit contenir de 1 à 20 valeurs entre 0 et 1")
+        
+        top = args.get("top", "20")
+        if not top.isdigit() or not 1 <= int(top) <= 1000:
+            raise ValidationError("Top doit être entre 1 et 1000")
+        
+        subreddit = args.get("subreddit", "").strip()
+        return {
+            "subreddit": subreddit or None,
+            "since": since,
+            "until": until,
+            "quantiles": quantiles,
+            "top_subreddits": int(top)
+        }
+    
+    @staticmethod
+    def validate_similar_posts_params(args: Dict[str, Any]) -> Dict[str, Any]:
+        """Valide les paramètres de recherche de posts similaires (post_id ou text)"""
+        post_id = args.get("post_id")
+        text = args.get("text")
+        post_id = post_id.strip() if isinstance(post_id, str) and post_id.strip() else None
+        text = text.strip() if isinstance(text, str) and text.strip() else None
+        if (post_id is None) == (text is None):
+            raise ValidationError("Un seul des paramètres 'post_id' ou 'text' est requis")
+        
+        k = args.get("k", RedditConfig.DEFAULT_SEARCH_LIMIT)
+        if not isinstance(k, int) or k < 1 or k > 100:
+            raise ValidationError("K doit être entre 1 et 100")
+        
+        return {
+            "post_id": post_id,
+            "text": text,
+            "k": k
+        }
+    
+    @staticmethod
+    def validate_comment_thread_params(args: Dict[str, Any]) -> Dict[str, Any]:
+        """Valide les paramètres de lecture d'un fil de commentaires stocké"""
+        post_id = args.get("post_id")
+        if not isinstance(post_id, str) or not post_id.strip():
+            raise ValidationError("Le paramètre 'post_id' est requis")
+        
+        comment_id = args.get("comment_id")
+        if comment_id is not None and (not isinstance(comment_id, str) or not comment_id.strip()):
+            raise ValidationError("Le paramètre 'comment_id' doit être un ID de commentaire")
+        
+        top_k = args.get("top_k", RedditConfig.DEFAULT_SEARCH_LIMIT)
+        if not isinstance(top_k, int) or top_k < 1 or top_k > 100:
+            raise ValidationError("Top_k doit être entre 1 et 100")
+        
+        by = args.get("by", "score")
+        if by not in RedditConfig.VALID_BRANCH_ORDERS:
+            raise ValidationError(
+                f"Critère invalide: {by}. Options valides: {RedditConfig.VALID_BRANCH_ORDERS}"
+            )
+        
+        max_depth = args.get("max_depth")
+        if max_depth is not None and (not isinstance(max_depth, int) or max_depth < 0):
+            raise ValidationError("Max_depth doit être un entier positif ou nul")
+        
+        return {
+            "post_id": post_id.strip(),
+            "comment_id": comment_id.strip() if comment_id else None,
+            "top_k": top_k,
+            "by": by,
+            "max_depth": max_depth
+        }
+    
     @staticmethod
     def validate_subreddit_params(args: Dict[str, Any]) -> Dict[str, Any]:
         """Valide les paramètres de collecte de subreddit"""
@@ -46,15 +213,20 @@ class RedditValidator:
         if not subreddit or not subreddit.strip():
             raise ValidationError("Le paramètre 'subreddit' est requis")
         
-        sort = args.get("sort", "hot")
+        incremental = RedditValidator.validate_flag(args, "incremental")
+        sort = args.get("sort", "new" if incremental else "hot")
         if sort not in RedditConfig.VALID_SUBREDDIT_SORT:
             raise ValidationError(
                 f"Sort invalide: {sort}. Options valides: {RedditConfig.VALID_SUBREDDIT_SORT}"
             )
+        if incremental and sort != "new":
+            raise ValidationError("Le mode incrémental nécessite sort='new'")
         
+        # Mode incrémental: limit borne le nombre de nouveaux posts (plusieurs pages)
+        max_limit = RedditConfig.MAX_INCREMENTAL_LIMIT if incremental else 100
         limit = args.get("limit", RedditConfig.DEFAULT_POST_LIMIT)
-        if not isinstance(limit, int) or limit < 1 or limit > 100:
-            raise ValidationError("Limit doit être entre 1 et 100")
+        if not isinstance(limit, int) or limit < 1 or limit > max_limit:
+            raise ValidationError(f"Limit doit être entre 1 et {max_limit}")
         
         time_filter = args.get("time_filter", "day")
         if time_filter not in RedditConfig.VALID_TIME_FILTERS:
@@ -66,7 +238,11 @@ class RedditValidator:
             "subreddit": subreddit.strip(),
             "sort": sort,
             "limit": limit,
-            "time_filter": time_filter
+            "time_filter": time_filter,
+            "incremental": incremental,
+            "skip_known": RedditValidator.validate_flag(args, "skip_known"),
+            "priority": RedditValidator.validate_priority(args),
+            "max_staleness": RedditValidator.validate_max_staleness(args)
         }
     
     @staticmethod
@@ -82,7 +258,10 @@ class RedditValidator:
         
         return {
             "post_id": post_id.strip(),
-            "limit": limit
+            "limit": limit,
+            "skip_known": RedditValidator.validate_flag(args, "skip_known"),
+            "priority": RedditValidator.validate_priority(args),
+            "max_staleness": RedditValidator.validate_max_staleness(args)
         }
     
     @staticmethod
@@ -100,7 +279,10 @@ class RedditValidator:
             "username": username.strip(),
             "include_posts": args.get("include_posts", True),
             "include_comments": args.get("include_comments", True),
-            "limit": limit
+            "limit": limit,
+            "skip_known": RedditValidator.validate_flag(args, "skip_known"),
+            "priority": RedditValidator.validate_priority(args),
+            "max_staleness": RedditValidator.validate_max_staleness(args)
         }
     
     @staticmethod
@@ -111,5 +293,7 @@ class RedditValidator:
             raise ValidationError("Le paramètre 'subreddit' est requis")
         
         return {
-            "subreddit": subreddit.strip()
+            "subreddit": subreddit.strip(),
+            "priority": RedditValidator.validate_priority(args),
+            "max_staleness": RedditValidator.validate_max_staleness(args)
         }
\ No newline at end of file